@@ -1,12 +1,46 @@
-from .common import Orchestrator, set_openai_api_key
-from .components import OpenAIChatBot, OpenAISpeechToText, Pyttsx3TextToSpeech
+from typing import TYPE_CHECKING
+
+from chat_toolkit.common.lazy_imports import lazy_getattr
+
+if TYPE_CHECKING:
+    from .common import (
+        AsyncOrchestrator,
+        Orchestrator,
+        OrchestratorOptions,
+        set_openai_api_key,
+    )
+    from .components import (
+        AsyncOpenAISpeechToText,
+        OpenAIChatBot,
+        OpenAISpeechToText,
+        Pyttsx3TextToSpeech,
+    )
 
 __version__ = "1.0.1"
 
+# Imported when first used, so that e.g. a text only chatbot doesn't import
+# the audio stack
+__getattr__ = lazy_getattr(
+    __name__,
+    {
+        "set_openai_api_key": ".common",
+        "AsyncOrchestrator": ".common",
+        "AsyncOpenAISpeechToText": ".components",
+        "OpenAIChatBot": ".components",
+        "OpenAISpeechToText": ".components",
+        "Orchestrator": ".common",
+        "OrchestratorOptions": ".common",
+        "Pyttsx3TextToSpeech": ".components",
+    },
+)
+
 __all__ = (
     "set_openai_api_key",
+    "AsyncOrchestrator",
+    "AsyncOpenAISpeechToText",
     "OpenAIChatBot",
     "OpenAISpeechToText",
     "Orchestrator",
+    "OrchestratorOptions",
     "Pyttsx3TextToSpeech",
 )
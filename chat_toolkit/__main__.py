@@ -1,66 +1,377 @@
-import importlib
-from typing import Optional
+from __future__ import annotations
 
-from chat_toolkit.common.orchestrator import Orchestrator
+import json
+from collections.abc import Iterator
+from functools import partial
+from pathlib import Path
+from statistics import mean
+from typing import TYPE_CHECKING, Callable, Optional
 
+from chat_toolkit.common.cassette import CASSETTE_MODES, Cassette
+from chat_toolkit.common.component_registry import (
+    BUILTIN_COMPONENTS,
+    ComponentRegistry,
+)
+from chat_toolkit.common.metrics import METRICS
+from chat_toolkit.common.orchestrator import Orchestrator, OrchestratorOptions
+from chat_toolkit.common.scheduler import SCHEDULER
+from chat_toolkit.common.tracing import TRACER
+from chat_toolkit.common.turn_result import TurnResult
+from chat_toolkit.common.usage_ledger import USAGE_LEDGER
+from chat_toolkit.common.utils import print_banner
+
+if TYPE_CHECKING:
+    # Each mode imports what only it uses (e.g. aiohttp, or worker pools)
+    # when it runs, so that e.g. starting a chat stays quick
+    from chat_toolkit.common.load_generator import LoadProfile
+    from chat_toolkit.common.openai_stub_server import OpenAIStubServer
+    from chat_toolkit.common.server import ConversationServer
+
+COMPONENT_REGISTRY = ComponentRegistry()
+# Class names of the components that ship with the toolkit, importable from
+# COMPONENT_MODULE, as they were before components were registered. Kept for
+# code that reads them; COMPONENT_REGISTRY also has plugin components
 COMPONENTS = {
-    "chatbot": {
-        "chatgpt": "OpenAIChatBot",
-    },
-    "speech_to_text": {
-        "whisper": "OpenAISpeechToText",
-    },
-    "text_to_speech": {
-        "pyttsx3": "Pyttsx3TextToSpeech",
-    },
+    kind: {name: value.rsplit(":", 1)[1] for name, value in components.items()}
+    for kind, components in BUILTIN_COMPONENTS.items()
 }
 COMPONENT_MODULE = "chat_toolkit.components"
 
 
+def build_orchestrator(
+    chatbot: str,
+    speech_to_text: Optional[str],
+    text_to_speech: Optional[str],
+    cassette: Optional[Cassette] = None,
+    **kwargs,
+) -> Orchestrator:
+    """
+    Build an orchestrator with new components, constructed and warmed up
+    concurrently.
+
+    :param chatbot: Name of the chatbot component to use, as registered in
+    `COMPONENT_REGISTRY`.
+    :param speech_to_text: Name of the speech to text component to use, if
+    any.
+    :param text_to_speech: Name of the text to speech component to use, if
+    any.
+    :param cassette: Cassette for the chatbot and speech to text components
+    to record requests to, or replay them from. Optional.
+    :param kwargs: Keyword arguments to pass to the orchestrator.
+    :return: Orchestrator.
+    """
+    cassette_kwargs = {"cassette": cassette} if cassette else {}
+    speech_to_text_factory = None
+    text_to_speech_factory = None
+    if speech_to_text:
+        speech_to_text_factory = partial(
+            COMPONENT_REGISTRY.load("speech_to_text", speech_to_text),
+            **cassette_kwargs,
+        )
+    if text_to_speech:
+        text_to_speech_factory = COMPONENT_REGISTRY.load(
+            "text_to_speech", text_to_speech
+        )
+
+    return Orchestrator.build(
+        partial(
+            COMPONENT_REGISTRY.load("chatbot", chatbot), **cassette_kwargs
+        ),
+        speech_to_text_factory,
+        text_to_speech_factory,
+        **kwargs,
+    )
+
+
 def main(
-    chatbot: str, speech_to_text: Optional[str], text_to_speech: Optional[str]
+    chatbot: str,
+    speech_to_text: Optional[str],
+    text_to_speech: Optional[str],
+    options: Optional[OrchestratorOptions] = None,
+    cassette: Optional[Cassette] = None,
 ) -> Orchestrator:
     """
     Have a conversation in the terminal.
 
     :return:
     """
-    chatbot_obj = getattr(
-        importlib.import_module(COMPONENT_MODULE),
-        COMPONENTS["chatbot"][chatbot],
-    )()
-    kwargs = {"chatbot_component": chatbot_obj}
-
-    if text_to_speech:
-        text_to_speech_obj = getattr(
-            importlib.import_module(COMPONENT_MODULE),
-            COMPONENTS["text_to_speech"][text_to_speech],
-        )()
-        kwargs["text_to_speech_component"] = text_to_speech_obj
-    if speech_to_text:
-        speech_to_text_obj = getattr(
-            importlib.import_module(COMPONENT_MODULE),
-            COMPONENTS["speech_to_text"][speech_to_text],
-        )()
-        kwargs["speech_to_text_component"] = speech_to_text_obj
-
-    orchestrator = Orchestrator(**kwargs)
+    orchestrator = build_orchestrator(
+        chatbot,
+        speech_to_text,
+        text_to_speech,
+        cassette,
+        options=options,
+    )
     orchestrator.terminal_conversation()
     return orchestrator
 
 
+def serve(
+    chatbot: str,
+    speech_to_text: Optional[str],
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    workers: int = 8,
+    max_sessions: Optional[int] = None,
+) -> ConversationServer:
+    """
+    Host conversations over HTTP and WebSockets, until interrupted. Text to
+    speech is not used, since the server has no speakers.
+
+    :return:
+    """
+    from chat_toolkit.common.server import ConversationServer
+
+    server = ConversationServer(
+        partial(build_orchestrator, chatbot, speech_to_text, None),
+        max_workers=workers,
+        max_sessions=max_sessions,
+    )
+    server.run(host, port)
+    return server
+
+
+def stub(
+    host: str = "127.0.0.1",
+    port: int = 8081,
+    latency: float = 0.0,
+    chunk_interval: float = 0.0,
+    rate_limit_rate: float = 0.0,
+    error_rate: float = 0.0,
+) -> OpenAIStubServer:
+    """
+    Serve a local stand in for OpenAI's API, until interrupted.
+
+    :return:
+    """
+    from chat_toolkit.common.openai_stub_server import (
+        OpenAIStubServer,
+        StubFailures,
+    )
+
+    server = OpenAIStubServer(
+        latency=latency,
+        chunk_interval=chunk_interval,
+        failures=StubFailures(rate_limit_rate, error_rate),
+    )
+    print(f"Set openai.api_base to http://{host}:{port}/v1")
+    server.run(host, port)
+    return server
+
+
+def replay(
+    chatbot: str,
+    speech_to_text: Optional[str],
+    text_to_speech: Optional[str],
+    script: str,
+    output: Optional[str] = None,
+    cassette: Optional[Cassette] = None,
+) -> list[TurnResult]:
+    """
+    Have a scripted conversation without a terminal, printing how long each
+    stage of a turn took on average and what the conversation cost.
+
+    :param script: JSONL file with one turn per line, either
+    {"message": "..."} or {"audio": "path/to/audio.wav"} (relative to the
+    script), optionally with {"start_prompt": "..."} lines to prompt the
+    chatbot. Alternatively, a directory of WAV files, sent in name order as
+    audio messages.
+    :param output: JSONL file to write the result of each turn to.
+    Optional.
+    :param cassette: Cassette to record requests to, or replay them from.
+    Optional.
+    :return: Result of each turn.
+    """
+    orchestrator = build_orchestrator(
+        chatbot, speech_to_text, text_to_speech, cassette
+    )
+    results = []
+    for turn in _read_replay_script(Path(script)):
+        if "start_prompt" in turn:
+            orchestrator.chatbot_component.prompt_chatbot(turn["start_prompt"])
+            continue
+        result = orchestrator.run_turn(turn.get("audio") or turn["message"])
+        print(f"\nUser: {result.user_input}")
+        print(f"\nChatbot: {result.response}")
+        results.append(result)
+
+    if output:
+        with open(output, "w") as f:
+            for result in results:
+                f.write(json.dumps(result.to_dict()) + "\n")
+
+    print("\nReplay finished.\n")
+    orchestrator.print_cost_summary()
+    stages: dict[str, list[float]] = {
+        stage: [] for result in results for stage in result.timings
+    }
+    for result in results:
+        for stage, seconds in result.timings.items():
+            stages[stage].append(seconds)
+    Orchestrator._print_statistics(
+        "Timing Summary (Mean seconds per turn)",
+        {stage: mean(seconds) for stage, seconds in stages.items()},
+    )
+    return results
+
+
+def bench(
+    orchestrator_factory: Callable[[], Orchestrator],
+    profile: Optional[LoadProfile] = None,
+    output: Optional[str] = None,
+    baseline: Optional[str] = None,
+) -> dict:
+    """
+    Have many conversations at once, printing throughput and latency
+    percentiles per stage, and how they changed from a baseline run.
+
+    :param orchestrator_factory: Creates an orchestrator for each
+    conversation, e.g. `build_orchestrator` with component names.
+    :param profile: The conversations to have. Optional.
+    :param output: JSON file to write the result of the run to. Optional.
+    :param baseline: JSON file with the result of an earlier run to compare
+    against. Optional.
+    :return: Result of the run.
+    """
+    from chat_toolkit.common.load_generator import LoadGenerator
+
+    result = LoadGenerator(orchestrator_factory, profile).run()
+    if output:
+        with open(output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    print_banner("Benchmark Summary")
+    print(
+        f"\t{result['completed_turns']} turns ({result['failed_turns']} "
+        f"failed) in {result['duration_seconds']:.4g} seconds",
+        f"\tThroughput: {result['throughput_turns_per_second']:.4g} turns "
+        "per second",
+        f"\tEstimated cost: ${result['cost_estimate']:.4f}",
+        sep="\n",
+    )
+    for stage, latencies in result["stages"].items():
+        print(
+            f"\t{stage}: "
+            + ", ".join(
+                f"{name} {value:.4g}s"
+                for name, value in latencies.items()
+                if name != "count"
+            )
+        )
+    print()
+
+    if baseline:
+        with open(baseline) as f:
+            comparison = LoadGenerator.compare(result, json.load(f))
+        print_banner("Comparison to Baseline")
+        throughput = comparison["throughput_turns_per_second"]
+        print(f"\tThroughput: {throughput['change']:+.1%}")
+        for stage, percentiles in comparison["stages"].items():
+            print(
+                f"\t{stage}: "
+                + ", ".join(
+                    f"{name} {change['change']:+.1%}"
+                    for name, change in percentiles.items()
+                )
+            )
+        print()
+    return result
+
+
+def batch(
+    chatbot: str,
+    script: str,
+    output: str,
+    conversations: int = 4,
+    cassette: Optional[Cassette] = None,
+) -> dict:
+    """
+    Have a dataset of conversations offline, several at once, appending
+    their results to a JSONL file and resuming from it if it already exists,
+    then print throughput and what the conversations cost.
+
+    :param script: JSONL file with one conversation per line, e.g.
+    {"id": "...", "start_prompt": "...", "messages": ["...", ...]}.
+    :param output: JSONL file to append the result of each conversation to.
+    :param conversations: Number of conversations to have at once.
+    :param cassette: Cassette to record requests to, or replay them from,
+    shared by every conversation. Optional.
+    :return: Summary of the run.
+    """
+    from chat_toolkit.common.batch_runner import BatchRunner
+
+    cassette_kwargs = {"cassette": cassette} if cassette else {}
+    batch_runner = BatchRunner(
+        partial(
+            COMPONENT_REGISTRY.load("chatbot", chatbot), **cassette_kwargs
+        ),
+        concurrency=conversations,
+    )
+    summary = batch_runner.run(Path(script), Path(output))
+
+    print_banner("Batch Summary")
+    print(
+        f"\t{summary['completed']} conversations ({summary['failed']} "
+        f"failed, {summary['skipped']} already done) in "
+        f"{summary['duration_seconds']:.4g} seconds",
+        f"\tThroughput: {summary['throughput_conversations_per_second']:.4g} "
+        "conversations per second",
+        f"\tTokens used: {summary['total_tokens']}",
+        f"\tEstimated cost: ${summary['cost_estimate']:.4f}",
+        sep="\n",
+    )
+    print()
+    return summary
+
+
+def _read_replay_script(script: Path) -> Iterator[dict]:
+    """
+    Read the turns of a replay script, loading any audio.
+
+    :param script: JSONL file, or directory of WAV files.
+    :return: None, but yields each turn.
+    """
+    if script.is_dir():
+        for audio_path in sorted(script.glob("*.wav")):
+            yield {"audio": audio_path.read_bytes()}
+        return
+
+    with open(script) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            turn = json.loads(line)
+            if "audio" in turn:
+                turn["audio"] = (script.parent / turn["audio"]).read_bytes()
+            yield turn
+
+
 if __name__ == "__main__":
     from argparse import ArgumentParser
 
     parser = ArgumentParser(
-        "A script for quickly starting a conversation in your terminal."
+        "A script for quickly starting a conversation in your terminal, or "
+        "hosting conversations over HTTP and WebSockets."
+    )
+    parser.add_argument(
+        "mode",
+        type=str,
+        help="Whether to have a conversation in the terminal (chat), to "
+        "host conversations over HTTP and WebSockets (serve), or to have a "
+        "scripted conversation (replay), to benchmark many concurrent "
+        "conversations (bench), to have a dataset of conversations offline "
+        "(batch), or to serve a local stand in for OpenAI's API (stub). "
+        "Default: chat.",
+        nargs="?",
+        default="chat",
+        choices=("chat", "serve", "replay", "bench", "batch", "stub"),
     )
     parser.add_argument(
         "--chatbot",
         type=str,
         help="Chatbot to use. Default: chatgpt.",
         default="chatgpt",
-        choices=("chatgpt",),
+        choices=COMPONENT_REGISTRY.names("chatbot"),
     )
     parser.add_argument(
         "--speech-to-text",
@@ -71,7 +382,7 @@ if __name__ == "__main__":
         nargs="?",
         const="whisper",
         default=None,
-        choices=("whisper",),
+        choices=COMPONENT_REGISTRY.names("speech_to_text"),
     )
     parser.add_argument(
         "--text-to-speech",
@@ -82,7 +393,315 @@ if __name__ == "__main__":
         nargs="?",
         const="pyttsx3",
         default=None,
-        choices=("pyttsx3",),
+        choices=COMPONENT_REGISTRY.names("text_to_speech"),
+    )
+    parser.add_argument(
+        "--speculative-chunks",
+        type=int,
+        help="Send messages to the chatbot speculatively once the partial "
+        "transcript of the user's speech has been stable for this many "
+        "chunks of audio. Only used with speech to text. Defaults to None "
+        "(no speculation).",
+        default=None,
+    )
+    parser.add_argument(
+        "--pipelined-speech",
+        help="Stream the chatbot's responses and say them sentence by "
+        "sentence. Only used with text to speech.",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--barge-in",
+        help="Say the chatbot's responses in the background, and stop them "
+        "as soon as the user starts their next message. Only used with text "
+        "to speech.",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        help="Host to listen on. Only used with serve, stub and "
+        "--metrics-port. Default: 127.0.0.1.",
+        default="127.0.0.1",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        help="Port to listen on. Only used with serve and stub. Default: "
+        "8080 (serve) or 8081 (stub).",
+        default=None,
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Maximum number of blocking component calls to run at once, "
+        "across all sessions. Only used with serve. Default: 8.",
+        default=8,
+    )
+    parser.add_argument(
+        "--max-sessions",
+        type=int,
+        help="Maximum number of sessions to host at once. Only used with "
+        "serve. Defaults to None (unbounded).",
+        default=None,
+    )
+    parser.add_argument(
+        "--script",
+        type=str,
+        help="JSONL file of turns, or directory of WAV files, to replay, or "
+        "JSONL file of conversations to batch. Required with replay and "
+        "batch.",
+        default=None,
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="JSONL file to write the result of each replayed turn to, JSON "
+        "file to write the result of a benchmark to, or JSONL file to append "
+        "the result of each batched conversation to (and resume from). Only "
+        "used with replay, bench and batch. Required with batch.",
+        default=None,
+    )
+    parser.add_argument(
+        "--conversations",
+        type=int,
+        help="Number of conversations to have at once. Only used with bench "
+        "and batch. Default: 4.",
+        default=4,
+    )
+    parser.add_argument(
+        "--turns",
+        type=int,
+        help="Number of turns in each conversation. Only used with bench. "
+        "Default: 5.",
+        default=5,
+    )
+    parser.add_argument(
+        "--message-words",
+        type=int,
+        help="Number of words in each message. Only used with bench. "
+        "Default: 20.",
+        default=20,
+    )
+    parser.add_argument(
+        "--think-time",
+        type=float,
+        help="Seconds to wait between turns of a conversation. Only used "
+        "with bench. Default: 0.",
+        default=0.0,
+    )
+    parser.add_argument(
+        "--audio",
+        type=str,
+        help="WAV file to send as every message, instead of text. Only used "
+        "with bench and speech to text. Optional.",
+        default=None,
+    )
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        help="JSON file with the result of an earlier benchmark to compare "
+        "against. Only used with bench. Optional.",
+        default=None,
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        help="Seconds to wait before responding to each request. Only used "
+        "with stub. Default: 0.",
+        default=0.0,
+    )
+    parser.add_argument(
+        "--chunk-interval",
+        type=float,
+        help="Seconds to wait between streamed chunks. Only used with stub. "
+        "Default: 0.",
+        default=0.0,
+    )
+    parser.add_argument(
+        "--rate-limit-rate",
+        type=float,
+        help="Fraction of requests to reject with 429 Too Many Requests. "
+        "Only used with stub. Default: 0.",
+        default=0.0,
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        help="Fraction of requests to fail with 500 Internal Server Error. "
+        "Only used with stub. Default: 0.",
+        default=0.0,
+    )
+    parser.add_argument(
+        "--cassette",
+        type=str,
+        help="Cassette file to record requests to OpenAI to, or replay them "
+        "from. Used with chat, replay and bench. Optional.",
+        default=None,
+    )
+    parser.add_argument(
+        "--cassette-mode",
+        type=str,
+        help="Whether to record or replay the cassette. Default: replay.",
+        default="replay",
+        choices=CASSETTE_MODES,
+    )
+    parser.add_argument(
+        "--cassette-time-scale",
+        type=float,
+        help="Multiplier for how long replayed responses take, compared to "
+        "when they were recorded. 0 replays instantly. Default: 1.",
+        default=1.0,
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Collect Prometheus metrics. With serve, they are served at "
+        "/metrics.",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Collect Prometheus metrics and serve them on this port. "
+        "Optional.",
+        default=None,
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=str,
+        help="Collect Prometheus metrics and write them to this file on "
+        "exit. Optional.",
+        default=None,
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        help="Trace the session and save it to this Chrome trace event file "
+        "on exit, for viewing in Perfetto or chrome://tracing. Optional.",
+        default=None,
+    )
+    parser.add_argument(
+        "--usage-ledger",
+        type=str,
+        help="Record every billed event and save them to this NumPy .npz "
+        "file on exit, for loading with UsageLedger.load. Optional.",
+        default=None,
+    )
+    parser.add_argument(
+        "--max-concurrent-requests",
+        type=int,
+        help="Make at most this many requests to OpenAI at once, shared "
+        "fairly between sessions, with interactive requests ahead of batch "
+        "ones. Optional.",
+        default=None,
+    )
+    parser.add_argument(
+        "--dsp-workers",
+        type=int,
+        help="Encode and hash recorded audio in this many worker processes, "
+        "so the thread reading audio from the device never waits for it. "
+        "Optional.",
+        default=None,
     )
     args = parser.parse_args()
-    main(args.chatbot, args.speech_to_text, args.text_to_speech)
+    if args.dsp_workers:
+        from chat_toolkit.common.dsp_pool import DSP_POOL
+
+        DSP_POOL.enable(args.dsp_workers)
+    if args.max_concurrent_requests:
+        SCHEDULER.enable(args.max_concurrent_requests)
+    if args.usage_ledger:
+        USAGE_LEDGER.enable()
+    if args.profile:
+        TRACER.start()
+    if args.metrics or args.metrics_file:
+        METRICS.enable()
+    if args.metrics_port:
+        METRICS.serve(args.host, args.metrics_port)
+    cassette = (
+        Cassette(args.cassette, args.cassette_mode, args.cassette_time_scale)
+        if args.cassette
+        else None
+    )
+    try:
+        if args.mode == "replay":
+            if not args.script:
+                parser.error("--script is required with replay")
+            replay(
+                args.chatbot,
+                args.speech_to_text,
+                args.text_to_speech,
+                args.script,
+                args.output,
+                cassette,
+            )
+        elif args.mode == "bench":
+            from chat_toolkit.common import load_generator
+
+            bench(
+                partial(
+                    build_orchestrator,
+                    args.chatbot,
+                    args.speech_to_text,
+                    args.text_to_speech,
+                    cassette,
+                ),
+                load_generator.LoadProfile(
+                    args.conversations,
+                    args.turns,
+                    args.message_words,
+                    args.think_time,
+                    Path(args.audio).read_bytes() if args.audio else None,
+                ),
+                args.output,
+                args.baseline,
+            )
+        elif args.mode == "batch":
+            if not args.script or not args.output:
+                parser.error("--script and --output are required with batch")
+            batch(
+                args.chatbot,
+                args.script,
+                args.output,
+                args.conversations,
+                cassette,
+            )
+        elif args.mode == "stub":
+            stub(
+                args.host,
+                args.port or 8081,
+                args.latency,
+                args.chunk_interval,
+                args.rate_limit_rate,
+                args.error_rate,
+            )
+        elif args.mode == "serve":
+            serve(
+                args.chatbot,
+                args.speech_to_text,
+                args.host,
+                args.port or 8080,
+                args.workers,
+                args.max_sessions,
+            )
+        else:
+            main(
+                args.chatbot,
+                args.speech_to_text,
+                args.text_to_speech,
+                OrchestratorOptions(
+                    args.speculative_chunks,
+                    args.pipelined_speech,
+                    args.barge_in,
+                ),
+                cassette,
+            )
+    finally:
+        # Saved even if the run is interrupted, e.g. with Ctrl+C
+        if args.metrics_file:
+            METRICS.dump(args.metrics_file)
+        if args.usage_ledger:
+            USAGE_LEDGER.save(args.usage_ledger)
+        if args.profile:
+            TRACER.stop()
+            TRACER.save(args.profile)
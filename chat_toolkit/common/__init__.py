@@ -1,14 +1,79 @@
-from .constants import TMP_DIR
-from .custom_types import StartingPromptsType
-from .exceptions import SpeakingRateError
-from .orchestrator import Orchestrator
-from .utils import set_openai_api_key, temporary_file
+from typing import TYPE_CHECKING
+
+from .lazy_imports import lazy_getattr
+
+if TYPE_CHECKING:
+    from .async_orchestrator import AsyncOrchestrator
+    from .batch_runner import BatchRunner
+    from .component_registry import ComponentRegistry
+    from .constants import TMP_DIR
+    from .custom_types import StartingPromptsType
+    from .dsp_pool import DSP_POOL, DSPWorkerPool
+    from .exceptions import SpeakingRateError
+    from .load_generator import LoadGenerator, LoadProfile
+    from .metrics import METRICS, MetricsRegistry
+    from .orchestrator import Orchestrator, OrchestratorOptions
+    from .scheduler import SCHEDULER, FairScheduler
+    from .tracing import TRACER, Tracer, profile
+    from .turn_result import TurnResult
+    from .usage_ledger import USAGE_LEDGER, UsageLedger
+    from .utils import set_openai_api_key, temporary_file
+
+# Modules are imported when first used, so that e.g. the synchronous
+# orchestrator doesn't import the async orchestrator's dependencies
+__getattr__ = lazy_getattr(
+    __name__,
+    {
+        "profile": ".tracing",
+        "set_openai_api_key": ".utils",
+        "temporary_file": ".utils",
+        "AsyncOrchestrator": ".async_orchestrator",
+        "BatchRunner": ".batch_runner",
+        "ComponentRegistry": ".component_registry",
+        "DSP_POOL": ".dsp_pool",
+        "DSPWorkerPool": ".dsp_pool",
+        "LoadGenerator": ".load_generator",
+        "LoadProfile": ".load_generator",
+        "METRICS": ".metrics",
+        "MetricsRegistry": ".metrics",
+        "FairScheduler": ".scheduler",
+        "Orchestrator": ".orchestrator",
+        "OrchestratorOptions": ".orchestrator",
+        "SCHEDULER": ".scheduler",
+        "SpeakingRateError": ".exceptions",
+        "StartingPromptsType": ".custom_types",
+        "TMP_DIR": ".constants",
+        "TRACER": ".tracing",
+        "Tracer": ".tracing",
+        "TurnResult": ".turn_result",
+        "USAGE_LEDGER": ".usage_ledger",
+        "UsageLedger": ".usage_ledger",
+    },
+)
 
 __all__ = (
+    "profile",
     "set_openai_api_key",
     "temporary_file",
+    "AsyncOrchestrator",
+    "BatchRunner",
+    "ComponentRegistry",
+    "DSP_POOL",
+    "DSPWorkerPool",
+    "LoadGenerator",
+    "LoadProfile",
+    "METRICS",
+    "MetricsRegistry",
+    "FairScheduler",
     "Orchestrator",
+    "OrchestratorOptions",
+    "SCHEDULER",
     "SpeakingRateError",
     "StartingPromptsType",
     "TMP_DIR",
+    "TRACER",
+    "Tracer",
+    "TurnResult",
+    "USAGE_LEDGER",
+    "UsageLedger",
 )
@@ -0,0 +1,330 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from pathlib import Path
+from typing import Any, Callable, Optional, TypeVar
+
+from chat_toolkit.common.exceptions import QueueSizeError
+from chat_toolkit.common.orchestrator import Orchestrator
+from chat_toolkit.common.utils import temporary_file
+from chat_toolkit.components.chatbots.chatbot_component_base import (
+    ChatbotComponentBase,
+)
+from chat_toolkit.components.speech_to_text.async_speech_to_text_component_base import (  # noqa: E501
+    AsyncSpeechToTextComponentBase,
+)
+from chat_toolkit.components.speech_to_text.speech_to_text_component_base import (  # noqa: E501
+    SpeechToTextComponentBase,
+)
+from chat_toolkit.components.text_to_speech.text_to_speech_component_base import (  # noqa: E501
+    TextToSpeechComponentBase,
+)
+
+ReturnType = TypeVar("ReturnType")
+
+# Capture, transcribe, chat and speak
+NUMBER_OF_STAGES = 4
+
+
+class _Turn:
+    """
+    One of the user's messages, as it passes through the stages of a
+    conversation.
+    """
+
+    def __init__(
+        self, audio: Optional[bytes] = None, user_input: Optional[str] = None
+    ):
+        self.audio = audio
+        self.user_input = user_input
+        # Whether the message continues the conversation, once it is known
+        self.accepted = asyncio.get_running_loop().create_future()
+
+
+class AsyncOrchestrator(Orchestrator):
+    """
+    Used to orchestrate a conversation as asyncio stages (capture,
+    transcribe, chat and speak) joined by bounded queues, so that the stages
+    of consecutive turns overlap. For example, the user can record their next
+    message while the chatbot's last response is still being said.
+    Synchronous components are run in an executor, while async components
+    are awaited directly.
+    """
+
+    def __init__(
+        self,
+        chatbot_component: ChatbotComponentBase,
+        speech_to_text_component: Optional[SpeechToTextComponentBase] = None,
+        text_to_speech_component: Optional[TextToSpeechComponentBase] = None,
+        max_queued_turns: int = 2,
+    ):
+        """
+        Instantiates async orchestrator.
+
+        :param chatbot_component: Prebuilt or custom chatbot component to use.
+        :param speech_to_text_component: Prebuilt or custom speech to text
+        component to use. Optional.
+        :param text_to_speech_component: Prebuilt or custom text to speech
+        component to use. Optional.
+        :param max_queued_turns: Maximum number of turns that may be waiting
+        between any two stages. Earlier stages wait while a later stage is
+        this far behind.
+        """
+        super().__init__(
+            chatbot_component,
+            speech_to_text_component=speech_to_text_component,
+            text_to_speech_component=text_to_speech_component,
+        )
+        if max_queued_turns <= 0:
+            raise QueueSizeError
+        self.max_queued_turns = max_queued_turns
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Speech is only recorded while capturing, and transcribed by the
+        # next stage, if the component can transcribe recordings
+        self._transcribes_recordings = bool(
+            speech_to_text_component
+            and speech_to_text_component.can_transcribe_recordings
+        )
+
+    def terminal_conversation(self) -> None:
+        """
+        Starts a conversation in the user's terminal, running the stages of
+        the conversation in a new event loop. Wraps `aconversation` with
+        greetings, error swallowing, and logic that prints cost summary at
+        the end of the conversation.
+
+        :return:
+        """
+        print("\nWelcome to the chat!")
+        print("Ctrl+C or send an empty message at any point to exit.")
+
+        try:
+            asyncio.run(self.aconversation())
+        except KeyboardInterrupt:
+            # Swallow user Keyboard Interrupts
+            pass
+        finally:
+            print("\nBye!\n")
+            self.print_cost_summary()
+            self.print_timing_summary()
+            if self._text_to_speech_component:
+                self.print_engine_pool_summary()
+
+    async def aconversation(self) -> None:
+        """
+        Have a conversation, from the start prompt until the user sends an
+        empty message. If cancelled, every stage is cancelled, and any text
+        that is being said is stopped.
+
+        :return:
+        """
+        self._executor = ThreadPoolExecutor(
+            max_workers=NUMBER_OF_STAGES, thread_name_prefix="chat-toolkit"
+        )
+        try:
+            await self._run_in_daemon(self._start_conversation)
+
+            transcribe_queue: asyncio.Queue = asyncio.Queue(
+                self.max_queued_turns
+            )
+            chat_queue: asyncio.Queue = asyncio.Queue(self.max_queued_turns)
+            speak_queue: asyncio.Queue = asyncio.Queue(self.max_queued_turns)
+            stages = [
+                asyncio.ensure_future(stage)
+                for stage in (
+                    self._capture_stage(transcribe_queue),
+                    self._transcribe_stage(transcribe_queue, chat_queue),
+                    self._chat_stage(chat_queue, speak_queue),
+                    self._speak_stage(speak_queue),
+                )
+            ]
+            try:
+                await asyncio.gather(*stages)
+            finally:
+                for stage in stages:
+                    stage.cancel()
+                await asyncio.gather(*stages, return_exceptions=True)
+        finally:
+            # Don't wait for threads blocked on the user (e.g. recording)
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _capture_stage(self, transcribe_queue: asyncio.Queue) -> None:
+        """
+        Capture the user's messages, until one is not accepted.
+
+        :param transcribe_queue: Queue of captured turns.
+        :return:
+        """
+        while True:
+            with self._timings.time("user_input"):
+                turn = await self._capture_turn()
+            await transcribe_queue.put(turn)
+            if not await turn.accepted:
+                return
+
+    async def _transcribe_stage(
+        self, transcribe_queue: asyncio.Queue, chat_queue: asyncio.Queue
+    ) -> None:
+        """
+        Transcribe captured audio (if necessary) and check whether each
+        message continues the conversation.
+
+        :param transcribe_queue: Queue of captured turns.
+        :param chat_queue: Queue of accepted turns.
+        :return:
+        """
+        while True:
+            turn = await transcribe_queue.get()
+            if turn.user_input is None:
+                with self._timings.time("transcribe"):
+                    turn.user_input, _ = await self._atranscribe(turn.audio)
+                print(f"\nUser: {turn.user_input}")
+
+            accepted = self._check_user_input(turn.user_input)
+            turn.accepted.set_result(accepted)
+            if not accepted:
+                await chat_queue.put(None)
+                return
+            await chat_queue.put(turn)
+
+    async def _chat_stage(
+        self, chat_queue: asyncio.Queue, speak_queue: asyncio.Queue
+    ) -> None:
+        """
+        Send each message to the chatbot, in order.
+
+        :param chat_queue: Queue of accepted turns.
+        :param speak_queue: Queue of the chatbot's responses.
+        :return:
+        """
+        while (turn := await chat_queue.get()) is not None:
+            with self._timings.time("chat"):
+                chatbot_response = await self._run_in_executor(
+                    self._get_chatbot_response, turn.user_input
+                )
+            print(f"\nChatbot: {chatbot_response}")
+            await speak_queue.put(chatbot_response)
+        await speak_queue.put(None)
+
+    async def _speak_stage(self, speak_queue: asyncio.Queue) -> None:
+        """
+        Say each of the chatbot's responses, in order.
+
+        :param speak_queue: Queue of the chatbot's responses.
+        :return:
+        """
+        while (chatbot_response := await speak_queue.get()) is not None:
+            if not self._text_to_speech_component:
+                continue
+            try:
+                with self._timings.time("speak"):
+                    await self._run_in_executor(
+                        self._text_to_speech_component.say_text,
+                        chatbot_response,
+                    )
+            except asyncio.CancelledError:
+                self._text_to_speech_component.stop_text()
+                raise
+
+    async def _capture_turn(self) -> _Turn:
+        """
+        Capture the user's next message. If possible, speech is only
+        recorded here, and is transcribed by the next stage.
+
+        :return: The captured turn.
+        """
+        speech_to_text = self._speech_to_text_component
+        if not speech_to_text:
+            return _Turn(
+                user_input=await self._run_in_daemon(input, "\nUser: ")
+            )
+
+        if not self._transcribes_recordings:
+            if isinstance(speech_to_text, AsyncSpeechToTextComponentBase):
+                user_input, _ = await speech_to_text.atranscribe_speech()
+            else:
+                user_input, _ = await self._run_in_executor(
+                    speech_to_text.transcribe_speech
+                )
+            print(f"\nUser: {user_input}")
+            return _Turn(user_input=user_input)
+
+        with temporary_file(
+            "wav", tmp_file_directory=speech_to_text.tmp_file_directory
+        ) as tmp:
+            if isinstance(speech_to_text, AsyncSpeechToTextComponentBase):
+                await speech_to_text.arecord_unspecified_length_audio(tmp.name)
+            else:
+                await self._run_in_executor(
+                    speech_to_text.record_unspecified_length_audio, tmp.name
+                )
+            return _Turn(audio=Path(tmp.name).read_bytes())
+
+    async def _atranscribe(self, audio: Optional[bytes]) -> tuple[str, dict]:
+        """
+        Transcribe recorded audio.
+
+        :param audio: Encoded audio.
+        :return: Transcription text, any applicable metadata.
+        """
+        speech_to_text = self._speech_to_text_component
+        if not speech_to_text or not audio:
+            return "", {}
+        if isinstance(speech_to_text, AsyncSpeechToTextComponentBase):
+            return await speech_to_text.atranscribe(audio)
+        return await self._run_in_executor(speech_to_text.transcribe, audio)
+
+    @staticmethod
+    async def _run_in_daemon(
+        func: Callable[..., ReturnType], *args: Any
+    ) -> ReturnType:
+        """
+        Run a function that blocks on the user (e.g. `input`, which can't be
+        interrupted) in a daemon thread. Unlike the executor's threads, it
+        doesn't stop the process from exiting, e.g. after Ctrl+C.
+
+        :param func: Function to run.
+        :param args: Arguments to call the function with.
+        :return: The function's return value.
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+
+        def _resolve(result: Any, exception: Optional[Exception]) -> None:
+            if future.done():
+                # The conversation was cancelled while waiting
+                pass
+            elif exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+
+        def _run() -> None:
+            result, exception = None, None
+            try:
+                result = func(*args)
+            except Exception as ex:
+                exception = ex
+            with suppress(RuntimeError):
+                # Raised if the event loop has already been closed
+                loop.call_soon_threadsafe(_resolve, result, exception)
+
+        threading.Thread(
+            target=_run, name="chat-toolkit-user", daemon=True
+        ).start()
+        return await future
+
+    async def _run_in_executor(
+        self, func: Callable[..., ReturnType], *args: Any
+    ) -> ReturnType:
+        """
+        Run a blocking function in the orchestrator's executor.
+
+        :param func: Function to run.
+        :param args: Arguments to call the function with.
+        :return: The function's return value.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
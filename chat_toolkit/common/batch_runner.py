@@ -0,0 +1,242 @@
+import json
+import os
+import time
+from collections.abc import Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from pathlib import Path
+from typing import IO, Callable
+
+from loguru import logger
+
+from chat_toolkit.common.exceptions import BatchItemError
+from chat_toolkit.common.scheduler import BATCH
+from chat_toolkit.components.chatbots.chatbot_component_base import (
+    ChatbotComponentBase,
+)
+
+
+class BatchRunner:
+    """
+    Runs a dataset of conversations through chatbots offline, several at a
+    time, each with a chatbot of its own. Conversations are read from a
+    JSONL file, one per line:
+
+        {"id": "...", "start_prompt": "...", "messages": ["...", ...]}
+
+    where "id" defaults to the line number and "start_prompt" is optional.
+    Each finished conversation's responses, usage and cost are appended to a
+    JSONL output file as soon as it finishes, and flushed to disk. The output
+    doubles as a checkpoint: rerunning with the same output skips every
+    conversation it already holds, so a crashed run resumes without sending
+    completed conversations again. Failed conversations are logged and left
+    out of the output, so they are retried by the next run, as are lines of
+    the input that aren't valid conversations.
+    """
+
+    def __init__(
+        self,
+        chatbot_factory: Callable[[], ChatbotComponentBase],
+        concurrency: int = 8,
+    ):
+        """
+        Instantiate a batch runner.
+
+        :param chatbot_factory: Creates a chatbot for each conversation.
+        :param concurrency: Number of conversations to have at once.
+        """
+        self.concurrency = concurrency
+        self._chatbot_factory = chatbot_factory
+
+    def run(self, input_path: Path, output_path: Path) -> dict:
+        """
+        Have every conversation in the input that isn't already in the
+        output, appending the results to the output.
+
+        :param input_path: JSONL file of conversations.
+        :param output_path: JSONL file to append results to, and to resume
+        from.
+        :return: Number of conversations completed, skipped (because they were
+        already in the output) and failed (including malformed lines), how
+        long the run took, throughput, and the tokens used and estimated cost
+        of the conversations had by this run, including what failed
+        conversations spent before failing.
+        """
+        completed_ids = self._read_checkpoint(Path(output_path))
+        summary = {
+            "completed": 0,
+            "skipped": 0,
+            "failed": 0,
+            "duration_seconds": 0.0,
+            "throughput_conversations_per_second": 0.0,
+            "total_tokens": 0,
+            "cost_estimate": 0.0,
+        }
+        started = time.monotonic()
+        with ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="chat-toolkit"
+        ) as executor, open(output_path, "a", encoding="utf-8") as output:
+            pending: dict[Future, tuple[str, ChatbotComponentBase]] = {}
+            for item in self._read_items(Path(input_path), summary):
+                if item["id"] in completed_ids:
+                    summary["skipped"] += 1
+                    continue
+                # Only read as far ahead as there are free workers, so
+                # datasets of any size use bounded memory
+                if len(pending) >= self.concurrency:
+                    self._collect(pending, output, summary)
+                # Created here, so that what a failed conversation spent can
+                # still be accounted for
+                chatbot = self._chatbot_factory()
+                future = executor.submit(self._converse, item, chatbot)
+                pending[future] = item["id"], chatbot
+            while pending:
+                self._collect(pending, output, summary)
+
+        duration = time.monotonic() - started
+        summary["duration_seconds"] = duration
+        if duration:
+            summary["throughput_conversations_per_second"] = (
+                summary["completed"] / duration
+            )
+        return summary
+
+    @staticmethod
+    def _converse(item: dict, chatbot: ChatbotComponentBase) -> dict:
+        """
+        Have one conversation.
+
+        :param item: Conversation from the input.
+        :param chatbot: Chatbot to have the conversation with.
+        :return: Result of the conversation.
+        """
+        messages = item.get("messages")
+        if not isinstance(messages, list) or not messages:
+            raise BatchItemError
+
+        started = time.monotonic()
+        # Only use capacity that interactive conversations leave spare
+        chatbot.dispatch_lane = BATCH
+        chatbot.prompt_chatbot(item.get("start_prompt"))
+        responses = [chatbot.send_message(message)[0] for message in messages]
+        cost_estimate, usage = chatbot.cost_estimate_data
+        return {
+            "id": item["id"],
+            "responses": responses,
+            "usage": usage,
+            "cost_estimate": cost_estimate,
+            "seconds": time.monotonic() - started,
+        }
+
+    @staticmethod
+    def _collect(
+        pending: dict[Future, tuple[str, ChatbotComponentBase]],
+        output: IO[str],
+        summary: dict,
+    ) -> None:
+        """
+        Wait for at least one conversation to finish, write the results of
+        finished conversations to the output, and account for them in the
+        summary.
+
+        :param pending: Conversations in progress, and their ids and chatbots.
+        Finished conversations are removed.
+        :param output: Open output file.
+        :param summary: Summary of the run so far.
+        :return:
+        """
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            item_id, chatbot = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as ex:
+                logger.opt(exception=ex).warning(
+                    "Conversation {} failed", item_id
+                )
+                summary["failed"] += 1
+                # Whatever was sent before the failure is still billed
+                cost_estimate, usage = chatbot.cost_estimate_data
+                summary["total_tokens"] += usage.get("total_tokens", 0)
+                summary["cost_estimate"] += cost_estimate
+                continue
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+            os.fsync(output.fileno())
+            summary["completed"] += 1
+            summary["total_tokens"] += result["usage"].get("total_tokens", 0)
+            summary["cost_estimate"] += result["cost_estimate"]
+
+    @staticmethod
+    def _read_items(input_path: Path, summary: dict) -> Iterator[dict]:
+        """
+        Read the conversations of the input, giving any without an id their
+        line number as their id. Lines that aren't JSON objects are logged,
+        skipped and counted as failed in the summary.
+
+        :param input_path: JSONL file of conversations.
+        :param summary: Summary of the run so far.
+        :return: None, but yields each conversation.
+        """
+        with open(input_path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    item = None
+                if not isinstance(item, dict):
+                    logger.warning(
+                        "Skipping line {} of {}, which isn't a conversation",
+                        line_number,
+                        input_path,
+                    )
+                    summary["failed"] += 1
+                    continue
+                item["id"] = str(item.get("id", line_number))
+                yield item
+
+    @staticmethod
+    def _read_checkpoint(output_path: Path) -> set[str]:
+        """
+        Find the conversations already in the output, truncating a result
+        that was only partly written (i.e. has no trailing newline) when a
+        previous run crashed. Other lines that aren't results are logged and
+        skipped.
+
+        :param output_path: JSONL output file.
+        :return: Ids of the completed conversations.
+        """
+        completed_ids: set[str] = set()
+        if not output_path.exists():
+            return completed_ids
+
+        complete_bytes = 0
+        with open(output_path, "rb") as f:
+            for line_number, line in enumerate(f, start=1):
+                # Only the last line can be missing its newline
+                if not line.endswith(b"\n"):
+                    break
+                complete_bytes += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    completed_ids.add(str(json.loads(line)["id"]))
+                except (ValueError, KeyError, TypeError):
+                    logger.warning(
+                        "Skipping line {} of {}, which isn't a result",
+                        line_number,
+                        output_path,
+                    )
+        if complete_bytes < output_path.stat().st_size:
+            logger.warning(
+                "Discarding partly written results at the end of {}",
+                output_path,
+            )
+            os.truncate(output_path, complete_bytes)
+        return completed_ids
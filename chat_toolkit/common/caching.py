@@ -0,0 +1,205 @@
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from pathlib import Path
+from typing import Callable, Generic, Optional, TypeVar
+
+KeyType = TypeVar("KeyType", bound=Hashable)
+ValueType = TypeVar("ValueType")
+
+
+class LRUCache(Generic[KeyType, ValueType]):
+    """
+    Thread safe, in memory, least recently used cache. The cache is bounded
+    by the total size of its values, as measured by `sizeof`. By default,
+    every value has a size of one, so the bound is a number of entries.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        sizeof: Callable[[ValueType], int] = lambda _: 1,
+    ):
+        """
+        Instantiate an in memory cache.
+
+        :param max_size: Maximum total size of all values in the cache.
+        :param sizeof: Function used to measure the size of a value.
+        """
+        self.max_size = max_size
+        self._sizeof = sizeof
+        self._size = 0
+        self._entries: OrderedDict[KeyType, ValueType] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    @property
+    def size(self) -> int:
+        """
+        Read only property representing the total size of values currently
+        held by the cache.
+
+        :return:
+        """
+        return self._size
+
+    def get(self, key: KeyType) -> Optional[ValueType]:
+        """
+        Get a value from the cache and mark it as recently used.
+
+        :param key: Key to look up.
+        :return: Cached value, or None if the key is not cached.
+        """
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: KeyType, value: ValueType) -> None:
+        """
+        Add a value to the cache, evicting least recently used values until
+        the cache fits within its bound. Values larger than the bound are not
+        cached at all.
+
+        :param key: Key to store value under.
+        :param value: Value to store.
+        :return:
+        """
+        value_size = self._sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._sizeof(self._entries.pop(key))
+            if value_size > self.max_size:
+                return
+            self._entries[key] = value
+            self._size += value_size
+            while self._size > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= self._sizeof(evicted)
+
+
+class DiskCache:
+    """
+    Thread safe, on disk, least recently used cache of raw bytes. Each entry
+    is a file in `directory`, and recency is tracked with file modification
+    times so that it survives between processes.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: Optional[int] = None,
+        suffix: str = "bin",
+    ):
+        """
+        Instantiate an on disk cache, indexing any entries already present in
+        the directory.
+
+        :param directory: Directory to store cache entries in.
+        :param max_bytes: Maximum total size of all entries, in bytes. If
+        None, the cache is unbounded.
+        :param suffix: File ending to use for cache entries.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        existing = sorted(
+            self.directory.glob(f"*.{self.suffix}"),
+            key=lambda path: path.stat().st_mtime,
+        )
+        for path in existing:
+            self._entries[path.stem] = path.stat().st_size
+            self._size += self._entries[path.stem]
+        self._evict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    @property
+    def size(self) -> int:
+        """
+        Read only property representing the total number of bytes currently
+        held by the cache.
+
+        :return:
+        """
+        return self._size
+
+    def path(self, key: str) -> Path:
+        """
+        Get the path an entry is (or would be) stored at.
+
+        :param key: Key of the entry.
+        :return: Path of the entry.
+        """
+        return self.directory / f"{key}.{self.suffix}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Read an entry from disk and mark it as recently used.
+
+        :param key: Key to look up.
+        :return: Cached bytes, or None if the key is not cached.
+        """
+        with self._lock:
+            if key not in self._entries:
+                return None
+            path = self.path(key)
+            try:
+                data = path.read_bytes()
+            except FileNotFoundError:
+                # Removed by another process sharing the directory
+                self._size -= self._entries.pop(key)
+                return None
+            os.utime(path)
+            self._entries.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Write an entry to disk, evicting least recently used entries until
+        the cache fits within its bound.
+
+        :param key: Key to store data under.
+        :param data: Bytes to store.
+        :return:
+        """
+        with self._lock:
+            path = self.path(key)
+            # Write then rename, so readers never see partial entries
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            self._size -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._size += len(data)
+            self._evict()
+
+    def _evict(self) -> None:
+        """
+        Remove least recently used entries until the cache fits within its
+        bound.
+
+        :return:
+        """
+        if self.max_bytes is None:
+            return
+        while self._size > self.max_bytes and self._entries:
+            key, entry_size = self._entries.popitem(last=False)
+            self.path(key).unlink(missing_ok=True)
+            self._size -= entry_size
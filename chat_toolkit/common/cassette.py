@@ -0,0 +1,233 @@
+import asyncio
+import gzip
+import hashlib
+import io
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import Awaitable, Iterator
+from pathlib import Path
+from typing import IO, Any, Callable
+
+import openai
+
+from chat_toolkit.common.exceptions import CassetteMissError, CassetteModeError
+
+CASSETTE_MODES = ("record", "replay")
+
+
+class Cassette:
+    """
+    Records the requests components make to OpenAI and their responses (or
+    errors) to a file, and replays them later, without network access or
+    cost. Entries are indexed by a hash of the request, so a conversation
+    replays as long as it sends the same requests, and identical requests
+    are replayed in the order they were recorded. Each entry keeps how long
+    the response took, so that replays can take the original time, a scaled
+    time, or no time at all.
+
+    Cassettes are JSON lines files, compressed with gzip if the path ends in
+    `.gz`. Pass a cassette to components (e.g. `OpenAIChatBot` and
+    `OpenAISpeechToText`) to use it.
+    """
+
+    def __init__(
+        self, path: Path, mode: str = "replay", time_scale: float = 1.0
+    ):
+        """
+        Instantiate a cassette.
+
+        :param path: File to record to, or replay from.
+        :param mode: Either "record" (overwriting the file) or "replay".
+        :param time_scale: Multiplier for the recorded duration of each
+        response when replaying. 0 replays instantly.
+        """
+        if mode not in CASSETTE_MODES:
+            raise CassetteModeError
+        self.path = Path(path)
+        self.mode = mode
+        self.time_scale = time_scale
+
+        self._lock = threading.Lock()
+        self._entries: dict[str, deque] = defaultdict(deque)
+        self._recorded = 0
+        self._replayed = 0
+        if mode == "record":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._open("wt").close()
+        else:
+            with self._open("rt") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    self._entries[entry["key"]].append(entry)
+
+    @staticmethod
+    def make_key(kind: str, request: dict) -> str:
+        """
+        Create the key a request is indexed by.
+
+        :param kind: Kind of request, e.g. "chat" or "transcription".
+        :param request: JSON serializable description of the request.
+        :return: Hash of the request.
+        """
+        payload = json.dumps({"kind": kind, **request}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def call(self, kind: str, request: dict, send: Callable[[], Any]) -> Any:
+        """
+        Make a request, recording it, or replay its response.
+
+        :param kind: Kind of request.
+        :param request: JSON serializable description of the request.
+        :param send: Makes the request to OpenAI, when recording.
+        :return: Response to the request.
+        """
+        key = self.make_key(kind, request)
+        if self.mode == "replay":
+            entry = self._replay(key)
+            time.sleep(entry["seconds"] * self.time_scale)
+            return self._response(entry)
+
+        started = time.monotonic()
+        try:
+            response = send()
+        except openai.error.OpenAIError as ex:
+            self._record(key, kind, time.monotonic() - started, error=ex)
+            raise
+        self._record(key, kind, time.monotonic() - started, response=response)
+        return response
+
+    async def acall(
+        self, kind: str, request: dict, send: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Make a request from an asyncio event loop, recording it, or replay
+        its response. See `call`.
+
+        :param kind: Kind of request.
+        :param request: JSON serializable description of the request.
+        :param send: Makes the request to OpenAI, when recording.
+        :return: Response to the request.
+        """
+        key = self.make_key(kind, request)
+        if self.mode == "replay":
+            entry = self._replay(key)
+            await asyncio.sleep(entry["seconds"] * self.time_scale)
+            return self._response(entry)
+
+        started = time.monotonic()
+        try:
+            response = await send()
+        except openai.error.OpenAIError as ex:
+            self._record(key, kind, time.monotonic() - started, error=ex)
+            raise
+        self._record(key, kind, time.monotonic() - started, response=response)
+        return response
+
+    def stream(
+        self, kind: str, request: dict, send: Callable[[], Iterator[Any]]
+    ) -> Iterator[Any]:
+        """
+        Make a streamed request, recording each chunk and when it arrived, or
+        replay its chunks with their original pacing.
+
+        :param kind: Kind of request.
+        :param request: JSON serializable description of the request.
+        :param send: Makes the streamed request to OpenAI, when recording.
+        :return: None, but yields chunks of the response.
+        """
+        key = self.make_key(kind, request)
+        if self.mode == "replay":
+            entry = self._replay(key)
+            previous_offset = 0.0
+            for offset, chunk in entry["chunks"]:
+                time.sleep((offset - previous_offset) * self.time_scale)
+                previous_offset = offset
+                yield chunk
+            return
+
+        started = time.monotonic()
+        chunks = []
+        for chunk in send():
+            chunks.append((time.monotonic() - started, chunk))
+            yield chunk
+        self._record(key, kind, time.monotonic() - started, chunks=chunks)
+
+    @property
+    def summary(self) -> dict:
+        """
+        Property representing how many responses have been recorded and
+        replayed.
+
+        :return: Summary statistics.
+        """
+        return {"recorded": self._recorded, "replayed": self._replayed}
+
+    def _replay(self, key: str) -> dict:
+        """
+        Get the next recorded entry for a request. The last entry for a
+        request is replayed again once every entry has been replayed.
+
+        :param key: Key of the request.
+        :return: Recorded entry.
+        """
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMissError
+            entry = entries.popleft() if len(entries) > 1 else entries[0]
+            self._replayed += 1
+        return entry
+
+    @staticmethod
+    def _response(entry: dict) -> Any:
+        """
+        Get the response of a recorded entry, raising its error instead if
+        the request failed.
+
+        :param entry: Recorded entry.
+        :return: Recorded response.
+        """
+        if "error" not in entry:
+            return entry["response"]
+        error_type = getattr(
+            openai.error, entry["error"]["type"], openai.error.OpenAIError
+        )
+        if issubclass(error_type, openai.error.InvalidRequestError):
+            raise error_type(entry["error"]["message"], None)
+        raise error_type(entry["error"]["message"])
+
+    def _record(self, key: str, kind: str, seconds: float, **data) -> None:
+        """
+        Append an entry to the cassette.
+
+        :param key: Key of the request.
+        :param kind: Kind of request.
+        :param seconds: How long the response took.
+        :param data: The response, streamed chunks, or error.
+        :return:
+        """
+        entry = {"key": key, "kind": kind, "seconds": seconds, **data}
+        if "error" in entry:
+            entry["error"] = {
+                "type": type(entry["error"]).__name__,
+                "message": str(entry["error"]),
+            }
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            with self._open("at") as f:
+                f.write(line)
+            self._recorded += 1
+
+    def _open(self, mode: str) -> IO[str]:
+        """
+        Open the cassette file.
+
+        :param mode: Text mode to open the file in.
+        :return: Open file.
+        """
+        if self.path.suffix == ".gz":
+            binary = gzip.GzipFile(self.path, mode.replace("t", ""))
+            return io.TextIOWrapper(binary, encoding="utf-8")
+        return open(self.path, mode, encoding="utf-8")
@@ -0,0 +1,146 @@
+import importlib.metadata
+import sys
+from typing import Optional
+
+from loguru import logger
+
+from chat_toolkit.common.exceptions import (
+    ComponentKindError,
+    UnknownComponentError,
+)
+
+# Entry point group that components of each kind register themselves in
+ENTRY_POINT_GROUPS = {
+    "chatbot": "chat_toolkit.chatbots",
+    "speech_to_text": "chat_toolkit.speech_to_text",
+    "text_to_speech": "chat_toolkit.text_to_speech",
+}
+# Components that ship with the toolkit, as entry point values
+BUILTIN_COMPONENTS = {
+    "chatbot": {
+        "chatgpt": "chat_toolkit.components.chatbots.openai_chatbot"
+        ":OpenAIChatBot",
+    },
+    "speech_to_text": {
+        "whisper": "chat_toolkit.components.speech_to_text"
+        ".openai_speech_to_text:OpenAISpeechToText",
+    },
+    "text_to_speech": {
+        "pyttsx3": "chat_toolkit.components.text_to_speech"
+        ".pyttsx3_text_to_speech:Pyttsx3TextToSpeech",
+    },
+}
+
+
+class ComponentRegistry:
+    """
+    Names of the chatbot, speech to text and text to speech components that
+    are available, and where to import them from. Besides the toolkit's own
+    components, other packages can register components under the entry point
+    groups in `ENTRY_POINT_GROUPS`, e.g. with poetry:
+
+        [tool.poetry.plugins."chat_toolkit.chatbots"]
+        my-chatbot = "my_package.chatbot:MyChatBot"
+
+    Discovering components only reads installed packages' metadata, and a
+    component is only imported when it is loaded.
+    """
+
+    def __init__(
+        self, builtin_components: Optional[dict[str, dict[str, str]]] = None
+    ):
+        """
+        Instantiate a component registry.
+
+        :param builtin_components: Entry point values of components that are
+        always available, keyed by kind and then by name. Defaults to the
+        toolkit's own components.
+        """
+        if builtin_components is None:
+            builtin_components = BUILTIN_COMPONENTS
+        self._components = {
+            kind: dict(components)
+            for kind, components in builtin_components.items()
+        }
+        self._discovered = False
+
+    def names(self, kind: str) -> tuple[str, ...]:
+        """
+        Get the names of the components of a kind, without importing them.
+
+        :param kind: Kind of component: "chatbot", "speech_to_text" or
+        "text_to_speech".
+        :return: Names of the components.
+        """
+        return tuple(self._components_of(kind))
+
+    def load(self, kind: str, name: str) -> type:
+        """
+        Import a component class.
+
+        :param kind: Kind of component.
+        :param name: Name the component is registered with.
+        :return: Component class.
+        """
+        components = self._components_of(kind)
+        if name not in components:
+            raise UnknownComponentError
+        entry_point = importlib.metadata.EntryPoint(
+            name, components[name], ENTRY_POINT_GROUPS[kind]
+        )
+        return entry_point.load()
+
+    def register(self, kind: str, name: str, value: str) -> None:
+        """
+        Register a component without an entry point, e.g. in tests.
+
+        :param kind: Kind of component.
+        :param name: Name to register the component with.
+        :param value: Where to import the component from, as an entry point
+        value ("module:attribute").
+        :return:
+        """
+        self._components_of(kind)[name] = value
+
+    def _components_of(self, kind: str) -> dict[str, str]:
+        """
+        Get the components of a kind, discovering components registered
+        with entry points first, if they haven't been yet.
+
+        :param kind: Kind of component.
+        :return: Entry point values of the components, keyed by name.
+        """
+        if kind not in ENTRY_POINT_GROUPS:
+            raise ComponentKindError
+        if not self._discovered:
+            self._discover()
+        return self._components.setdefault(kind, {})
+
+    def _discover(self) -> None:
+        """
+        Read components registered with entry points from installed
+        packages' metadata. Components can't replace one that is already
+        registered with the same name.
+
+        :return:
+        """
+        self._discovered = True
+        entry_points = importlib.metadata.entry_points()
+        for kind, group in ENTRY_POINT_GROUPS.items():
+            components = self._components.setdefault(kind, {})
+            if sys.version_info >= (3, 10):
+                group_entry_points = entry_points.select(group=group)
+            else:
+                # Python 3.9 returns a dict of entry points, keyed by group
+                group_entry_points = entry_points.get(group, ())
+            for entry_point in group_entry_points:
+                if entry_point.name in components:
+                    logger.warning(
+                        "Ignoring {} component {!r} from {}, since it is "
+                        "already registered",
+                        kind,
+                        entry_point.name,
+                        entry_point.value,
+                    )
+                    continue
+                components[entry_point.name] = entry_point.value
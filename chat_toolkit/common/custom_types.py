@@ -1,3 +1,10 @@
-from typing import Union
+import io
+from typing import Callable, Union
+
+import numpy as np
 
 StartingPromptsType = Union[list[str], str, None]
+AudioFileType = Union[io.BufferedRandom, io.BytesIO]
+AudioInputType = Union[AudioFileType, bytes]
+AudioBlockCallbackType = Callable[[np.ndarray], None]
+PartialTranscriptCallbackType = Callable[[str], None]
@@ -0,0 +1,329 @@
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Optional
+
+import numpy as np
+import soundfile as sf
+
+from chat_toolkit.common.exceptions import SampleRateError
+from chat_toolkit.common.tracing import TRACER
+
+
+def encode_wav(audio: np.ndarray, sample_rate: int) -> bytes:
+    """
+    Encode audio as a WAV file.
+
+    :param audio: Audio samples, one column per channel.
+    :param sample_rate: Sample rate of the audio.
+    :return: Encoded audio.
+    """
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, sample_rate, format="WAV")
+    return buffer.getvalue()
+
+
+def resample(
+    audio: np.ndarray, sample_rate: int, target_sample_rate: int
+) -> np.ndarray:
+    """
+    Resample audio by linear interpolation, which is plenty for speech
+    recognition, e.g. to send 16kHz audio instead of 48kHz.
+
+    :param audio: Audio samples, one column per channel.
+    :param sample_rate: Sample rate of the audio.
+    :param target_sample_rate: Sample rate to resample to.
+    :return: Resampled audio, of the same type.
+    """
+    _check_sample_rates(sample_rate, target_sample_rate)
+    if sample_rate == target_sample_rate:
+        return audio.copy()
+
+    frames = round(len(audio) * target_sample_rate / sample_rate)
+    positions = np.arange(frames) * (sample_rate / target_sample_rate)
+    source = np.arange(len(audio))
+    channels = audio.reshape(len(audio), -1)
+    resampled = np.column_stack(
+        [np.interp(positions, source, channel) for channel in channels.T]
+    )
+    if np.issubdtype(audio.dtype, np.integer):
+        resampled = np.rint(resampled)
+    return resampled.reshape((frames,) + audio.shape[1:]).astype(audio.dtype)
+
+
+def voice_activity(
+    audio: np.ndarray,
+    sample_rate: int,
+    threshold: float = 0.01,
+    frame_seconds: float = 0.03,
+) -> np.ndarray:
+    """
+    Detect speech in audio, frame by frame, by comparing the loudness (root
+    mean square, relative to full scale) of each frame to a threshold.
+
+    :param audio: Audio samples, one column per channel.
+    :param sample_rate: Sample rate of the audio.
+    :param threshold: Loudness above which a frame is speech, from 0 to 1.
+    :param frame_seconds: Length of each frame. A trailing partial frame is
+    ignored.
+    :return: Whether each frame is speech.
+    """
+    samples = audio.reshape(len(audio), -1).astype(np.float64)
+    if np.issubdtype(audio.dtype, np.integer):
+        samples /= np.iinfo(audio.dtype).max
+    mono = samples.mean(axis=1)
+    frame = max(int(frame_seconds * sample_rate), 1)
+    frames = len(mono) // frame
+    power = np.mean(mono[: frames * frame].reshape(frames, frame) ** 2, axis=1)
+    return np.sqrt(power) > threshold
+
+
+def digest(audio: np.ndarray, prefix: bytes = b"") -> str:
+    """
+    Hash audio samples.
+
+    :param audio: Audio samples.
+    :param prefix: Bytes to hash ahead of the samples, e.g. to tell apart
+    identical samples with different sample rates.
+    :return: SHA-256 hex digest.
+    """
+    hashed = hashlib.sha256(prefix)
+    hashed.update(np.ascontiguousarray(audio).data)
+    return hashed.hexdigest()
+
+
+def _check_sample_rates(*sample_rates: int) -> None:
+    """
+    Check that sample rates are valid.
+
+    :param sample_rates: Sample rates to check.
+    :return:
+    """
+    if any(sample_rate <= 0 for sample_rate in sample_rates):
+        raise SampleRateError
+
+
+# Only POSIX shared memory is tracked (and cleaned up) by a resource
+# tracker process. Elsewhere, e.g. on Windows, shared memory is freed once
+# every process has closed it
+_TRACKS_SHARED_MEMORY = os.name == "posix"
+
+_OPERATIONS: dict[str, Callable[..., Any]] = {
+    "encode_wav": encode_wav,
+    "resample": resample,
+    "voice_activity": voice_activity,
+    "digest": digest,
+}
+
+
+class DSPWorkerPool:
+    """
+    Runs CPU heavy audio work (encoding, resampling, voice activity detection
+    and hashing) in worker processes, so that it doesn't compete for the GIL
+    with the thread sounddevice passes recorded audio from. When that thread
+    can't run in time, blocks of audio are lost (input overflows, see
+    `SpeechToTextComponentBase.input_overflows`). Audio is passed to workers
+    through shared memory rather than being pickled, and the calling thread
+    waits for the result without holding the GIL.
+
+    The pool is disabled until `enable` is called, and work given to a
+    disabled pool is done in the calling thread. So is audio shorter than
+    `min_frames`, which is quicker to process than to hand over.
+    """
+
+    def __init__(self, workers: int = 2, min_frames: int = 16_000):
+        """
+        Instantiate a DSP worker pool.
+
+        :param workers: Number of worker processes.
+        :param min_frames: Number of frames of audio below which work is done
+        in the calling thread.
+        """
+        self.workers = workers
+        self.min_frames = min_frames
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def enable(self, workers: Optional[int] = None) -> None:
+        """
+        Start doing work in worker processes. Workers are started straight
+        away, since forking while audio is being recorded would stall the
+        recording.
+
+        :param workers: Number of worker processes. If None, the current
+        number is kept.
+        :return:
+        """
+        with self._lock:
+            if workers is not None and workers != self.workers:
+                self._shutdown()
+                self.workers = workers
+            if self._executor is None:
+                if _TRACKS_SHARED_MEMORY:
+                    # Workers must share this process' tracker of shared
+                    # memory, or theirs will clean up shared memory they
+                    # didn't create
+                    resource_tracker.ensure_running()
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                # Workers are only started when there is work waiting
+                started = [
+                    self._executor.submit(os.getpid)
+                    for _ in range(self.workers)
+                ]
+                for future in started:
+                    future.result()
+        self.enabled = True
+
+    def disable(self) -> None:
+        """
+        Stop doing work in worker processes, and stop the workers once work
+        already given to them has finished.
+
+        :return:
+        """
+        self.enabled = False
+        with self._lock:
+            self._shutdown()
+
+    def encode_wav(self, audio: np.ndarray, sample_rate: int) -> bytes:
+        """
+        Encode audio as a WAV file. See `encode_wav`.
+
+        :param audio: Audio samples, one column per channel.
+        :param sample_rate: Sample rate of the audio.
+        :return: Encoded audio.
+        """
+        return self._run("encode_wav", audio, sample_rate)
+
+    def resample(
+        self, audio: np.ndarray, sample_rate: int, target_sample_rate: int
+    ) -> np.ndarray:
+        """
+        Resample audio. See `resample`.
+
+        :param audio: Audio samples, one column per channel.
+        :param sample_rate: Sample rate of the audio.
+        :param target_sample_rate: Sample rate to resample to.
+        :return: Resampled audio, of the same type.
+        """
+        # Checked here, since the toolkit's errors can't be unpickled from
+        # workers
+        _check_sample_rates(sample_rate, target_sample_rate)
+        return self._run("resample", audio, sample_rate, target_sample_rate)
+
+    def voice_activity(
+        self,
+        audio: np.ndarray,
+        sample_rate: int,
+        threshold: float = 0.01,
+        frame_seconds: float = 0.03,
+    ) -> np.ndarray:
+        """
+        Detect speech in audio, frame by frame. See `voice_activity`.
+
+        :param audio: Audio samples, one column per channel.
+        :param sample_rate: Sample rate of the audio.
+        :param threshold: Loudness above which a frame is speech, from 0 to 1.
+        :param frame_seconds: Length of each frame.
+        :return: Whether each frame is speech.
+        """
+        return self._run(
+            "voice_activity", audio, sample_rate, threshold, frame_seconds
+        )
+
+    def digest(self, audio: np.ndarray, prefix: bytes = b"") -> str:
+        """
+        Hash audio samples. See `digest`.
+
+        :param audio: Audio samples.
+        :param prefix: Bytes to hash ahead of the samples.
+        :return: SHA-256 hex digest.
+        """
+        return self._run("digest", audio, prefix)
+
+    def _run(self, operation: str, audio: np.ndarray, *args: Any) -> Any:
+        """
+        Do some work on audio, in a worker process if the pool is enabled and
+        there is enough audio to be worth it.
+
+        :param operation: Name of the work to do.
+        :param audio: Audio samples.
+        :param args: Any other arguments of the work.
+        :return: Result of the work.
+        """
+        with TRACER.span(operation, type(self).__qualname__):
+            executor = self._executor
+            if (
+                not self.enabled
+                or executor is None
+                or len(audio) < self.min_frames
+            ):
+                return _OPERATIONS[operation](audio, *args)
+
+            block = shared_memory.SharedMemory(
+                create=True, size=max(audio.nbytes, 1)
+            )
+            try:
+                shared = np.ndarray(audio.shape, audio.dtype, buffer=block.buf)
+                shared[...] = audio
+                # Views must be released before shared memory can be closed
+                del shared
+                future = executor.submit(
+                    _run_in_worker,
+                    operation,
+                    block.name,
+                    audio.shape,
+                    audio.dtype.str,
+                    args,
+                )
+                result = future.result()
+            finally:
+                block.close()
+                block.unlink()
+            return result
+
+    def _shutdown(self) -> None:
+        """
+        Stop the worker processes, if any. Must be called with the lock held.
+
+        :return:
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def _run_in_worker(
+    operation: str,
+    name: str,
+    shape: tuple[int, ...],
+    dtype: str,
+    args: tuple,
+) -> Any:
+    """
+    Do some work on audio in shared memory, in a worker process.
+
+    :param operation: Name of the work to do.
+    :param name: Name of the shared memory holding the audio.
+    :param shape: Shape of the audio.
+    :param dtype: Type of the audio samples.
+    :param args: Any other arguments of the work.
+    :return: Result of the work.
+    """
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        audio = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+        result = _OPERATIONS[operation](audio, *args)
+        # Views must be released before shared memory can be closed
+        del audio
+    finally:
+        block.close()
+    return result
+
+
+# Pool that speech to text components do their audio work in
+DSP_POOL = DSPWorkerPool()
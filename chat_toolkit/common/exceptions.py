@@ -1,3 +1,89 @@
 class SpeakingRateError(ValueError):
     def __init__(self):
         super().__init__("Speaking rate must be > 0")
+
+
+class StableChunksError(ValueError):
+    def __init__(self):
+        super().__init__("Stable chunks must be > 0")
+
+
+class ForkingUnsupportedError(ValueError):
+    def __init__(self):
+        super().__init__("Chatbot component does not support forking")
+
+
+class MissingSpeechCacheError(ValueError):
+    def __init__(self):
+        super().__init__("No speech cache has been provided")
+
+
+class QueueSizeError(ValueError):
+    def __init__(self):
+        super().__init__("Queue size must be > 0")
+
+
+class TranscriptionUnsupportedError(ValueError):
+    def __init__(self):
+        super().__init__(
+            "Speech to text component cannot transcribe recorded audio"
+        )
+
+
+class CassetteModeError(ValueError):
+    def __init__(self):
+        super().__init__("Cassette mode must be 'record' or 'replay'")
+
+
+class CassetteMissError(ValueError):
+    def __init__(self):
+        super().__init__("No recorded response matches the request")
+
+
+class ComponentKindError(ValueError):
+    def __init__(self):
+        super().__init__(
+            "Component kind must be 'chatbot', 'speech_to_text' or "
+            "'text_to_speech'"
+        )
+
+
+class UnknownComponentError(ValueError):
+    def __init__(self):
+        super().__init__("No component is registered with that name")
+
+
+class UsageGroupError(ValueError):
+    def __init__(self):
+        super().__init__(
+            "Usage can only be grouped by 'component', 'session' or 'kind'"
+        )
+
+
+class BatchItemError(ValueError):
+    def __init__(self):
+        super().__init__("Batch items must have a non-empty list of messages")
+
+
+class SchedulerLaneError(ValueError):
+    def __init__(self):
+        super().__init__("Scheduler lane must be 'interactive' or 'batch'")
+
+
+class SchedulerWeightError(ValueError):
+    def __init__(self):
+        super().__init__("Tenant weight must be > 0")
+
+
+class SampleRateError(ValueError):
+    def __init__(self):
+        super().__init__("Sample rates must be > 0")
+
+
+class SynthesisWorkerError(RuntimeError):
+    def __init__(self):
+        super().__init__("Synthesis worker has not been initialized")
+
+    def __reduce__(self):
+        # Raised in worker processes, and unpickled without arguments
+        return type(self), ()
@@ -1,15 +1,25 @@
+from __future__ import annotations
+
+import threading
 from sys import platform
+from typing import TYPE_CHECKING
+
+from chat_toolkit.common.tracing import TRACER
 
-import keyboard
-import pyxhook
-from pyxhook.pyxhook import PyxHookKeyEvent
+if TYPE_CHECKING:
+    from pyxhook.pyxhook import PyxHookKeyEvent
 
 
 class KeyTracker:
     def __init__(self):
+        # Keyboard hooks are imported here rather than at module level,
+        # since pyxhook needs an X display
         self._linux = platform == "linux"
         if self._linux:
+            import pyxhook
+
             self._recording = False
+            self._recording_started = threading.Event()
             self._hook = pyxhook.HookManager()
             self._hook.KeyDown = self._key_down_event
             self._hook.KeyUp = self._key_up_event
@@ -17,6 +27,9 @@ class KeyTracker:
             self._hook.start()
             self._tracking_char = 32
         else:
+            import keyboard
+
+            self._keyboard = keyboard
             self._tracking_char = "space"
 
     def _key_down_event(self, event: PyxHookKeyEvent) -> None:
@@ -28,6 +41,7 @@ class KeyTracker:
         """
         if event.Ascii == self._tracking_char and not self._recording:
             self._recording = True
+            self._recording_started.set()
 
     def _key_up_event(self, event: PyxHookKeyEvent) -> None:
         """
@@ -48,11 +62,9 @@ class KeyTracker:
         :return:
         """
         if self._linux:
-            while True:
-                if self._recording:
-                    return
+            self._recording_started.wait()
         else:
-            keyboard.wait(self._tracking_char)
+            self._keyboard.wait(self._tracking_char)
             self._recording = True
 
     def _check_if_still_recording(self) -> bool:
@@ -62,7 +74,7 @@ class KeyTracker:
         :return:
         """
         if not self._linux:
-            self._recording = keyboard.is_pressed(self._tracking_char)
+            self._recording = self._keyboard.is_pressed(self._tracking_char)
         return self._recording
 
     def wait_for_recording_to_start(self) -> None:
@@ -73,7 +85,8 @@ class KeyTracker:
         :return:
         """
         print("\n\tHold space to record...")
-        self._wait_for_recording_to_start()
+        with TRACER.span("KeyTracker.wait_for_recording_to_start"):
+            self._wait_for_recording_to_start()
         print("\tRecording...")
 
     def check_if_still_recording(self) -> bool:
@@ -92,3 +105,5 @@ class KeyTracker:
         """
         if self._linux:
             self._hook.cancel()
+            # Release anyone still waiting for recording to start
+            self._recording_started.set()
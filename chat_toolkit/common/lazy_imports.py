@@ -0,0 +1,28 @@
+import importlib
+from typing import Any, Callable
+
+
+def lazy_getattr(
+    package: str, lazy_imports: dict[str, str]
+) -> Callable[[str], Any]:
+    """
+    Create a module level `__getattr__` that imports names from a package's
+    modules the first time they are used, so that importing the package
+    doesn't import every module's dependencies (e.g. the audio stack, for a
+    text only chatbot).
+
+    :param package: Name of the package, i.e. its `__name__`.
+    :param lazy_imports: Module to import each name from, relative to the
+    package.
+    :return: Function to assign to the package's `__getattr__`.
+    """
+
+    def __getattr__(name: str) -> Any:  # noqa: N807
+        if name not in lazy_imports:
+            raise AttributeError(
+                f"module {package!r} has no attribute {name!r}"
+            )
+        module = importlib.import_module(lazy_imports[name], package)
+        return getattr(module, name)
+
+    return __getattr__
@@ -0,0 +1,230 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Union
+
+from loguru import logger
+
+from chat_toolkit.common.orchestrator import Orchestrator
+from chat_toolkit.common.turn_result import TurnResult
+from chat_toolkit.common.utils import latency_percentiles
+
+# Percentiles compared against a baseline run
+COMPARED_PERCENTILES = ("p50", "p95", "p99")
+
+
+class LoadProfile:
+    """
+    The conversations a load generator has: how many, how long, and what is
+    said in them.
+    """
+
+    def __init__(
+        self,
+        conversations: int = 4,
+        turns: int = 5,
+        message_words: int = 20,
+        think_time: float = 0.0,
+        audio: Optional[bytes] = None,
+    ):
+        """
+        Instantiate a load profile.
+
+        :param conversations: Number of conversations to have at once.
+        :param turns: Number of turns in each conversation.
+        :param message_words: Number of words in each message.
+        :param think_time: Seconds to wait between turns of a conversation.
+        :param audio: Encoded audio to send as every message, instead of
+        text. Requires a speech to text component. Optional.
+        """
+        self.conversations = conversations
+        self.turns = turns
+        self.message_words = message_words
+        self.think_time = think_time
+        self.audio = audio
+
+    @property
+    def summary(self) -> dict:
+        """
+        Property representing the profile, as reported with a run's result.
+
+        :return: Every setting, and whether audio is sent.
+        """
+        return {
+            "conversations": self.conversations,
+            "turns": self.turns,
+            "message_words": self.message_words,
+            "think_time": self.think_time,
+            "audio": self.audio is not None,
+        }
+
+
+class LoadGenerator:
+    """
+    Simulates many concurrent conversations, each with its own orchestrator
+    (and components), to measure how the toolkit behaves under concurrency.
+    Every conversation has the same number of turns, with a pause between
+    turns to stand in for the user thinking.
+    """
+
+    def __init__(
+        self,
+        orchestrator_factory: Callable[[], Orchestrator],
+        profile: Optional[LoadProfile] = None,
+    ):
+        """
+        Instantiate a load generator.
+
+        :param orchestrator_factory: Creates an orchestrator for each
+        conversation.
+        :param profile: The conversations to have. By default, 4
+        conversations of 5 turns, with 20 word messages.
+        """
+        self.profile = profile or LoadProfile()
+        self._orchestrator_factory = orchestrator_factory
+
+    def run(self) -> dict:
+        """
+        Have every conversation, all at once.
+
+        :return: The run's configuration, throughput, latency percentiles
+        per stage, estimated cost (including failed turns), and number of
+        failed turns.
+        """
+        start = threading.Barrier(self.profile.conversations)
+        with ThreadPoolExecutor(
+            max_workers=self.profile.conversations,
+            thread_name_prefix="chat-toolkit",
+        ) as executor:
+            started = time.monotonic()
+            futures = [
+                executor.submit(self._converse, conversation, start)
+                for conversation in range(self.profile.conversations)
+            ]
+            conversations = [future.result() for future in futures]
+            duration = time.monotonic() - started
+
+        results = [
+            result
+            for conversation, _, _ in conversations
+            for result in conversation
+        ]
+        stages: dict[str, list[float]] = {}
+        for result in results:
+            for stage, seconds in result.timings.items():
+                stages.setdefault(stage, []).append(seconds)
+        return {
+            "config": self.profile.summary,
+            "duration_seconds": duration,
+            "completed_turns": len(results),
+            "failed_turns": sum(errors for _, errors, _ in conversations),
+            "throughput_turns_per_second": (
+                len(results) / duration if duration else 0.0
+            ),
+            "stages": {
+                stage: latency_percentiles(seconds)
+                for stage, seconds in stages.items()
+            },
+            # Taken from the components, since failed turns may still have
+            # been billed
+            "cost_estimate": sum(cost for _, _, cost in conversations),
+        }
+
+    @staticmethod
+    def compare(result: dict, baseline: dict) -> dict:
+        """
+        Compare a run against a baseline run.
+
+        :param result: Result of a run.
+        :param baseline: Result of the baseline run.
+        :return: Baseline and current throughput and latency percentiles of
+        each stage (that both runs have), with their relative change.
+        """
+        stages = {}
+        for stage, latencies in result["stages"].items():
+            if stage not in baseline["stages"]:
+                continue
+            stages[stage] = {
+                percentile: _change(
+                    baseline["stages"][stage][percentile],
+                    latencies[percentile],
+                )
+                for percentile in COMPARED_PERCENTILES
+            }
+        return {
+            "throughput_turns_per_second": _change(
+                baseline["throughput_turns_per_second"],
+                result["throughput_turns_per_second"],
+            ),
+            "stages": stages,
+        }
+
+    def _converse(
+        self, conversation: int, start: threading.Barrier
+    ) -> tuple[list[TurnResult], int, float]:
+        """
+        Have one conversation, once every conversation is ready to start.
+
+        :param conversation: Index of the conversation.
+        :param start: Barrier that every conversation waits on before
+        starting.
+        :return: Result of each successful turn, the number of failed turns,
+        and the estimated cost of every turn.
+        """
+        try:
+            orchestrator = self._orchestrator_factory()
+        except Exception:
+            # Don't leave the other conversations waiting to start
+            start.abort()
+            raise
+        start.wait()
+
+        results = []
+        errors = 0
+        for turn in range(self.profile.turns):
+            if turn and self.profile.think_time:
+                time.sleep(self.profile.think_time)
+            try:
+                results.append(
+                    orchestrator.run_turn(self._message(conversation, turn))
+                )
+            except Exception as ex:
+                logger.opt(exception=ex).warning(
+                    "Conversation {} turn {} failed", conversation, turn
+                )
+                errors += 1
+        return (
+            results,
+            errors,
+            orchestrator.cost_summary["total_cost_estimate"],
+        )
+
+    def _message(self, conversation: int, turn: int) -> Union[str, bytes]:
+        """
+        Create a message to send.
+
+        :param conversation: Index of the conversation.
+        :param turn: Index of the turn.
+        :return: Text of the configured length, or the configured audio.
+        """
+        if self.profile.audio is not None:
+            return self.profile.audio
+        words = [f"Conversation {conversation} turn {turn}."]
+        words += ["word"] * max(self.profile.message_words - 4, 0)
+        return " ".join(words)
+
+
+def _change(baseline: float, current: float) -> dict[str, float]:
+    """
+    Describe how a measurement changed from a baseline.
+
+    :param baseline: Baseline measurement.
+    :param current: Current measurement.
+    :return: Both measurements, and the relative change (0.0 if the baseline
+    is 0).
+    """
+    return {
+        "baseline": baseline,
+        "current": current,
+        "change": (current - baseline) / baseline if baseline else 0.0,
+    }
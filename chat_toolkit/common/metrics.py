@@ -0,0 +1,244 @@
+import threading
+from bisect import bisect_left
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+# Upper bounds of latency histogram buckets, in seconds
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+METRIC_PREFIX = "chat_toolkit"
+METRIC_HELP = {
+    "tokens": "Tokens used, by kind of token.",
+    "audio_seconds_transcribed": "Seconds of audio sent to be transcribed.",
+    "requests": "Requests made to models.",
+    "errors": "Requests made to models that failed.",
+    "cache_hits": "Requests served from a cache instead of a model.",
+    "input_overflows": "Blocks of audio input lost before they were read.",
+    "stage": "Latency of each stage of a component's work.",
+    "queue_wait": "Time requests waited to be dispatched by the scheduler.",
+}
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelsType = tuple[tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """
+    Counters and latency histograms that components and orchestrators update
+    as they work, rendered in Prometheus' text exposition format. Every
+    metric is labelled with the component (and its model) that updated it.
+
+    The registry is disabled until `enable` is called, and updating a
+    disabled registry does nothing, so metrics cost next to nothing unless
+    they are wanted.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Instantiate a metrics registry.
+
+        :param buckets: Upper bounds of latency histogram buckets, in
+        seconds, in ascending order.
+        """
+        self.buckets = buckets
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[LabelsType, float]] = {}
+        self._histograms: dict[str, dict[LabelsType, list]] = {}
+
+    def enable(self) -> None:
+        """
+        Start collecting metrics.
+
+        :return:
+        """
+        self.enabled = True
+
+    def disable(self) -> None:
+        """
+        Stop collecting metrics. Metrics collected so far are kept.
+
+        :return:
+        """
+        self.enabled = False
+
+    def reset(self) -> None:
+        """
+        Forget every metric collected so far.
+
+        :return:
+        """
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        """
+        Increment a counter.
+
+        :param name: Name of the counter, without prefix or suffix.
+        :param value: Amount to increment by.
+        :param labels: Labels of the counter.
+        :return:
+        """
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counter = self._counters.setdefault(name, {})
+            counter[key] = counter.get(key, 0.0) + value
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        """
+        Add a latency to a histogram.
+
+        :param name: Name of the histogram, without prefix or suffix.
+        :param seconds: Latency to add.
+        :param labels: Labels of the histogram.
+        :return:
+        """
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        bucket = bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.setdefault(name, {})
+            if key not in histogram:
+                # Count per bucket (the last is +Inf), sum, count
+                histogram[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series = histogram[key]
+            series[0][bucket] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def render(self) -> str:
+        """
+        Render every metric in Prometheus' text exposition format.
+
+        :return: Metrics.
+        """
+        lines = []
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        with self._lock:
+            for name, counter in sorted(self._counters.items()):
+                full_name = f"{METRIC_PREFIX}_{name}_total"
+                lines += self._header(name, full_name, "counter")
+                for key, value in sorted(counter.items()):
+                    lines.append(f"{full_name}{_format_labels(key)} {value}")
+
+            for name, histogram in sorted(self._histograms.items()):
+                full_name = f"{METRIC_PREFIX}_{name}_seconds"
+                lines += self._header(name, full_name, "histogram")
+                for key, (counts, total, count) in sorted(histogram.items()):
+                    cumulative = 0
+                    for bound, bucket_count in zip(bounds, counts):
+                        cumulative += bucket_count
+                        bucket_key = key + (("le", bound),)
+                        lines.append(
+                            f"{full_name}_bucket{_format_labels(bucket_key)} "
+                            f"{cumulative}"
+                        )
+                    labels = _format_labels(key)
+                    lines.append(f"{full_name}_sum{labels} {total}")
+                    lines.append(f"{full_name}_count{labels} {count}")
+        return "".join(f"{line}\n" for line in lines)
+
+    def dump(self, path: Path) -> None:
+        """
+        Write every metric to a file, e.g. for node exporter's textfile
+        collector.
+
+        :param path: File to write to.
+        :return:
+        """
+        Path(path).write_text(self.render(), encoding="utf-8")
+
+    def serve(
+        self, host: str = "127.0.0.1", port: int = 9090
+    ) -> "ThreadingHTTPServer":
+        """
+        Enable the registry and serve its metrics over HTTP (at any path) from
+        a background thread.
+
+        :param host: Host to listen on.
+        :param port: Port to listen on. If 0, any free port is used.
+        :return: Running server. Call `shutdown` on it to stop serving.
+        """
+        # Imported here, since most processes never serve metrics
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.enable()
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    @staticmethod
+    def _header(name: str, full_name: str, metric_type: str) -> list[str]:
+        """
+        Create the HELP and TYPE lines of a metric.
+
+        :param name: Name of the metric, without prefix or suffix.
+        :param full_name: Name of the metric, as rendered.
+        :param metric_type: Prometheus type of the metric.
+        :return: Lines.
+        """
+        help_text = METRIC_HELP.get(name, name.replace("_", " ").capitalize())
+        return [
+            f"# HELP {full_name} {help_text}",
+            f"# TYPE {full_name} {metric_type}",
+        ]
+
+
+def _format_labels(labels: LabelsType) -> str:
+    """
+    Format labels of a metric.
+
+    :param labels: Label names and values.
+    :return: Labels in Prometheus' format.
+    """
+    if not labels:
+        return ""
+    escaped = (
+        (
+            name,
+            value.replace("\\", r"\\")
+            .replace('"', r"\"")
+            .replace("\n", r"\n"),
+        )
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+# Registry updated by every component and orchestrator
+METRICS = MetricsRegistry()
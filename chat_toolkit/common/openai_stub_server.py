@@ -0,0 +1,340 @@
+import asyncio
+import io
+import json
+import random
+import threading
+import time
+import uuid
+from collections.abc import Generator
+from contextlib import contextmanager
+from typing import Any, Optional
+
+import soundfile as sf
+from aiohttp import web
+from loguru import logger
+
+# Mirrors OpenAI's error for audio it can't transcribe
+AUDIO_TOO_SHORT = (
+    "Audio file is too short. Minimum audio length is 0.1 seconds."
+)
+MINIMUM_AUDIO_SECONDS = 0.1
+
+
+class StubFailures:
+    """
+    Errors a stub server injects into its responses.
+    """
+
+    def __init__(
+        self,
+        rate_limit_rate: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        """
+        Instantiate stub failures.
+
+        :param rate_limit_rate: Fraction of requests to reject with 429 Too
+        Many Requests.
+        :param error_rate: Fraction of requests to fail with 500 Internal
+        Server Error.
+        :param seed: Seed for choosing which requests fail.
+        """
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.seed = seed
+
+
+class OpenAIStubServer:
+    """
+    Local stand in for OpenAI's chat completions and audio transcriptions
+    endpoints, for exercising the real HTTP path of components without
+    network access or cost. Point components at it by setting
+    `openai.api_base` to its `api_base` (and `openai.api_key` to anything).
+
+    Responses are deterministic for a given seed. Latency, the pace of
+    streamed chunks, and the rate of injected errors are configurable, and
+    the tokens and audio the server has handled are accounted for in its
+    `usage`.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        chunk_interval: float = 0.0,
+        completion_tokens: int = 20,
+        transcript: str = "This is a stub transcript.",
+        failures: Optional[StubFailures] = None,
+    ):
+        """
+        Instantiate a stub server.
+
+        :param latency: Seconds to wait before responding to each request.
+        :param chunk_interval: Seconds to wait between streamed chunks.
+        :param completion_tokens: Number of tokens (words) in each chat
+        completion.
+        :param transcript: Text of every transcription.
+        :param failures: Errors to inject. By default, no requests fail.
+        """
+        self.latency = latency
+        self.chunk_interval = chunk_interval
+        self.completion_tokens = completion_tokens
+        self.transcript = transcript
+        self.failures = failures or StubFailures()
+        self.api_base: Optional[str] = None
+
+        # Only chooses which stub requests fail, so needn't be secure
+        self._random = random.Random(self.failures.seed)  # noqa: S311
+        self._usage = {
+            "requests": 0,
+            "rate_limited": 0,
+            "errors": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+            "audio_seconds": 0.0,
+        }
+
+    @property
+    def usage(self) -> dict:
+        """
+        Read only property representing the requests and usage the server
+        has handled so far.
+
+        :return: Number of requests (and how many were rate limited or
+        failed), tokens used and seconds of audio transcribed.
+        """
+        return self._usage.copy()
+
+    def make_app(self) -> web.Application:
+        """
+        Create the aiohttp application serving the stub endpoints.
+
+        :return: Application to run, e.g. with `aiohttp.web.run_app`.
+        """
+        app = web.Application()
+        app.add_routes(
+            [
+                web.post("/v1/chat/completions", self._chat_completions),
+                web.post("/v1/audio/transcriptions", self._transcriptions),
+            ]
+        )
+        return app
+
+    def run(self, host: str = "127.0.0.1", port: int = 8081) -> None:
+        """
+        Serve until interrupted.
+
+        :param host: Host to listen on.
+        :param port: Port to listen on.
+        :return:
+        """
+        self.api_base = f"http://{host}:{port}/v1"
+        web.run_app(self.make_app(), host=host, port=port)
+
+    @contextmanager
+    def running(
+        self, host: str = "127.0.0.1", port: int = 0
+    ) -> Generator[str, None, None]:
+        """
+        Context manager for serving in a background thread.
+
+        :param host: Host to listen on.
+        :param port: Port to listen on. If 0, any free port is used.
+        :return: None, but yields the server's API base URL.
+        """
+        loop = asyncio.new_event_loop()
+        runner = web.AppRunner(self.make_app())
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, host, port)
+        loop.run_until_complete(site.start())
+        port = runner.addresses[0][1]
+        self.api_base = f"http://{host}:{port}/v1"
+
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        logger.debug("Stub server listening on {}", self.api_base)
+        try:
+            yield self.api_base
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.run_until_complete(runner.cleanup())
+            loop.close()
+            self.api_base = None
+
+    async def _chat_completions(
+        self, request: web.Request
+    ) -> web.StreamResponse:
+        """
+        Respond to a chat completion request, streaming the response as
+        server sent events if requested.
+
+        :param request: Request to handle.
+        :return: Completion, or streamed completion.
+        """
+        failure = await self._start_request()
+        if failure is not None:
+            return failure
+
+        body = await request.json()
+        prompt_tokens = sum(
+            len(message["content"].split()) for message in body["messages"]
+        )
+        words = [f"token{index}" for index in range(self.completion_tokens)]
+        self._account(prompt_tokens, len(words))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+        if not body.get("stream"):
+            return web.json_response(
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body["model"],
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {
+                                "role": "assistant",
+                                "content": " ".join(words),
+                            },
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": len(words),
+                        "total_tokens": prompt_tokens + len(words),
+                    },
+                }
+            )
+
+        response = web.StreamResponse(
+            headers={"Content-Type": "text/event-stream"}
+        )
+        await response.prepare(request)
+        deltas = (
+            [{"role": "assistant"}]
+            + [
+                {"content": word if index == 0 else f" {word}"}
+                for index, word in enumerate(words)
+            ]
+            + [{}]
+        )
+        for index, delta in enumerate(deltas):
+            if index and self.chunk_interval:
+                await asyncio.sleep(self.chunk_interval)
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "delta": delta,
+                        "finish_reason": None if delta else "stop",
+                    }
+                ],
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def _transcriptions(self, request: web.Request) -> web.Response:
+        """
+        Respond to a transcription request, rejecting audio that is too
+        short to transcribe like OpenAI does.
+
+        :param request: Request to handle.
+        :return: Transcription.
+        """
+        failure = await self._start_request()
+        if failure is not None:
+            return failure
+
+        form = await request.post()
+        seconds, error = self._audio_seconds(form.get("file"))
+        if error is not None:
+            return self._error(400, "invalid_request_error", error)
+
+        self._usage["audio_seconds"] += seconds
+        return web.json_response({"text": self.transcript})
+
+    @staticmethod
+    def _audio_seconds(audio: Any) -> tuple[float, Optional[str]]:
+        """
+        Measure uploaded audio.
+
+        :param audio: Uploaded audio file.
+        :return: Seconds of audio, and why it can't be transcribed, if it
+        can't.
+        """
+        if not isinstance(audio, web.FileField):
+            return 0.0, "No file given"
+        try:
+            info = sf.info(io.BytesIO(audio.file.read()))
+        except sf.LibsndfileError:
+            return 0.0, "Invalid file format."
+        seconds = info.frames / info.samplerate
+        too_short = seconds < MINIMUM_AUDIO_SECONDS
+        return seconds, AUDIO_TOO_SHORT if too_short else None
+
+    async def _start_request(self) -> Optional[web.Response]:
+        """
+        Count a request, wait for the configured latency, and decide whether
+        it should fail.
+
+        :return: An injected error response, or None if the request should
+        succeed.
+        """
+        self._usage["requests"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        roll = self._random.random()
+        if roll < self.failures.rate_limit_rate:
+            self._usage["rate_limited"] += 1
+            return self._error(
+                429, "requests", "Rate limit reached for requests"
+            )
+        if roll < self.failures.rate_limit_rate + self.failures.error_rate:
+            self._usage["errors"] += 1
+            return self._error(500, "server_error", "The server had an error")
+        return None
+
+    def _account(self, prompt_tokens: int, completion_tokens: int) -> None:
+        """
+        Account for the tokens used by a completion.
+
+        :param prompt_tokens: Tokens in the prompt.
+        :param completion_tokens: Tokens in the completion.
+        :return:
+        """
+        self._usage["prompt_tokens"] += prompt_tokens
+        self._usage["completion_tokens"] += completion_tokens
+        self._usage["total_tokens"] += prompt_tokens + completion_tokens
+
+    @staticmethod
+    def _error(status: int, error_type: str, message: str) -> web.Response:
+        """
+        Create an error response in OpenAI's format.
+
+        :param status: HTTP status code.
+        :param error_type: Type of error.
+        :param message: Description of the error.
+        :return: JSON error response.
+        """
+        return web.json_response(
+            {
+                "error": {
+                    "message": message,
+                    "type": error_type,
+                    "param": None,
+                    "code": None,
+                }
+            },
+            status=status,
+        )
@@ -1,18 +1,66 @@
 import json
-from typing import Optional
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Optional, TypeVar, Union
 
+from chat_toolkit.common.exceptions import (
+    ForkingUnsupportedError,
+    TranscriptionUnsupportedError,
+)
+from chat_toolkit.common.sentence_pipeline import SentencePipeline
+from chat_toolkit.common.speculation import SpeculativeResponder
+from chat_toolkit.common.timing import Timings
+from chat_toolkit.common.turn_result import TurnResult
 from chat_toolkit.common.utils import print_banner
 from chat_toolkit.components.chatbots.chatbot_component_base import (
     ChatbotComponentBase,
 )
 from chat_toolkit.components.component_base import ComponentBase
-from chat_toolkit.components.speech_to_text.speech_to_text_component_base import (  # noqa: E501
-    SpeechToTextComponentBase,
-)
 from chat_toolkit.components.text_to_speech.text_to_speech_component_base import (  # noqa: E501
     TextToSpeechComponentBase,
 )
 
+if TYPE_CHECKING:
+    # Only needed for type hints, and imports the audio stack
+    from chat_toolkit.components.speech_to_text.speech_to_text_component_base import (  # noqa: E501
+        SpeechToTextComponentBase,
+    )
+
+OrchestratorType = TypeVar("OrchestratorType", bound="Orchestrator")
+
+
+class OrchestratorOptions:
+    """
+    Opt-in features of an orchestrator's conversations.
+    """
+
+    def __init__(
+        self,
+        speculative_stable_chunks: Optional[int] = None,
+        pipelined_speech: bool = False,
+        barge_in: bool = False,
+    ):
+        """
+        Instantiate orchestrator options.
+
+        :param speculative_stable_chunks: If provided (and a speech to text
+        component is used), messages are sent to the chatbot speculatively
+        once the partial transcript has been stable for this many chunks of
+        audio. Requires a chatbot component that supports forking.
+        Optional.
+        :param pipelined_speech: If True (and a text to speech component is
+        used), responses are streamed, split into sentences and said one
+        sentence at a time, so the first sentence is said while the rest is
+        still being generated.
+        :param barge_in: If True (and a text to speech component is used),
+        responses are said in the background and are interrupted as soon as
+        the user starts recording their next message.
+        """
+        self.speculative_stable_chunks = speculative_stable_chunks
+        self.pipelined_speech = pipelined_speech
+        self.barge_in = barge_in
+
 
 class Orchestrator:
     """
@@ -22,8 +70,9 @@ class Orchestrator:
     def __init__(
         self,
         chatbot_component: ChatbotComponentBase,
-        speech_to_text_component: Optional[SpeechToTextComponentBase] = None,
+        speech_to_text_component: Optional["SpeechToTextComponentBase"] = None,
         text_to_speech_component: Optional[TextToSpeechComponentBase] = None,
+        options: Optional[OrchestratorOptions] = None,
     ):
         """
         Instantiates orchestrator.
@@ -33,11 +82,129 @@ class Orchestrator:
         component to use. Optional.
         :param text_to_speech_component: Prebuilt or custom text to speech
         component to use. Optional.
+        :param options: Opt-in features, e.g. pipelined speech and barge in.
+        By default, none are used.
         """
+        options = options or OrchestratorOptions()
         self._chatbot_component = chatbot_component
         self._speech_to_text_component = speech_to_text_component
         self._text_to_speech_component = text_to_speech_component
 
+        self._speculative_responder: Optional[SpeculativeResponder] = None
+        if (
+            options.speculative_stable_chunks is not None
+            and speech_to_text_component
+        ):
+            # Speculative responses are sent from forks of the chatbot
+            if not chatbot_component.supports_forking:
+                raise ForkingUnsupportedError
+            self._speculative_responder = SpeculativeResponder(
+                chatbot_component, options.speculative_stable_chunks
+            )
+
+        self._barge_in = (
+            options.barge_in and text_to_speech_component is not None
+        )
+        if self._barge_in and text_to_speech_component:
+            if speech_to_text_component:
+                speech_to_text_component.add_recording_started_listener(
+                    text_to_speech_component.interrupt
+                )
+
+        self._sentence_pipeline: Optional[SentencePipeline] = None
+        if options.pipelined_speech and text_to_speech_component:
+            self._sentence_pipeline = SentencePipeline(
+                text_to_speech_component
+            )
+
+        self._timings = Timings(
+            labels={"component": type(self).__qualname__, "model": ""}
+        )
+
+    @classmethod
+    def build(
+        cls: type[OrchestratorType],
+        chatbot_factory: Callable[[], ChatbotComponentBase],
+        speech_to_text_factory: Optional[
+            Callable[[], "SpeechToTextComponentBase"]
+        ] = None,
+        text_to_speech_factory: Optional[
+            Callable[[], TextToSpeechComponentBase]
+        ] = None,
+        **kwargs,
+    ) -> OrchestratorType:
+        """
+        Build an orchestrator, constructing and warming up its components
+        concurrently, so that it is ready as soon as the slowest component
+        is, rather than after every component in turn.
+
+        :param chatbot_factory: Creates the chatbot component to use.
+        :param speech_to_text_factory: Creates the speech to text component
+        to use. Optional.
+        :param text_to_speech_factory: Creates the text to speech component
+        to use. Optional.
+        :param kwargs: Keyword arguments to pass to the orchestrator.
+        :return: Orchestrator.
+        """
+        factories: dict[str, Callable[[], ComponentBase]] = {
+            name: factory
+            for name, factory in (
+                ("chatbot_component", chatbot_factory),
+                ("speech_to_text_component", speech_to_text_factory),
+                ("text_to_speech_component", text_to_speech_factory),
+            )
+            if factory is not None
+        }
+        with ThreadPoolExecutor(
+            max_workers=len(factories), thread_name_prefix="build"
+        ) as executor:
+            futures = {
+                name: executor.submit(cls._build_component, factory)
+                for name, factory in factories.items()
+            }
+            components: dict[str, Any] = {
+                name: future.result() for name, future in futures.items()
+            }
+        return cls(**components, **kwargs)
+
+    @staticmethod
+    def _build_component(
+        factory: Callable[[], ComponentBase]
+    ) -> ComponentBase:
+        """
+        Construct a component and warm it up, timing both.
+
+        :param factory: Creates the component.
+        :return: Component, ready to use.
+        """
+        started = time.monotonic()
+        component = factory()
+        component._timings.record("construct", time.monotonic() - started)
+        with component._timings.time("warm_up"):
+            component.warm_up()
+        return component
+
+    @property
+    def chatbot_component(self) -> ChatbotComponentBase:
+        """
+        Read only property representing the chatbot component.
+
+        :return:
+        """
+        return self._chatbot_component
+
+    @property
+    def speech_to_text_component(
+        self,
+    ) -> Optional["SpeechToTextComponentBase"]:
+        """
+        Read only property representing the speech to text component, if
+        any.
+
+        :return:
+        """
+        return self._speech_to_text_component
+
     @property
     def components(self) -> tuple[ComponentBase, ...]:
         """
@@ -69,33 +236,175 @@ class Orchestrator:
         print("Ctrl+C or send an empty message at any point to exit.")
 
         try:
-            start_prompt = self.get_start_prompt()
-            self._chatbot_component.prompt_chatbot(start_prompt)
+            self._start_conversation()
             while True:
-                if self._speech_to_text_component:
-                    user_input = (
-                        self._speech_to_text_component.transcribe_speech()[0]
-                    )
-                    print(f"\nUser: {user_input}")
-                else:
-                    user_input = input("\nUser: ")
+                with self._timings.time("user_input"):
+                    user_input = self._get_user_input()
+                self._interrupt_speech()
 
                 if not self._check_user_input(user_input):
                     break
 
-                chatbot_response, _ = self._chatbot_component.send_message(
-                    user_input
-                )
-                print(f"\nChatbot: {chatbot_response}")
-
-                if self._text_to_speech_component:
-                    self._text_to_speech_component.say_text(chatbot_response)
+                if self._sentence_pipeline:
+                    print("\nChatbot: ", end="", flush=True)
+                    with self._timings.time("chat_and_speak"):
+                        self._sentence_pipeline.speak(
+                            self._stream_chatbot_response(user_input),
+                            wait=not self._barge_in,
+                        )
+                    print()
+                else:
+                    with self._timings.time("chat"):
+                        chatbot_response = self._get_chatbot_response(
+                            user_input
+                        )
+                    print(f"\nChatbot: {chatbot_response}")
+                    with self._timings.time("speak"):
+                        self._say_text(chatbot_response)
         except KeyboardInterrupt:
             # Swallow user Keyboard Interrupts
             pass
         finally:
+            self._interrupt_speech()
             print("\nBye!\n")
+            if self._speculative_responder:
+                self._speculative_responder.close()
             self.print_cost_summary()
+            self.print_timing_summary()
+            if self._speculative_responder:
+                self.print_speculation_summary()
+            if self._sentence_pipeline:
+                self.print_pipeline_summary()
+            if self._text_to_speech_component:
+                self.print_engine_pool_summary()
+
+    def run_turn(
+        self, text_or_audio: Union[str, bytes], speak: bool = True
+    ) -> TurnResult:
+        """
+        Have one turn of a conversation without a terminal: transcribe the
+        user's message (if it is audio), get the chatbot's response and say
+        it (if a text to speech component is present). Each stage is timed
+        with a monotonic clock.
+
+        :param text_or_audio: User's message, or encoded audio of it (e.g.
+        the contents of a WAV file).
+        :param speak: Whether to say the chatbot's response.
+        :return: The turn's transcript, response, timings and costs.
+        """
+        costs_before = self._component_costs()
+        timings = {}
+        started = time.monotonic()
+
+        transcript = None
+        if isinstance(text_or_audio, bytes):
+            speech_to_text = self._speech_to_text_component
+            if (
+                not speech_to_text
+                or not speech_to_text.can_transcribe_recordings
+            ):
+                raise TranscriptionUnsupportedError
+            transcript, _ = speech_to_text.transcribe(text_or_audio)
+            timings["transcribe"] = time.monotonic() - started
+            user_input = transcript
+        else:
+            user_input = text_or_audio
+
+        response = None
+        if self._check_user_input(user_input):
+            chat_started = time.monotonic()
+            response = self._get_chatbot_response(user_input)
+            timings["chat"] = time.monotonic() - chat_started
+
+            if speak and self._text_to_speech_component:
+                speak_started = time.monotonic()
+                self._text_to_speech_component.say_text(response)
+                timings["speak"] = time.monotonic() - speak_started
+        timings["total"] = time.monotonic() - started
+        for stage, seconds in timings.items():
+            self._timings.record(stage, seconds)
+
+        costs = {
+            name: cost - costs_before.get(name, 0.0)
+            for name, cost in self._component_costs().items()
+            if cost != costs_before.get(name, 0.0)
+        }
+        return TurnResult(user_input, response, transcript, timings, costs)
+
+    @property
+    def cost_summary(self) -> dict:
+        """
+        Property representing the estimated cost of the conversation so far,
+        per component and in total. Note: this is based on pricing rates
+        provided by the user. Costs and estimates are the user's
+        responsibility.
+
+        :return: Cost estimate and metadata of each component, keyed by
+        component name, and the total cost estimate.
+        """
+        components = {}
+        for component in self.components:
+            cost_estimate, metadata = component.cost_estimate_data
+            components[type(component).__qualname__] = {
+                "cost_estimate": cost_estimate,
+                "metadata": metadata,
+            }
+        return {
+            "components": components,
+            "total_cost_estimate": sum(
+                component["cost_estimate"] for component in components.values()
+            ),
+        }
+
+    @property
+    def timing_summary(self) -> dict[str, dict[str, dict[str, float]]]:
+        """
+        Property representing the latency percentiles of each stage of the
+        conversation so far, as timed by the orchestrator and by each
+        component.
+
+        :return: Latency percentiles of each stage, keyed by the name of the
+        orchestrator or component and then by stage name.
+        """
+        timing_summary = {type(self).__qualname__: self._timings.summary}
+        for component in self.components:
+            timing_summary[
+                type(component).__qualname__
+            ] = component.timing_data
+        return timing_summary
+
+    def print_timing_summary(self) -> None:
+        """
+        Helper method to print the latency percentiles of each stage of the
+        conversation so far.
+
+        :return:
+        """
+        print_banner("Timing Summary (Seconds)")
+        for name, stages in self.timing_summary.items():
+            if not stages:
+                continue
+            print(f"\n- {name}:")
+            for stage, latencies in stages.items():
+                print(
+                    f"\t{stage}: "
+                    + ", ".join(
+                        f"{statistic} {value:.4g}"
+                        for statistic, value in latencies.items()
+                    )
+                )
+        print()
+
+    def _component_costs(self) -> dict[str, float]:
+        """
+        Get the estimated cost of the conversation so far, per component.
+
+        :return: Cost estimate of each component, keyed by component name.
+        """
+        return {
+            name: component["cost_estimate"]
+            for name, component in self.cost_summary["components"].items()
+        }
 
     def print_cost_summary(self) -> None:
         """
@@ -105,18 +414,66 @@ class Orchestrator:
 
         :return:
         """
-        total = 0.0
+        cost_summary = self.cost_summary
         print_banner("Cost Summary (Estimated with pricing rates provided)")
-        for component in self.components:
-            cost_estimate, metadata = component.cost_estimate_data
+        for name, component in cost_summary["components"].items():
             print(
-                f"\n- {type(component).__qualname__}:",
-                f"\tSpent ${cost_estimate:.4f}",
-                f"\tMetadata: {json.dumps(metadata)}",
+                f"\n- {name}:",
+                f"\tSpent ${component['cost_estimate']:.4f}",
+                f"\tMetadata: {json.dumps(component['metadata'])}",
                 sep="\n",
             )
-            total += cost_estimate
-        print(f"\n\nTotal Estimated Cost: ${total:.4f}\n")
+        print(
+            "\n\nTotal Estimated Cost: "
+            f"${cost_summary['total_cost_estimate']:.4f}\n"
+        )
+
+    def print_speculation_summary(self) -> None:
+        """
+        Helper method to print the hit rate of speculative chatbot requests
+        and the latency they saved.
+
+        :return:
+        """
+        if not self._speculative_responder:
+            return
+        self._print_statistics(
+            "Speculation Summary", self._speculative_responder.summary
+        )
+
+    def print_pipeline_summary(self) -> None:
+        """
+        Helper method to print how long it took for the chatbot's responses
+        to start being said.
+
+        :return:
+        """
+        if not self._sentence_pipeline:
+            return
+        self._print_statistics(
+            "Speech Pipeline Summary", self._sentence_pipeline.summary
+        )
+
+    def print_engine_pool_summary(self) -> None:
+        """
+        Helper method to print the pyttsx3 engines shared by text to speech
+        components, and how long they took to create. Prints nothing unless
+        a component has used the process wide pool.
+
+        :return:
+        """
+        # Only imported once there is a text to speech component, which is
+        # when pyttsx3 may be in use
+        from chat_toolkit.components.text_to_speech.pyttsx3_engine_pool import (  # noqa: E501
+            ENGINE_POOL,
+        )
+
+        engine_pool_summary = ENGINE_POOL.summary
+        if not engine_pool_summary["sessions"]:
+            return
+        self._print_statistics(
+            "Text to Speech Engine Summary", engine_pool_summary
+        )
 
     def get_start_prompt(self) -> str:
         """
@@ -137,6 +494,116 @@ class Orchestrator:
         self._chatbot_component.prompt_chatbot(start_prompts=start_prompt)
         return start_prompt
 
+    def _start_conversation(self) -> None:
+        """
+        Get a start prompt from the user and prompt the chatbot with it.
+
+        :return:
+        """
+        start_prompt = self.get_start_prompt()
+        self._chatbot_component.prompt_chatbot(start_prompt)
+
+    def _get_user_input(self) -> str:
+        """
+        Get the user's next message, from speech if a speech to text
+        component is present, otherwise from the terminal.
+
+        :return: User's message.
+        """
+        if not self._speech_to_text_component:
+            return input("\nUser: ")
+
+        if self._speculative_responder:
+            self._speculative_responder.start_turn()
+            user_input = self._speech_to_text_component.transcribe_speech(
+                on_partial_transcript=self._speculative_responder.feed
+            )[0]
+        else:
+            user_input = self._speech_to_text_component.transcribe_speech()[0]
+        print(f"\nUser: {user_input}")
+        return user_input
+
+    def _get_chatbot_response(self, user_input: str) -> str:
+        """
+        Get the chatbot's response to the user's message, using a speculative
+        response where possible.
+
+        :param user_input: User's message.
+        :return: Chatbot's response.
+        """
+        if self._speculative_responder:
+            chatbot_response, _ = self._speculative_responder.resolve(
+                user_input
+            )
+        else:
+            chatbot_response, _ = self._chatbot_component.send_message(
+                user_input
+            )
+        return chatbot_response
+
+    def _say_text(self, text: str) -> None:
+        """
+        Say some text, if a text to speech component is present. When the
+        user may barge in, the text is said in the background.
+
+        :param text: Text to say.
+        :return:
+        """
+        if not self._text_to_speech_component:
+            return
+        if self._barge_in:
+            self._text_to_speech_component.say_text_async(text)
+        else:
+            self._text_to_speech_component.say_text(text)
+
+    def _interrupt_speech(self) -> None:
+        """
+        Stop any text being said in the background, if the user may barge in.
+
+        :return:
+        """
+        if self._barge_in and self._text_to_speech_component:
+            self._text_to_speech_component.interrupt()
+
+    def stream_response(self, user_input: str) -> Iterator[str]:
+        """
+        Stream the chatbot's response to the user's message, without printing
+        it. Speculative responses are yielded whole.
+
+        :param user_input: User's message.
+        :return: None, but yields fragments of the chatbot's response.
+        """
+        if self._speculative_responder:
+            yield self._get_chatbot_response(user_input)
+        else:
+            yield from self._chatbot_component.stream_message(user_input)
+
+    def _stream_chatbot_response(self, user_input: str) -> Iterator[str]:
+        """
+        Stream the chatbot's response to the user's message, printing it as
+        it arrives.
+
+        :param user_input: User's message.
+        :return: None, but yields fragments of the chatbot's response.
+        """
+        for fragment in self.stream_response(user_input):
+            print(fragment, end="", flush=True)
+            yield fragment
+
+    @staticmethod
+    def _print_statistics(title: str, statistics: dict) -> None:
+        """
+        Print some summary statistics in the terminal.
+
+        :param title: Title of the banner to print above the statistics.
+        :param statistics: Mapping of statistic names to values.
+        :return:
+        """
+        print_banner(title)
+        for name, value in statistics.items():
+            print(f"\t{name}: {value:.4g}")
+        print()
+
     @staticmethod
     def _check_user_input(user_input: str) -> bool:
         """
@@ -0,0 +1,450 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, Generator
+from contextlib import (
+    AbstractAsyncContextManager,
+    AbstractContextManager,
+    asynccontextmanager,
+    contextmanager,
+    nullcontext,
+)
+from math import inf
+from typing import Callable, Optional
+
+from chat_toolkit.common.exceptions import (
+    SchedulerLaneError,
+    SchedulerWeightError,
+)
+from chat_toolkit.common.metrics import METRICS
+from chat_toolkit.common.utils import latency_percentiles
+
+# Lanes of requests, highest priority first. Batch requests are only
+# dispatched when no interactive requests are waiting
+INTERACTIVE = "interactive"
+BATCH = "batch"
+LANES = (INTERACTIVE, BATCH)
+# Tenant of requests from components without a session
+DEFAULT_TENANT = "default"
+# Number of tenants to remember the fair queueing state of, before
+# forgetting those that are idle
+MAX_IDLE_TENANTS = 1024
+
+_NULL_SLOT = nullcontext()
+
+
+class _Waiter:
+    """
+    A request waiting to be dispatched.
+    """
+
+    __slots__ = (
+        "tenant",
+        "lane",
+        "deadline",
+        "start_tag",
+        "enqueued",
+        "grant",
+    )
+
+    def __init__(
+        self,
+        tenant: str,
+        lane: str,
+        deadline: float,
+        start_tag: float,
+        grant: Callable[[], None],
+    ):
+        self.tenant = tenant
+        self.lane = lane
+        self.deadline = deadline
+        self.start_tag = start_tag
+        self.enqueued = time.monotonic()
+        self.grant = grant
+
+
+class FairScheduler:
+    """
+    Limits how many requests are made to a model provider at once, and
+    decides which waiting request goes next, so that one heavy tenant (e.g.
+    a session, or a batch job) can't starve the others.
+
+    Each tenant has a queue per lane. Interactive requests always go before
+    batch requests, so batch work only uses capacity that interactive work
+    leaves spare. Within a lane, tenants share capacity in proportion to
+    their weights (start time fair queueing), unless a request is within
+    `deadline_slack` seconds of its deadline, in which case the request
+    with the earliest deadline goes first. Requests of a tenant are
+    dispatched in the order they were made.
+
+    How long each tenant's requests waited, and each tenant's share of the
+    dispatched requests, are available from `summary`, and waits are added
+    to the queue wait histogram of `METRICS` if it is enabled.
+
+    The scheduler is disabled until `enable` is called, and requests
+    dispatched through a disabled scheduler don't wait at all.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        deadline_slack: float = 0.5,
+        max_samples: int = 10_000,
+    ):
+        """
+        Instantiate a scheduler.
+
+        :param max_concurrent: Number of requests to make at once.
+        :param deadline_slack: Seconds before their deadline at which
+        requests jump ahead of fair ordering.
+        :param max_samples: Number of queue waits to keep per tenant.
+        """
+        self.max_concurrent = max_concurrent
+        self.deadline_slack = deadline_slack
+        self.max_samples = max_samples
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._active = 0
+        self._queues: dict[str, dict[str, deque[_Waiter]]] = {
+            lane: {} for lane in LANES
+        }
+        self._weights: dict[str, float] = {}
+        self._finish_tags: dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._dispatched: dict[str, int] = {}
+        self._waits: dict[str, deque] = {}
+
+    def enable(self, max_concurrent: Optional[int] = None) -> None:
+        """
+        Start scheduling requests.
+
+        :param max_concurrent: Number of requests to make at once. If None,
+        the current limit is kept.
+        :return:
+        """
+        if max_concurrent is not None:
+            self.max_concurrent = max_concurrent
+        self.enabled = True
+        # Dispatch anything waiting on slots the new limit freed up
+        self._fill()
+
+    def disable(self) -> None:
+        """
+        Stop scheduling requests. Requests already waiting are still
+        dispatched in turn.
+
+        :return:
+        """
+        self.enabled = False
+
+    def reset(self) -> None:
+        """
+        Forget the weights of tenants and how long their requests waited.
+
+        :return:
+        """
+        with self._lock:
+            self._weights.clear()
+            self._dispatched.clear()
+            self._waits.clear()
+
+    def set_weight(self, tenant: str, weight: float) -> None:
+        """
+        Set a tenant's share of capacity, relative to other tenants. Tenants
+        have a weight of 1 by default.
+
+        :param tenant: Tenant, e.g. a session id.
+        :param weight: Weight of the tenant. Must be > 0.
+        :return:
+        """
+        if weight <= 0:
+            raise SchedulerWeightError
+        with self._lock:
+            self._weights[tenant] = weight
+
+    def slot(
+        self,
+        tenant: str = DEFAULT_TENANT,
+        lane: str = INTERACTIVE,
+        deadline: Optional[float] = None,
+        cost: float = 1.0,
+    ) -> AbstractContextManager:
+        """
+        Context manager for waiting until a request can be dispatched, and
+        holding its slot while it is made.
+
+        :param tenant: Tenant making the request, e.g. a session id.
+        :param lane: Either "interactive" or "batch".
+        :param deadline: Seconds from now by which the request should be
+        dispatched. Optional.
+        :param cost: Cost of the request relative to others, for fair
+        sharing.
+        :return:
+        """
+        if not self.enabled:
+            return _NULL_SLOT
+        return self._slot(tenant, lane, deadline, cost)
+
+    def aslot(
+        self,
+        tenant: str = DEFAULT_TENANT,
+        lane: str = INTERACTIVE,
+        deadline: Optional[float] = None,
+        cost: float = 1.0,
+    ) -> AbstractAsyncContextManager:
+        """
+        Async context manager for waiting until a request can be dispatched,
+        without blocking the event loop. See `slot`.
+
+        :param tenant: Tenant making the request.
+        :param lane: Either "interactive" or "batch".
+        :param deadline: Seconds from now by which the request should be
+        dispatched. Optional.
+        :param cost: Cost of the request relative to others.
+        :return:
+        """
+        if not self.enabled:
+            return _null_aslot()
+        return self._aslot(tenant, lane, deadline, cost)
+
+    @property
+    def summary(self) -> dict:
+        """
+        Property representing the requests in flight and waiting, and each
+        tenant's weight, share of dispatched requests and queue waits.
+
+        :return: Summary statistics.
+        """
+        with self._lock:
+            queued = {
+                lane: sum(len(queue) for queue in queues.values())
+                for lane, queues in self._queues.items()
+            }
+            weights = dict(self._weights)
+            dispatched = dict(self._dispatched)
+            waits = {
+                tenant: list(wait) for tenant, wait in self._waits.items()
+            }
+            active = self._active
+        total = sum(dispatched.values())
+        tenants = {
+            tenant: {
+                "weight": weights.get(tenant, 1.0),
+                "dispatched": count,
+                "share": count / total,
+                "wait": latency_percentiles(waits[tenant]),
+            }
+            for tenant, count in dispatched.items()
+        }
+        return {"active": active, "queued": queued, "tenants": tenants}
+
+    @contextmanager
+    def _slot(
+        self, tenant: str, lane: str, deadline: Optional[float], cost: float
+    ) -> Generator[None, None, None]:
+        """
+        See `slot`.
+        """
+        granted = threading.Event()
+        waiter = self._enqueue(tenant, lane, deadline, cost, granted.set)
+        if waiter is not None:
+            try:
+                granted.wait()
+            except BaseException:
+                self._abandon(waiter)
+                raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def _aslot(
+        self, tenant: str, lane: str, deadline: Optional[float], cost: float
+    ) -> AsyncGenerator[None, None]:
+        """
+        See `aslot`.
+        """
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def _resolve() -> None:
+            # The request may have been cancelled while being dispatched
+            if not granted.done():
+                granted.set_result(None)
+
+        def _grant() -> None:
+            loop.call_soon_threadsafe(_resolve)
+
+        waiter = self._enqueue(tenant, lane, deadline, cost, _grant)
+        if waiter is not None:
+            try:
+                await granted
+            except BaseException:
+                self._abandon(waiter)
+                raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _enqueue(
+        self,
+        tenant: str,
+        lane: str,
+        deadline: Optional[float],
+        cost: float,
+        grant: Callable[[], None],
+    ) -> Optional[_Waiter]:
+        """
+        Dispatch a request straight away if there is a free slot and nothing
+        is waiting, or queue it.
+
+        :param tenant: Tenant making the request.
+        :param lane: Lane of the request.
+        :param deadline: Seconds from now by which the request should be
+        dispatched. Optional.
+        :param cost: Cost of the request relative to others.
+        :param grant: Called, from another thread, when a queued request is
+        dispatched.
+        :return: The queued request, or None if it was dispatched.
+        """
+        if lane not in LANES:
+            raise SchedulerLaneError
+        with self._lock:
+            start_tag = max(
+                self._virtual_time, self._finish_tags.get(tenant, 0.0)
+            )
+            weight = self._weights.get(tenant, 1.0)
+            self._finish_tags[tenant] = start_tag + cost / weight
+            waiter = _Waiter(
+                tenant,
+                lane,
+                inf if deadline is None else time.monotonic() + deadline,
+                start_tag,
+                grant,
+            )
+            if self._active < self.max_concurrent and not any(
+                self._queues.values()
+            ):
+                self._dispatch(waiter)
+                return None
+            self._queues[lane].setdefault(tenant, deque()).append(waiter)
+            return waiter
+
+    def _release(self) -> None:
+        """
+        Free the slot of a finished request, and dispatch the next waiting
+        request, if any.
+
+        :return:
+        """
+        with self._lock:
+            self._active -= 1
+        self._fill()
+
+    def _fill(self) -> None:
+        """
+        Dispatch waiting requests while there are free slots.
+
+        :return:
+        """
+        dispatched = []
+        with self._lock:
+            while self._active < self.max_concurrent:
+                waiter = self._next()
+                if waiter is None:
+                    break
+                self._dispatch(waiter)
+                dispatched.append(waiter)
+        for waiter in dispatched:
+            waiter.grant()
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        """
+        Give up on a queued request (e.g. because it was cancelled), freeing
+        its slot if it was dispatched in the meantime.
+
+        :param waiter: Queued request.
+        :return:
+        """
+        with self._lock:
+            queue = self._queues[waiter.lane].get(waiter.tenant)
+            if queue is not None and waiter in queue:
+                queue.remove(waiter)
+                if not queue:
+                    del self._queues[waiter.lane][waiter.tenant]
+                return
+        self._release()
+
+    def _next(self) -> Optional[_Waiter]:
+        """
+        Take the next request to dispatch off its queue. Must be called with
+        the lock held.
+
+        :return: Request, or None if nothing is waiting.
+        """
+        for lane in LANES:
+            queues = self._queues[lane]
+            if not queues:
+                continue
+            heads = [queue[0] for queue in queues.values()]
+            urgent_before = time.monotonic() + self.deadline_slack
+            urgent = [
+                waiter for waiter in heads if waiter.deadline <= urgent_before
+            ]
+            if urgent:
+                waiter = min(urgent, key=lambda waiter: waiter.deadline)
+            else:
+                waiter = min(
+                    heads,
+                    key=lambda waiter: (waiter.start_tag, waiter.enqueued),
+                )
+            queue = queues[waiter.tenant]
+            queue.popleft()
+            if not queue:
+                del queues[waiter.tenant]
+            return waiter
+        return None
+
+    def _dispatch(self, waiter: _Waiter) -> None:
+        """
+        Give a request a slot, and account for how long it waited. Must be
+        called with the lock held.
+
+        :param waiter: Request to dispatch.
+        :return:
+        """
+        self._active += 1
+        self._virtual_time = max(self._virtual_time, waiter.start_tag)
+        if len(self._finish_tags) > MAX_IDLE_TENANTS:
+            # Tenants whose requests have all started are no longer ahead
+            # of anyone, so can be forgotten
+            self._finish_tags = {
+                tenant: finish_tag
+                for tenant, finish_tag in self._finish_tags.items()
+                if finish_tag > self._virtual_time
+            }
+        wait = time.monotonic() - waiter.enqueued
+        tenant = waiter.tenant
+        self._dispatched[tenant] = self._dispatched.get(tenant, 0) + 1
+        if tenant not in self._waits:
+            self._waits[tenant] = deque(maxlen=self.max_samples)
+        self._waits[tenant].append(wait)
+        if METRICS.enabled:
+            METRICS.observe(
+                "queue_wait", wait, tenant=tenant, lane=waiter.lane
+            )
+
+
+@asynccontextmanager
+async def _null_aslot() -> AsyncGenerator[None, None]:
+    """
+    Async context manager that does nothing, for disabled schedulers.
+    """
+    yield
+
+
+# Scheduler every OpenAI backed component dispatches its requests through
+SCHEDULER = FairScheduler()
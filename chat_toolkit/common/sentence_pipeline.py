@@ -0,0 +1,128 @@
+import re
+import time
+from collections.abc import Iterable, Iterator
+
+from chat_toolkit.components.text_to_speech.speech_handle import SpeechHandle
+from chat_toolkit.components.text_to_speech.text_to_speech_component_base import (  # noqa: E501
+    TextToSpeechComponentBase,
+)
+
+# Sentence ending punctuation (and any closing quotes or brackets), followed by
+# whitespace. Requiring whitespace avoids splitting "3.14" or "e.g." mid-token
+# while text is still streaming in.
+SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+|\n+")
+
+
+def split_sentences(fragments: Iterable[str]) -> Iterator[str]:
+    """
+    Group fragments of streamed text into sentences, yielding each sentence
+    as soon as it is complete.
+
+    :param fragments: Fragments of text, e.g. streamed from a chatbot.
+    :return: None, but yields sentences.
+    """
+    buffer = ""
+    for fragment in fragments:
+        buffer = f"{buffer}{fragment}"
+        while match := SENTENCE_END.search(buffer):
+            end = match.end()
+            sentence, buffer = buffer[:end].strip(), buffer[end:]
+            if sentence:
+                yield sentence
+    if buffer.strip():
+        yield buffer.strip()
+
+
+class SentencePipeline:
+    """
+    Speaks text sentence by sentence while the rest of it is still being
+    generated. Sentences are queued to a text to speech component's speech
+    worker, so the first sentence can be heard while later ones are still
+    being generated or synthesized.
+    """
+
+    def __init__(self, text_to_speech_component: TextToSpeechComponentBase):
+        """
+        Instantiate a sentence pipeline.
+
+        :param text_to_speech_component: Component to say sentences with.
+        Generation is paused while its speech queue is full.
+        """
+        self._text_to_speech_component = text_to_speech_component
+        self._first_sentences: list[tuple[float, SpeechHandle]] = []
+
+    def speak(self, fragments: Iterable[str], wait: bool = True) -> str:
+        """
+        Say text as it is generated.
+
+        :param fragments: Fragments of text, e.g. streamed from a chatbot.
+        :param wait: Whether to wait until all of the text has been said (or
+        cancelled) before returning. If True, errors raised while saying the
+        text are raised here.
+        :return: The full text.
+        """
+        started = time.monotonic()
+        text_parts: list[str] = []
+        handles = [
+            self._text_to_speech_component.say_text_async(sentence)
+            for sentence in split_sentences(
+                self._record_fragments(fragments, text_parts)
+            )
+        ]
+        if handles:
+            self._first_sentences.append((started, handles[0]))
+
+        if wait:
+            for speech in handles:
+                speech.wait()
+            for speech in handles:
+                if speech.exception is not None:
+                    raise speech.exception
+        return "".join(text_parts)
+
+    @property
+    def time_to_first_audio(self) -> list[float]:
+        """
+        Read only property representing how long it took for each piece of
+        text to start being said, from the moment it was requested. Text that
+        was cancelled before it was said is excluded.
+
+        :return:
+        """
+        return [
+            speech.started_at - started
+            for started, speech in self._first_sentences
+            if speech.started_at is not None
+        ]
+
+    @property
+    def summary(self) -> dict:
+        """
+        Property representing how long it took for speech to start, from the
+        moment text was requested.
+
+        :return: Summary statistics.
+        """
+        samples = self.time_to_first_audio
+        return {
+            "responses": len(samples),
+            "mean_time_to_first_audio_seconds": (
+                sum(samples) / len(samples) if samples else 0.0
+            ),
+            "max_time_to_first_audio_seconds": max(samples, default=0.0),
+        }
+
+    @staticmethod
+    def _record_fragments(
+        fragments: Iterable[str], text_parts: list[str]
+    ) -> Iterator[str]:
+        """
+        Pass fragments through, keeping a record of them.
+
+        :param fragments: Fragments of text.
+        :param text_parts: List to record fragments in.
+        :return: None, but yields fragments.
+        """
+        for fragment in fragments:
+            text_parts.append(fragment)
+            yield fragment
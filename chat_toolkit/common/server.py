@@ -0,0 +1,532 @@
+import asyncio
+import json
+import time
+import uuid
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from aiohttp import WSMsgType, web
+from loguru import logger
+
+from chat_toolkit.common.metrics import CONTENT_TYPE, METRICS
+from chat_toolkit.common.orchestrator import Orchestrator
+from chat_toolkit.common.scheduler import SCHEDULER
+
+ReturnType = TypeVar("ReturnType")
+
+# Marks the end of a streamed response, since `next` can't raise
+# StopIteration into a future
+_END_OF_STREAM = object()
+
+
+class _Session:
+    """
+    A conversation hosted by the server.
+    """
+
+    def __init__(self, session_id: str, orchestrator: Orchestrator):
+        self.session_id = session_id
+        self.orchestrator = orchestrator
+        self.turns = 0
+        self.last_active = time.monotonic()
+        # One turn at a time, so that messages are answered in order
+        self.lock = asyncio.Lock()
+
+    @property
+    def summary(self) -> dict:
+        """
+        Property representing the session's usage so far.
+
+        :return: Session id, number of turns and cost summary.
+        """
+        return {
+            "session_id": self.session_id,
+            "turns": self.turns,
+            "cost_summary": self.orchestrator.cost_summary,
+        }
+
+
+class ConversationServer:
+    """
+    Hosts many concurrent conversations over HTTP and WebSockets, without a
+    terminal. Each session has its own orchestrator (and components), and
+    blocking component calls are run in a bounded pool of worker threads
+    shared by every session.
+
+    Routes:
+
+        POST   /sessions                   Start a session. Optional JSON
+                                           body: {"start_prompt": "..."}
+        GET    /sessions/{id}              Session summary, incl. costs
+        DELETE /sessions/{id}              End a session, returning its
+                                           summary
+        POST   /sessions/{id}/messages     Send a message. JSON body:
+                                           {"message": "...", "stream": bool}
+                                           or encoded audio (audio/*), if the
+                                           session can transcribe audio
+        GET    /sessions/{id}/ws           WebSocket. Send {"message": "..."}
+                                           and receive {"type": "fragment"}
+                                           messages, then {"type": "response"}
+        GET    /metrics                    Metrics, in Prometheus' format
+                                           (empty unless `METRICS` is
+                                           enabled)
+        GET    /scheduler                  Requests waiting for `SCHEDULER`,
+                                           and each session's queue waits
+                                           and share of requests
+
+    Sessions that have been idle for `session_ttl` seconds are ended.
+    """
+
+    def __init__(
+        self,
+        orchestrator_factory: Callable[[], Orchestrator],
+        max_workers: int = 8,
+        max_sessions: Optional[int] = None,
+        session_ttl: Optional[float] = 30 * 60,
+    ):
+        """
+        Instantiate a conversation server.
+
+        :param orchestrator_factory: Creates an orchestrator (with its own
+        components) for each new session.
+        :param max_workers: Maximum number of blocking component calls (e.g.
+        requests to OpenAI) to run at once, across all sessions.
+        :param max_sessions: Maximum number of sessions to host at once. If
+        None, the number of sessions is unbounded.
+        :param session_ttl: Number of seconds after its last message (or its
+        start) that a session is ended. If None, sessions last until they
+        are deleted.
+        """
+        self.max_workers = max_workers
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        self._orchestrator_factory = orchestrator_factory
+        self._sessions: dict[str, _Session] = {}
+        # Sessions being started, which count towards `max_sessions`
+        self._starting_sessions = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._expiry: Optional[asyncio.Future] = None
+
+    @property
+    def sessions(self) -> dict[str, _Session]:
+        """
+        Read only property representing the sessions currently hosted.
+
+        :return:
+        """
+        return self._sessions
+
+    def make_app(self) -> web.Application:
+        """
+        Create the aiohttp application serving the server's routes.
+
+        :return: Application to run, e.g. with `aiohttp.web.run_app`.
+        """
+        app = web.Application()
+        app.add_routes(
+            [
+                web.post("/sessions", self._create_session),
+                web.get("/sessions/{session_id}", self._get_session),
+                web.delete("/sessions/{session_id}", self._delete_session),
+                web.post(
+                    "/sessions/{session_id}/messages", self._post_message
+                ),
+                web.get("/sessions/{session_id}/ws", self._websocket),
+                web.get("/metrics", self._metrics),
+                web.get("/scheduler", self._scheduler),
+            ]
+        )
+        app.on_startup.append(self._start_workers)
+        app.on_cleanup.append(self._stop_workers)
+        return app
+
+    def run(self, host: str = "127.0.0.1", port: int = 8080) -> None:
+        """
+        Serve until interrupted.
+
+        :param host: Host to listen on.
+        :param port: Port to listen on.
+        :return:
+        """
+        web.run_app(self.make_app(), host=host, port=port)
+
+    async def _start_workers(self, app: web.Application) -> None:
+        """
+        Start the worker pool, and the expiry of idle sessions, when the
+        application starts.
+
+        :param app: Application starting.
+        :return:
+        """
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="chat-toolkit"
+        )
+        if self.session_ttl is not None:
+            self._expiry = asyncio.ensure_future(
+                self._expire_sessions(self.session_ttl)
+            )
+
+    async def _stop_workers(self, app: web.Application) -> None:
+        """
+        Stop the worker pool, and the expiry of idle sessions, when the
+        application stops.
+
+        :param app: Application stopping.
+        :return:
+        """
+        if self._expiry is not None:
+            self._expiry.cancel()
+            self._expiry = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _expire_sessions(self, session_ttl: float) -> None:
+        """
+        End sessions that have been idle for longer than their time to live,
+        until cancelled. Sessions that are responding are never idle.
+
+        :param session_ttl: Number of seconds a session may be idle for.
+        :return:
+        """
+        while True:
+            await asyncio.sleep(min(session_ttl, 60))
+            now = time.monotonic()
+            expired = [
+                session
+                for session in self._sessions.values()
+                if not session.lock.locked()
+                and now - session.last_active > session_ttl
+            ]
+            for session in expired:
+                del self._sessions[session.session_id]
+                logger.info("Expired session {}", session.session_id)
+
+    async def _create_session(self, request: web.Request) -> web.Response:
+        """
+        Start a session, prompting its chatbot with the start prompt if one
+        is provided.
+
+        :param request: Request to handle.
+        :return: Summary of the new session.
+        """
+        if (
+            self.max_sessions is not None
+            and len(self._sessions) + self._starting_sessions
+            >= self.max_sessions
+        ):
+            return self._error(503, "Too many sessions")
+
+        # Reserved before waiting, so concurrent requests can't exceed the
+        # maximum number of sessions
+        self._starting_sessions += 1
+        try:
+            body = await self._read_json(request)
+            if body is None:
+                return self._error(400, "Body must be a JSON object")
+            session = await self._start_session(
+                body.get("start_prompt") or None
+            )
+        finally:
+            self._starting_sessions -= 1
+        return web.json_response(session.summary, status=201)
+
+    async def _start_session(self, start_prompt: Optional[str]) -> _Session:
+        """
+        Start a session with a new orchestrator.
+
+        :param start_prompt: Start prompt for the session's chatbot, if any.
+        :return: The new session.
+        """
+        orchestrator = await self._run_in_executor(self._orchestrator_factory)
+        session = _Session(uuid.uuid4().hex, orchestrator)
+        # Bill the session's usage (including its start prompt) to it
+        for component in orchestrator.components:
+            component.session_id = session.session_id
+        await self._run_in_executor(
+            orchestrator.chatbot_component.prompt_chatbot, start_prompt
+        )
+        self._sessions[session.session_id] = session
+        logger.info("Started session {}", session.session_id)
+        return session
+
+    async def _get_session(self, request: web.Request) -> web.Response:
+        """
+        Get a session's summary, including its cost summary.
+
+        :param request: Request to handle.
+        :return: Summary of the session.
+        """
+        session = self._sessions.get(request.match_info["session_id"])
+        if session is None:
+            return self._error(404, "Unknown session")
+        return web.json_response(session.summary)
+
+    async def _metrics(self, request: web.Request) -> web.Response:
+        """
+        Get the metrics of every session's components and orchestrators.
+
+        :param request: Request to handle.
+        :return: Metrics, in Prometheus' text exposition format.
+        """
+        return web.Response(
+            body=METRICS.render().encode("utf-8"),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
+
+    async def _scheduler(self, request: web.Request) -> web.Response:
+        """
+        Get the requests waiting to be dispatched, and how long each
+        session's requests waited.
+
+        :param request: Request to handle.
+        :return: Summary of the scheduler.
+        """
+        return web.json_response(SCHEDULER.summary)
+
+    async def _delete_session(self, request: web.Request) -> web.Response:
+        """
+        End a session.
+
+        :param request: Request to handle.
+        :return: Final summary of the session.
+        """
+        session = self._sessions.pop(request.match_info["session_id"], None)
+        if session is None:
+            return self._error(404, "Unknown session")
+        logger.info("Ended session {}", session.session_id)
+        return web.json_response(session.summary)
+
+    async def _post_message(self, request: web.Request) -> web.StreamResponse:
+        """
+        Send a message (or an audio message) in a session, responding with
+        the chatbot's whole response, or streaming it as plain text.
+
+        :param request: Request to handle.
+        :return: Response, or streamed response.
+        """
+        session = self._sessions.get(request.match_info["session_id"])
+        if session is None:
+            return self._error(404, "Unknown session")
+
+        body, error = await self._read_message(session, request)
+        if error is not None:
+            return self._error(400, error)
+
+        respond = (
+            self._stream_response if body["stream"] else self._respond_json
+        )
+        async with session.lock:
+            return await respond(request, session, body)
+
+    async def _read_message(
+        self, session: _Session, request: web.Request
+    ) -> tuple[dict[str, Any], Optional[str]]:
+        """
+        Read a message (or an audio message) sent in a session, transcribing
+        audio messages.
+
+        :param session: Session the message was sent in.
+        :param request: Request to read.
+        :return: The message, its transcript (for audio messages) and whether
+        to stream the response, and what is wrong with the request, if
+        anything.
+        """
+        if request.content_type.startswith("audio/"):
+            transcript = await self._transcribe(session, await request.read())
+            if transcript is None:
+                return {}, "Session cannot transcribe audio"
+            body: dict[str, Any] = {
+                "message": transcript,
+                "transcript": transcript,
+            }
+        else:
+            json_body = await self._read_json(request)
+            if json_body is None:
+                return {}, "Body must be a JSON object"
+            body = {
+                "message": json_body.get("message"),
+                "transcript": None,
+                "stream": bool(json_body.get("stream", False)),
+            }
+        error = None if body["message"] else "Message must not be empty"
+        return {"stream": False, **body}, error
+
+    async def _respond_json(
+        self, request: web.Request, session: _Session, body: dict[str, Any]
+    ) -> web.StreamResponse:
+        """
+        Respond to a message with the chatbot's whole response. Must be
+        called while holding the session's lock.
+
+        :param request: Request to respond to.
+        :param session: Session to respond in.
+        :param body: The message, and its transcript (for audio messages).
+        :return: Response.
+        """
+        fragments = self._respond(session, body["message"])
+        response = "".join([fragment async for fragment in fragments])
+        return web.json_response(
+            {"response": response, "transcript": body["transcript"]}
+        )
+
+    async def _stream_response(
+        self, request: web.Request, session: _Session, body: dict[str, Any]
+    ) -> web.StreamResponse:
+        """
+        Stream the chatbot's response to a message as plain text. Must be
+        called while holding the session's lock.
+
+        :param request: Request to respond to.
+        :param session: Session to respond in.
+        :param body: The message.
+        :return: Streamed response.
+        """
+        stream_response = web.StreamResponse(
+            headers={"Content-Type": "text/plain; charset=utf-8"}
+        )
+        await stream_response.prepare(request)
+        async for fragment in self._respond(session, body["message"]):
+            await stream_response.write(fragment.encode("utf-8"))
+        await stream_response.write_eof()
+        return stream_response
+
+    async def _websocket(self, request: web.Request) -> web.StreamResponse:
+        """
+        Converse in a session over a WebSocket, streaming each response.
+
+        :param request: Request to handle.
+        :return: WebSocket response.
+        """
+        session = self._sessions.get(request.match_info["session_id"])
+        if session is None:
+            return self._error(404, "Unknown session")
+
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        async for ws_message in websocket:
+            if ws_message.type != WSMsgType.TEXT:
+                break
+            body = _parse_json_object(ws_message.data)
+            if body is None or not body.get("message"):
+                error = (
+                    "Message must be a JSON object"
+                    if body is None
+                    else "Message must not be empty"
+                )
+                await websocket.send_json({"type": "error", "error": error})
+                continue
+            message = body["message"]
+
+            fragments = []
+            async with session.lock:
+                async for fragment in self._respond(session, message):
+                    fragments.append(fragment)
+                    await websocket.send_json(
+                        {"type": "fragment", "text": fragment}
+                    )
+            await websocket.send_json(
+                {"type": "response", "text": "".join(fragments)}
+            )
+        return websocket
+
+    async def _respond(
+        self, session: _Session, message: str
+    ) -> AsyncIterator[str]:
+        """
+        Stream the chatbot's response to a message, with each blocking step
+        run by a worker. Must be called while holding the session's lock.
+
+        :param session: Session to respond in.
+        :param message: User's message.
+        :return: None, but yields fragments of the response.
+        """
+        fragments = session.orchestrator.stream_response(message)
+        while True:
+            fragment = await self._run_in_executor(_next_fragment, fragments)
+            if fragment is _END_OF_STREAM:
+                break
+            yield fragment
+        session.turns += 1
+        session.last_active = time.monotonic()
+
+    async def _transcribe(
+        self, session: _Session, audio: bytes
+    ) -> Optional[str]:
+        """
+        Transcribe an audio message with the session's speech to text
+        component.
+
+        :param session: Session to transcribe in.
+        :param audio: Encoded audio.
+        :return: Transcript, or None if the session cannot transcribe audio.
+        """
+        speech_to_text = session.orchestrator.speech_to_text_component
+        if not speech_to_text or not speech_to_text.can_transcribe_recordings:
+            return None
+        transcript, _ = await self._run_in_executor(
+            speech_to_text.transcribe, audio
+        )
+        return transcript
+
+    async def _run_in_executor(
+        self, func: Callable[..., ReturnType], *args: Any
+    ) -> ReturnType:
+        """
+        Run a blocking function in the server's worker pool.
+
+        :param func: Function to run.
+        :param args: Arguments to call the function with.
+        :return: The function's return value.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    @staticmethod
+    async def _read_json(request: web.Request) -> Optional[dict]:
+        """
+        Read a request's JSON body.
+
+        :param request: Request to read.
+        :return: The body (empty, if there is no body), or None if the body
+        is not a JSON object.
+        """
+        if not request.can_read_body:
+            return {}
+        return _parse_json_object(await request.text())
+
+    @staticmethod
+    def _error(status: int, error: str) -> web.Response:
+        """
+        Create an error response.
+
+        :param status: HTTP status code.
+        :param error: Description of the error.
+        :return: JSON error response.
+        """
+        return web.json_response({"error": error}, status=status)
+
+
+def _next_fragment(fragments: Iterator[str]) -> Any:
+    """
+    Get the next fragment of a streamed response.
+
+    :param fragments: Fragments of a response.
+    :return: The next fragment, or `_END_OF_STREAM`.
+    """
+    return next(fragments, _END_OF_STREAM)
+
+
+def _parse_json_object(data: str) -> Optional[dict]:
+    """
+    Parse a JSON object.
+
+    :param data: JSON to parse.
+    :return: The object, or None if the data is not a JSON object.
+    """
+    try:
+        parsed = json.loads(data)
+    except json.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
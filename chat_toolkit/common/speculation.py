@@ -0,0 +1,206 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from chat_toolkit.common.exceptions import StableChunksError
+from chat_toolkit.components.chatbots.chatbot_component_base import (
+    ChatbotComponentBase,
+)
+
+
+class _Speculation:
+    """
+    A message sent speculatively to a forked chatbot.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        fork: ChatbotComponentBase,
+        executor: ThreadPoolExecutor,
+    ):
+        self.message = message
+        self.fork = fork
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self.future: Future = executor.submit(fork.send_message, message)
+        self.future.add_done_callback(self._mark_finished)
+
+    def _mark_finished(self, _: Future) -> None:
+        self.finished = time.monotonic()
+
+
+class SpeculativeResponder:
+    """
+    Sends a message to a fork of a chatbot as soon as a partial transcript
+    has stayed the same for several chunks of audio in a row. If the final
+    transcript matches, the speculative response is used and any time spent
+    waiting on it is saved. Otherwise, the speculative response is discarded,
+    but its usage is still accounted for. Requires a chatbot component that
+    supports `fork` and `join`.
+    """
+
+    def __init__(
+        self, chatbot_component: ChatbotComponentBase, stable_chunks: int
+    ):
+        """
+        Instantiate a speculative responder.
+
+        :param chatbot_component: Chatbot to send messages to.
+        :param stable_chunks: Number of consecutive partial transcripts that
+        must match before a message is sent speculatively.
+        """
+        if stable_chunks <= 0:
+            raise StableChunksError
+        self._chatbot_component = chatbot_component
+        self._stable_chunks = stable_chunks
+        self._executor = ThreadPoolExecutor(thread_name_prefix="speculation")
+        self._lock = threading.Lock()
+        self._accepting = False
+        self._last_partial: Optional[str] = None
+        self._stable_count = 0
+        self._speculation: Optional[_Speculation] = None
+        self._discarded: list[_Speculation] = []
+        self.turns: list[dict] = []
+
+    def start_turn(self) -> None:
+        """
+        Start accepting partial transcripts for a new turn.
+
+        :return:
+        """
+        with self._lock:
+            self._accepting = True
+            self._last_partial = None
+            self._stable_count = 0
+            self._speculation = None
+
+    def feed(self, partial_transcript: str) -> None:
+        """
+        Process a partial transcript, sending it speculatively once it has
+        been stable for long enough. May be called from any thread.
+
+        :param partial_transcript: Transcript of the speech so far.
+        :return:
+        """
+        message = partial_transcript.strip()
+        with self._lock:
+            if not self._accepting:
+                return
+            if message == self._last_partial:
+                self._stable_count += 1
+            else:
+                self._last_partial = message
+                self._stable_count = 1
+
+            if self._stable_count < self._stable_chunks or not any(
+                char.isalpha() for char in message
+            ):
+                return
+            if self._speculation is not None:
+                if self._speculation.message == message:
+                    return
+                self._discarded.append(self._speculation)
+
+            self._speculation = _Speculation(
+                message, self._chatbot_component.fork(), self._executor
+            )
+
+    def resolve(self, message: str) -> tuple[str, dict]:
+        """
+        Get the chatbot's response to the final transcript of a turn, using
+        the speculative response if it was for the same message.
+
+        :param message: Final transcript.
+        :return: Chatbot's response, any applicable metadata.
+        """
+        with self._lock:
+            self._accepting = False
+            speculation = self._speculation
+            self._speculation = None
+        resolved = time.monotonic()
+
+        hit = False
+        if (
+            speculation is not None
+            and speculation.message == message.strip()
+            and speculation.future.exception() is None
+        ):
+            hit = True
+            response = speculation.future.result()
+            self._chatbot_component.join(speculation.fork, adopt=True)
+            # Without speculation, the request would have started now
+            finished = speculation.finished or time.monotonic()
+            latency_saved = min(
+                finished - speculation.started, resolved - speculation.started
+            )
+        else:
+            if speculation is not None:
+                self._discarded.append(speculation)
+            response = self._chatbot_component.send_message(message)
+            latency_saved = 0.0
+
+        self.turns.append(
+            {
+                "speculated": speculation is not None,
+                "hit": hit,
+                "latency_saved": latency_saved,
+            }
+        )
+        self._settle(wait=False)
+        return response
+
+    def close(self) -> None:
+        """
+        Wait for any discarded speculative requests to finish and account for
+        their usage.
+
+        :return:
+        """
+        with self._lock:
+            self._accepting = False
+        self._settle(wait=True)
+        self._executor.shutdown()
+
+    @property
+    def summary(self) -> dict:
+        """
+        Property representing the hit rate of speculative requests and the
+        latency they saved.
+
+        :return: Summary statistics.
+        """
+        turns = len(self.turns)
+        hits = sum(turn["hit"] for turn in self.turns)
+        latency_saved = sum(turn["latency_saved"] for turn in self.turns)
+        return {
+            "turns": turns,
+            "speculated_turns": sum(turn["speculated"] for turn in self.turns),
+            "hits": hits,
+            "hit_rate": hits / turns if turns else 0.0,
+            "latency_saved_seconds": latency_saved,
+            "latency_saved_seconds_per_turn": (
+                latency_saved / turns if turns else 0.0
+            ),
+        }
+
+    def _settle(self, wait: bool) -> None:
+        """
+        Account for the usage of discarded speculative requests that have
+        finished.
+
+        :param wait: Whether to wait for requests that are still in flight.
+        :return:
+        """
+        with self._lock:
+            discarded = self._discarded
+            self._discarded = []
+
+        for speculation in discarded:
+            if not wait and not speculation.future.done():
+                with self._lock:
+                    self._discarded.append(speculation)
+                continue
+            if speculation.future.exception() is None:
+                self._chatbot_component.join(speculation.fork, adopt=False)
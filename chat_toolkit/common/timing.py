@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import deque
+from collections.abc import Generator
+from contextlib import contextmanager
+from typing import Optional
+
+from chat_toolkit.common.metrics import METRICS
+from chat_toolkit.common.tracing import TRACER
+from chat_toolkit.common.utils import latency_percentiles
+
+
+class Timings:
+    """
+    Latencies of named stages (e.g. recording, transcription or completion),
+    measured with a monotonic clock. Only the most recent `max_samples`
+    latencies of each stage are kept, so long-lived processes use bounded
+    memory. Latencies are also added to the stage histogram of `METRICS`,
+    and recorded as spans by `TRACER`, if they are enabled.
+    """
+
+    def __init__(
+        self,
+        max_samples: int = 10_000,
+        labels: Optional[dict[str, str]] = None,
+    ):
+        """
+        Instantiate timings.
+
+        :param max_samples: Number of latencies to keep per stage.
+        :param labels: Labels of the stage histogram, e.g. the component and
+        model being timed. Optional.
+        """
+        self.max_samples = max_samples
+        self.labels = labels or {}
+        self._samples: dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float) -> None:
+        """
+        Record how long a stage took.
+
+        :param stage: Name of the stage.
+        :param seconds: Latency of the stage.
+        :return:
+        """
+        with self._lock:
+            if stage not in self._samples:
+                self._samples[stage] = deque(maxlen=self.max_samples)
+            self._samples[stage].append(seconds)
+        if METRICS.enabled:
+            METRICS.observe("stage", seconds, stage=stage, **self.labels)
+        if TRACER.enabled:
+            TRACER.add_span(stage, seconds, self.labels.get("component", ""))
+
+    @contextmanager
+    def time(self, stage: str) -> Generator[None, None, None]:
+        """
+        Context manager for timing a stage. Stages that raise are not
+        recorded.
+
+        :param stage: Name of the stage.
+        :return:
+        """
+        started = time.monotonic()
+        yield
+        self.record(stage, time.monotonic() - started)
+
+    def samples(self, stage: str) -> list[float]:
+        """
+        Get the recorded latencies of a stage.
+
+        :param stage: Name of the stage.
+        :return: Latencies, oldest first.
+        """
+        with self._lock:
+            return list(self._samples.get(stage, ()))
+
+    @property
+    def summary(self) -> dict[str, dict[str, float]]:
+        """
+        Property representing the latency percentiles of every stage.
+
+        :return: Number of samples, mean, p50, p95 and p99 of each stage,
+        keyed by stage name.
+        """
+        with self._lock:
+            samples = {
+                stage: list(latencies)
+                for stage, latencies in self._samples.items()
+            }
+        return {
+            stage: latency_percentiles(latencies)
+            for stage, latencies in samples.items()
+        }
@@ -0,0 +1,226 @@
+import json
+import os
+import threading
+import time
+from collections.abc import Generator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Optional
+
+DEFAULT_CATEGORY = "chat_toolkit"
+
+_NULL_SPAN = nullcontext()
+
+
+class Tracer:
+    """
+    Records spans of work (e.g. waiting for a key, recording, transcribing
+    or saying text), with the thread that did the work, as Chrome trace
+    events. Saved traces can be opened in Perfetto (ui.perfetto.dev) or
+    chrome://tracing, to see where a conversation's stages overlap, stall or
+    wait on each other.
+
+    The tracer is disabled until `start` is called, and spans of a disabled
+    tracer are not recorded.
+    """
+
+    def __init__(self, max_events: int = 1_000_000):
+        """
+        Instantiate a tracer.
+
+        :param max_events: Maximum number of spans to keep. Later spans are
+        dropped, and counted in the saved trace.
+        """
+        self.max_events = max_events
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._events: list[dict] = []
+        self._thread_names: dict[int, str] = {}
+        self._dropped_events = 0
+        self._origin = time.perf_counter()
+
+    def start(self) -> None:
+        """
+        Forget any recorded spans and start recording.
+
+        :return:
+        """
+        with self._lock:
+            self._events.clear()
+            self._thread_names.clear()
+            self._dropped_events = 0
+            self._origin = time.perf_counter()
+        self.enabled = True
+
+    def stop(self) -> None:
+        """
+        Stop recording. Spans recorded so far are kept.
+
+        :return:
+        """
+        self.enabled = False
+
+    def span(
+        self, name: str, category: str = DEFAULT_CATEGORY, **args: Any
+    ) -> AbstractContextManager:
+        """
+        Context manager for recording a span of work on the current thread.
+
+        :param name: Name of the span.
+        :param category: Category of the span, e.g. the component doing the
+        work.
+        :param args: Any details to show with the span.
+        :return:
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def add_span(
+        self,
+        name: str,
+        seconds: float,
+        category: str = DEFAULT_CATEGORY,
+        **args: Any,
+    ) -> None:
+        """
+        Record a span of work on the current thread that has just finished.
+
+        :param name: Name of the span.
+        :param seconds: How long the work took.
+        :param category: Category of the span.
+        :param args: Any details to show with the span.
+        :return:
+        """
+        if not self.enabled:
+            return
+        ended = time.perf_counter()
+        self._add(name, category, ended - seconds, ended, args)
+
+    @property
+    def events(self) -> list[dict]:
+        """
+        Read only property representing the recorded spans, and the names of
+        the threads they were recorded on, as Chrome trace events.
+
+        :return: Trace events.
+        """
+        pid = os.getpid()
+        with self._lock:
+            events = list(self._events)
+            thread_names = dict(self._thread_names)
+        return events + [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": thread_name},
+            }
+            for tid, thread_name in thread_names.items()
+        ]
+
+    def save(self, path: Path) -> None:
+        """
+        Save the recorded spans to a Chrome trace event file.
+
+        :param path: File to save to.
+        :return:
+        """
+        trace = {
+            "traceEvents": self.events,
+            "displayTimeUnit": "ms",
+            "otherData": {"dropped_events": self._dropped_events},
+        }
+        Path(path).write_text(json.dumps(trace), encoding="utf-8")
+
+    def _add(
+        self,
+        name: str,
+        category: str,
+        started: float,
+        ended: float,
+        args: dict,
+    ) -> None:
+        """
+        Record a span as a complete event.
+
+        :param name: Name of the span.
+        :param category: Category of the span.
+        :param started: `time.perf_counter` when the span started.
+        :param ended: `time.perf_counter` when the span ended.
+        :param args: Any details to show with the span.
+        :return:
+        """
+        tid = threading.get_ident()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (started - self._origin) * 1_000_000,
+            "dur": (ended - started) * 1_000_000,
+            "pid": os.getpid(),
+            "tid": tid,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            if len(self._events) >= self.max_events:
+                self._dropped_events += 1
+                return
+            self._events.append(event)
+            self._thread_names[tid] = threading.current_thread().name
+
+
+class _Span:
+    """
+    A span of work being recorded by a tracer.
+    """
+
+    def __init__(self, tracer: Tracer, name: str, category: str, args: dict):
+        self._tracer = tracer
+        self._name = name
+        self._category = category
+        self._args = args
+        self._started = 0.0
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: Optional[type],
+        _exc: Optional[BaseException],
+        _traceback: Optional[TracebackType],
+    ) -> None:
+        if exc_type is not None:
+            self._args["error"] = exc_type.__name__
+        self._tracer._add(
+            self._name,
+            self._category,
+            self._started,
+            time.perf_counter(),
+            self._args,
+        )
+
+
+# Tracer used by every component and orchestrator
+TRACER = Tracer()
+
+
+@contextmanager
+def profile(path: Path) -> Generator[Tracer, None, None]:
+    """
+    Context manager for tracing everything that happens within it, and
+    saving the trace to a Chrome trace event file.
+
+    :param path: File to save the trace to.
+    :return: None, but yields the tracer.
+    """
+    TRACER.start()
+    try:
+        yield TRACER
+    finally:
+        TRACER.stop()
+        TRACER.save(path)
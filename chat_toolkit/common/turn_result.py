@@ -0,0 +1,72 @@
+from typing import Optional
+
+
+class TurnResult:
+    """
+    The outcome of one turn of a conversation: what the user said, how the
+    chatbot responded, how long each stage of the turn took, and what the
+    turn cost.
+    """
+
+    def __init__(
+        self,
+        user_input: str,
+        response: Optional[str],
+        transcript: Optional[str] = None,
+        timings: Optional[dict[str, float]] = None,
+        costs: Optional[dict[str, float]] = None,
+    ):
+        """
+        Instantiate a turn result.
+
+        :param user_input: Message sent to the chatbot (the transcript, for
+        audio messages).
+        :param response: Chatbot's response, or None if the message was not
+        accepted (e.g. it was empty).
+        :param transcript: Transcript of the user's audio, if the message was
+        audio.
+        :param timings: Seconds spent in each stage of the turn (e.g.
+        transcribe, chat, speak), and in total.
+        :param costs: Estimated cost of the turn for each component that
+        incurred a cost, keyed by component name.
+        """
+        self.user_input = user_input
+        self.response = response
+        self.transcript = transcript
+        self.timings = timings or {}
+        self.costs = costs or {}
+
+    @property
+    def accepted(self) -> bool:
+        """
+        Read only property representing whether the message continued the
+        conversation.
+
+        :return:
+        """
+        return self.response is not None
+
+    @property
+    def cost_estimate(self) -> float:
+        """
+        Read only property representing the estimated cost of the turn,
+        across all components.
+
+        :return:
+        """
+        return sum(self.costs.values())
+
+    def to_dict(self) -> dict:
+        """
+        Represent the turn as JSON serializable data.
+
+        :return: Turn result as a dictionary.
+        """
+        return {
+            "user_input": self.user_input,
+            "transcript": self.transcript,
+            "response": self.response,
+            "timings": self.timings,
+            "costs": self.costs,
+            "cost_estimate": self.cost_estimate,
+        }
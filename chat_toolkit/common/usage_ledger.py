@@ -0,0 +1,368 @@
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from chat_toolkit.common.exceptions import UsageGroupError
+
+# Columns of the ledger and their types. Components, sessions and kinds of
+# usage are stored as codes into lists of names
+COLUMNS = {
+    "timestamp": np.float64,
+    "component": np.uint32,
+    "session": np.uint32,
+    "kind": np.uint16,
+    "quantity": np.float64,
+    "cost": np.float64,
+}
+NAMED_COLUMNS = ("component", "session", "kind")
+
+
+class UsageLedger:
+    """
+    Append only, columnar record of every billed event (e.g. tokens used or
+    seconds of audio transcribed), with when it happened, the component and
+    session it was billed to, and its estimated cost. Columns are NumPy
+    arrays that grow geometrically, so recording an event is cheap and the
+    ledger stays compact at millions of events. Aggregations over time
+    windows, and grouped by component, session or kind of usage, are
+    vectorized.
+
+    The ledger is disabled until `enable` is called, and recording events
+    in a disabled ledger does nothing.
+    """
+
+    def __init__(
+        self,
+        initial_capacity: int = 1024,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Instantiate a usage ledger.
+
+        :param initial_capacity: Number of events to allocate space for. The
+        ledger doubles in size whenever it is full.
+        :param clock: Function giving the current time in seconds since the
+        epoch, which events are timestamped with.
+        """
+        self.enabled = False
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._size = 0
+        self._columns = {
+            column: np.empty(initial_capacity, dtype=dtype)
+            for column, dtype in COLUMNS.items()
+        }
+        self._names: dict[str, list[str]] = {
+            column: [] for column in NAMED_COLUMNS
+        }
+        self._codes: dict[str, dict[str, int]] = {
+            column: {} for column in NAMED_COLUMNS
+        }
+
+    def enable(self) -> None:
+        """
+        Start recording events.
+
+        :return:
+        """
+        self.enabled = True
+
+    def disable(self) -> None:
+        """
+        Stop recording events. Events recorded so far are kept.
+
+        :return:
+        """
+        self.enabled = False
+
+    def reset(self) -> None:
+        """
+        Forget every event recorded so far.
+
+        :return:
+        """
+        with self._lock:
+            self._size = 0
+            for column in NAMED_COLUMNS:
+                self._names[column].clear()
+                self._codes[column].clear()
+
+    def record(
+        self,
+        component: str,
+        kind: str,
+        quantity: float,
+        cost: float = 0.0,
+        session: Optional[str] = None,
+    ) -> None:
+        """
+        Record a billed event, timestamped with the ledger's clock.
+
+        :param component: Component the event was billed to.
+        :param kind: Kind of usage, e.g. "prompt_tokens" or "audio_seconds".
+        :param quantity: Amount of usage.
+        :param cost: Estimated cost of the usage.
+        :param session: Session the event was billed to, if any.
+        :return:
+        """
+        if not self.enabled:
+            return
+        timestamp = self._clock()
+        with self._lock:
+            if self._size == len(self._columns["timestamp"]):
+                self._grow()
+            row = self._size
+            columns = self._columns
+            columns["timestamp"][row] = timestamp
+            columns["component"][row] = self._code("component", component)
+            columns["session"][row] = self._code("session", session or "")
+            columns["kind"][row] = self._code("kind", kind)
+            columns["quantity"][row] = quantity
+            columns["cost"][row] = cost
+            self._size += 1
+
+    def __len__(self) -> int:
+        return self._size
+
+    def columns(
+        self, start: Optional[float] = None, end: Optional[float] = None
+    ) -> dict[str, np.ndarray]:
+        """
+        Get a copy of the events recorded within a time window.
+
+        :param start: Earliest timestamp to include. If None, unbounded.
+        :param end: Timestamp to include events up to (exclusive). If None,
+        unbounded.
+        :return: Column arrays, keyed by column name. Component, session and
+        kind columns hold codes; see `names`.
+        """
+        with self._lock:
+            return self._filtered(start, end, None)
+
+    def names(self, column: str) -> list[str]:
+        """
+        Get the names that codes of a column refer to.
+
+        :param column: Either "component", "session" or "kind".
+        :return: Names, indexed by code.
+        """
+        if column not in NAMED_COLUMNS:
+            raise UsageGroupError
+        with self._lock:
+            return list(self._names[column])
+
+    def aggregate(
+        self,
+        by: str = "component",
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        kind: Optional[str] = None,
+    ) -> dict[str, dict[str, float]]:
+        """
+        Total the usage and cost of the events within a time window, grouped
+        by component, session or kind of usage.
+
+        :param by: Either "component", "session" or "kind".
+        :param start: Earliest timestamp to include. If None, unbounded.
+        :param end: Timestamp to include events up to (exclusive). If None,
+        unbounded.
+        :param kind: Only include this kind of usage. If None, every kind is
+        included.
+        :return: Number of events, quantity and cost of each group, keyed by
+        the group's name.
+        """
+        if by not in NAMED_COLUMNS:
+            raise UsageGroupError
+        # Taken together, so that every code in the columns has a name
+        with self._lock:
+            names = list(self._names[by])
+            columns = self._filtered(start, end, kind)
+        codes = columns[by]
+        events = np.bincount(codes, minlength=len(names))
+        quantities = np.bincount(
+            codes, weights=columns["quantity"], minlength=len(names)
+        )
+        costs = np.bincount(
+            codes, weights=columns["cost"], minlength=len(names)
+        )
+        return {
+            names[code]: {
+                "events": int(events[code]),
+                "quantity": float(quantities[code]),
+                "cost": float(costs[code]),
+            }
+            for code in np.flatnonzero(events)
+        }
+
+    def rate(
+        self,
+        interval: float = 60.0,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        kind: Optional[str] = None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Total the usage and cost of the events within a time window, per
+        interval, e.g. tokens per minute over the last hour.
+
+        :param interval: Length of each interval, in seconds.
+        :param start: Start of the first interval. If None, the earliest
+        event within the window.
+        :param end: End of the window (exclusive). If None, now.
+        :param kind: Only include this kind of usage. If None, every kind is
+        included.
+        :return: Start of each interval, and the quantity and cost of the
+        events within it.
+        """
+        if end is None:
+            end = self._clock()
+        with self._lock:
+            columns = self._filtered(start, end, kind)
+        timestamps = columns["timestamp"]
+        if start is None:
+            start = float(timestamps.min()) if len(timestamps) else end
+        intervals = max(int(np.ceil((end - start) / interval)), 0)
+        buckets = ((timestamps - start) // interval).astype(np.int64)
+        quantities = np.bincount(
+            buckets, weights=columns["quantity"], minlength=intervals
+        )
+        costs = np.bincount(
+            buckets, weights=columns["cost"], minlength=intervals
+        )
+        starts = start + np.arange(intervals) * interval
+        return starts, quantities[:intervals], costs[:intervals]
+
+    def save(self, path: Path) -> None:
+        """
+        Save the ledger to a binary (NumPy .npz) file.
+
+        :param path: File to save to.
+        :return:
+        """
+        with self._lock:
+            arrays: dict[str, Any] = {
+                column: values[: self._size]
+                for column, values in self._columns.items()
+            }
+            for column in NAMED_COLUMNS:
+                arrays[f"{column}_names"] = np.array(
+                    self._names[column], dtype=str
+                )
+            with open(path, "wb") as f:
+                np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: Path) -> "UsageLedger":
+        """
+        Load a ledger saved with `save`. The loaded ledger is enabled.
+
+        :param path: File to load from.
+        :return: Ledger.
+        """
+        with np.load(path) as arrays:
+            size = len(arrays["timestamp"])
+            ledger = cls(initial_capacity=max(size, 1))
+            for column, dtype in COLUMNS.items():
+                ledger._columns[column][:size] = arrays[column].astype(dtype)
+            for column in NAMED_COLUMNS:
+                names = [str(name) for name in arrays[f"{column}_names"]]
+                ledger._names[column] = names
+                ledger._codes[column] = {
+                    name: code for code, name in enumerate(names)
+                }
+        ledger._size = size
+        ledger.enable()
+        return ledger
+
+    def _code(self, column: str, name: str) -> int:
+        """
+        Get the code of a name, assigning the next code if it is new. Must
+        be called with the lock held.
+
+        :param column: Column the name belongs to.
+        :param name: Name of a component, session or kind of usage.
+        :return: Code.
+        """
+        codes = self._codes[column]
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(codes)
+            self._names[column].append(name)
+        return code
+
+    def _grow(self) -> None:
+        """
+        Double the capacity of every column. Must be called with the lock
+        held.
+
+        :return:
+        """
+        capacity = max(len(self._columns["timestamp"]) * 2, 1)
+        for column, values in self._columns.items():
+            grown = np.empty(capacity, dtype=values.dtype)
+            grown[: self._size] = values[: self._size]
+            self._columns[column] = grown
+
+    def _filtered(
+        self, start: Optional[float], end: Optional[float], kind: Optional[str]
+    ) -> dict[str, np.ndarray]:
+        """
+        Get a copy of the events within a time window, of one kind of usage.
+        Must be called with the lock held.
+
+        :param start: Earliest timestamp to include. If None, unbounded.
+        :param end: Timestamp to include events up to (exclusive). If None,
+        unbounded.
+        :param kind: Only include this kind of usage. If None, every kind is
+        included.
+        :return: Column arrays, keyed by column name.
+        """
+        columns = {
+            column: values[: self._size]
+            for column, values in self._columns.items()
+        }
+        mask = self._window_mask(columns["timestamp"], start, end)
+        if kind is not None:
+            code = self._codes["kind"].get(kind)
+            if code is None:
+                return {
+                    column: values[:0] for column, values in columns.items()
+                }
+            kinds = columns["kind"] == code
+            mask = kinds if mask is None else mask & kinds
+        if mask is None:
+            return {
+                column: values.copy() for column, values in columns.items()
+            }
+        # Boolean indexing copies
+        return {column: values[mask] for column, values in columns.items()}
+
+    @staticmethod
+    def _window_mask(
+        timestamps: np.ndarray, start: Optional[float], end: Optional[float]
+    ) -> Optional[np.ndarray]:
+        """
+        Find the events within a time window.
+
+        :param timestamps: Timestamp of each event.
+        :param start: Earliest timestamp to include. If None, unbounded.
+        :param end: Timestamp to include events up to (exclusive). If None,
+        unbounded.
+        :return: Mask of the events within the window, or None if the window
+        is unbounded.
+        """
+        if start is None and end is None:
+            return None
+        mask = np.ones(len(timestamps), dtype=bool)
+        if start is not None:
+            mask &= timestamps >= start
+        if end is not None:
+            mask &= timestamps < end
+        return mask
+
+
+# Ledger every component records its billed usage to
+USAGE_LEDGER = UsageLedger()
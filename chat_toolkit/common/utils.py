@@ -1,13 +1,15 @@
 import io
 import os
-from collections.abc import Generator
+from collections.abc import Generator, Sequence
 from contextlib import contextmanager
 from pathlib import Path
 
+import numpy as np
 import openai
 from loguru import logger
 
 from chat_toolkit.common.constants import TMP_DIR
+from chat_toolkit.common.tracing import TRACER
 
 
 def print_banner(text: str, indent: int = 0) -> None:
@@ -27,6 +29,26 @@ def print_banner(text: str, indent: int = 0) -> None:
     print("\n")
 
 
+def latency_percentiles(samples: Sequence[float]) -> dict[str, float]:
+    """
+    Summarize a sample of latencies.
+
+    :param samples: Latencies, in seconds.
+    :return: Number of samples, and their mean, p50, p95 and p99 (all 0.0 if
+    there are no samples).
+    """
+    if not samples:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+    p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+    return {
+        "count": len(samples),
+        "mean": float(np.mean(samples)),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+    }
+
+
 @contextmanager
 def temporary_file(
     ending: str,
@@ -49,15 +71,17 @@ def temporary_file(
     will use a default directory if not provided.
     :return: None, but yields the temporary file.
     """
-    tmp_file_directory.mkdir(parents=True, exist_ok=True)
-
-    tmp_path = tmp_file_directory / f"{os.urandom(24).hex()}.{ending}"
+    with TRACER.span("temporary_file.create"):
+        tmp_file_directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = tmp_file_directory / f"{os.urandom(24).hex()}.{ending}"
+        tmp = tmp_path.open("w+b")
 
-    with tmp_path.open("w+b") as tmp:
+    with tmp:
         yield tmp
 
     if delete_after:
-        tmp_path.unlink()
+        with TRACER.span("temporary_file.delete"):
+            tmp_path.unlink()
 
 
 def set_openai_api_key():
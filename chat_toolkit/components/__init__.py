@@ -1,22 +1,73 @@
-from .chatbots.chatbot_component_base import ChatbotComponentBase
-from .chatbots.openai_chatbot import OpenAIChatBot
-from .component_base import ComponentBase, CostEstimatorBase
-from .speech_to_text.openai_speech_to_text import OpenAISpeechToText
-from .speech_to_text.speech_to_text_component_base import (
-    SpeechToTextComponentBase,
-)
-from .text_to_speech.pyttsx3_text_to_speech import Pyttsx3TextToSpeech
-from .text_to_speech.text_to_speech_component_base import (
-    TextToSpeechComponentBase,
+from typing import TYPE_CHECKING
+
+from chat_toolkit.common.lazy_imports import lazy_getattr
+
+if TYPE_CHECKING:
+    from .chatbots.chatbot_component_base import ChatbotComponentBase
+    from .chatbots.openai_chatbot import OpenAIChatBot
+    from .component_base import ComponentBase, CostEstimatorBase
+    from .speech_to_text.async_openai_speech_to_text import (
+        AsyncOpenAISpeechToText,
+    )
+    from .speech_to_text.async_speech_to_text_component_base import (
+        AsyncSpeechToTextComponentBase,
+    )
+    from .speech_to_text.openai_speech_to_text import OpenAISpeechToText
+    from .speech_to_text.speech_to_text_component_base import (
+        SpeechToTextComponentBase,
+    )
+    from .speech_to_text.transcription_cache import TranscriptionCache
+    from .text_to_speech.pyttsx3_engine_pool import Pyttsx3EnginePool
+    from .text_to_speech.pyttsx3_text_to_speech import Pyttsx3TextToSpeech
+    from .text_to_speech.speech_cache import SpeechCache
+    from .text_to_speech.speech_handle import SpeechHandle
+    from .text_to_speech.text_to_speech_component_base import (
+        TextToSpeechComponentBase,
+    )
+
+# Components are imported when first used, so that e.g. a text only chatbot
+# doesn't import the audio stack
+__getattr__ = lazy_getattr(
+    __name__,
+    {
+        "AsyncOpenAISpeechToText": (
+            ".speech_to_text.async_openai_speech_to_text"
+        ),
+        "AsyncSpeechToTextComponentBase": (
+            ".speech_to_text.async_speech_to_text_component_base"
+        ),
+        "ChatbotComponentBase": ".chatbots.chatbot_component_base",
+        "ComponentBase": ".component_base",
+        "CostEstimatorBase": ".component_base",
+        "OpenAIChatBot": ".chatbots.openai_chatbot",
+        "OpenAISpeechToText": ".speech_to_text.openai_speech_to_text",
+        "Pyttsx3EnginePool": ".text_to_speech.pyttsx3_engine_pool",
+        "Pyttsx3TextToSpeech": ".text_to_speech.pyttsx3_text_to_speech",
+        "SpeechCache": ".text_to_speech.speech_cache",
+        "SpeechHandle": ".text_to_speech.speech_handle",
+        "SpeechToTextComponentBase": (
+            ".speech_to_text.speech_to_text_component_base"
+        ),
+        "TextToSpeechComponentBase": (
+            ".text_to_speech.text_to_speech_component_base"
+        ),
+        "TranscriptionCache": ".speech_to_text.transcription_cache",
+    },
 )
 
 __all__ = (
+    "AsyncOpenAISpeechToText",
+    "AsyncSpeechToTextComponentBase",
     "ChatbotComponentBase",
     "ComponentBase",
     "CostEstimatorBase",
     "OpenAIChatBot",
     "OpenAISpeechToText",
+    "Pyttsx3EnginePool",
     "Pyttsx3TextToSpeech",
+    "SpeechCache",
+    "SpeechHandle",
     "SpeechToTextComponentBase",
     "TextToSpeechComponentBase",
+    "TranscriptionCache",
 )
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 
 from chat_toolkit.common.custom_types import StartingPromptsType
+from chat_toolkit.common.exceptions import ForkingUnsupportedError
 from chat_toolkit.components.component_base import ComponentBase
 
 
@@ -31,3 +33,48 @@ class ChatbotComponentBase(ComponentBase, ABC):
         :return: Response text, any metadata applicable.
         """
         pass
+
+    def stream_message(self, message: str) -> Iterator[str]:
+        """
+        Send a message and yield the response in fragments, as it is
+        generated. By default, the whole response is yielded at once when it
+        is complete. Components that can stream responses should override
+        this.
+
+        :param message: User's desired message to the chatbot.
+        :return: None, but yields fragments of the response.
+        """
+        response, _ = self.send_message(message)
+        yield response
+
+    def fork(self) -> "ChatbotComponentBase":
+        """
+        Create an independent copy of the chatbot, with the same conversation
+        history but no usage of its own, so that a message can be sent
+        speculatively. Optional for chatbot components.
+
+        :return: Forked chatbot.
+        """
+        raise ForkingUnsupportedError
+
+    def join(self, fork: "ChatbotComponentBase", adopt: bool) -> None:
+        """
+        Account for the usage of a chatbot created by `fork`, and optionally
+        continue the conversation from where the fork left off. Optional for
+        chatbot components.
+
+        :param fork: Chatbot created by this chatbot's `fork` method.
+        :param adopt: Whether to adopt the fork's conversation history.
+        :return:
+        """
+        raise ForkingUnsupportedError
+
+    @property
+    def supports_forking(self) -> bool:
+        """
+        Read only property representing whether this object implements
+        `fork` and `join`.
+
+        :return:
+        """
+        return type(self).fork is not ChatbotComponentBase.fork
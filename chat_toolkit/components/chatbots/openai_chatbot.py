@@ -1,9 +1,17 @@
+import copy
 import logging
+import threading
+import time
+from collections.abc import Iterator
+from math import ceil
+from queue import SimpleQueue
 from typing import Optional
 
 import openai
 
+from chat_toolkit.common.cassette import Cassette
 from chat_toolkit.common.custom_types import StartingPromptsType
+from chat_toolkit.common.tracing import TRACER
 from chat_toolkit.common.utils import set_openai_api_key
 from chat_toolkit.components.chatbots.chatbot_component_base import (
     ChatbotComponentBase,
@@ -11,6 +19,9 @@ from chat_toolkit.components.chatbots.chatbot_component_base import (
 
 logger = logging.getLogger()
 
+# Put on a queue of streamed fragments after the last one
+_END_OF_STREAM = object()
+
 
 class OpenAIChatBot(ChatbotComponentBase):
     """
@@ -22,6 +33,7 @@ class OpenAIChatBot(ChatbotComponentBase):
         self,
         model: str = "gpt-3.5-turbo",
         pricing_rate: float = 0.002,
+        cassette: Optional[Cassette] = None,
     ):
         """
         Instantiate a chatbot interaction object.
@@ -30,6 +42,8 @@ class OpenAIChatBot(ChatbotComponentBase):
         :param pricing_rate: Pricing rate per 1000 tokens used to
         calculate cost estimates of orchestrators. See notes about
         user responsibility re: costs + estimates in CostEstimatorBase.
+        :param cassette: Cassette to record requests to OpenAI to, or replay
+        them from. Optional.
         """
         super().__init__(
             model=model,
@@ -38,6 +52,7 @@ class OpenAIChatBot(ChatbotComponentBase):
 
         set_openai_api_key()
 
+        self.cassette = cassette
         self.latest_response: Optional[openai.ChatCompletion] = None
         self.history: list[dict] = []
         self._tokens_used = {
@@ -74,7 +89,10 @@ class OpenAIChatBot(ChatbotComponentBase):
         :return: Chatbot's response.
         """
         self._record_message("user", message)
-        self.latest_response = self._send_message()
+        with TRACER.span(
+            "send_message", type(self).__qualname__
+        ), self._count_request(), self._timings.time("completion"):
+            self.latest_response = self._send_message()
         response_content = ""
         for choice in self.latest_response["choices"]:
             choice_message = choice["message"]["content"]
@@ -88,6 +106,130 @@ class OpenAIChatBot(ChatbotComponentBase):
             self.latest_response.copy(),
         )
 
+    def stream_message(self, message: str) -> Iterator[str]:
+        """
+        Send a message to the chatbot and yield its response as it is
+        generated. The response is recorded so that conversation may
+        continue once it has been streamed in full. A response that fails or
+        is abandoned part way is still billed, but is left out of the
+        history. OpenAI does not report token usage for streamed responses,
+        so usage is estimated: one completion token per streamed chunk, and
+        prompt tokens from the length of the conversation history.
+
+        :param message: User's desired message to the chatbot.
+        :return: None, but yields fragments of the chatbot's response.
+        """
+        self._record_message("user", message)
+        prompt_tokens = self._estimate_prompt_tokens()
+        completion_tokens = 0
+        response_content = ""
+        finished = False
+        started = time.monotonic()
+        fragments: SimpleQueue = SimpleQueue()
+        stopped = threading.Event()
+        # Read the response in the background, so that a slow consumer (e.g.
+        # one waiting on a full speech queue) doesn't hold a scheduler slot
+        threading.Thread(
+            target=self._read_stream,
+            # The history may change while the response is read
+            args=(list(self.history), fragments, stopped),
+            name="chat-toolkit-stream",
+            daemon=True,
+        ).start()
+        try:
+            with TRACER.span("stream_message", type(self).__qualname__):
+                while True:
+                    content = fragments.get()
+                    if content is _END_OF_STREAM:
+                        finished = True
+                        break
+                    if isinstance(content, Exception):
+                        raise content
+                    if not completion_tokens:
+                        self._timings.record(
+                            "first_token", time.monotonic() - started
+                        )
+                    completion_tokens += 1
+                    response_content = f"{response_content}{content}"
+                    yield content
+        finally:
+            stopped.set()
+            self._timings.record("completion", time.monotonic() - started)
+            if finished:
+                self._record_message("assistant", response_content)
+            if finished or completion_tokens:
+                self._update_tokens_used(
+                    {
+                        "completion_tokens": completion_tokens,
+                        "prompt_tokens": prompt_tokens,
+                        "total_tokens": completion_tokens + prompt_tokens,
+                    }
+                )
+
+    def _read_stream(
+        self,
+        messages: list[dict],
+        fragments: SimpleQueue,
+        stopped: threading.Event,
+    ) -> None:
+        """
+        Stream a response from OpenAI into a queue, holding a scheduler slot
+        only until the stream has been read.
+
+        :param messages: Conversation history to send.
+        :param fragments: Queue to put fragments of the response on, followed
+        by an exception if the request failed, and then `_END_OF_STREAM`.
+        :param stopped: Set when the consumer stops reading, to stop reading
+        the stream early.
+        :return:
+        """
+        try:
+            with self._dispatch(), self._count_request():
+                for chunk in self._stream_message(messages):
+                    if stopped.is_set():
+                        break
+                    content = chunk["choices"][0]["delta"].get("content")
+                    if content:
+                        fragments.put(content)
+        except Exception as ex:
+            # Raised to the consumer instead
+            fragments.put(ex)
+        finally:
+            fragments.put(_END_OF_STREAM)
+
+    def fork(self) -> "OpenAIChatBot":
+        """
+        Create an independent copy of the chatbot, with the same conversation
+        history but no tokens used, so that a message can be sent
+        speculatively.
+
+        :return: Forked chatbot.
+        """
+        fork = copy.copy(self)
+        fork.history = [message.copy() for message in self.history]
+        fork.latest_response = None
+        fork._tokens_used = dict.fromkeys(self._tokens_used, 0)
+        return fork
+
+    def join(self, fork: ChatbotComponentBase, adopt: bool) -> None:
+        """
+        Account for the tokens used by a chatbot created by `fork`, and
+        optionally continue the conversation from where the fork left off.
+
+        :param fork: Chatbot created by this chatbot's `fork` method.
+        :param adopt: Whether to adopt the fork's conversation history.
+        :return:
+        """
+        if not isinstance(fork, OpenAIChatBot):
+            raise TypeError(f"Cannot join {type(fork).__qualname__}.")
+        # The fork has already counted its tokens in the metrics registry and
+        # billed them to the usage ledger
+        for metric, value in fork.tokens_used.items():
+            self._tokens_used[metric] += value
+        if adopt:
+            self.history = fork.history
+            self.latest_response = fork.latest_response
+
     @property
     def _cost_estimate_data(self) -> tuple[float, dict]:
         """
@@ -123,12 +265,54 @@ class OpenAIChatBot(ChatbotComponentBase):
 
     def _send_message(self) -> openai.ChatCompletion:
         """
-        Send message to OpenAI, including all conversation history.
+        Send message to OpenAI, including all conversation history, once the
+        scheduler dispatches it.
 
         :return: Response from OpenAI.
         """
-        return openai.ChatCompletion.create(
-            model=self._model, messages=self.history
+        with self._dispatch():
+            if self.cassette is None:
+                return openai.ChatCompletion.create(
+                    model=self._model, messages=self.history
+                )
+            return self.cassette.call(
+                "chat",
+                {"model": self._model, "messages": self.history},
+                lambda: openai.ChatCompletion.create(
+                    model=self._model, messages=self.history
+                ),
+            )
+
+    def _stream_message(self, messages: list[dict]) -> Iterator[dict]:
+        """
+        Send message to OpenAI, including all conversation history, and
+        stream the response.
+
+        :param messages: Conversation history to send.
+        :return: Chunks of the response from OpenAI.
+        """
+        if self.cassette is None:
+            return openai.ChatCompletion.create(
+                model=self._model, messages=messages, stream=True
+            )
+        return self.cassette.stream(
+            "chat_stream",
+            {"model": self._model, "messages": messages},
+            lambda: openai.ChatCompletion.create(
+                model=self._model, messages=messages, stream=True
+            ),
+        )
+
+    def _estimate_prompt_tokens(self) -> int:
+        """
+        Estimate the number of tokens in the conversation history, using
+        OpenAI's rule of thumb of roughly 4 characters per token, plus a few
+        tokens of overhead per message.
+
+        :return: Estimated prompt tokens.
+        """
+        return sum(
+            ceil(len(message["content"]) / 4) + 4 for message in self.history
         )
 
     def _record_message(self, role: str, content: str) -> None:
@@ -144,7 +328,8 @@ class OpenAIChatBot(ChatbotComponentBase):
     def _update_tokens_used(self, usage: dict) -> None:
         """
         Update record of token counts in the conversation for cost
-        estimation and reporting purposes.
+        estimation and reporting purposes, count them as metrics, and bill
+        them to the usage ledger.
 
         :param usage: Usage mapping provided in OpenAI's response for a
         single message.
@@ -153,3 +338,7 @@ class OpenAIChatBot(ChatbotComponentBase):
         usage = usage.copy()
         for metric, value in usage.items():
             self._tokens_used[metric] += value
+            self._count("tokens", value, kind=metric)
+            # Totals are the sum of the other kinds, so aren't billed twice
+            if metric != "total_tokens":
+                self._bill(metric, value, value / 1000 * self._pricing_rate)
@@ -1,6 +1,21 @@
 from abc import ABC, abstractmethod
+from collections.abc import Generator
+from contextlib import (
+    AbstractAsyncContextManager,
+    AbstractContextManager,
+    contextmanager,
+)
 from typing import Optional
 
+from chat_toolkit.common.metrics import METRICS
+from chat_toolkit.common.scheduler import (
+    DEFAULT_TENANT,
+    INTERACTIVE,
+    SCHEDULER,
+)
+from chat_toolkit.common.timing import Timings
+from chat_toolkit.common.usage_ledger import USAGE_LEDGER
+
 
 class CostEstimatorBase(ABC):
     """
@@ -54,3 +69,113 @@ class ComponentBase(CostEstimatorBase, ABC):
         """
         super().__init__(**kwargs)
         self._model = model
+        self._metric_labels = {
+            "component": type(self).__qualname__,
+            "model": model or "",
+        }
+        self._timings = Timings(labels=self._metric_labels)
+        # Session that usage is billed to in `USAGE_LEDGER`, and tenant that
+        # requests are dispatched for by `SCHEDULER`, if any
+        self.session_id: Optional[str] = None
+        # Lane of `SCHEDULER` that requests are dispatched in, and seconds
+        # after being made by which they should be dispatched, if any
+        self.dispatch_lane = INTERACTIVE
+        self.dispatch_deadline: Optional[float] = None
+
+    @property
+    def timing_data(self) -> dict[str, dict[str, float]]:
+        """
+        Read only property representing the latency percentiles of each
+        stage of the component's work so far (e.g. recording, transcription
+        or completion), measured with a monotonic clock.
+
+        :return: Latency percentiles, keyed by stage name.
+        """
+        return self._timings.summary
+
+    def warm_up(self) -> None:
+        """
+        Do any slow, one-off setup (e.g. creating engines or loading models)
+        ahead of the first request, so that it isn't paid for mid
+        conversation. Called by `Orchestrator.build`, concurrently with other
+        components' warm-ups. Optional for components; does nothing by
+        default.
+
+        :return:
+        """
+        pass
+
+    def _count(self, metric: str, value: float = 1.0, **labels: str) -> None:
+        """
+        Increment a counter of `METRICS`, labelled with this component and its
+        model. Does nothing unless metrics are enabled.
+
+        :param metric: Name of the counter.
+        :param value: Amount to increment by.
+        :param labels: Any additional labels.
+        :return:
+        """
+        if METRICS.enabled:
+            METRICS.inc(metric, value, **self._metric_labels, **labels)
+
+    def _bill(self, kind: str, quantity: float, cost: float) -> None:
+        """
+        Record billed usage in `USAGE_LEDGER`, against this component and its
+        session. Does nothing unless the ledger is enabled.
+
+        :param kind: Kind of usage.
+        :param quantity: Amount of usage.
+        :param cost: Estimated cost of the usage.
+        :return:
+        """
+        if USAGE_LEDGER.enabled:
+            USAGE_LEDGER.record(
+                self._metric_labels["component"],
+                kind,
+                quantity,
+                cost,
+                self.session_id,
+            )
+
+    def _dispatch(self) -> AbstractContextManager:
+        """
+        Context manager for waiting for `SCHEDULER` to dispatch a request to
+        a model, and holding its slot while the request is made. Doesn't
+        wait unless the scheduler is enabled.
+
+        :return:
+        """
+        return SCHEDULER.slot(
+            self.session_id or DEFAULT_TENANT,
+            self.dispatch_lane,
+            self.dispatch_deadline,
+        )
+
+    def _adispatch(self) -> AbstractAsyncContextManager:
+        """
+        Async context manager for waiting for `SCHEDULER` to dispatch a
+        request to a model, without blocking the event loop. See
+        `_dispatch`.
+
+        :return:
+        """
+        return SCHEDULER.aslot(
+            self.session_id or DEFAULT_TENANT,
+            self.dispatch_lane,
+            self.dispatch_deadline,
+        )
+
+    @contextmanager
+    def _count_request(self) -> Generator[None, None, None]:
+        """
+        Context manager for counting a request to a model, and counting it
+        as an error if it raises.
+
+        :return:
+        """
+        self._count("requests")
+        try:
+            yield
+        except Exception:
+            self._count("errors")
+            raise
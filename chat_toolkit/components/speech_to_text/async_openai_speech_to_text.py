@@ -0,0 +1,105 @@
+import asyncio
+from typing import Optional
+
+import openai
+
+from chat_toolkit.common.custom_types import (
+    AudioFileType,
+    AudioInputType,
+    PartialTranscriptCallbackType,
+)
+from chat_toolkit.common.tracing import TRACER
+from chat_toolkit.common.utils import temporary_file
+from chat_toolkit.components.speech_to_text.async_speech_to_text_component_base import (  # noqa: E501
+    AsyncSpeechToTextComponentBase,
+)
+from chat_toolkit.components.speech_to_text.openai_speech_to_text import (
+    OpenAISpeechToText,
+)
+
+
+class AsyncOpenAISpeechToText(
+    OpenAISpeechToText, AsyncSpeechToTextComponentBase
+):
+    """
+    Class for interacting with one of OpenAI's speech to text algorithms
+    from an asyncio event loop. Shares its configuration, cost estimates and
+    transcription cache handling with OpenAISpeechToText, whose synchronous
+    methods remain available. Requires OPENAI_API_KEY environment variable.
+    """
+
+    async def atranscribe_speech(
+        self,
+        on_partial_transcript: Optional[PartialTranscriptCallbackType] = None,
+    ) -> tuple[str, dict]:
+        """
+        Record user's voice and transcribe into text without blocking the
+        event loop.
+
+        :param on_partial_transcript: See `transcribe_speech`.
+        :return: Transcription text, any applicable metadata.
+        """
+        with temporary_file(
+            "wav", tmp_file_directory=self.tmp_file_directory
+        ) as tmp, self._partial_transcriber(
+            on_partial_transcript
+        ) as on_audio_block:
+            await self.arecord_unspecified_length_audio(
+                tmp.name, on_audio_block
+            )
+            transcription, metadata = await self.atranscribe(tmp)
+        return transcription, metadata
+
+    async def atranscribe(self, audio: AudioInputType) -> tuple[str, dict]:
+        """
+        Transcribe audio from a supported file type with OpenAI's api without
+        blocking the event loop. See `transcribe`.
+
+        :param audio: Open audio file, or a buffer of encoded audio.
+        :return: Transcribed text, any applicable metadata.
+        """
+        with TRACER.span("atranscribe", type(self).__qualname__):
+            return await self._atranscribe(audio)
+
+    async def _atranscribe(self, audio: AudioInputType) -> tuple[str, dict]:
+        """
+        Transcribe audio, from the transcription cache if one is configured.
+
+        :param audio: Open audio file, or a buffer of encoded audio.
+        :return: Transcribed text, any applicable metadata.
+        """
+        audio_file = self._as_audio_file(audio)
+        # Decoding and hashing audio is CPU bound, so happens off the loop
+        loop = asyncio.get_running_loop()
+        key, seconds, cached_text = await loop.run_in_executor(
+            None, self._lookup_transcription, audio_file
+        )
+        if cached_text is not None:
+            return cached_text, {"cache_hit": True}
+
+        try:
+            with self._count_request(), self._timings.time("transcription"):
+                transcription = await self._asend_audio(audio_file)
+            text = transcription["text"]
+        except openai.error.InvalidRequestError as ex:
+            # Audio too short to transcribe is neither billed nor cached
+            return self._handle_invalid_request(ex), {}
+
+        return text, self._record_transcription(key, seconds, text)
+
+    async def _asend_audio(self, audio_file: AudioFileType) -> dict:
+        """
+        Send audio to OpenAI to be transcribed, once the scheduler dispatches
+        it, without blocking the event loop.
+
+        :param audio_file: Open audio file.
+        :return: Response from OpenAI.
+        """
+        async with self._adispatch():
+            if self.cassette is None:
+                return await openai.Audio.atranscribe(self._model, audio_file)
+            return await self.cassette.acall(
+                "transcription",
+                self._cassette_request(audio_file),
+                lambda: openai.Audio.atranscribe(self._model, audio_file),
+            )
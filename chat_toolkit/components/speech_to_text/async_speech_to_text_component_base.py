@@ -0,0 +1,118 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from chat_toolkit.common.custom_types import (
+    AudioBlockCallbackType,
+    AudioInputType,
+    PartialTranscriptCallbackType,
+)
+from chat_toolkit.common.key_tracker import KeyTracker
+from chat_toolkit.common.tracing import TRACER
+from chat_toolkit.components.speech_to_text.speech_to_text_component_base import (  # noqa: E501
+    SpeechToTextComponentBase,
+)
+
+
+class AsyncSpeechToTextComponentBase(SpeechToTextComponentBase, ABC):
+    """
+    Used to create speech to text components that can be awaited from an
+    asyncio event loop, so that one loop can serve many speech sessions at
+    once. Async components can still be used synchronously.
+    """
+
+    @abstractmethod
+    async def atranscribe_speech(
+        self,
+        on_partial_transcript: Optional[PartialTranscriptCallbackType] = None,
+    ) -> tuple[str, dict]:
+        """
+        Abstract method for transcribing speech without blocking the event
+        loop.
+
+        :param on_partial_transcript: See `transcribe_speech`.
+        :return: Transcription text, any applicable metadata.
+        """
+        pass
+
+    def transcribe_speech(
+        self,
+        on_partial_transcript: Optional[PartialTranscriptCallbackType] = None,
+    ) -> tuple[str, dict]:
+        """
+        Transcribe speech by running `atranscribe_speech` in a new event loop.
+
+        :param on_partial_transcript: See `SpeechToTextComponentBase`.
+        :return: Transcription text, any applicable metadata.
+        """
+        return asyncio.run(self.atranscribe_speech(on_partial_transcript))
+
+    async def atranscribe(self, audio: AudioInputType) -> tuple[str, dict]:
+        """
+        Transcribe audio that has already been recorded without blocking the
+        event loop. By default, `transcribe` is run in the loop's default
+        executor. Components with native async transcription should override
+        this.
+
+        :param audio: Open audio file, or a buffer of encoded audio.
+        :return: Transcription text, any applicable metadata.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.transcribe, audio)
+
+    async def arecord_unspecified_length_audio(
+        self,
+        file_path: str,
+        on_audio_block: Optional[AudioBlockCallbackType] = None,
+    ) -> None:
+        """
+        Wait for user to push space bar, then record while they are holding.
+        Audio blocks are passed from sounddevice's callback thread to the
+        event loop through an asyncio queue, and waiting for the space bar
+        happens in the loop's default executor.
+
+        :param file_path: Path to save audio to.
+        :param on_audio_block: Called with each block of audio after it has
+        been saved. Optional.
+        :return:
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        key_tracker = KeyTracker()
+        input_overflows = self._input_overflows
+
+        def _callback(indata, frames, time, status):  # noqa: F841
+            """
+            This is called (from a separate thread) for each audio block.
+            """
+            self._check_callback_status(indata, frames, time, status)
+            loop.call_soon_threadsafe(queue.put_nowait, indata.copy())
+
+        try:
+            # Make sure the file is opened before recording anything:
+            with TRACER.span(
+                "arecord_unspecified_length_audio", type(self).__qualname__
+            ), self._open_recording_file(file_path) as audio_file:
+                await loop.run_in_executor(
+                    None, key_tracker.wait_for_recording_to_start
+                )
+                self._notify_recording_started()
+
+                with self._timings.time("recording"), self._input_stream(
+                    _callback
+                ):
+                    while True:
+                        block = await queue.get()
+                        audio_file.write(block)
+                        if on_audio_block is not None:
+                            on_audio_block(block)
+                        if not key_tracker.check_if_still_recording():
+                            break
+
+        except KeyboardInterrupt:
+            key_tracker.stop_tracking()
+        except asyncio.CancelledError:
+            key_tracker.stop_tracking()
+            raise
+        finally:
+            self._report_input_overflows(input_overflows)
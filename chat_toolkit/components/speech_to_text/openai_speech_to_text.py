@@ -1,14 +1,35 @@
+import hashlib
 import io
+import threading
+from collections.abc import Generator
+from contextlib import contextmanager
+from math import ceil
 from pathlib import Path
-from typing import Union
+from typing import Optional, Union
 
+import numpy as np
 import openai
+import soundfile as sf
 
+from chat_toolkit.common.cassette import Cassette
 from chat_toolkit.common.constants import TMP_DIR
+from chat_toolkit.common.custom_types import (
+    AudioBlockCallbackType,
+    AudioFileType,
+    AudioInputType,
+    PartialTranscriptCallbackType,
+)
+from chat_toolkit.common.tracing import TRACER
 from chat_toolkit.common.utils import set_openai_api_key, temporary_file
+from chat_toolkit.components.speech_to_text.partial_transcriber import (
+    PartialTranscriber,
+)
 from chat_toolkit.components.speech_to_text.speech_to_text_component_base import (  # noqa: E501
     SpeechToTextComponentBase,
 )
+from chat_toolkit.components.speech_to_text.transcription_cache import (
+    TranscriptionCache,
+)
 
 
 class OpenAISpeechToText(SpeechToTextComponentBase):
@@ -18,14 +39,24 @@ class OpenAISpeechToText(SpeechToTextComponentBase):
     """
 
     _channels = 2
+    # Seconds of audio to record between partial transcriptions, when they
+    # are requested, and seconds of audio after which they stop. Each partial
+    # transcription sends (and is billed for) all the audio recorded so far,
+    # see PartialTranscriber. Can be set per component
+    partial_transcript_seconds = 1.0
+    max_partial_transcript_seconds: Optional[float] = 15.0
 
-    def __init__(
+    # Device, channels and temporary file directory come first, as they did
+    # before the cache and cassette were added, for positional callers
+    def __init__(  # noqa: CFQ002
         self,
         model: str = "whisper-1",
         pricing_rate: float = 0.006,
         device: Union[int, str] = 0,
         channels: int = 2,
         tmp_file_directory: Path = TMP_DIR,
+        transcription_cache: Optional[TranscriptionCache] = None,
+        cassette: Optional[Cassette] = None,
     ):
         """
         Instantiate a speech to text interaction object.
@@ -39,6 +70,10 @@ class OpenAISpeechToText(SpeechToTextComponentBase):
         :param channels: Number of channels
         :param tmp_file_directory: Directory to use for temporary files,
         will use a default directory if not provided.
+        :param transcription_cache: Cache to look up transcriptions of
+        previously heard audio in before calling OpenAI. Optional.
+        :param cassette: Cassette to record requests to OpenAI to, or replay
+        them from. Optional.
         """
         super().__init__(
             model=model,
@@ -49,16 +84,32 @@ class OpenAISpeechToText(SpeechToTextComponentBase):
         )
         set_openai_api_key()
 
-    def transcribe_speech(self) -> tuple[str, dict]:
+        self.cassette = cassette
+
+        self._transcription_cache = transcription_cache
+        self._seconds_cached = 0
+        self._cache_hits = 0
+        # Partial transcriptions are accounted for from a separate thread
+        self._accounting_lock = threading.Lock()
+
+    def transcribe_speech(
+        self,
+        on_partial_transcript: Optional[PartialTranscriptCallbackType] = None,
+    ) -> tuple[str, dict]:
         """
         Record user's voice and transcribe into text.
 
+        :param on_partial_transcript: Called (from a separate thread) with
+        transcripts of the speech recorded so far, every
+        `partial_transcript_seconds` while recording. Optional.
         :return: Transcription text, any applicable metadata.
         """
         with temporary_file(
             "wav", tmp_file_directory=self.tmp_file_directory
-        ) as tmp:
-            self.record_unspecified_length_audio(tmp.name)
+        ) as tmp, self._partial_transcriber(
+            on_partial_transcript
+        ) as on_audio_block:
+            self.record_unspecified_length_audio(tmp.name, on_audio_block)
             transcription, metadata = self.transcribe(tmp)
         return transcription, metadata
 
@@ -73,24 +124,262 @@ class OpenAISpeechToText(SpeechToTextComponentBase):
         """
         cost_estimate = self._seconds_transcribed / 60 * self._pricing_rate
         metadata = {"seconds_transcribed": self._seconds_transcribed}
+        if self._transcription_cache is not None:
+            # Cached seconds were never sent to OpenAI, so they are not billed
+            metadata["seconds_cached"] = self._seconds_cached
+            metadata["cache_hits"] = self._cache_hits
         return cost_estimate, metadata
 
-    def transcribe(self, audio_file: io.BufferedRandom) -> tuple[str, dict]:
+    def transcribe(self, audio: AudioInputType) -> tuple[str, dict]:
         """
-        Transcribe audio from a supported file type with OpenAI's api.
+        Transcribe audio from a supported file type with OpenAI's api. If a
+        transcription cache is configured, audio that has been transcribed
+        before is served from the cache without calling OpenAI.
 
-        :param audio_file: Open audio file.
-        :return: Transcribed text.
+        :param audio: Open audio file, or a buffer of encoded audio.
+        :return: Transcribed text, any applicable metadata.
+        """
+        with TRACER.span("transcribe", type(self).__qualname__):
+            return self._transcribe(audio)
+
+    def _transcribe(self, audio: AudioInputType) -> tuple[str, dict]:
+        """
+        Transcribe audio, from the transcription cache if one is configured.
+
+        :param audio: Open audio file, or a buffer of encoded audio.
+        :return: Transcribed text, any applicable metadata.
         """
+        audio_file = self._as_audio_file(audio)
+        key, seconds, cached_text = self._lookup_transcription(audio_file)
+        if cached_text is not None:
+            return cached_text, {"cache_hit": True}
+
         try:
-            transcription = openai.Audio.transcribe(self._model, audio_file)
+            with self._count_request(), self._timings.time("transcription"):
+                transcription = self._send_audio(audio_file)
             text = transcription["text"]
         except openai.error.InvalidRequestError as ex:
-            if (
-                str(ex) != "Audio file is too short. Minimum audio "
-                "length is 0.1 seconds."
-            ):
-                raise
-            text = ""
-
-        return text, {}
+            # Audio too short to transcribe is neither billed nor cached
+            return self._handle_invalid_request(ex), {}
+
+        return text, self._record_transcription(key, seconds, text)
+
+    @property
+    def cache_hits(self) -> int:
+        """
+        Read only property representing how many transcriptions this object
+        has served from its transcription cache so far.
+
+        :return:
+        """
+        return self._cache_hits
+
+    @contextmanager
+    def _partial_transcriber(
+        self,
+        on_partial_transcript: Optional[PartialTranscriptCallbackType],
+    ) -> Generator[Optional[AudioBlockCallbackType], None, None]:
+        """
+        Context manager for transcribing audio while it is being recorded.
+
+        :param on_partial_transcript: Callback for partial transcripts. If
+        None, nothing is transcribed until recording has finished.
+        :return: None, but yields a callback for recorded audio blocks (or
+        None, if partial transcripts are not needed).
+        """
+        if on_partial_transcript is None:
+            yield None
+            return
+
+        partial_transcriber = PartialTranscriber(
+            self._transcribe_partial,
+            on_partial_transcript,
+            self.sample_rate,
+            self.partial_transcript_seconds,
+            self.max_partial_transcript_seconds,
+        )
+        try:
+            yield partial_transcriber.add_block
+        finally:
+            partial_transcriber.close()
+
+    def _transcribe_partial(self, audio: bytes) -> tuple[str, dict]:
+        """
+        Transcribe a partial recording. Partial recordings are never heard
+        again, so they bypass the transcription cache, and they are timed and
+        counted separately from full transcriptions. They are still billed.
+
+        :param audio: Buffer of encoded audio.
+        :return: Transcribed text, any applicable metadata.
+        """
+        audio_file = self._as_audio_file(audio)
+        seconds = self._audio_duration(audio_file)
+        self._count("partial_transcriptions")
+        try:
+            with self._timings.time("partial_transcription"):
+                transcription = self._send_audio(audio_file)
+        except openai.error.InvalidRequestError as ex:
+            return self._handle_invalid_request(ex), {}
+        self._bill_transcription(seconds)
+        return transcription["text"], {}
+
+    def _lookup_transcription(
+        self, audio_file: AudioFileType
+    ) -> tuple[Optional[str], int, Optional[str]]:
+        """
+        Measure some audio and look it up in the transcription cache, if one
+        is configured. Cache hits are accounted for here.
+
+        :param audio_file: Open audio file.
+        :return: Cache key (None if audio should not be cached), billable
+        duration in seconds, cached transcription (None on a cache miss).
+        """
+        if self._transcription_cache is None:
+            return None, self._audio_duration(audio_file), None
+
+        decoded = self._decode_audio(audio_file)
+        if decoded is None:
+            return None, 0, None
+
+        pcm, sample_rate = decoded
+        seconds = ceil(len(pcm) / sample_rate)
+        key = TranscriptionCache.make_key(pcm, sample_rate, self._model)
+        cached_text = self._transcription_cache.get(key)
+        if cached_text is not None:
+            with self._accounting_lock:
+                self._seconds_cached += seconds
+                self._cache_hits += 1
+            self._count("cache_hits")
+        return key, seconds, cached_text
+
+    def _record_transcription(
+        self, key: Optional[str], seconds: int, text: str
+    ) -> dict:
+        """
+        Account for audio that was sent to OpenAI and cache its
+        transcription.
+
+        :param key: Cache key from `_lookup_transcription`.
+        :param seconds: Billable duration from `_lookup_transcription`.
+        :param text: Transcribed text.
+        :return: Any applicable metadata.
+        """
+        self._bill_transcription(seconds)
+        if self._transcription_cache is None:
+            return {}
+        if key is not None:
+            self._transcription_cache.put(key, text)
+        return {"cache_hit": False}
+
+    def _bill_transcription(self, seconds: int) -> None:
+        """
+        Account for audio that was sent to OpenAI.
+
+        :param seconds: Billable duration of the audio.
+        :return:
+        """
+        with self._accounting_lock:
+            self._seconds_transcribed += seconds
+        self._count("audio_seconds_transcribed", seconds)
+        self._bill("audio_seconds", seconds, seconds / 60 * self._pricing_rate)
+
+    def _send_audio(self, audio_file: AudioFileType) -> dict:
+        """
+        Send audio to OpenAI to be transcribed, once the scheduler dispatches
+        it.
+
+        :param audio_file: Open audio file.
+        :return: Response from OpenAI.
+        """
+        with self._dispatch():
+            if self.cassette is None:
+                return openai.Audio.transcribe(self._model, audio_file)
+            return self.cassette.call(
+                "transcription",
+                self._cassette_request(audio_file),
+                lambda: openai.Audio.transcribe(self._model, audio_file),
+            )
+
+    def _cassette_request(self, audio_file: AudioFileType) -> dict:
+        """
+        Describe a transcription request for a cassette, leaving the file
+        ready to be read again from the start.
+
+        :param audio_file: Open audio file.
+        :return: Model and hash of the audio.
+        """
+        audio_file.seek(0)
+        audio_hash = hashlib.sha256(audio_file.read()).hexdigest()
+        audio_file.seek(0)
+        return {"model": self._model, "audio_sha256": audio_hash}
+
+    @staticmethod
+    def _handle_invalid_request(ex: openai.error.InvalidRequestError) -> str:
+        """
+        Treat audio that is too short to transcribe as silence, and re-raise
+        any other invalid request errors.
+
+        :param ex: Error raised by OpenAI.
+        :return: Empty transcription.
+        """
+        if (
+            str(ex) != "Audio file is too short. Minimum audio "
+            "length is 0.1 seconds."
+        ):
+            raise ex
+        return ""
+
+    @staticmethod
+    def _as_audio_file(audio: AudioInputType) -> AudioFileType:
+        """
+        Wrap raw bytes of encoded audio in a named buffer, so that OpenAI can
+        infer the format. Open files are returned as is.
+
+        :param audio: Open audio file, or a buffer of encoded audio.
+        :return: Open audio file.
+        """
+        if not isinstance(audio, bytes):
+            return audio
+        audio_file = io.BytesIO(audio)
+        audio_file.name = "audio.wav"
+        return audio_file
+
+    @staticmethod
+    def _decode_audio(
+        audio_file: AudioFileType,
+    ) -> Optional[tuple[np.ndarray, int]]:
+        """
+        Decode an audio file into PCM samples, leaving the file ready to be
+        read again from the start.
+
+        :param audio_file: Open audio file.
+        :return: Decoded samples and sample rate, or None if the file could
+        not be decoded (e.g. it is empty).
+        """
+        audio_file.seek(0)
+        try:
+            pcm, sample_rate = sf.read(audio_file, dtype="int16")
+        except sf.LibsndfileError:
+            return None
+        finally:
+            audio_file.seek(0)
+        return pcm, sample_rate
+
+    @staticmethod
+    def _audio_duration(audio_file: AudioFileType) -> int:
+        """
+        Get the billable duration of an audio file without decoding it,
+        leaving the file ready to be read again from the start.
+
+        :param audio_file: Open audio file.
+        :return: Duration in seconds, rounded up. 0 if the file could not be
+        read.
+        """
+        audio_file.seek(0)
+        try:
+            info = sf.info(audio_file)
+        except sf.LibsndfileError:
+            return 0
+        finally:
+            audio_file.seek(0)
+        return ceil(info.frames / info.samplerate)
@@ -0,0 +1,112 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+import numpy as np
+from loguru import logger
+
+from chat_toolkit.common.custom_types import PartialTranscriptCallbackType
+from chat_toolkit.common.dsp_pool import DSP_POOL
+
+
+class PartialTranscriber:
+    """
+    Transcribes the audio recorded so far in a background thread every time
+    another chunk of audio has been recorded, so that callers can act on
+    speech before recording has finished. Only one partial transcription is
+    in flight at a time; chunks recorded in the meantime are folded into the
+    next one. Recorded blocks are joined and encoded in the background too
+    (in `DSP_POOL`, if it is enabled), so the recording loop only ever
+    appends to a list.
+
+    Each partial transcription sends everything recorded so far, so the
+    audio sent (and billed) grows quadratically with the length of the
+    recording: n chunks of audio send n(n+1)/2 chunks in total. Partial
+    transcriptions therefore stop once `max_seconds` of audio has been
+    recorded, bounding the extra audio sent per recording to about
+    max_seconds² / (2 * chunk_seconds) seconds.
+    """
+
+    def __init__(
+        self,
+        transcribe: Callable[[bytes], tuple[str, dict]],
+        on_partial_transcript: PartialTranscriptCallbackType,
+        sample_rate: int,
+        chunk_seconds: float,
+        max_seconds: Optional[float] = None,
+    ):
+        """
+        Instantiate a partial transcriber.
+
+        :param transcribe: Function used to transcribe a buffer of encoded
+        audio.
+        :param on_partial_transcript: Called (from a separate thread) with
+        each partial transcript.
+        :param sample_rate: Sample rate of the recorded audio.
+        :param chunk_seconds: Seconds of audio to record between partial
+        transcriptions.
+        :param max_seconds: Seconds of audio after which no more partial
+        transcriptions are started. If None, partial transcriptions continue
+        for the whole recording.
+        """
+        self._transcribe = transcribe
+        self._on_partial_transcript = on_partial_transcript
+        self._sample_rate = sample_rate
+        self._chunk_frames = int(chunk_seconds * sample_rate)
+        self._max_frames = (
+            None if max_seconds is None else int(max_seconds * sample_rate)
+        )
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._blocks: list[np.ndarray] = []
+        self._frames = 0
+        self._frames_since_chunk = 0
+        self._in_flight: Optional[Future] = None
+
+    def add_block(self, block: np.ndarray) -> None:
+        """
+        Add a block of recorded audio, starting a partial transcription if
+        enough audio has been recorded since the last one.
+
+        :param block: Block of recorded audio.
+        :return:
+        """
+        if self._max_frames is not None and self._frames >= self._max_frames:
+            return
+        self._blocks.append(block)
+        self._frames += len(block)
+        self._frames_since_chunk += len(block)
+        if self._frames_since_chunk < self._chunk_frames:
+            return
+        if self._in_flight is not None and not self._in_flight.done():
+            return
+
+        self._frames_since_chunk = 0
+        self._in_flight = self._executor.submit(
+            self._transcribe_partial, list(self._blocks)
+        )
+
+    def close(self) -> None:
+        """
+        Stop starting partial transcriptions. A partial transcription that
+        is already in flight is left to finish in the background.
+
+        :return:
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _transcribe_partial(self, blocks: list[np.ndarray]) -> None:
+        """
+        Encode and transcribe some audio, then pass on the transcript.
+
+        :param blocks: Blocks of audio recorded so far.
+        :return:
+        """
+        # Nothing else would see errors raised in this thread
+        try:
+            audio = DSP_POOL.encode_wav(
+                np.concatenate(blocks), self._sample_rate
+            )
+            text, _ = self._transcribe(audio)
+            self._on_partial_transcript(text)
+        except Exception:
+            # Partial transcripts are best effort, the final one is not
+            logger.exception("Partial transcription failed")
@@ -1,18 +1,38 @@
 from abc import ABC, abstractmethod
-from math import ceil
+from functools import lru_cache
 from pathlib import Path
 from queue import Queue
-from typing import Union
+from typing import Any, Callable, Optional, Union
 
 import sounddevice as sd
 import soundfile as sf
 from loguru import logger
 
 from chat_toolkit.common.constants import TMP_DIR
+from chat_toolkit.common.custom_types import (
+    AudioBlockCallbackType,
+    AudioInputType,
+    PartialTranscriptCallbackType,
+)
+from chat_toolkit.common.exceptions import TranscriptionUnsupportedError
 from chat_toolkit.common.key_tracker import KeyTracker
+from chat_toolkit.common.tracing import TRACER
 from chat_toolkit.components.component_base import ComponentBase
 
 
+@lru_cache(maxsize=None)
+def default_sample_rate(device: Union[int, str]) -> int:
+    """
+    Get the default sample rate of an input device. Querying devices can be
+    slow, so each device is only queried once per process. Call
+    `default_sample_rate.cache_clear()` if devices change.
+
+    :param device: Device to query. Must be understood by sounddevice.
+    :return: Default sample rate of the device.
+    """
+    return int(sd.query_devices(device, "input")["default_samplerate"])
+
+
 class SpeechToTextComponentBase(ComponentBase, ABC):
     """
     Used to create speech to text components in a standardized manner.
@@ -37,73 +57,203 @@ class SpeechToTextComponentBase(ComponentBase, ABC):
         super().__init__(**kwargs)
         self.tmp_file_directory = tmp_file_directory
         self.device = device
-        self.sample_rate = int(
-            sd.query_devices(self.device, "input")["default_samplerate"]
-        )
+        self.sample_rate = default_sample_rate(self.device)
 
         self._channels = channels
         self._seconds_transcribed = 0
+        self._input_overflows = 0
+        self._recording_started_listeners: list[Callable[[], None]] = []
 
     @abstractmethod
-    def transcribe_speech(self) -> tuple[str, dict]:
+    def transcribe_speech(
+        self,
+        on_partial_transcript: Optional[PartialTranscriptCallbackType] = None,
+    ) -> tuple[str, dict]:
         """
         Abstract method for transcribing speech.
 
+        :param on_partial_transcript: Called with transcripts of the speech
+        recorded so far, while recording is still in progress. Optional.
+        Components that cannot produce partial transcripts may ignore it.
         :return: Transcription text, any applicable metadata.
         """
         pass
 
-    def record_unspecified_length_audio(self, file_path: str) -> None:
+    def transcribe(self, audio: AudioInputType) -> tuple[str, dict]:
+        """
+        Transcribe audio that has already been recorded, e.g. with
+        `record_unspecified_length_audio`. Optional for speech to text
+        components, but required to record and transcribe separately.
+
+        :param audio: Open audio file, or a buffer of encoded audio.
+        :return: Transcription text, any applicable metadata.
+        """
+        raise TranscriptionUnsupportedError
+
+    @property
+    def can_transcribe_recordings(self) -> bool:
+        """
+        Read only property representing whether this object implements
+        `transcribe`.
+
+        :return:
+        """
+        return (
+            type(self).transcribe is not SpeechToTextComponentBase.transcribe
+        )
+
+    @property
+    def input_overflows(self) -> int:
+        """
+        Read only property representing how many blocks of audio input have
+        been lost so far, because they weren't read from the device in time
+        (e.g. because the thread reading them was waiting for the GIL).
+
+        :return:
+        """
+        return self._input_overflows
+
+    def record_unspecified_length_audio(
+        self,
+        file_path: str,
+        on_audio_block: Optional[AudioBlockCallbackType] = None,
+    ) -> None:
         """
         Wait for user to push space bar, then record while they are holding.
 
         :param file_path: Path to save audio to.
+        :param on_audio_block: Called with each block of audio after it has
+        been saved. Optional.
         :return:
         """
         queue: Queue = Queue()
         key_tracker = KeyTracker()
+        input_overflows = self._input_overflows
 
         def _callback(indata, frames, time, status):  # noqa: F841
             """
             This is called (from a separate thread) for each audio block.
             """
-            if status:
-                logger.error(
-                    "Callback flag found",
-                    status=str(status),
-                    indatatype=type(indata),
-                    frames=str(frames),
-                    time=str(time),
-                )
+            self._check_callback_status(indata, frames, time, status)
             queue.put(indata.copy())
 
         try:
             # Make sure the file is opened before recording anything:
-            with sf.SoundFile(
-                file_path,
-                mode="w+b",
-                samplerate=self.sample_rate,
-                channels=self._channels,
-                closefd=False,
-            ) as audio_file:
+            with TRACER.span(
+                "record_unspecified_length_audio", type(self).__qualname__
+            ), self._open_recording_file(file_path) as audio_file:
                 key_tracker.wait_for_recording_to_start()
+                self._notify_recording_started()
 
-                with sd.InputStream(
-                    samplerate=self.sample_rate,
-                    device=self.device,
-                    channels=self._channels,
-                    callback=_callback,
+                with self._timings.time("recording"), self._input_stream(
+                    _callback
                 ):
                     while True:
-                        audio_file.write(queue.get())
+                        block = queue.get()
+                        audio_file.write(block)
+                        if on_audio_block is not None:
+                            on_audio_block(block)
                         if not key_tracker.check_if_still_recording():
-                            self._seconds_transcribed += ceil(
-                                audio_file.frames / self.sample_rate
-                            )
                             break
 
         except KeyboardInterrupt:
             key_tracker.stop_tracking()
+        finally:
+            self._report_input_overflows(input_overflows)
+
+    def add_recording_started_listener(
+        self, listener: Callable[[], None]
+    ) -> None:
+        """
+        Register a function to call whenever the user starts recording, e.g.
+        to stop text to speech when the user barges in.
+
+        :param listener: Function to call.
+        :return:
+        """
+        self._recording_started_listeners.append(listener)
+
+    def _notify_recording_started(self) -> None:
+        """
+        Call every function registered to be called when the user starts
+        recording.
+
+        :return:
+        """
+        for listener in self._recording_started_listeners:
+            listener()
+
+    def _open_recording_file(self, file_path: str) -> sf.SoundFile:
+        """
+        Open a file to write recorded audio to.
+
+        :param file_path: Path to save audio to.
+        :return: Open sound file.
+        """
+        return sf.SoundFile(
+            file_path,
+            mode="w+b",
+            samplerate=self.sample_rate,
+            channels=self._channels,
+            closefd=False,
+        )
+
+    def _input_stream(self, callback: Callable) -> sd.InputStream:
+        """
+        Create a stream that passes blocks of audio from the input device to
+        a callback.
+
+        :param callback: Callback to process each block of audio. Called from
+        a separate thread.
+        :return: Input stream, to be used as a context manager.
+        """
+        return sd.InputStream(
+            samplerate=self.sample_rate,
+            device=self.device,
+            channels=self._channels,
+            callback=callback,
+        )
+
+    def _check_callback_status(
+        self, indata: Any, frames: int, time: Any, status: Any
+    ) -> None:
+        """
+        Log any flags raised by sounddevice for a block of audio, and count
+        input overflows.
+
+        :param indata: Block of audio.
+        :param frames: Number of frames in the block.
+        :param time: Timing information of the block.
+        :param status: Status flags of the block.
+        :return:
+        """
+        if status:
+            logger.error(
+                "Callback flag found",
+                status=str(status),
+                indatatype=type(indata),
+                frames=str(frames),
+                time=str(time),
+            )
+            if status.input_overflow:
+                self._input_overflows += 1
+                self._count("input_overflows")
+
+    def _report_input_overflows(self, before: int) -> None:
+        """
+        Warn about blocks of audio input lost during a recording.
+
+        :param before: Number of input overflows before the recording.
+        :return:
+        """
+        lost = self._input_overflows - before
+        if lost:
+            logger.warning(
+                "{} blocks of audio input overflowed while recording ({} "
+                "so far)",
+                lost,
+                self._input_overflows,
+            )
 
     @property
     def seconds_transcribed(self) -> int:
@@ -0,0 +1,82 @@
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from chat_toolkit.common.caching import DiskCache, LRUCache
+from chat_toolkit.common.dsp_pool import DSP_POOL
+
+
+class TranscriptionCache:
+    """
+    Two tier cache of transcriptions. Entries are keyed by a hash of the
+    decoded audio and the model that transcribed it, so the same recording
+    is only ever paid for once, regardless of the file it is stored in.
+    Lookups check memory first, then disk (if a directory is provided).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        directory: Optional[Path] = None,
+        max_disk_bytes: Optional[int] = None,
+    ):
+        """
+        Instantiate a transcription cache.
+
+        :param max_entries: Maximum number of transcriptions to keep in
+        memory.
+        :param directory: Directory to persist transcriptions to. If None,
+        transcriptions are only cached in memory.
+        :param max_disk_bytes: Maximum total size of transcriptions persisted
+        to disk. If None, the disk tier is unbounded.
+        """
+        self._memory: LRUCache[str, str] = LRUCache(max_entries)
+        self._disk = (
+            DiskCache(directory, max_bytes=max_disk_bytes, suffix="txt")
+            if directory is not None
+            else None
+        )
+
+    @staticmethod
+    def make_key(
+        pcm: np.ndarray, sample_rate: int, model: Optional[str]
+    ) -> str:
+        """
+        Create a cache key for some decoded audio. Audio is hashed in
+        `DSP_POOL`, if it is enabled.
+
+        :param pcm: Decoded audio samples.
+        :param sample_rate: Sample rate of the audio.
+        :param model: Model used for transcription.
+        :return: Cache key.
+        """
+        prefix = f"{model}:{sample_rate}:{pcm.dtype}:{pcm.shape}".encode()
+        return DSP_POOL.digest(pcm, prefix)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a transcription, promoting disk hits into memory.
+
+        :param key: Key created by `make_key`.
+        :return: Cached transcription, or None if it is not cached.
+        """
+        text = self._memory.get(key)
+        if text is None and self._disk is not None:
+            data = self._disk.get(key)
+            if data is not None:
+                text = data.decode("utf-8")
+                self._memory.put(key, text)
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        """
+        Store a transcription in every tier.
+
+        :param key: Key created by `make_key`.
+        :param text: Transcription to store.
+        :return:
+        """
+        self._memory.put(key, text)
+        if self._disk is not None:
+            self._disk.put(key, text.encode("utf-8"))
@@ -0,0 +1,154 @@
+import threading
+import time
+import weakref
+from collections.abc import Generator
+from contextlib import contextmanager
+from typing import Any, Optional
+
+import pyttsx3
+from loguru import logger
+
+# Engine properties that affect how text sounds. Components get the engine's
+# defaults for these, unless they override them
+BASE_PYTTSX3_PROPERTIES = ("voice", "rate", "volume")
+
+
+class _PooledEngine:
+    """
+    A pyttsx3 engine shared by components, and the properties currently
+    applied to it.
+    """
+
+    def __init__(self, engine: pyttsx3.Engine):
+        self.engine = engine
+        self.lock = threading.RLock()
+        self.base_properties = {
+            name: engine.getProperty(name) for name in BASE_PYTTSX3_PROPERTIES
+        }
+        self.applied_properties = dict(self.base_properties)
+        self.owner: Optional[object] = None
+
+
+class Pyttsx3EnginePool:
+    """
+    Process wide pool of pyttsx3 engines, shared by text to speech
+    components. pyttsx3 only ever creates one engine per driver, so every
+    component using a driver takes turns using its engine. Each component
+    keeps its own overlay of properties, which is applied (only where it
+    differs from what is already applied) whenever the component takes its
+    turn. Properties are applied without calling `runAndWait`, because
+    pyttsx3 applies them straight away while the engine is idle.
+    """
+
+    def __init__(self):
+        self._engines: dict[Optional[str], _PooledEngine] = {}
+        self._lock = threading.Lock()
+        self._sessions: weakref.WeakSet = weakref.WeakSet()
+        self._engines_created = 0
+        self._construction_seconds = 0.0
+
+    def register(self, session: object) -> None:
+        """
+        Register a component using the pool, so that it is included in the
+        pool's summary for as long as it is alive.
+
+        :param session: Component using the pool.
+        :return:
+        """
+        self._sessions.add(session)
+
+    @contextmanager
+    def use(
+        self,
+        properties: dict[str, Any],
+        owner: Optional[object] = None,
+        driver_name: Optional[str] = None,
+    ) -> Generator[pyttsx3.Engine, None, None]:
+        """
+        Context manager for taking a turn using an engine. The engine is
+        locked for the duration of the turn.
+
+        :param properties: Overlay of properties to apply to the engine,
+        on top of its defaults.
+        :param owner: Component taking the turn. Only the owner of a turn
+        can stop it with `stop`. Optional.
+        :param driver_name: pyttsx3 driver to use. If None, pyttsx3's
+        default driver for the platform is used.
+        :return: None, but yields the engine.
+        """
+        pooled = self._get(driver_name)
+        with pooled.lock:
+            self._apply(pooled, properties)
+            previous_owner, pooled.owner = pooled.owner, owner
+            try:
+                yield pooled.engine
+            finally:
+                pooled.owner = previous_owner
+
+    def stop(self, owner: object, driver_name: Optional[str] = None) -> None:
+        """
+        Stop an engine, if it is being used by the given owner. Called from a
+        different thread to the one using the engine.
+
+        :param owner: Component whose turn should be stopped.
+        :param driver_name: pyttsx3 driver of the engine.
+        :return:
+        """
+        pooled = self._engines.get(driver_name)
+        if pooled is not None and pooled.owner is owner:
+            pooled.engine.stop()
+
+    @property
+    def summary(self) -> dict:
+        """
+        Property representing the engines in the pool and how long they took
+        to create.
+
+        :return: Summary statistics.
+        """
+        return {
+            "live_engines": len(self._engines),
+            "sessions": len(self._sessions),
+            "engines_created": self._engines_created,
+            "construction_seconds": self._construction_seconds,
+        }
+
+    def _get(self, driver_name: Optional[str]) -> _PooledEngine:
+        """
+        Get the engine for a driver, creating it if necessary.
+
+        :param driver_name: pyttsx3 driver of the engine.
+        :return: The pooled engine.
+        """
+        with self._lock:
+            if driver_name not in self._engines:
+                started = time.monotonic()
+                engine = pyttsx3.init(driver_name)
+                self._engines[driver_name] = _PooledEngine(engine)
+                seconds = time.monotonic() - started
+                self._engines_created += 1
+                self._construction_seconds += seconds
+                logger.debug(
+                    "Created pyttsx3 engine ({}) in {:.3f} seconds",
+                    driver_name or "default driver",
+                    seconds,
+                )
+            return self._engines[driver_name]
+
+    @staticmethod
+    def _apply(pooled: _PooledEngine, properties: dict[str, Any]) -> None:
+        """
+        Apply a property overlay to an engine, setting only the properties
+        that differ from those already applied.
+
+        :param pooled: Engine to apply properties to.
+        :param properties: Overlay of properties.
+        :return:
+        """
+        for name, value in {**pooled.base_properties, **properties}.items():
+            if pooled.applied_properties.get(name, object()) != value:
+                pooled.engine.setProperty(name, value)
+                pooled.applied_properties[name] = value
+
+
+ENGINE_POOL = Pyttsx3EnginePool()
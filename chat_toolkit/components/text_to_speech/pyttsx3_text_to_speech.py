@@ -1,33 +1,133 @@
-from typing import Any
+import multiprocessing
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    as_completed,
+    wait,
+)
+from multiprocessing.context import BaseContext
+from pathlib import Path
+from typing import Any, ContextManager, Optional
 
 import pyttsx3
+import sounddevice as sd
 
+from chat_toolkit.common.exceptions import (
+    MissingSpeechCacheError,
+    SynthesisWorkerError,
+)
+from chat_toolkit.common.tracing import TRACER
+from chat_toolkit.common.utils import temporary_file
+from chat_toolkit.components.text_to_speech.pyttsx3_engine_pool import (
+    BASE_PYTTSX3_PROPERTIES,
+    ENGINE_POOL,
+    Pyttsx3EnginePool,
+)
+from chat_toolkit.components.text_to_speech.speech_cache import (
+    DecodedAudioType,
+    SpeechCache,
+)
 from chat_toolkit.components.text_to_speech.text_to_speech_component_base import (  # noqa E501
     TextToSpeechComponentBase,
 )
 
+# Engine owned by a synthesis worker process
+_worker_engine: Optional[pyttsx3.Engine] = None
+
+
+def _init_synthesis_worker(properties: dict[str, Any]) -> None:
+    """
+    Create the engine used by a synthesis worker process.
+
+    :param properties: Engine properties to apply.
+    :return:
+    """
+    global _worker_engine
+    _worker_engine = pyttsx3.init()
+    for name, value in properties.items():
+        _worker_engine.setProperty(name, value)
+    _worker_engine.runAndWait()
+
+
+def _synthesize_to_file(text: str, file_path: Path) -> Path:
+    """
+    Render some text to an audio file, in a synthesis worker process.
+
+    :param text: Text to render.
+    :param file_path: Path to save audio to.
+    :return: Path the audio was saved to.
+    """
+    if _worker_engine is None:
+        raise SynthesisWorkerError
+    _worker_engine.save_to_file(text, str(file_path))
+    _worker_engine.runAndWait()
+    return file_path
+
 
 class Pyttsx3TextToSpeech(TextToSpeechComponentBase):
     """
     Class for interacting with pyttsx, a free, offline text to speech package.
     """
 
-    def __init__(self, speaking_rate: int = 175):
+    def __init__(
+        self,
+        speaking_rate: int = 175,
+        speech_cache: Optional[SpeechCache] = None,
+        engine_pool: Pyttsx3EnginePool = ENGINE_POOL,
+    ):
+        """
+        Instantiate a pyttsx3 text to speech component.
+
+        :param speaking_rate: Speaking rate to use.
+        :param speech_cache: Cache of synthesized speech. If provided, text
+        is rendered to a file once, and played from memory after that.
+        Optional.
+        :param engine_pool: Pool of engines to share. By default, every
+        component in the process shares the same pool.
+        """
         super().__init__(
             model="pyttsx3", pricing_rate=0.0, speaking_rate=speaking_rate
         )
-        self.engine = pyttsx3.init()
+        self._speech_cache = speech_cache
+        self._cache_hits = 0
+        self._engine_pool = engine_pool
+        self._engine_pool.register(self)
+        self._pyttsx3_properties: dict[str, Any] = {}
         self.set_pyttsx3_property("rate", self.speaking_rate)
 
+    def use_engine(self) -> ContextManager[pyttsx3.Engine]:
+        """
+        Take a turn using the pyttsx3 engine, with this object's properties
+        applied. The engine is shared with other components, so it is only
+        this object's to use until the turn ends, and its properties should
+        be changed with `set_pyttsx3_property`.
+
+        :return: Context manager yielding the engine.
+        """
+        return self._engine_pool.use(self._pyttsx3_properties, owner=self)
+
     def set_pyttsx3_property(self, pyttsx3_property: str, value: Any) -> None:
         """
         Set/update a property in the pyttsx3 engine. See their documentation
-        for more information.
+        for more information. Properties are applied the next time this
+        object uses the engine.
         :param pyttsx3_property: property to alter
         :param value: value to set
         """
-        self.engine.setProperty(pyttsx3_property, value)
-        self.engine.runAndWait()
+        self._pyttsx3_properties[pyttsx3_property] = value
+
+    def warm_up(self) -> None:
+        """
+        Create the shared engine, if it hasn't been created yet, and apply
+        this object's properties to it.
+
+        :return:
+        """
+        with self.use_engine():
+            pass
 
     def say_text(self, text: str) -> dict:
         """
@@ -36,9 +136,162 @@ class Pyttsx3TextToSpeech(TextToSpeechComponentBase):
         :param text: Text to say.
         :return: Any applicable metadata.
         """
-        self.engine.say(text)
-        self.engine.runAndWait()
-        return {}
+        with TRACER.span("say_text", type(self).__qualname__):
+            return self._say_text(text)
+
+    def _say_text(self, text: str) -> dict:
+        """
+        Say some text, from the speech cache if one is configured.
+
+        :param text: Text to say.
+        :return: Any applicable metadata.
+        """
+        if self._speech_cache is None:
+            with self._timings.time("speech"), self.use_engine() as engine:
+                engine.say(text)
+                engine.runAndWait()
+            return {}
+
+        key = self._speech_cache_key(text)
+        decoded = self._speech_cache.get(key)
+        cache_hit = decoded is not None
+        if decoded is None:
+            with self._timings.time("synthesis"):
+                decoded = self._render_text(self._speech_cache, key, text)
+        else:
+            self._cache_hits += 1
+            self._count("cache_hits")
+
+        data, sample_rate = decoded
+        with self._timings.time("playback"):
+            sd.play(data, sample_rate)
+            sd.wait()
+        return {"cache_hit": cache_hit}
+
+    def warm_speech_cache(self, phrases: Iterable[str]) -> int:
+        """
+        Render phrases that are likely to be said (e.g. greetings) into the
+        speech cache ahead of time, using the engine's current properties.
+
+        :param phrases: Phrases to render.
+        :return: Number of phrases that were rendered, i.e. were not already
+        cached.
+        """
+        if self._speech_cache is None:
+            raise MissingSpeechCacheError
+
+        rendered = 0
+        for phrase in phrases:
+            key = self._speech_cache_key(phrase)
+            if key not in self._speech_cache:
+                self._render_text(self._speech_cache, key, phrase)
+                rendered += 1
+        return rendered
+
+    def synthesize_to_files(
+        self,
+        items: Iterable[tuple[str, Path]],
+        workers: Optional[int] = None,
+        mp_context: Optional[BaseContext] = None,
+    ) -> Iterator[tuple[str, Path]]:
+        """
+        Render many pieces of text to audio files in parallel. pyttsx3
+        engines are not thread safe, so each worker is a separate process
+        with its own engine, configured with this engine's current voice,
+        rate and volume. Items are read as workers become free, with at most
+        two per worker in flight, so `items` can be a lazy iterable of any
+        length.
+
+        :param items: Text to render, and the path to save its audio to.
+        :param workers: Number of worker processes. If None, one per CPU.
+        :param mp_context: Context to start worker processes with. If None,
+        workers are spawned, since forking a process with running threads
+        (e.g. audio callbacks, or the speech worker) can deadlock the
+        workers.
+        :return: None, but yields text and the path its audio was saved to,
+        as soon as each file is finished.
+        """
+        workers = workers or os.cpu_count() or 1
+        properties = self._current_properties()
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp_context or multiprocessing.get_context("spawn"),
+            initializer=_init_synthesis_worker,
+            initargs=(properties,),
+        )
+        in_flight: dict[Future, str] = {}
+        try:
+            for text, path in items:
+                future = executor.submit(_synthesize_to_file, text, Path(path))
+                in_flight[future] = text
+                if len(in_flight) < 2 * workers:
+                    continue
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    yield in_flight.pop(future), future.result()
+            for future in as_completed(in_flight):
+                yield in_flight[future], future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @property
+    def cache_hits(self) -> int:
+        """
+        Read only property representing how many pieces of text this object
+        has said from its speech cache so far.
+
+        :return:
+        """
+        return self._cache_hits
+
+    def stop_text(self) -> None:
+        """
+        Stop text that is currently being said.
+
+        :return:
+        """
+        if self._speech_cache is not None:
+            sd.stop()
+        self._engine_pool.stop(self)
+
+    def _speech_cache_key(self, text: str) -> str:
+        """
+        Create a speech cache key for some text, using the engine's current
+        properties.
+
+        :param text: Text to be said.
+        :return: Cache key.
+        """
+        return SpeechCache.make_key(text, self._current_properties())
+
+    def _current_properties(self) -> dict[str, Any]:
+        """
+        Get the engine properties that affect how this object's text sounds.
+
+        :return: Property names and values.
+        """
+        with self.use_engine() as engine:
+            return {
+                name: engine.getProperty(name)
+                for name in BASE_PYTTSX3_PROPERTIES
+            }
+
+    def _render_text(
+        self, speech_cache: SpeechCache, key: str, text: str
+    ) -> DecodedAudioType:
+        """
+        Render some text to an audio file with the engine, and cache it.
+
+        :param speech_cache: Cache to store the rendered audio in.
+        :param key: Speech cache key for the text.
+        :param text: Text to render.
+        :return: Decoded samples and sample rate.
+        """
+        with temporary_file("wav") as tmp, self.use_engine() as engine:
+            engine.save_to_file(text, tmp.name)
+            engine.runAndWait()
+            audio = Path(tmp.name).read_bytes()
+        return speech_cache.put(key, audio)
 
     @property
     def _cost_estimate_data(self) -> tuple[float, dict]:
@@ -48,4 +301,6 @@ class Pyttsx3TextToSpeech(TextToSpeechComponentBase):
 
         :return: Cost estimate in dollars, any applicable metadata.
         """
-        return 0.0, {}
+        if self._speech_cache is None:
+            return 0.0, {}
+        return 0.0, {"cache_hits": self._cache_hits}
@@ -0,0 +1,110 @@
+import hashlib
+import io
+import json
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import soundfile as sf
+
+from chat_toolkit.common.caching import DiskCache, LRUCache
+
+DecodedAudioType = tuple[np.ndarray, int]
+
+
+class SpeechCache:
+    """
+    Two tier cache of synthesized speech. Entries are keyed by a hash of the
+    text and every engine property that affects how it sounds (voice, rate,
+    etc.), so stock phrases are only ever synthesized once. Rendered audio
+    files are persisted to disk (if a directory is provided), while decoded
+    samples are kept in memory, ready to be played.
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        directory: Optional[Path] = None,
+        max_disk_bytes: Optional[int] = None,
+    ):
+        """
+        Instantiate a speech cache.
+
+        :param max_memory_bytes: Maximum total size of decoded samples to
+        keep in memory.
+        :param directory: Directory to persist rendered audio files to. If
+        None, speech is only cached in memory.
+        :param max_disk_bytes: Maximum total size of audio files persisted
+        to disk. If None, the disk tier is unbounded.
+        """
+        self._memory: LRUCache[str, DecodedAudioType] = LRUCache(
+            max_memory_bytes, sizeof=lambda decoded: decoded[0].nbytes
+        )
+        self._disk = (
+            DiskCache(directory, max_bytes=max_disk_bytes, suffix="wav")
+            if directory is not None
+            else None
+        )
+
+    @staticmethod
+    def make_key(text: str, properties: dict[str, Any]) -> str:
+        """
+        Create a cache key for some text.
+
+        :param text: Text to be said.
+        :param properties: Engine properties that affect how the text
+        sounds.
+        :return: Cache key.
+        """
+        digest = hashlib.sha256()
+        digest.update(
+            json.dumps(properties, sort_keys=True, default=str).encode()
+        )
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._memory or (
+            self._disk is not None and key in self._disk
+        )
+
+    def get(self, key: str) -> Optional[DecodedAudioType]:
+        """
+        Look up decoded speech, decoding and promoting disk hits into memory.
+
+        :param key: Key created by `make_key`.
+        :return: Decoded samples and sample rate, or None if the speech is
+        not cached.
+        """
+        decoded = self._memory.get(key)
+        if decoded is None and self._disk is not None:
+            audio = self._disk.get(key)
+            if audio is not None:
+                decoded = self._decode(audio)
+                self._memory.put(key, decoded)
+        return decoded
+
+    def put(self, key: str, audio: bytes) -> DecodedAudioType:
+        """
+        Store a rendered audio file in every tier.
+
+        :param key: Key created by `make_key`.
+        :param audio: Encoded audio file, e.g. the bytes of a WAV file.
+        :return: Decoded samples and sample rate.
+        """
+        decoded = self._decode(audio)
+        self._memory.put(key, decoded)
+        if self._disk is not None:
+            self._disk.put(key, audio)
+        return decoded
+
+    @staticmethod
+    def _decode(audio: bytes) -> DecodedAudioType:
+        """
+        Decode an audio file into samples that can be played.
+
+        :param audio: Encoded audio file.
+        :return: Decoded samples and sample rate.
+        """
+        data, sample_rate = sf.read(io.BytesIO(audio), dtype="float32")
+        return data, sample_rate
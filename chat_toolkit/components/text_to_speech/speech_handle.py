@@ -0,0 +1,101 @@
+import threading
+import time
+from typing import Callable, Optional
+
+
+class SpeechHandle:
+    """
+    Handle for a piece of text queued to be said by a text to speech
+    component's speech worker. Can be used to wait for the text to be said,
+    or to cancel it, whether it is still queued or already being said.
+    """
+
+    def __init__(self, text: str, stop: Callable[[], None]):
+        """
+        Instantiate a speech handle.
+
+        :param text: Text to say.
+        :param stop: Function that stops speech that is in progress.
+        """
+        self.text = text
+        self.metadata: Optional[dict] = None
+        self.exception: Optional[Exception] = None
+        self.started_at: Optional[float] = None
+        self._stop = stop
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._done = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        """
+        Read only property representing whether the text was cancelled.
+
+        :return:
+        """
+        return self._cancelled
+
+    @property
+    def done(self) -> bool:
+        """
+        Read only property representing whether the text has been said,
+        cancelled, or failed to be said.
+
+        :return:
+        """
+        return self._done.is_set()
+
+    def cancel(self) -> None:
+        """
+        Cancel the text. If it is still queued, it will never be said. If it
+        is being said, speech is stopped immediately.
+
+        :return:
+        """
+        with self._lock:
+            if self.done:
+                return
+            self._cancelled = True
+            speaking = self.started_at is not None
+        if speaking:
+            self._stop()
+        else:
+            self._done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the text has been said, cancelled, or failed to be said.
+
+        :param timeout: Maximum number of seconds to wait. If None, wait
+        indefinitely.
+        :return: Whether the handle is done.
+        """
+        return self._done.wait(timeout)
+
+    def start(self) -> bool:
+        """
+        Mark the text as being said. Used by the speech worker.
+
+        :return: Whether the text should be said (i.e. it was not cancelled).
+        """
+        with self._lock:
+            if self._cancelled:
+                return False
+            self.started_at = time.monotonic()
+            return True
+
+    def finish(
+        self,
+        metadata: Optional[dict] = None,
+        exception: Optional[Exception] = None,
+    ) -> None:
+        """
+        Mark the text as done. Used by the speech worker.
+
+        :param metadata: Metadata returned when the text was said.
+        :param exception: Exception raised while saying the text, if any.
+        :return:
+        """
+        self.metadata = metadata
+        self.exception = exception
+        self._done.set()
@@ -1,7 +1,11 @@
+import threading
 from abc import ABC, abstractmethod
+from queue import Queue
+from typing import Optional
 
 from chat_toolkit.common.exceptions import SpeakingRateError
 from chat_toolkit.components.component_base import ComponentBase
+from chat_toolkit.components.text_to_speech.speech_handle import SpeechHandle
 
 
 class TextToSpeechComponentBase(ComponentBase, ABC):
@@ -9,12 +13,27 @@ class TextToSpeechComponentBase(ComponentBase, ABC):
     Used to create text to speech components in standardized manner.
     """
 
-    def __init__(self, speaking_rate: int, **kwargs):
+    def __init__(
+        self, speaking_rate: int, max_queued_utterances: int = 8, **kwargs
+    ):
+        """
+        Instantiate a text to speech component object.
+
+        :param speaking_rate: Speaking rate to use.
+        :param max_queued_utterances: Maximum number of pieces of text that
+        may be waiting to be said by `say_text_async`.
+        :param kwargs: Keyword arguments to pass to parent class.
+        """
         super().__init__(**kwargs)
         if speaking_rate <= 0:
             raise SpeakingRateError
         self.speaking_rate = speaking_rate
 
+        self._speech_queue: Queue[SpeechHandle] = Queue(max_queued_utterances)
+        self._speech_worker: Optional[threading.Thread] = None
+        self._speech_worker_lock = threading.Lock()
+        self._pending_speech: list[SpeechHandle] = []
+
     @abstractmethod
     def say_text(self, text: str) -> dict:
         """
@@ -24,3 +43,69 @@ class TextToSpeechComponentBase(ComponentBase, ABC):
         :return: Any applicable metadata.
         """
         pass
+
+    def stop_text(self) -> None:
+        """
+        Stop text that is currently being said by `say_text`. Called from a
+        different thread to the one saying the text. By default, this does
+        nothing, so speech can only be cancelled before it starts. Components
+        that can be interrupted should override this.
+
+        :return:
+        """
+        pass
+
+    def say_text_async(self, text: str) -> SpeechHandle:
+        """
+        Queue some text to be said by a dedicated speech worker thread,
+        without waiting for it to be said. Blocks while the queue is full.
+        Do not call `say_text` directly while the speech worker is in use.
+
+        :param text: Text to speak.
+        :return: Handle that can be used to wait for or cancel the speech.
+        """
+        speech = SpeechHandle(text, self.stop_text)
+        with self._speech_worker_lock:
+            if self._speech_worker is None:
+                self._speech_worker = threading.Thread(
+                    target=self._run_speech_worker,
+                    name=f"{type(self).__qualname__}-speech",
+                    daemon=True,
+                )
+                self._speech_worker.start()
+            self._pending_speech = [
+                pending for pending in self._pending_speech if not pending.done
+            ]
+            self._pending_speech.append(speech)
+        self._speech_queue.put(speech)
+        return speech
+
+    def interrupt(self) -> None:
+        """
+        Cancel all text queued with `say_text_async`, stopping any text that
+        is being said immediately. Useful for letting the user barge in.
+
+        :return:
+        """
+        with self._speech_worker_lock:
+            pending_speech = self._pending_speech
+            self._pending_speech = []
+        for speech in pending_speech:
+            speech.cancel()
+
+    def _run_speech_worker(self) -> None:
+        """
+        Say queued text, one piece at a time, until the process exits.
+
+        :return:
+        """
+        while True:
+            speech = self._speech_queue.get()
+            if not speech.start():
+                continue
+            try:
+                metadata = self.say_text(speech.text)
+            except Exception as ex:
+                speech.finish(exception=ex)
+            else:
+                speech.finish(metadata=metadata)
@@ -0,0 +1,272 @@
+import os
+import threading
+import time
+from functools import partial
+from typing import Any, Callable, Optional
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+from loguru import logger
+
+from chat_toolkit.common.custom_types import StartingPromptsType
+from chat_toolkit.common.utils import latency_percentiles, temporary_file
+from chat_toolkit.components.chatbots.chatbot_component_base import (
+    ChatbotComponentBase,
+)
+from chat_toolkit.components.speech_to_text.speech_to_text_component_base import (  # noqa: E501
+    SpeechToTextComponentBase,
+    default_sample_rate,
+)
+from chat_toolkit.components.text_to_speech.text_to_speech_component_base import (  # noqa: E501
+    TextToSpeechComponentBase,
+)
+
+# Budgets for the toolkit's own overhead, in seconds. Scale them with the
+# BENCHMARK_BUDGET_SCALE environment variable on slow machines
+BUDGET_SCALE = float(os.environ.get("BENCHMARK_BUDGET_SCALE", "1"))
+SAMPLE_RATE = 16000
+BLOCK_FRAMES = 1024
+
+BudgetCheckType = Callable[[str, list[float], str, float], None]
+HoldSpaceType = Callable[[int], None]
+
+logger.disable("chat_toolkit")
+
+
+class LatencyModel:
+    """
+    Log-normal distribution of latencies, e.g. of requests to a model.
+    """
+
+    def __init__(self, median: float, sigma: float = 0.0, seed: int = 0):
+        self.median = median
+        self.sigma = sigma
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self._lock:
+            return self.median * float(np.exp(self._rng.normal(0, self.sigma)))
+
+
+class BusyTimer:
+    """
+    Records how long a fake component spends "working", so that it can be
+    subtracted from measurements to leave the toolkit's own overhead.
+    """
+
+    def __init__(self):
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def sleep(self, seconds: float) -> None:
+        started = time.monotonic()
+        time.sleep(seconds)
+        with self._lock:
+            self.busy_seconds += time.monotonic() - started
+
+
+class FakeChatBot(ChatbotComponentBase):
+    """
+    Chatbot component that responds after a modelled latency, with a
+    response of a configurable number of tokens (one word per token).
+    """
+
+    def __init__(
+        self,
+        latency: Optional[LatencyModel] = None,
+        completion_tokens: int = 50,
+    ):
+        super().__init__(model="fake", pricing_rate=0.0)
+        self.latency = latency or LatencyModel(0.0)
+        self.completion_tokens = completion_tokens
+        self.timer = BusyTimer()
+        self.history: list[str] = []
+
+    def prompt_chatbot(
+        self, start_prompts: StartingPromptsType = None
+    ) -> None:
+        pass
+
+    def send_message(self, message: str) -> tuple[str, dict]:
+        self.timer.sleep(self.latency.sample())
+        self.history.append(message)
+        return " ".join(["token"] * self.completion_tokens), {}
+
+    @property
+    def _cost_estimate_data(self) -> tuple[float, dict]:
+        return 0.0, {}
+
+
+class _FakeInputStream:
+    """
+    Stands in for a sounddevice input stream, passing blocks of silence to
+    its callback from a separate thread as fast as they are consumed.
+    """
+
+    def __init__(self, callback: Callable, channels: int):
+        self._callback = callback
+        self._block = np.zeros((BLOCK_FRAMES, channels), dtype=np.float32)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> "_FakeInputStream":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._callback(self._block, BLOCK_FRAMES, None, None)
+            # Yield, as a real device would between blocks
+            time.sleep(0)
+
+
+class FakeKeyTracker:
+    """
+    Stands in for the user holding space for a fixed number of blocks of
+    audio.
+    """
+
+    def __init__(self, blocks: int):
+        self._remaining = blocks
+
+    def wait_for_recording_to_start(self) -> None:
+        pass
+
+    def check_if_still_recording(self) -> bool:
+        self._remaining -= 1
+        return self._remaining > 0
+
+    def stop_tracking(self) -> None:
+        pass
+
+
+class FakeSpeechToText(SpeechToTextComponentBase):
+    """
+    Speech to text component that records fake audio of a configurable
+    duration through the real recording path, and transcribes it after a
+    modelled latency.
+    """
+
+    def __init__(
+        self,
+        latency: Optional[LatencyModel] = None,
+        audio_seconds: float = 1.0,
+        transcript: str = "Hello there",
+        **kwargs,
+    ):
+        super().__init__(model="fake", pricing_rate=0.0, **kwargs)
+        self.latency = latency or LatencyModel(0.0)
+        self.audio_seconds = audio_seconds
+        self.transcript = transcript
+        self.timer = BusyTimer()
+
+    def transcribe_speech(
+        self, on_partial_transcript=None
+    ) -> tuple[str, dict]:
+        with temporary_file(
+            "wav", tmp_file_directory=self.tmp_file_directory
+        ) as tmp:
+            self.record_unspecified_length_audio(tmp.name)
+            return self.transcribe(tmp)
+
+    def transcribe(self, audio) -> tuple[str, dict]:
+        self.timer.sleep(self.latency.sample())
+        return self.transcript, {}
+
+    @property
+    def blocks(self) -> int:
+        return max(int(self.audio_seconds * SAMPLE_RATE / BLOCK_FRAMES), 1)
+
+    def _input_stream(self, callback: Callable) -> _FakeInputStream:
+        return _FakeInputStream(callback, self._channels)
+
+    @property
+    def _cost_estimate_data(self) -> tuple[float, dict]:
+        return 0.0, {}
+
+
+class FakeTextToSpeech(TextToSpeechComponentBase):
+    """
+    Text to speech component that takes as long to say text as it would take
+    to speak at its speaking rate, scaled down by `time_scale`.
+    """
+
+    def __init__(self, speaking_rate: int = 175, time_scale: float = 0.001):
+        super().__init__(
+            model="fake", pricing_rate=0.0, speaking_rate=speaking_rate
+        )
+        self.time_scale = time_scale
+        self.timer = BusyTimer()
+
+    def say_text(self, text: str) -> dict:
+        seconds = len(text.split()) / self.speaking_rate * 60
+        self.timer.sleep(seconds * self.time_scale)
+        return {}
+
+    @property
+    def _cost_estimate_data(self) -> tuple[float, dict]:
+        return 0.0, {}
+
+
+@pytest.fixture
+def fake_audio_device(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Fixture that lets speech to text components be created without an audio
+    device.
+    """
+    monkeypatch.setattr(
+        "sounddevice.query_devices",
+        Mock(return_value={"default_samplerate": str(SAMPLE_RATE)}),
+    )
+    default_sample_rate.cache_clear()
+
+
+@pytest.fixture
+def hold_space(monkeypatch: pytest.MonkeyPatch) -> HoldSpaceType:
+    """
+    Fixture that makes every recording last a fixed number of blocks of
+    audio, without a keyboard.
+    """
+
+    def _inner(blocks: int) -> None:
+        monkeypatch.setattr(
+            "chat_toolkit.components.speech_to_text"
+            ".speech_to_text_component_base.KeyTracker",
+            partial(FakeKeyTracker, blocks),
+        )
+
+    return _inner
+
+
+@pytest.fixture
+def check_budget() -> BudgetCheckType:
+    """
+    Fixture that reports a sample of overheads, and fails if a percentile of
+    them is over budget.
+    """
+
+    def _inner(
+        name: str, overheads: list[float], percentile: str, budget: float
+    ) -> None:
+        latencies = latency_percentiles(overheads)
+        print(
+            f"\n{name}: "
+            + ", ".join(
+                f"{stat} {value * 1000:.3f}ms"
+                for stat, value in latencies.items()
+                if stat != "count"
+            )
+        )
+        assert latencies[percentile] <= budget * BUDGET_SCALE, (
+            f"{name} {percentile} overhead of "
+            f"{latencies[percentile] * 1000:.3f}ms is over budget "
+            f"({budget * BUDGET_SCALE * 1000:.3f}ms)"
+        )
+
+    return _inner
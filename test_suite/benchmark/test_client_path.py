@@ -0,0 +1,58 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+import pytest
+
+from chat_toolkit.common.openai_stub_server import OpenAIStubServer
+from chat_toolkit.components.chatbots.openai_chatbot import OpenAIChatBot
+from test_suite.benchmark.conftest import BudgetCheckType
+
+LATENCY = 0.005
+CONVERSATIONS = 8
+TURNS = 20
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_client_overhead_under_concurrency(
+    monkeypatch: pytest.MonkeyPatch,
+    check_budget: BudgetCheckType,
+    stream: bool,
+) -> None:
+    """
+    Benchmark the time OpenAI's client adds to each request over HTTP, with
+    many conversations at once, against a local stub server.
+    """
+    monkeypatch.setattr(
+        "chat_toolkit.components.chatbots.openai_chatbot.set_openai_api_key",
+        Mock(),
+    )
+    monkeypatch.setattr("openai.api_key", "stub")
+    server = OpenAIStubServer(latency=LATENCY, completion_tokens=20)
+
+    def _converse(_: int) -> list[float]:
+        chatbot = OpenAIChatBot()
+        overheads = []
+        for turn in range(TURNS):
+            started = time.monotonic()
+            if stream:
+                "".join(chatbot.stream_message(f"Message {turn}"))
+            else:
+                chatbot.send_message(f"Message {turn}")
+            overheads.append(time.monotonic() - started - LATENCY)
+        return overheads
+
+    with server.running() as api_base:
+        monkeypatch.setattr("openai.api_base", api_base)
+        with ThreadPoolExecutor(CONVERSATIONS) as executor:
+            overheads = [
+                overhead
+                for conversation in executor.map(
+                    _converse, range(CONVERSATIONS)
+                )
+                for overhead in conversation
+            ]
+
+    assert server.usage["requests"] == CONVERSATIONS * TURNS
+    name = "HTTP " + ("stream_message" if stream else "send_message")
+    check_budget(name, overheads, "p50", 0.05)
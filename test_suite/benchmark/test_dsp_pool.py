@@ -0,0 +1,127 @@
+import os
+import time
+from pathlib import Path
+from typing import Callable
+from unittest.mock import MagicMock, Mock
+
+import numpy as np
+import pytest
+
+from chat_toolkit.common.dsp_pool import DSP_POOL
+from chat_toolkit.common.utils import temporary_file
+from chat_toolkit.components.speech_to_text.partial_transcriber import (
+    PartialTranscriber,
+)
+from test_suite.benchmark.conftest import (
+    BLOCK_FRAMES,
+    SAMPLE_RATE,
+    BudgetCheckType,
+    FakeSpeechToText,
+    HoldSpaceType,
+    _FakeInputStream,
+)
+
+AUDIO_SECONDS = 3.0
+PARTIAL_SECONDS = 0.25
+
+
+class _RealTimeInputStream(_FakeInputStream):
+    """
+    Stands in for a sounddevice input stream, passing blocks of noise to its
+    callback at the rate a real device would. Blocks passed more than a
+    block late are flagged as input overflows, as a device's buffer would
+    have overflowed by then.
+    """
+
+    def __init__(self, callback: Callable, channels: int):
+        super().__init__(callback, channels)
+        self.lateness: list[float] = []
+        self._block = (
+            np.random.default_rng(0).standard_normal((BLOCK_FRAMES, channels))
+            / 10
+        ).astype(np.float32)
+
+    def _run(self) -> None:
+        period = BLOCK_FRAMES / SAMPLE_RATE
+        due = time.perf_counter() + period
+        while not self._stopped.is_set():
+            time.sleep(max(due - time.perf_counter(), 0))
+            lateness = time.perf_counter() - due
+            self.lateness.append(lateness)
+            # Stands in for sounddevice.CallbackFlags
+            status = MagicMock(input_overflow=lateness > period)
+            status.__bool__.return_value = lateness > period
+            self._callback(self._block, BLOCK_FRAMES, None, status)
+            due += period
+
+
+class _RealTimeSpeechToText(FakeSpeechToText):
+    """
+    Fake speech to text component that records in real time.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(audio_seconds=AUDIO_SECONDS, **kwargs)
+        self.streams: list[_RealTimeInputStream] = []
+
+    def _input_stream(self, callback: Callable) -> _RealTimeInputStream:
+        self.streams.append(_RealTimeInputStream(callback, self._channels))
+        return self.streams[-1]
+
+
+def _record(speech_to_text: _RealTimeSpeechToText, tmp_path: Path) -> None:
+    """
+    Record in real time, transcribing partial transcripts as audio comes in.
+    """
+    partial_transcriber = PartialTranscriber(
+        Mock(return_value=("", {})),
+        Mock(),
+        speech_to_text.sample_rate,
+        PARTIAL_SECONDS,
+    )
+    with temporary_file("wav", tmp_file_directory=tmp_path) as tmp:
+        speech_to_text.record_unspecified_length_audio(
+            tmp.name, partial_transcriber.add_block
+        )
+    partial_transcriber.close()
+
+
+@pytest.mark.skipif(
+    os.name != "posix", reason="Worker pool is only tested on POSIX"
+)
+def test_capture_with_dsp_pool(
+    fake_audio_device: None,
+    hold_space: HoldSpaceType,
+    check_budget: BudgetCheckType,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """
+    Benchmark how late blocks of audio reach the recording callback while
+    partial transcripts are encoded, with encoding in the recording process
+    and in `DSP_POOL`, and report input overflows of both.
+    """
+    overflows = {}
+    for pooled in (False, True):
+        speech_to_text = _RealTimeSpeechToText(tmp_file_directory=tmp_path)
+        hold_space(speech_to_text.blocks)
+        if pooled:
+            # Hand over every partial transcript, however short
+            monkeypatch.setattr(DSP_POOL, "min_frames", 0)
+            DSP_POOL.enable()
+        try:
+            _record(speech_to_text, tmp_path)
+        finally:
+            DSP_POOL.disable()
+        overflows[pooled] = speech_to_text.input_overflows
+
+    print(
+        f"\nInput overflows: {overflows[False]} encoding in process, "
+        f"{overflows[True]} encoding in DSP_POOL"
+    )
+    check_budget(
+        "Capture lateness (DSP_POOL)",
+        speech_to_text.streams[-1].lateness,
+        "p95",
+        0.005,
+    )
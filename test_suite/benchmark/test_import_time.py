@@ -0,0 +1,50 @@
+import json
+import subprocess  # noqa: S404
+import sys
+
+from test_suite.benchmark.conftest import BudgetCheckType
+
+RUNS = 5
+# Audio (and keyboard hook) dependencies, which a text only chatbot should
+# never import
+AUDIO_MODULES = ("sounddevice", "soundfile", "pyttsx3", "keyboard", "pyxhook")
+
+# Imports the chatbot and orchestrator in a fresh interpreter, after the
+# dependencies the chatbot can't do without, and reports how long the
+# toolkit's own imports took and which audio modules were imported
+_IMPORT_SCRIPT = f"""
+import json, sys, time
+import loguru, numpy, openai
+started = time.perf_counter()
+from chat_toolkit import OpenAIChatBot, Orchestrator
+seconds = time.perf_counter() - started
+audio = [module for module in {AUDIO_MODULES!r} if module in sys.modules]
+print(json.dumps({{"seconds": seconds, "audio_modules": audio}}))
+"""
+
+
+def test_text_only_import_time(check_budget: BudgetCheckType) -> None:
+    """
+    Benchmark how long importing the toolkit for a text only chatbot takes,
+    beyond its dependencies, and check that it doesn't import the audio
+    stack.
+    """
+    results = [
+        json.loads(
+            subprocess.run(  # noqa: S603
+                [sys.executable, "-c", _IMPORT_SCRIPT],
+                capture_output=True,
+                check=True,
+                text=True,
+            ).stdout
+        )
+        for _ in range(RUNS)
+    ]
+
+    assert all(not result["audio_modules"] for result in results)
+    check_budget(
+        "Text only import",
+        [result["seconds"] for result in results],
+        "p50",
+        0.1,
+    )
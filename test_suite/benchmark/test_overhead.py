@@ -0,0 +1,130 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from chat_toolkit.common.orchestrator import Orchestrator
+from chat_toolkit.common.utils import temporary_file
+from chat_toolkit.components.chatbots.openai_chatbot import OpenAIChatBot
+from test_suite.benchmark.conftest import (
+    BudgetCheckType,
+    BusyTimer,
+    FakeChatBot,
+    FakeSpeechToText,
+    FakeTextToSpeech,
+    HoldSpaceType,
+    LatencyModel,
+)
+
+TURNS = 200
+
+
+@pytest.mark.parametrize("with_speech", [False, True])
+def test_orchestrator_overhead_per_turn(
+    fake_audio_device: None,
+    check_budget: BudgetCheckType,
+    tmp_path: Path,
+    with_speech: bool,
+) -> None:
+    """
+    Benchmark the time a turn takes, beyond the time spent in components.
+    """
+    chatbot = FakeChatBot(LatencyModel(0.001, sigma=0.5))
+    speech_to_text = text_to_speech = None
+    if with_speech:
+        speech_to_text = FakeSpeechToText(
+            LatencyModel(0.001, sigma=0.5), tmp_file_directory=tmp_path
+        )
+        text_to_speech = FakeTextToSpeech(time_scale=0.0001)
+    orchestrator = Orchestrator(chatbot, speech_to_text, text_to_speech)
+    components = [
+        component
+        for component in (chatbot, speech_to_text, text_to_speech)
+        if component is not None
+    ]
+    message = b"RIFF" if with_speech else "Hello there"
+
+    overheads = []
+    for _ in range(TURNS):
+        busy_before = sum(c.timer.busy_seconds for c in components)
+        result = orchestrator.run_turn(message)
+        busy = sum(c.timer.busy_seconds for c in components) - busy_before
+        overheads.append(result.timings["total"] - busy)
+
+    check_budget("Orchestrator.run_turn", overheads, "p50", 0.0005)
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_chatbot_history_overhead(
+    monkeypatch: pytest.MonkeyPatch,
+    check_budget: BudgetCheckType,
+    stream: bool,
+) -> None:
+    """
+    Benchmark the time OpenAIChatBot spends handling its conversation
+    history, as the conversation gets long.
+    """
+    latency = LatencyModel(0.0005, sigma=0.5)
+    timer = BusyTimer()
+    response = " ".join(["token"] * 50)
+
+    def _create(model: str, messages: list[dict], stream: bool = False):
+        timer.sleep(latency.sample())
+        if stream:
+            return iter(
+                {"choices": [{"delta": {"content": f"{word} "}}]}
+                for word in response.split()
+            )
+        return {
+            "choices": [{"message": {"content": response}}],
+            "usage": {
+                "completion_tokens": 50,
+                "prompt_tokens": len(messages) * 50,
+                "total_tokens": (len(messages) + 1) * 50,
+            },
+        }
+
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setattr("openai.ChatCompletion.create", _create)
+    chatbot = OpenAIChatBot()
+    chatbot.prompt_chatbot("You are a helpful assistant.")
+
+    overheads = []
+    for turn in range(TURNS):
+        busy_before = timer.busy_seconds
+        started = time.monotonic()
+        if stream:
+            "".join(chatbot.stream_message(f"Message {turn}"))
+        else:
+            chatbot.send_message(f"Message {turn}")
+        elapsed = time.monotonic() - started
+        overheads.append(elapsed - (timer.busy_seconds - busy_before))
+
+    assert len(chatbot.history) == 2 * TURNS + 1
+    name = "OpenAIChatBot." + ("stream_message" if stream else "send_message")
+    check_budget(name, overheads, "p95", 0.0005)
+
+
+def test_recording_overhead_per_block(
+    fake_audio_device: None,
+    hold_space: HoldSpaceType,
+    check_budget: BudgetCheckType,
+    tmp_path: Path,
+) -> None:
+    """
+    Benchmark the time it takes to write each block of recorded audio.
+    """
+    speech_to_text = FakeSpeechToText(
+        audio_seconds=2.0, tmp_file_directory=tmp_path
+    )
+    hold_space(speech_to_text.blocks)
+
+    overheads = []
+    for _ in range(20):
+        with temporary_file("wav", tmp_file_directory=tmp_path) as tmp:
+            started = time.monotonic()
+            speech_to_text.record_unspecified_length_audio(tmp.name)
+            elapsed = time.monotonic() - started
+        overheads.append(elapsed / speech_to_text.blocks)
+
+    check_budget("Recording (per block)", overheads, "p50", 0.0005)
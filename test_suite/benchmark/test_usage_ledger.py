@@ -0,0 +1,39 @@
+import time
+from itertools import count
+
+from chat_toolkit.common.usage_ledger import UsageLedger
+from test_suite.benchmark.conftest import BudgetCheckType
+
+EVENTS = 1_000_000
+BATCH = 100_000
+
+
+def test_usage_ledger(check_budget: BudgetCheckType) -> None:
+    """
+    Benchmark recording a million billed events, and aggregating over them.
+    """
+    ledger = UsageLedger(clock=count().__next__)
+    ledger.enable()
+
+    overheads = []
+    for batch in range(EVENTS // BATCH):
+        started = time.perf_counter()
+        for index in range(batch * BATCH, (batch + 1) * BATCH):
+            ledger.record(
+                f"Component{index % 3}",
+                "prompt_tokens",
+                10,
+                0.00002,
+                f"session{index % 1000}",
+            )
+        overheads.append((time.perf_counter() - started) / BATCH)
+    check_budget("UsageLedger.record", overheads, "p50", 0.00001)
+
+    aggregations = []
+    for _ in range(5):
+        started = time.perf_counter()
+        usage = ledger.aggregate("session", start=EVENTS // 2)
+        ledger.rate(60, start=EVENTS - 3600, end=EVENTS)
+        aggregations.append(time.perf_counter() - started)
+    assert len(usage) == 1000
+    check_budget("UsageLedger aggregation", aggregations, "p50", 0.25)
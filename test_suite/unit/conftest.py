@@ -1,20 +1,39 @@
 import itertools
+import re
+import threading
 from collections.abc import Generator
+from pathlib import Path
 from typing import Any, Callable, Optional, Union
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
 
+import numpy as np
+import openai
 import pytest
+import soundfile as sf
 from _pytest.fixtures import SubRequest
 from loguru import logger
 
+from chat_toolkit.common.metrics import METRICS, MetricsRegistry
 from chat_toolkit.common.orchestrator import Orchestrator
+from chat_toolkit.common.scheduler import SCHEDULER, FairScheduler
+from chat_toolkit.common.usage_ledger import USAGE_LEDGER, UsageLedger
 from chat_toolkit.components.chatbots.openai_chatbot import OpenAIChatBot
 from chat_toolkit.components.speech_to_text.openai_speech_to_text import (
     OpenAISpeechToText,
 )
+from chat_toolkit.components.speech_to_text.speech_to_text_component_base import (  # noqa: E501
+    default_sample_rate,
+)
+from chat_toolkit.components.speech_to_text.transcription_cache import (
+    TranscriptionCache,
+)
 from chat_toolkit.components.text_to_speech.pyttsx3_text_to_speech import (
     Pyttsx3TextToSpeech,
 )
+from chat_toolkit.components.text_to_speech.speech_cache import SpeechCache
+from chat_toolkit.components.text_to_speech.text_to_speech_component_base import (  # noqa: E501
+    TextToSpeechComponentBase,
+)
 
 CHATBOT_MODEL_TYPES = ("gpt-3.5-turbo",)
 SPEECH_TO_TEXT_MODEL_TYPES = ("whisper-1",)
@@ -50,6 +69,42 @@ class TypeMatcher:
         return isinstance(other, self.expected_type)
 
 
+class FakeTextToSpeech(TextToSpeechComponentBase):
+    """
+    Text to speech component that records the text it says, instead of
+    saying it. Pass `on_say` to run code while text is being said, e.g. to
+    block until `stop_text` is called.
+    """
+
+    def __init__(
+        self,
+        on_say: Optional[Callable[[str], None]] = None,
+        max_queued_utterances: int = 8,
+    ):
+        super().__init__(
+            model="fake",
+            pricing_rate=0.0,
+            speaking_rate=175,
+            max_queued_utterances=max_queued_utterances,
+        )
+        self.on_say = on_say
+        self.said: list[str] = []
+        self.stopped = threading.Event()
+
+    def say_text(self, text: str) -> dict:
+        if self.on_say is not None:
+            self.on_say(text)
+        self.said.append(text)
+        return {"text": text}
+
+    def stop_text(self) -> None:
+        self.stopped.set()
+
+    @property
+    def _cost_estimate_data(self) -> tuple[float, dict]:
+        return 0.0, {}
+
+
 @pytest.fixture
 def loguru_caplog(
     caplog: pytest.LogCaptureFixture,
@@ -65,6 +120,41 @@ def loguru_caplog(
     logger.disable("chat_toolkit")
 
 
+@pytest.fixture
+def metrics() -> Generator[MetricsRegistry, None, None]:
+    """
+    Temporarily enables the metrics registry, forgetting its metrics
+    afterwards.
+    """
+    METRICS.enable()
+    yield METRICS
+    METRICS.disable()
+    METRICS.reset()
+
+
+@pytest.fixture
+def scheduler() -> Generator[FairScheduler, None, None]:
+    """
+    Temporarily enables the scheduler, forgetting its statistics
+    afterwards.
+    """
+    SCHEDULER.enable()
+    yield SCHEDULER
+    SCHEDULER.disable()
+    SCHEDULER.reset()
+
+
+@pytest.fixture
+def usage_ledger() -> Generator[UsageLedger, None, None]:
+    """
+    Temporarily enables the usage ledger, forgetting its events afterwards.
+    """
+    USAGE_LEDGER.enable()
+    yield USAGE_LEDGER
+    USAGE_LEDGER.disable()
+    USAGE_LEDGER.reset()
+
+
 @pytest.fixture
 def no_openai_api_key(monkeypatch: pytest.MonkeyPatch) -> None:
     """
@@ -105,6 +195,33 @@ def patched_openai_chat_completion(monkeypatch: pytest.MonkeyPatch) -> None:
     )
 
 
+@pytest.fixture
+def patched_openai_chat_completion_stream(
+    patched_openai_chat_completion: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Extends the monkeypatched openai.ChatCompletion to stream responses word
+    by word when requested.
+    """
+    create = openai.ChatCompletion.create
+
+    def _create(model: str, messages: list[dict], stream: bool = False):
+        response = create(model, messages)
+        if not stream:
+            return response
+        content = response["choices"][0]["message"]["content"]
+        return iter(
+            [{"choices": [{"delta": {"role": "assistant"}}]}]
+            + [
+                {"choices": [{"delta": {"content": word}}]}
+                for word in re.findall(r"\S+\s*", content)
+            ]
+            + [{"choices": [{"delta": {}}]}]
+        )
+
+    monkeypatch.setattr("openai.ChatCompletion.create", _create)
+
+
 @pytest.fixture
 def patched_openai_chatbot_factory(
     no_openai_api_key: None,
@@ -137,10 +254,15 @@ def patched_openai_speech_to_text(
         "openai.Audio.transcribe",
         Mock(return_value={"text": TEST_TEXT}),
     )
+    monkeypatch.setattr(
+        "openai.Audio.atranscribe",
+        AsyncMock(return_value={"text": TEST_TEXT}),
+    )
     monkeypatch.setattr(
         "sounddevice.query_devices",
         Mock(return_value={"default_samplerate": "44100"}),
     )
+    default_sample_rate.cache_clear()
 
 
 @pytest.fixture
@@ -158,6 +280,7 @@ def patched_openai_speech_to_text_factory(
         model: Optional[str],
         pricing_rate: Optional[float] = None,
         device: Union[int, str] = 0,
+        transcription_cache: Optional[TranscriptionCache] = None,
     ) -> Optional[OpenAISpeechToText]:
         if not model:
             return None
@@ -166,6 +289,7 @@ def patched_openai_speech_to_text_factory(
             "model": model,
             "device": device,
             "tmp_file_directory": tmp_path,
+            "transcription_cache": transcription_cache,
         }
 
         if isinstance(pricing_rate, float):
@@ -176,6 +300,24 @@ def patched_openai_speech_to_text_factory(
     return _inner
 
 
+@pytest.fixture
+def wav_file_factory(tmp_path: Path) -> Callable[..., Path]:
+    """
+    Factory to write short, deterministic wav files to disk.
+    """
+
+    def _inner(seconds: float = 1.5, seed: int = 0) -> Path:
+        sample_rate = 16000
+        samples = np.random.default_rng(seed).uniform(
+            -0.5, 0.5, (int(seconds * sample_rate), 2)
+        )
+        path = tmp_path / f"{seed}-{seconds}.wav"
+        sf.write(path, samples, sample_rate)
+        return path
+
+    return _inner
+
+
 @pytest.fixture
 def patched_pyttsx3_text_to_speech_factory() -> Pyttsx3TextToSpeechFactoryType:
     """
@@ -186,20 +328,43 @@ def patched_pyttsx3_text_to_speech_factory() -> Pyttsx3TextToSpeechFactoryType:
     def _inner(
         model: Optional[str],
         speaking_rate: Optional[int] = None,
+        speech_cache: Optional[SpeechCache] = None,
     ) -> Optional[Pyttsx3TextToSpeech]:
         if not model:
             return None
 
+        kwargs: dict[str, Any] = {"speech_cache": speech_cache}
         if isinstance(speaking_rate, int):
-            kwargs = {"speaking_rate": speaking_rate}
-        else:
-            kwargs = {}
+            kwargs["speaking_rate"] = speaking_rate
 
         return Pyttsx3TextToSpeech(**kwargs)
 
     return _inner
 
 
+@pytest.fixture
+def patched_pyttsx3_rendering(
+    monkeypatch: pytest.MonkeyPatch,
+) -> list[str]:
+    """
+    Monkeypatches pyttsx3 rendering and sounddevice playback as needed for
+    testing. Rendered text is recorded in the returned list, and rendered
+    files have a sample rate of 100 times the engine's speaking rate.
+    """
+    rendered: list[str] = []
+
+    def _save_to_file(self, text: str, filename: str, name=None) -> None:
+        rendered.append(text)
+        sample_rate = 100 * self.getProperty("rate")
+        sf.write(filename, np.zeros(100 * len(text)), sample_rate)
+
+    monkeypatch.setattr("pyttsx3.engine.Engine.save_to_file", _save_to_file)
+    monkeypatch.setattr("sounddevice.play", Mock())
+    monkeypatch.setattr("sounddevice.wait", Mock())
+    monkeypatch.setattr("sounddevice.stop", Mock())
+    return rendered
+
+
 @pytest.fixture(
     params=list(
         itertools.product(
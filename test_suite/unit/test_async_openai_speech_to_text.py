@@ -0,0 +1,152 @@
+import asyncio
+import threading
+from pathlib import Path
+from typing import Callable
+from unittest.mock import AsyncMock, Mock
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from chat_toolkit.components.speech_to_text.async_openai_speech_to_text import (  # noqa: E501
+    AsyncOpenAISpeechToText,
+)
+from chat_toolkit.components.speech_to_text.transcription_cache import (
+    TranscriptionCache,
+)
+from test_suite.unit.conftest import SPEECH_TO_TEXT_MODEL_TYPES, TEST_TEXT
+
+BLOCKS = 5
+BLOCK_SIZE = 512
+
+
+class FakeInputStream:
+    """
+    Stands in for sounddevice.InputStream, calling back from a separate
+    thread like the real thing.
+    """
+
+    def __init__(self, callback: Callable, channels: int, **kwargs):
+        self._callback = callback
+        self._channels = channels
+        self._thread = threading.Thread(target=self._run)
+
+    def _run(self) -> None:
+        for _ in range(BLOCKS):
+            self._callback(
+                np.ones((BLOCK_SIZE, self._channels), dtype="float32") / 4,
+                BLOCK_SIZE,
+                None,
+                None,
+            )
+
+    def __enter__(self) -> "FakeInputStream":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._thread.join()
+
+
+@pytest.fixture
+def async_speech_to_text(
+    no_openai_api_key: None,
+    patched_openai_speech_to_text: None,
+    tmp_path: Path,
+) -> AsyncOpenAISpeechToText:
+    """
+    Async speech to text component with appropriate mocks.
+    """
+    return AsyncOpenAISpeechToText(
+        model=SPEECH_TO_TEXT_MODEL_TYPES[0],
+        tmp_file_directory=tmp_path,
+        transcription_cache=TranscriptionCache(),
+    )
+
+
+def test_atranscribe_file_and_buffer(
+    async_speech_to_text: AsyncOpenAISpeechToText,
+    wav_file_factory: Callable[..., Path],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Test that open files and raw buffers are transcribed, and that both share
+    the transcription cache.
+    """
+    atranscribe = AsyncMock(return_value={"text": TEST_TEXT})
+    monkeypatch.setattr("openai.Audio.atranscribe", atranscribe)
+    wav_file = wav_file_factory(seconds=1.5)
+
+    async def _inner() -> list[tuple[str, dict]]:
+        with wav_file.open("r+b") as audio_file:
+            from_file = await async_speech_to_text.atranscribe(audio_file)
+        from_buffer = await async_speech_to_text.atranscribe(
+            wav_file.read_bytes()
+        )
+        return [from_file, from_buffer]
+
+    assert asyncio.run(_inner()) == [
+        (TEST_TEXT, {"cache_hit": False}),
+        (TEST_TEXT, {"cache_hit": True}),
+    ]
+    assert atranscribe.await_count == 1
+    assert async_speech_to_text.seconds_transcribed == 2
+
+
+def test_atranscribe_concurrently(
+    async_speech_to_text: AsyncOpenAISpeechToText,
+    wav_file_factory: Callable[..., Path],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Test that many transcriptions can be awaited on one event loop.
+    """
+    atranscribe = AsyncMock(return_value={"text": TEST_TEXT})
+    monkeypatch.setattr("openai.Audio.atranscribe", atranscribe)
+    buffers = [
+        wav_file_factory(seconds=0.5, seed=seed).read_bytes()
+        for seed in range(10)
+    ]
+
+    async def _inner() -> list[tuple[str, dict]]:
+        return await asyncio.gather(
+            *(async_speech_to_text.atranscribe(buffer) for buffer in buffers)
+        )
+
+    assert [text for text, _ in asyncio.run(_inner())] == [TEST_TEXT] * 10
+    assert atranscribe.await_count == 10
+
+
+def test_atranscribe_speech(
+    async_speech_to_text: AsyncOpenAISpeechToText,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Test that audio recorded through the asyncio queue reaches the file that
+    is transcribed.
+    """
+    key_tracker = Mock()
+    key_tracker.check_if_still_recording.side_effect = [True] * (
+        BLOCKS - 1
+    ) + [False]
+    monkeypatch.setattr(
+        "chat_toolkit.components.speech_to_text."
+        "async_speech_to_text_component_base.KeyTracker",
+        Mock(return_value=key_tracker),
+    )
+    monkeypatch.setattr("sounddevice.InputStream", FakeInputStream)
+
+    async def _check_recording(model: str, audio_file) -> dict:
+        audio, _ = sf.read(audio_file)
+        assert audio.shape == (BLOCKS * BLOCK_SIZE, 2)
+        return {"text": TEST_TEXT}
+
+    monkeypatch.setattr(
+        "openai.Audio.atranscribe", AsyncMock(side_effect=_check_recording)
+    )
+
+    assert asyncio.run(async_speech_to_text.atranscribe_speech()) == (
+        TEST_TEXT,
+        {"cache_hit": False},
+    )
+    key_tracker.wait_for_recording_to_start.assert_called_once()
@@ -0,0 +1,250 @@
+import asyncio
+import threading
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from chat_toolkit.common.async_orchestrator import AsyncOrchestrator
+from chat_toolkit.common.exceptions import (
+    QueueSizeError,
+    TranscriptionUnsupportedError,
+)
+from chat_toolkit.common.orchestrator import Orchestrator
+from chat_toolkit.components.speech_to_text.async_openai_speech_to_text import (  # noqa: E501
+    AsyncOpenAISpeechToText,
+)
+from chat_toolkit.components.speech_to_text.openai_speech_to_text import (
+    OpenAISpeechToText,
+)
+from chat_toolkit.components.speech_to_text.speech_to_text_component_base import (  # noqa: E501
+    SpeechToTextComponentBase,
+)
+from test_suite.unit.conftest import (
+    CHATBOT_MODEL_TYPES,
+    FakeTextToSpeech,
+    OpenAIChatbotFactoryType,
+)
+
+
+def _record(file_path: str, on_audio_block=None) -> None:
+    """
+    Stands in for recording a second of speech.
+    """
+    sf.write(file_path, np.full(44100, 0.25), 44100)
+
+
+def test_cost_summary_matches(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    """
+    Test that a text conversation says every response, and ends with the
+    same cost summary as the synchronous orchestrator.
+    """
+    cost_summaries = []
+    for orchestrator_type in (Orchestrator, AsyncOrchestrator):
+        text_to_speech = FakeTextToSpeech()
+        orchestrator = orchestrator_type(
+            patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0]),
+            text_to_speech_component=text_to_speech,
+        )
+        monkeypatch.setattr(
+            "builtins.input", Mock(side_effect=["Be nice", "Hi", "Bye", ""])
+        )
+        orchestrator.terminal_conversation()
+
+        output = capsys.readouterr().out
+        assert "Chatbot: Response: Hi\n" in output
+        assert text_to_speech.said == ["Response: Hi", "Response: Bye"]
+        cost_summary, timing_summary = output.split("Bye!")[1].split(
+            "Timing Summary"
+        )
+        cost_summaries.append(cost_summary)
+        assert "chat: count 2" in timing_summary
+
+    assert "Cost Summary" in cost_summaries[0]
+    assert '"total_tokens": ' in cost_summaries[0]
+    assert cost_summaries[0] == cost_summaries[1]
+
+
+@pytest.mark.parametrize(
+    "speech_to_text_type", [OpenAISpeechToText, AsyncOpenAISpeechToText]
+)
+@pytest.mark.usefixtures("no_openai_api_key", "patched_openai_speech_to_text")
+def test_speech_conversation(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+    tmp_path: Path,
+    speech_to_text_type: type,
+) -> None:
+    """
+    Test that speech is recorded and transcribed in separate stages, with
+    sync components run in an executor and async components awaited.
+    """
+    speech_to_text = speech_to_text_type(tmp_file_directory=tmp_path)
+    orchestrator = AsyncOrchestrator(
+        patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0]),
+        speech_to_text,
+    )
+    transcripts = [{"text": "Hi there"}, {"text": ""}]
+    transcribe = Mock(side_effect=transcripts)
+    atranscribe = AsyncMock(side_effect=transcripts)
+    monkeypatch.setattr("openai.Audio.transcribe", transcribe)
+    monkeypatch.setattr("openai.Audio.atranscribe", atranscribe)
+    monkeypatch.setattr(
+        orchestrator, "get_start_prompt", Mock(return_value="")
+    )
+    if isinstance(speech_to_text, AsyncOpenAISpeechToText):
+        monkeypatch.setattr(
+            speech_to_text,
+            "arecord_unspecified_length_audio",
+            AsyncMock(side_effect=_record),
+        )
+        transcribe = atranscribe
+    else:
+        monkeypatch.setattr(
+            speech_to_text, "record_unspecified_length_audio", _record
+        )
+    orchestrator.terminal_conversation()
+
+    output = capsys.readouterr().out
+    assert "User: Hi there\n" in output
+    assert "Chatbot: Response: Hi there\n" in output
+    assert transcribe.call_count == 2
+    assert speech_to_text.seconds_transcribed == 2
+
+
+def test_speech_conversation_without_transcribe(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    patched_openai_speech_to_text: None,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    """
+    Test that speech to text components that cannot transcribe recorded
+    audio capture and transcribe speech in one stage.
+    """
+
+    class _SpeechToText(SpeechToTextComponentBase):
+        def transcribe_speech(self, on_partial_transcript=None):
+            return transcripts.pop(0), {}
+
+        @property
+        def _cost_estimate_data(self) -> tuple[float, dict]:
+            return 0.0, {}
+
+    transcripts = ["Hi there", ""]
+    speech_to_text = _SpeechToText(model=None, pricing_rate=0.0)
+    assert not speech_to_text.can_transcribe_recordings
+    with pytest.raises(TranscriptionUnsupportedError):
+        speech_to_text.transcribe(b"")
+
+    orchestrator = AsyncOrchestrator(
+        patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0]),
+        speech_to_text,
+    )
+    assert not orchestrator._transcribes_recordings
+    monkeypatch.setattr(
+        orchestrator, "get_start_prompt", Mock(return_value="")
+    )
+    orchestrator.terminal_conversation()
+
+    assert "Chatbot: Response: Hi there\n" in capsys.readouterr().out
+    assert not transcripts
+
+
+def test_stages_overlap(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Test that the user's next message is captured while the last response
+    is still being said.
+    """
+    next_message_captured = threading.Event()
+    read_by_daemons = []
+
+    def _input(prompt: str = "") -> str:
+        # Input is read by daemon threads, so it can't keep the process alive
+        read_by_daemons.append(threading.current_thread().daemon)
+        if inputs:
+            return inputs.pop(0)
+        next_message_captured.set()
+        return ""
+
+    def _on_say(_: str) -> None:
+        next_message_captured.wait(5)
+
+    inputs = ["", "Hi"]
+    text_to_speech = FakeTextToSpeech(on_say=_on_say)
+    orchestrator = AsyncOrchestrator(
+        patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0]),
+        text_to_speech_component=text_to_speech,
+    )
+    monkeypatch.setattr("builtins.input", _input)
+    asyncio.run(orchestrator.aconversation())
+
+    assert next_message_captured.is_set()
+    assert text_to_speech.said == ["Response: Hi"]
+    assert read_by_daemons and all(read_by_daemons)
+
+
+def test_cancel_conversation(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Test that cancelling a conversation stops text that is being said.
+    """
+    saying = threading.Event()
+    release = threading.Event()
+
+    def _on_say(_: str) -> None:
+        saying.set()
+        text_to_speech.stopped.wait(5)
+
+    def _input(prompt: str = "") -> str:
+        if inputs:
+            return inputs.pop(0)
+        release.wait(5)
+        return ""
+
+    inputs = ["", "Hi"]
+    text_to_speech = FakeTextToSpeech(on_say=_on_say)
+    orchestrator = AsyncOrchestrator(
+        patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0]),
+        text_to_speech_component=text_to_speech,
+    )
+    monkeypatch.setattr("builtins.input", _input)
+
+    async def _main() -> None:
+        conversation = asyncio.ensure_future(orchestrator.aconversation())
+        loop = asyncio.get_running_loop()
+        assert await loop.run_in_executor(None, saying.wait, 5)
+        conversation.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await conversation
+
+    try:
+        asyncio.run(_main())
+    finally:
+        release.set()
+    assert text_to_speech.stopped.is_set()
+
+
+def test_max_queued_turns_sad(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+) -> None:
+    """
+    Test that queues between stages must be bounded.
+    """
+    with pytest.raises(QueueSizeError, match="Queue size must be > 0"):
+        AsyncOrchestrator(
+            patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0]),
+            max_queued_turns=0,
+        )
@@ -0,0 +1,240 @@
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from chat_toolkit.common.batch_runner import BatchRunner
+from chat_toolkit.common.metrics import MetricsRegistry
+from chat_toolkit.common.scheduler import FairScheduler
+from test_suite.unit.conftest import (
+    CHATBOT_MODEL_TYPES,
+    OpenAIChatbotFactoryType,
+)
+
+
+def _write_items(path: Path, items: list[dict]) -> Path:
+    """
+    Write conversations to a JSONL file.
+    """
+    path.write_text("".join(json.dumps(item) + "\n" for item in items))
+    return path
+
+
+def _read_results(path: Path) -> dict[str, dict]:
+    """
+    Read the results of a batch, keyed by conversation id.
+    """
+    with open(path) as f:
+        return {result["id"]: result for result in map(json.loads, f)}
+
+
+@pytest.fixture
+def batch_runner(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+) -> BatchRunner:
+    """
+    Batch runner with patched chatbots, two conversations at a time.
+    """
+    return BatchRunner(
+        lambda: patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0]),
+        concurrency=2,
+    )
+
+
+def test_run(batch_runner: BatchRunner, tmp_path: Path) -> None:
+    """
+    Test that every conversation is had, with its start prompt, and that
+    results, throughput, tokens and costs are reported.
+    """
+    input_path = _write_items(
+        tmp_path / "input.jsonl",
+        [
+            {"id": "a", "start_prompt": "Be brief", "messages": ["Hi", "Bye"]},
+            {"messages": ["Hello there"]},
+            {"id": "c", "messages": []},
+        ],
+    )
+    output_path = tmp_path / "output.jsonl"
+    summary = batch_runner.run(input_path, output_path)
+
+    assert summary["completed"] == 2
+    assert summary["failed"] == 1
+    assert summary["skipped"] == 0
+    assert summary["throughput_conversations_per_second"] > 0
+
+    results = _read_results(output_path)
+    assert set(results) == {"a", "2"}
+    assert results["a"]["responses"] == ["Response: Hi", "Response: Bye"]
+    assert results["2"]["responses"] == ["Response: Hello there"]
+    assert summary["total_tokens"] == sum(
+        result["usage"]["total_tokens"] for result in results.values()
+    )
+    assert summary["cost_estimate"] == pytest.approx(
+        sum(result["cost_estimate"] for result in results.values())
+    )
+
+
+def test_failures(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    tmp_path: Path,
+) -> None:
+    """
+    Test that malformed lines are skipped, and that what failed
+    conversations spent before failing is counted.
+    """
+    chatbots = []
+
+    def _factory():
+        chatbot = patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0])
+        send_message = chatbot.send_message
+
+        def _send_message(message):
+            if message == "Fail":
+                raise RuntimeError
+            return send_message(message)
+
+        chatbot.send_message = _send_message
+        chatbots.append(chatbot)
+        return chatbot
+
+    input_path = tmp_path / "input.jsonl"
+    input_path.write_text(
+        '{"id": "a", "messages": ["Hi", "Fail"]}\n'
+        "not json\n"
+        '["not", "a", "conversation"]\n'
+        '{"id": "d", "messages": ["Hi"]}\n'
+    )
+    output_path = tmp_path / "output.jsonl"
+    summary = BatchRunner(_factory).run(input_path, output_path)
+
+    assert summary["completed"] == 1
+    assert summary["failed"] == 3
+    assert set(_read_results(output_path)) == {"d"}
+    assert summary["total_tokens"] == sum(
+        chatbot.cost_estimate_data[1]["total_tokens"] for chatbot in chatbots
+    )
+    assert (
+        summary["total_tokens"]
+        > _read_results(output_path)["d"]["usage"]["total_tokens"]
+    )
+
+
+def test_resume(batch_runner: BatchRunner, tmp_path: Path) -> None:
+    """
+    Test that a run resumes from its output, without having completed
+    conversations again, and discards a partly written result.
+    """
+    input_path = _write_items(
+        tmp_path / "input.jsonl",
+        [{"id": str(index), "messages": ["Hi"]} for index in range(5)],
+    )
+    output_path = tmp_path / "output.jsonl"
+    _write_items(output_path, [{"id": "0", "responses": []}])
+    with open(output_path, "a") as f:
+        f.write('{"id": "1", "respo')
+
+    summary = batch_runner.run(input_path, output_path)
+
+    assert summary["skipped"] == 1
+    assert summary["completed"] == 4
+    results = _read_results(output_path)
+    assert set(results) == {"0", "1", "2", "3", "4"}
+    assert results["0"]["responses"] == []
+
+    summary = batch_runner.run(input_path, output_path)
+    assert summary["skipped"] == 5
+    assert summary["completed"] == 0
+
+
+def test_resume_skips_bad_lines(
+    batch_runner: BatchRunner,
+    tmp_path: Path,
+    loguru_caplog: pytest.LogCaptureFixture,
+) -> None:
+    """
+    Test that lines of the output that aren't results are skipped, without
+    discarding the results after them.
+    """
+    input_path = _write_items(
+        tmp_path / "input.jsonl",
+        [{"id": str(index), "messages": ["Hi"]} for index in range(3)],
+    )
+    output_path = tmp_path / "output.jsonl"
+    output_path.write_text(
+        '{"id": "0", "responses": []}\n'
+        "not json\n"
+        "\n"
+        '{"responses": []}\n'
+        '{"id": "2", "responses": []}\n'
+    )
+
+    summary = batch_runner.run(input_path, output_path)
+
+    assert summary["skipped"] == 2
+    assert summary["completed"] == 1
+    assert "Skipping line 2" in loguru_caplog.text
+    assert "Skipping line 4" in loguru_caplog.text
+    assert output_path.read_text().count('"id": "2"') == 1
+
+
+def test_concurrency(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    tmp_path: Path,
+) -> None:
+    """
+    Test that no more than the configured number of conversations are had
+    at once.
+    """
+    lock = threading.Lock()
+    active = []
+    peak = []
+
+    def _factory():
+        chatbot = patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0])
+        send_message = chatbot.send_message
+
+        def _send_message(message):
+            with lock:
+                active.append(message)
+                peak.append(len(active))
+            try:
+                threading.Event().wait(0.01)
+                response = send_message(message)
+            finally:
+                with lock:
+                    active.remove(message)
+            return response
+
+        chatbot.send_message = _send_message
+        return chatbot
+
+    input_path = _write_items(
+        tmp_path / "input.jsonl",
+        [{"messages": [f"Message {index}"]} for index in range(12)],
+    )
+    summary = BatchRunner(_factory, concurrency=3).run(
+        input_path, tmp_path / "output.jsonl"
+    )
+
+    assert summary["completed"] == 12
+    assert 1 < max(peak) <= 3
+
+
+def test_batch_lane(
+    batch_runner: BatchRunner,
+    tmp_path: Path,
+    scheduler: FairScheduler,
+    metrics: MetricsRegistry,
+) -> None:
+    """
+    Test that batched conversations are dispatched in the scheduler's batch
+    lane.
+    """
+    input_path = _write_items(tmp_path / "input.jsonl", [{"messages": ["Hi"]}])
+    batch_runner.run(input_path, tmp_path / "output.jsonl")
+
+    assert (
+        "chat_toolkit_queue_wait_seconds_count"
+        '{lane="batch",tenant="default"} 1' in metrics.render()
+    )
@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import pytest
+
+from chat_toolkit.common.caching import DiskCache, LRUCache
+
+
+@pytest.mark.parametrize("max_size", [2, 3, 5])
+def test_lru_cache_evicts_least_recently_used(max_size: int) -> None:
+    """
+    Test that the in memory cache never exceeds its bound, and that it
+    evicts the least recently used entries first.
+    """
+    cache: LRUCache[int, str] = LRUCache(max_size)
+    for key in range(max_size):
+        cache.put(key, str(key))
+    # Touch the oldest entry so that it is no longer least recently used
+    assert cache.get(0) == "0"
+    cache.put(max_size, str(max_size))
+
+    assert len(cache) == max_size
+    assert cache.get(0) == "0"
+    assert cache.get(max_size) == str(max_size)
+    assert 1 not in cache
+
+
+def test_lru_cache_sizeof() -> None:
+    """
+    Test that the in memory cache can be bounded by value size, and that
+    values larger than the bound are not cached.
+    """
+    cache: LRUCache[str, bytes] = LRUCache(10, sizeof=len)
+    cache.put("a", b"12345")
+    cache.put("b", b"12345")
+    assert cache.size == 10
+    cache.put("c", b"123")
+    assert cache.size == 8
+    assert "a" not in cache
+    cache.put("d", b"12345678901")
+    assert "d" not in cache
+
+
+def test_disk_cache_persists_and_evicts(tmp_path: Path) -> None:
+    """
+    Test that the on disk cache survives being reopened and is bounded by
+    total bytes.
+    """
+    cache = DiskCache(tmp_path, max_bytes=8)
+    cache.put("a", b"1234")
+    cache.put("b", b"5678")
+    assert cache.get("a") == b"1234"
+
+    reopened = DiskCache(tmp_path, max_bytes=8)
+    assert reopened.get("b") == b"5678"
+    reopened.put("c", b"9")
+    assert reopened.size <= 8
+    assert len(list(tmp_path.glob("*.bin"))) == len(reopened)
+    assert reopened.get("missing") is None
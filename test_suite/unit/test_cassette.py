@@ -0,0 +1,172 @@
+import asyncio
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock
+
+import openai
+import pytest
+
+from chat_toolkit.common.cassette import Cassette
+from chat_toolkit.common.exceptions import CassetteMissError, CassetteModeError
+from chat_toolkit.common.orchestrator import Orchestrator
+from chat_toolkit.components.chatbots.openai_chatbot import OpenAIChatBot
+from chat_toolkit.components.speech_to_text.async_openai_speech_to_text import (  # noqa: E501
+    AsyncOpenAISpeechToText,
+)
+from chat_toolkit.components.speech_to_text.openai_speech_to_text import (
+    OpenAISpeechToText,
+)
+from test_suite.unit.conftest import CHATBOT_MODEL_TYPES, TEST_TEXT
+
+TOO_SHORT = "Audio file is too short. Minimum audio length is 0.1 seconds."
+
+
+def _offline(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Make any request to OpenAI fail.
+    """
+    monkeypatch.setattr(
+        "openai.ChatCompletion.create", Mock(side_effect=AssertionError)
+    )
+    monkeypatch.setattr(
+        "openai.Audio.transcribe", Mock(side_effect=AssertionError)
+    )
+    monkeypatch.setattr(
+        "openai.Audio.atranscribe", AsyncMock(side_effect=AssertionError)
+    )
+
+
+@pytest.mark.parametrize("file_name", ["cassette.jsonl", "cassette.jsonl.gz"])
+def test_chat_record_replay(
+    no_openai_api_key: None,
+    patched_openai_chat_completion_stream: None,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    file_name: str,
+) -> None:
+    """
+    Test that sent and streamed messages are replayed from a cassette
+    without calling OpenAI.
+    """
+
+    def _converse(cassette: Cassette) -> tuple[list, dict]:
+        chatbot = OpenAIChatBot(CHATBOT_MODEL_TYPES[0], cassette=cassette)
+        chatbot.prompt_chatbot("Be nice")
+        responses = [
+            chatbot.send_message("Hi there")[0],
+            "".join(chatbot.stream_message("How are you?")),
+            chatbot.send_message("Hi there")[0],
+        ]
+        return responses, chatbot.tokens_used
+
+    path = tmp_path / file_name
+    recorded = _converse(Cassette(path, "record"))
+    _offline(monkeypatch)
+    cassette = Cassette(path, "replay", time_scale=0)
+
+    assert _converse(cassette) == recorded
+    assert cassette.summary == {"recorded": 0, "replayed": 3}
+
+
+@pytest.mark.parametrize(
+    "speech_to_text_type", [OpenAISpeechToText, AsyncOpenAISpeechToText]
+)
+def test_transcription_record_replay(
+    no_openai_api_key: None,
+    patched_openai_speech_to_text: None,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    wav_file_factory,
+    speech_to_text_type: type,
+) -> None:
+    """
+    Test that transcriptions, and errors for audio that is too short, are
+    replayed from a cassette without calling OpenAI.
+    """
+    audio = wav_file_factory().read_bytes()
+    short_audio = wav_file_factory(seconds=0.05).read_bytes()
+    error = openai.error.InvalidRequestError(TOO_SHORT, None)
+    monkeypatch.setattr(
+        "openai.Audio.transcribe",
+        Mock(side_effect=[{"text": TEST_TEXT}, error]),
+    )
+    monkeypatch.setattr(
+        "openai.Audio.atranscribe",
+        AsyncMock(side_effect=[{"text": TEST_TEXT}, error]),
+    )
+
+    def _transcribe(cassette: Cassette) -> list[str]:
+        speech_to_text = speech_to_text_type(
+            tmp_file_directory=tmp_path, cassette=cassette
+        )
+        if isinstance(speech_to_text, AsyncOpenAISpeechToText):
+            return [
+                asyncio.run(speech_to_text.atranscribe(a))[0]
+                for a in (audio, short_audio)
+            ]
+        return [speech_to_text.transcribe(a)[0] for a in (audio, short_audio)]
+
+    path = tmp_path / "cassette.jsonl"
+    assert _transcribe(Cassette(path, "record")) == [TEST_TEXT, ""]
+    _offline(monkeypatch)
+    assert _transcribe(Cassette(path, "replay", time_scale=0)) == [
+        TEST_TEXT,
+        "",
+    ]
+
+
+def test_replay_timing(tmp_path: Path) -> None:
+    """
+    Test that responses are replayed with their original timing, scaled.
+    """
+
+    def _slow_response() -> dict:
+        time.sleep(0.05)
+        return {"text": TEST_TEXT}
+
+    path = tmp_path / "cassette.jsonl"
+    Cassette(path, "record").call("transcription", {"a": 1}, _slow_response)
+
+    for time_scale, minimum, maximum in ((1, 0.05, 1), (0, 0, 0.04)):
+        cassette = Cassette(path, "replay", time_scale=time_scale)
+        started = time.monotonic()
+        response = cassette.call("transcription", {"a": 1}, Mock())
+        assert minimum <= time.monotonic() - started < maximum
+        assert response == {"text": TEST_TEXT}
+
+
+def test_under_orchestrator(
+    no_openai_api_key: None,
+    patched_openai_chat_completion: None,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """
+    Test that an orchestrator works the same with a replayed cassette.
+    """
+    path = tmp_path / "cassette.jsonl"
+
+    def _run(cassette: Cassette) -> list:
+        orchestrator = Orchestrator(
+            OpenAIChatBot(CHATBOT_MODEL_TYPES[0], cassette=cassette)
+        )
+        results = [orchestrator.run_turn(f"Message {i}") for i in range(3)]
+        return [(result.response, result.costs) for result in results]
+
+    recorded = _run(Cassette(path, "record"))
+    _offline(monkeypatch)
+    assert _run(Cassette(path, "replay", time_scale=0)) == recorded
+
+
+def test_cassette_sad(tmp_path: Path) -> None:
+    """
+    Test that unknown modes and requests that were not recorded are
+    rejected.
+    """
+    path = tmp_path / "cassette.jsonl"
+    with pytest.raises(CassetteModeError):
+        Cassette(path, "rewind")
+
+    Cassette(path, "record")
+    with pytest.raises(CassetteMissError, match="No recorded response"):
+        Cassette(path).call("chat", {"messages": []}, Mock())
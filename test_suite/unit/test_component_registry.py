@@ -0,0 +1,93 @@
+import importlib.metadata
+import sys
+
+import pytest
+
+from chat_toolkit.common.component_registry import (
+    BUILTIN_COMPONENTS,
+    ComponentRegistry,
+)
+from chat_toolkit.common.exceptions import (
+    ComponentKindError,
+    UnknownComponentError,
+)
+from chat_toolkit.components.chatbots.openai_chatbot import OpenAIChatBot
+from test_suite.unit.conftest import FakeTextToSpeech
+
+
+@pytest.fixture
+def plugin_entry_points(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Fixture that makes installed packages appear to register components with
+    entry points.
+    """
+    entry_points = importlib.metadata.EntryPoints(
+        [
+            importlib.metadata.EntryPoint(
+                "fake",
+                "test_suite.unit.conftest:FakeTextToSpeech",
+                "chat_toolkit.text_to_speech",
+            ),
+            importlib.metadata.EntryPoint(
+                "lazy",
+                "not_imported_plugin:LazyChatBot",
+                "chat_toolkit.chatbots",
+            ),
+            importlib.metadata.EntryPoint(
+                "chatgpt",
+                "not_imported_plugin:ImpostorChatBot",
+                "chat_toolkit.chatbots",
+            ),
+            importlib.metadata.EntryPoint(
+                "unrelated", "not_imported_plugin:main", "console_scripts"
+            ),
+        ]
+    )
+    monkeypatch.setattr(
+        "importlib.metadata.entry_points", lambda: entry_points
+    )
+
+
+def test_builtin_components() -> None:
+    """
+    Test that the toolkit's own components are registered.
+    """
+    registry = ComponentRegistry()
+
+    for kind, components in BUILTIN_COMPONENTS.items():
+        assert set(registry.names(kind)) >= set(components)
+    assert registry.load("chatbot", "chatgpt") is OpenAIChatBot
+
+
+def test_entry_point_components(plugin_entry_points: None) -> None:
+    """
+    Test that components registered with entry points are discovered
+    without importing them, and can't replace existing components.
+    """
+    registry = ComponentRegistry()
+
+    assert registry.names("chatbot") == ("chatgpt", "lazy")
+    assert registry.names("text_to_speech") == ("pyttsx3", "fake")
+    assert "not_imported_plugin" not in sys.modules
+    assert registry.load("chatbot", "chatgpt") is OpenAIChatBot
+    assert registry.load("text_to_speech", "fake") is FakeTextToSpeech
+    with pytest.raises(ModuleNotFoundError):
+        registry.load("chatbot", "lazy")
+
+
+def test_register() -> None:
+    """
+    Test that components can be registered directly, and that unknown kinds
+    and names are rejected.
+    """
+    registry = ComponentRegistry({})
+    registry.register(
+        "text_to_speech", "fake", "test_suite.unit.conftest:FakeTextToSpeech"
+    )
+
+    assert registry.names("chatbot") == ()
+    assert registry.load("text_to_speech", "fake") is FakeTextToSpeech
+    with pytest.raises(UnknownComponentError):
+        registry.load("chatbot", "fake")
+    with pytest.raises(ComponentKindError):
+        registry.names("speech_to_speech")
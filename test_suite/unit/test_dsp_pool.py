@@ -0,0 +1,198 @@
+import hashlib
+import io
+import os
+from collections.abc import Generator
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.shared_memory import SharedMemory
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from chat_toolkit.common.dsp_pool import (
+    DSPWorkerPool,
+    digest,
+    encode_wav,
+    resample,
+    voice_activity,
+)
+from chat_toolkit.common.exceptions import SampleRateError
+from chat_toolkit.components.speech_to_text.transcription_cache import (
+    TranscriptionCache,
+)
+
+SAMPLE_RATE = 16000
+# Worker processes are only tested where this is verified to work in CI
+posix_only = pytest.mark.skipif(
+    os.name != "posix", reason="Worker pool is only tested on POSIX"
+)
+
+
+@pytest.fixture
+def audio() -> np.ndarray:
+    """
+    A second of stereo audio: half a second of silence, then half a second
+    of a tone.
+    """
+    seconds = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+    tone = 0.5 * np.sin(2 * np.pi * 440 * seconds)
+    tone[: SAMPLE_RATE // 2] = 0
+    return np.column_stack([tone, tone]).astype(np.float32)
+
+
+@pytest.fixture
+def dsp_pool() -> Generator[DSPWorkerPool, None, None]:
+    """
+    Enabled DSP worker pool that hands over audio of any length.
+    """
+    pool = DSPWorkerPool(workers=1, min_frames=0)
+    pool.enable()
+    yield pool
+    pool.disable()
+
+
+def test_encode_wav(audio: np.ndarray) -> None:
+    """
+    Test that encoded audio decodes to the original.
+    """
+    decoded, sample_rate = sf.read(
+        io.BytesIO(encode_wav(audio, SAMPLE_RATE)), dtype="float32"
+    )
+    assert sample_rate == SAMPLE_RATE
+    np.testing.assert_allclose(decoded, audio, atol=1e-4)
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.int16])
+@pytest.mark.parametrize("target_sample_rate", [8000, 16000, 48000])
+def test_resample(
+    audio: np.ndarray, dtype: type, target_sample_rate: int
+) -> None:
+    """
+    Test that resampled audio has the expected number of frames, type and
+    channels, and is unchanged when the sample rate is.
+    """
+    audio = (audio * 32767).astype(dtype)
+    resampled = resample(audio, SAMPLE_RATE, target_sample_rate)
+    assert resampled.shape == (target_sample_rate, 2)
+    assert resampled.dtype == dtype
+    if target_sample_rate == SAMPLE_RATE:
+        np.testing.assert_array_equal(resampled, audio)
+        assert resampled is not audio
+    assert resample(audio[:, 0], SAMPLE_RATE, target_sample_rate).shape == (
+        target_sample_rate,
+    )
+
+    with pytest.raises(SampleRateError):
+        resample(audio, 0, target_sample_rate)
+
+
+def test_voice_activity(audio: np.ndarray) -> None:
+    """
+    Test that only frames of the tone are detected as speech, for float and
+    integer samples alike.
+    """
+    frame_seconds = 0.05
+    frames = voice_activity(audio, SAMPLE_RATE, frame_seconds=frame_seconds)
+    assert len(frames) == 20
+    assert not frames[:10].any()
+    assert frames[10:].all()
+    np.testing.assert_array_equal(
+        voice_activity(
+            (audio * 32767).astype(np.int16),
+            SAMPLE_RATE,
+            frame_seconds=frame_seconds,
+        ),
+        frames,
+    )
+
+
+def test_digest(audio: np.ndarray) -> None:
+    """
+    Test that audio is hashed like its bytes, so transcription cache keys
+    are unchanged.
+    """
+    expected = hashlib.sha256(b"prefix" + audio.tobytes()).hexdigest()
+    assert digest(audio, b"prefix") == expected
+    assert digest(np.asfortranarray(audio), b"prefix") == expected
+
+
+@posix_only
+def test_pool(
+    dsp_pool: DSPWorkerPool,
+    audio: np.ndarray,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Test that work done in worker processes matches work done in the calling
+    thread, and that no shared memory is left behind.
+    """
+    created = []
+
+    class _SharedMemory(SharedMemory):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            created.append(self.name)
+
+    monkeypatch.setattr(shared_memory, "SharedMemory", _SharedMemory)
+
+    assert dsp_pool.encode_wav(audio, SAMPLE_RATE) == encode_wav(
+        audio, SAMPLE_RATE
+    )
+    np.testing.assert_array_equal(
+        dsp_pool.resample(audio, SAMPLE_RATE, 8000),
+        resample(audio, SAMPLE_RATE, 8000),
+    )
+    np.testing.assert_array_equal(
+        dsp_pool.voice_activity(audio, SAMPLE_RATE),
+        voice_activity(audio, SAMPLE_RATE),
+    )
+    assert dsp_pool.digest(audio, b"prefix") == digest(audio, b"prefix")
+    assert TranscriptionCache.make_key(
+        audio, SAMPLE_RATE, "model"
+    ) == TranscriptionCache.make_key(audio.copy(), SAMPLE_RATE, "model")
+    assert dsp_pool.digest(audio[:0]) == digest(audio[:0])
+
+    with pytest.raises(SampleRateError):
+        dsp_pool.resample(audio, SAMPLE_RATE, -1)
+
+    assert created
+    for name in created:
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name=name)
+
+
+@posix_only
+def test_pool_disabled(audio: np.ndarray) -> None:
+    """
+    Test that a disabled pool does its work in the calling thread, without
+    starting workers, and that disabling stops them.
+    """
+    pool = DSPWorkerPool(workers=1, min_frames=0)
+    assert pool.digest(audio) == digest(audio)
+    assert pool._executor is None
+
+    pool.enable()
+    assert pool.enabled and pool._executor is not None
+    pool.disable()
+    assert not pool.enabled and pool._executor is None
+    assert pool.digest(audio) == digest(audio)
+
+
+def test_pool_without_resource_tracker(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Test that the resource tracker is only started where shared memory is
+    tracked, since it can only be started on POSIX.
+    """
+    ensure_running = Mock()
+    monkeypatch.setattr(resource_tracker, "ensure_running", ensure_running)
+    monkeypatch.setattr(
+        "chat_toolkit.common.dsp_pool._TRACKS_SHARED_MEMORY", False
+    )
+    pool = DSPWorkerPool(workers=1)
+    pool.enable()
+    pool.disable()
+
+    ensure_running.assert_not_called()
@@ -0,0 +1,73 @@
+import subprocess  # noqa: S404
+import sys
+
+import pytest
+
+import chat_toolkit
+import chat_toolkit.common
+import chat_toolkit.components
+
+
+def test_lazy_attributes() -> None:
+    """
+    Test that every exported name resolves, and that unknown names raise
+    AttributeError.
+    """
+    for package in (
+        chat_toolkit,
+        chat_toolkit.common,
+        chat_toolkit.components,
+    ):
+        for name in package.__all__:
+            assert getattr(package, name) is not None
+        with pytest.raises(AttributeError):
+            package.NotAComponent  # noqa: B018
+
+    assert chat_toolkit.OpenAIChatBot is chat_toolkit.components.OpenAIChatBot
+
+
+def test_text_only_imports() -> None:
+    """
+    Test that a text only chatbot doesn't import the audio stack.
+    """
+    audio_modules = subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "from chat_toolkit import OpenAIChatBot, Orchestrator\n"
+            "print(sorted(set(sys.modules) & {'sounddevice', 'soundfile', "
+            "'pyttsx3', 'keyboard', 'pyxhook'}))",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.strip()
+
+    assert audio_modules == "[]"
+
+
+def test_command_line_imports() -> None:
+    """
+    Test that the command line only imports each mode's dependencies when
+    the mode runs.
+    """
+    mode_modules = subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "import chat_toolkit.__main__\n"
+            "print(sorted(set(sys.modules) & {"
+            "'chat_toolkit.common.server', "
+            "'chat_toolkit.common.openai_stub_server', "
+            "'chat_toolkit.common.dsp_pool', "
+            "'chat_toolkit.common.batch_runner', "
+            "'chat_toolkit.common.load_generator'}))",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.strip()
+
+    assert mode_modules == "[]"
@@ -0,0 +1,159 @@
+from unittest.mock import Mock
+
+import pytest
+
+from chat_toolkit.common.load_generator import LoadGenerator, LoadProfile
+from chat_toolkit.common.orchestrator import Orchestrator
+from test_suite.unit.conftest import (
+    CHATBOT_MODEL_TYPES,
+    SPEECH_TO_TEXT_MODEL_TYPES,
+    FakeTextToSpeech,
+    OpenAIChatbotFactoryType,
+    OpenAISpeechToTextFactoryType,
+)
+
+
+def test_run(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+) -> None:
+    """
+    Test that every conversation is had, with messages of the configured
+    size, and that latency percentiles are reported for every stage.
+    """
+    text_to_speech = FakeTextToSpeech()
+    load_generator = LoadGenerator(
+        lambda: Orchestrator(
+            patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0]),
+            text_to_speech_component=text_to_speech,
+        ),
+        LoadProfile(
+            conversations=3, turns=2, message_words=10, think_time=0.01
+        ),
+    )
+    result = load_generator.run()
+
+    assert result["completed_turns"] == 6
+    assert result["failed_turns"] == 0
+    assert result["throughput_turns_per_second"] > 0
+    assert result["cost_estimate"] > 0
+    assert result["duration_seconds"] >= 0.01
+    assert set(result["stages"]) == {"chat", "speak", "total"}
+    for latencies in result["stages"].values():
+        assert latencies["count"] == 6
+        assert latencies["p50"] <= latencies["p95"] <= latencies["p99"]
+    assert len(text_to_speech.said) == 6
+    assert all(
+        len(text.split()) == len("Response: ".split()) + 10
+        for text in text_to_speech.said
+    )
+
+
+@pytest.mark.parametrize("speech_to_text_model", SPEECH_TO_TEXT_MODEL_TYPES)
+def test_run_audio(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    patched_openai_speech_to_text_factory: OpenAISpeechToTextFactoryType,
+    wav_file_factory,
+    speech_to_text_model: str,
+) -> None:
+    """
+    Test that audio can be sent as every message.
+    """
+    load_generator = LoadGenerator(
+        lambda: Orchestrator(
+            patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0]),
+            patched_openai_speech_to_text_factory(speech_to_text_model),
+        ),
+        LoadProfile(
+            conversations=2, turns=1, audio=wav_file_factory().read_bytes()
+        ),
+    )
+    result = load_generator.run()
+
+    assert result["stages"]["transcribe"]["count"] == 2
+    assert result["config"]["audio"]
+
+
+def test_failed_turns(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Test that failed turns are counted, without ending the conversation.
+    """
+    monkeypatch.setattr(
+        "openai.ChatCompletion.create",
+        Mock(side_effect=RuntimeError("Rate limited")),
+    )
+    load_generator = LoadGenerator(
+        lambda: Orchestrator(
+            patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0])
+        ),
+        LoadProfile(conversations=1, turns=1),
+    )
+    result = load_generator.run()
+
+    assert result["failed_turns"] == 1
+    assert result["completed_turns"] == 0
+    assert result["stages"] == {}
+
+
+def test_failed_turns_cost(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    patched_openai_speech_to_text_factory: OpenAISpeechToTextFactoryType,
+    wav_file_factory,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Test that what failed turns were billed for counts towards the cost.
+    """
+    monkeypatch.setattr(
+        "openai.ChatCompletion.create",
+        Mock(side_effect=RuntimeError("Rate limited")),
+    )
+    load_generator = LoadGenerator(
+        lambda: Orchestrator(
+            patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0]),
+            patched_openai_speech_to_text_factory(
+                SPEECH_TO_TEXT_MODEL_TYPES[0]
+            ),
+        ),
+        LoadProfile(
+            conversations=1, turns=1, audio=wav_file_factory().read_bytes()
+        ),
+    )
+    result = load_generator.run()
+
+    # The audio was transcribed before the chatbot failed
+    assert result["completed_turns"] == 0
+    assert result["cost_estimate"] > 0
+
+
+def test_compare() -> None:
+    """
+    Test that runs are compared with a baseline run, stage by stage.
+    """
+    baseline = {
+        "throughput_turns_per_second": 2.0,
+        "stages": {
+            "chat": {"p50": 1.0, "p95": 2.0, "p99": 4.0},
+            "speak": {"p50": 1.0, "p95": 1.0, "p99": 1.0},
+        },
+    }
+    result = {
+        "throughput_turns_per_second": 1.0,
+        "stages": {
+            "chat": {"p50": 1.5, "p95": 2.0, "p99": 0.0},
+            "transcribe": {"p50": 1.0, "p95": 1.0, "p99": 1.0},
+        },
+    }
+    comparison = LoadGenerator.compare(result, baseline)
+
+    assert comparison["throughput_turns_per_second"] == {
+        "baseline": 2.0,
+        "current": 1.0,
+        "change": -0.5,
+    }
+    assert list(comparison["stages"]) == ["chat"]
+    assert [
+        change["change"] for change in comparison["stages"]["chat"].values()
+    ] == [0.5, 0.0, -1.0]
@@ -1,9 +1,25 @@
+import importlib
+import json
+from functools import partial
+from pathlib import Path
 from typing import Optional
 from unittest.mock import Mock
 
 import pytest
 
-from chat_toolkit.__main__ import COMPONENTS, main
+from chat_toolkit.__main__ import (
+    COMPONENT_MODULE,
+    COMPONENTS,
+    batch,
+    bench,
+    build_orchestrator,
+    main,
+    replay,
+    serve,
+    stub,
+)
+from chat_toolkit.common.load_generator import LoadProfile
+from test_suite.unit.conftest import TEST_TEXT
 
 
 @pytest.mark.parametrize(
@@ -38,3 +54,158 @@ def test_main(
         main(chatbot_model, speech_to_text_model, text_to_speech_model)
     except ImportError as e:
         raise AssertionError from e
+
+
+def test_components() -> None:
+    """
+    Test that the toolkit's components are still listed by class name.
+    """
+    assert COMPONENTS == {
+        "chatbot": {"chatgpt": "OpenAIChatBot"},
+        "speech_to_text": {"whisper": "OpenAISpeechToText"},
+        "text_to_speech": {"pyttsx3": "Pyttsx3TextToSpeech"},
+    }
+    components = importlib.import_module(COMPONENT_MODULE)
+    for names in COMPONENTS.values():
+        for class_name in names.values():
+            assert getattr(components, class_name)
+
+
+@pytest.mark.parametrize(
+    "speech_to_text_model",
+    list(COMPONENTS["speech_to_text"].keys()) + [None],
+)
+def test_serve(
+    speech_to_text_model: Optional[str],
+    monkeypatch: pytest.MonkeyPatch,
+    patched_openai_speech_to_text: None,
+) -> None:
+    """
+    Test that the server builds a new orchestrator for each session.
+    """
+    run = Mock()
+    monkeypatch.setattr(
+        "chat_toolkit.common.server.ConversationServer.run", run
+    )
+    server = serve("chatgpt", speech_to_text_model, workers=2)
+
+    orchestrators = [server._orchestrator_factory() for _ in range(2)]
+    assert orchestrators[0] is not orchestrators[1]
+    assert len(orchestrators[0].components) == 1 + bool(speech_to_text_model)
+    run.assert_called_once_with("127.0.0.1", 8080)
+
+
+def test_replay_script(
+    tmp_path: Path,
+    wav_file_factory,
+    patched_openai_chat_completion: None,
+    patched_openai_speech_to_text: None,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    """
+    Test that a conversation can be replayed from a JSONL script, with text
+    and audio messages, and that the result of each turn is written out.
+    """
+    audio_path = wav_file_factory()
+    script = tmp_path / "script.jsonl"
+    script.write_text(
+        "\n".join(
+            json.dumps(turn)
+            for turn in (
+                {"start_prompt": "Be nice"},
+                {"message": "Hi there"},
+                {"audio": audio_path.name},
+            )
+        )
+    )
+    output = tmp_path / "results.jsonl"
+    results = replay("chatgpt", "whisper", None, str(script), str(output))
+
+    assert [result.response for result in results] == [
+        "Response: Hi there",
+        f"Response: {TEST_TEXT}",
+    ]
+    written = [json.loads(line) for line in output.read_text().splitlines()]
+    assert written == [result.to_dict() for result in results]
+    printed = capsys.readouterr().out
+    assert "Cost Summary" in printed
+    assert "Timing Summary" in printed
+
+
+def test_replay_directory(
+    wav_file_factory,
+    patched_openai_chat_completion: None,
+    patched_openai_speech_to_text: None,
+) -> None:
+    """
+    Test that a directory of WAV files is replayed as audio messages.
+    """
+    audio_paths = [wav_file_factory(seed=seed) for seed in range(3)]
+    results = replay("chatgpt", "whisper", None, str(audio_paths[0].parent))
+
+    assert len(results) == 3
+    assert all(result.transcript == TEST_TEXT for result in results)
+
+
+def test_bench(
+    tmp_path: Path,
+    patched_openai_chat_completion: None,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    """
+    Test that a benchmark writes its result, and can be compared against a
+    baseline run.
+    """
+    output = tmp_path / "bench.json"
+    orchestrator_factory = partial(build_orchestrator, "chatgpt", None, None)
+    result = bench(
+        orchestrator_factory,
+        LoadProfile(conversations=2, turns=2),
+        output=str(output),
+    )
+    assert json.loads(output.read_text()) == result
+    assert "Benchmark Summary" in capsys.readouterr().out
+
+    bench(
+        orchestrator_factory,
+        LoadProfile(conversations=2),
+        baseline=str(output),
+    )
+    printed = capsys.readouterr().out
+    assert "Comparison to Baseline" in printed
+    assert "chat: p50 " in printed
+
+
+def test_batch(
+    tmp_path: Path,
+    patched_openai_chat_completion: None,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    """
+    Test that a batch of conversations is had, and its summary printed.
+    """
+    script = tmp_path / "batch.jsonl"
+    script.write_text('{"id": "a", "messages": ["Hi"]}\n')
+    output = tmp_path / "results.jsonl"
+    summary = batch("chatgpt", str(script), str(output), conversations=2)
+
+    assert summary["completed"] == 1
+    assert json.loads(output.read_text())["responses"] == ["Response: Hi"]
+    printed = capsys.readouterr().out
+    assert "Batch Summary" in printed
+    assert "Estimated cost" in printed
+
+
+def test_stub(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that the stub server is configured from the command line.
+    """
+    run = Mock()
+    monkeypatch.setattr(
+        "chat_toolkit.common.openai_stub_server.OpenAIStubServer.run", run
+    )
+    server = stub(latency=0.5, rate_limit_rate=0.1)
+
+    assert server.latency == 0.5
+    assert server.failures.rate_limit_rate == 0.1
+    run.assert_called_once_with("127.0.0.1", 8081)
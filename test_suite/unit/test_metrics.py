@@ -0,0 +1,103 @@
+import urllib.request
+
+from chat_toolkit.common.metrics import MetricsRegistry
+from chat_toolkit.common.orchestrator import Orchestrator
+from test_suite.unit.conftest import (
+    CHATBOT_MODEL_TYPES,
+    OpenAIChatbotFactoryType,
+)
+
+
+def test_disabled() -> None:
+    """
+    Test that a disabled registry collects nothing.
+    """
+    registry = MetricsRegistry()
+    registry.inc("requests", component="OpenAIChatBot")
+    registry.observe("stage", 0.1, stage="chat")
+
+    assert registry.render() == ""
+
+
+def test_render() -> None:
+    """
+    Test that counters and histograms are rendered in Prometheus' format.
+    """
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.enable()
+    registry.inc("requests", component="OpenAIChatBot")
+    registry.inc("requests", 2, component="OpenAIChatBot")
+    registry.inc("errors", component='Quoted "Bot"')
+    registry.observe("stage", 0.1, stage="chat")
+    registry.observe("stage", 0.5, stage="chat")
+    registry.observe("stage", 5.0, stage="chat")
+
+    assert registry.render() == (
+        "# HELP chat_toolkit_errors_total Requests made to models that "
+        "failed.\n"
+        "# TYPE chat_toolkit_errors_total counter\n"
+        'chat_toolkit_errors_total{component="Quoted \\"Bot\\""} 1.0\n'
+        "# HELP chat_toolkit_requests_total Requests made to models.\n"
+        "# TYPE chat_toolkit_requests_total counter\n"
+        'chat_toolkit_requests_total{component="OpenAIChatBot"} 3.0\n'
+        "# HELP chat_toolkit_stage_seconds Latency of each stage of a "
+        "component's work.\n"
+        "# TYPE chat_toolkit_stage_seconds histogram\n"
+        'chat_toolkit_stage_seconds_bucket{stage="chat",le="0.1"} 1\n'
+        'chat_toolkit_stage_seconds_bucket{stage="chat",le="1.0"} 2\n'
+        'chat_toolkit_stage_seconds_bucket{stage="chat",le="+Inf"} 3\n'
+        'chat_toolkit_stage_seconds_sum{stage="chat"} 5.6\n'
+        'chat_toolkit_stage_seconds_count{stage="chat"} 3\n'
+    )
+
+    registry.reset()
+    assert registry.render() == ""
+
+
+def test_serve() -> None:
+    """
+    Test that metrics can be served over HTTP, and dumped to a file.
+    """
+    registry = MetricsRegistry()
+    server = registry.serve(port=0)
+    try:
+        registry.inc("requests")
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:  # noqa: S310
+            body = response.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert registry.enabled
+    assert "chat_toolkit_requests_total 1.0\n" in body
+
+
+def test_component_metrics(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    metrics: MetricsRegistry,
+) -> None:
+    """
+    Test that components and orchestrators update the registry.
+    """
+    orchestrator = Orchestrator(
+        patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0])
+    )
+    orchestrator.run_turn("Hello there")
+    rendered = metrics.render()
+
+    labels = f'component="OpenAIChatBot",model="{CHATBOT_MODEL_TYPES[0]}"'
+    assert f"chat_toolkit_requests_total{{{labels}}} 1.0\n" in rendered
+    assert (
+        'chat_toolkit_tokens_total{component="OpenAIChatBot",'
+        f'kind="completion_tokens",model="{CHATBOT_MODEL_TYPES[0]}"}} 3.0'
+        in rendered
+    )
+    assert (
+        f'chat_toolkit_stage_seconds_count{{{labels},stage="completion"}} 1'
+        in rendered
+    )
+    assert (
+        'chat_toolkit_stage_seconds_count{component="Orchestrator",model="",'
+        'stage="total"} 1' in rendered
+    )
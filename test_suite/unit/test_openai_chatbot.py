@@ -1,7 +1,14 @@
+import time
+from collections.abc import Generator
+from typing import cast
+from unittest.mock import Mock
+
 import pytest
 
 from chat_toolkit.common.custom_types import StartingPromptsType
+from chat_toolkit.common.scheduler import FairScheduler
 from test_suite.unit.conftest import (
+    CHATBOT_MODEL_TYPES,
     SPEECH_TO_TEXT_MODEL_TYPES,
     OpenAIChatbotFactoryType,
 )
@@ -100,6 +107,7 @@ def test_send_message(
         "total_tokens": (total_tokens := completion_tokens + prompt_tokens),
     }
     assert chatbot.total_tokens_used == total_tokens
+    assert chatbot.timing_data["completion"]["count"] == 1
 
 
 @pytest.mark.parametrize("model", SPEECH_TO_TEXT_MODEL_TYPES)
@@ -126,3 +134,113 @@ def test_cost_estimate_data(
     assert cost_estimate == tokens_used["total_tokens"] / 1000 * pricing_rate
     assert metadata == tokens_used | {"pricing_rate": chatbot._pricing_rate}
     assert chatbot.total_tokens_used == tokens * 3
+
+
+@pytest.mark.parametrize("model", CHATBOT_MODEL_TYPES)
+@pytest.mark.parametrize("adopt", [True, False])
+def test_fork_and_join(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    model: str,
+    adopt: bool,
+) -> None:
+    """
+    Test that forks do not affect the original chatbot until they are
+    joined, and that their tokens are always accounted for.
+    """
+    chatbot = patched_openai_chatbot_factory(model)
+    chatbot.send_message("Hello")
+    history = [message.copy() for message in chatbot.history]
+
+    fork = chatbot.fork()
+    fork.send_message("How are you?")
+    assert chatbot.history == history
+    assert chatbot.total_tokens_used == 3
+    assert fork.total_tokens_used == 10
+
+    chatbot.join(fork, adopt=adopt)
+    assert chatbot.total_tokens_used == 13
+    assert chatbot.history == (fork.history if adopt else history)
+
+
+@pytest.mark.parametrize("model", CHATBOT_MODEL_TYPES)
+def test_stream_message(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    patched_openai_chat_completion_stream: None,
+    model: str,
+) -> None:
+    """
+    Test that responses are streamed, recorded to history, and that token
+    usage is estimated.
+    """
+    chatbot = patched_openai_chatbot_factory(model)
+    test_message = "Hello! How are you?"
+    fragments = list(chatbot.stream_message(test_message))
+
+    assert fragments == ["Response: ", "Hello! ", "How ", "are ", "you?"]
+    assert chatbot.history == [
+        {"role": "user", "content": test_message},
+        {"role": "assistant", "content": "".join(fragments)},
+    ]
+    assert chatbot.tokens_used == {
+        "completion_tokens": 5,
+        # A quarter of the message's 19 characters, rounded up, plus 4 per
+        # message
+        "prompt_tokens": 9,
+        "total_tokens": 14,
+    }
+    assert set(chatbot.timing_data) == {"first_token", "completion"}
+
+
+def test_stream_message_incomplete(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    patched_openai_chat_completion_stream: None,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Test that responses abandoned part way are billed but left out of the
+    history, and that failed responses are neither.
+    """
+    chatbot = patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0])
+    fragments = cast(
+        Generator[str, None, None],
+        chatbot.stream_message("Hello! How are you?"),
+    )
+    assert next(fragments) == "Response: "
+    fragments.close()
+
+    assert chatbot.history == [
+        {"role": "user", "content": "Hello! How are you?"}
+    ]
+    assert chatbot.tokens_used["completion_tokens"] == 1
+
+    monkeypatch.setattr(
+        "openai.ChatCompletion.create", Mock(side_effect=RuntimeError)
+    )
+    with pytest.raises(RuntimeError):
+        list(chatbot.stream_message("Still there?"))
+
+    assert [message["content"] for message in chatbot.history] == [
+        "Hello! How are you?",
+        "Still there?",
+    ]
+    assert chatbot.tokens_used["completion_tokens"] == 1
+
+
+def test_stream_message_releases_scheduler_slot(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    patched_openai_chat_completion_stream: None,
+    scheduler: FairScheduler,
+) -> None:
+    """
+    Test that a response's scheduler slot is released once it has been
+    streamed, even if the caller hasn't finished reading it.
+    """
+    chatbot = patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0])
+    fragments = chatbot.stream_message("Hello! How are you?")
+    assert next(fragments) == "Response: "
+
+    deadline = time.monotonic() + 5
+    while scheduler.summary["active"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert scheduler.summary["active"] == 0
+    assert "".join(fragments) == "Hello! How are you?"
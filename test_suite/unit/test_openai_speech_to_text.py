@@ -1,10 +1,25 @@
+import io
+import threading
+from collections.abc import Generator
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Union
-from unittest.mock import Mock
+from typing import Callable, Union
+from unittest.mock import MagicMock, Mock
 
+import numpy as np
+import openai
 import pytest
+import sounddevice as sd
+import soundfile as sf
 
+from chat_toolkit.common.metrics import MetricsRegistry
 from chat_toolkit.common.utils import temporary_file
+from chat_toolkit.components.speech_to_text.partial_transcriber import (
+    PartialTranscriber,
+)
+from chat_toolkit.components.speech_to_text.transcription_cache import (
+    TranscriptionCache,
+)
 from test_suite.unit.conftest import (
     SPEECH_TO_TEXT_MODEL_TYPES,
     TEST_TEXT,
@@ -35,6 +50,24 @@ def test_init(
     assert isinstance(speech_to_text.tmp_file_directory, Path)
 
 
+def test_sample_rate_cached(
+    patched_openai_speech_to_text_factory: OpenAISpeechToTextFactoryType,
+) -> None:
+    """
+    Test that each audio device is only queried once, however many
+    components use it.
+    """
+    first = patched_openai_speech_to_text_factory(
+        SPEECH_TO_TEXT_MODEL_TYPES[0]
+    )
+    second = patched_openai_speech_to_text_factory(
+        SPEECH_TO_TEXT_MODEL_TYPES[0]
+    )
+    assert first and second
+    assert first.sample_rate == second.sample_rate == 44100
+    assert sd.query_devices.call_count == 1
+
+
 @pytest.mark.parametrize("model", SPEECH_TO_TEXT_MODEL_TYPES)
 def test_record_and_transcribe_sad(
     patched_openai_speech_to_text_factory: OpenAISpeechToTextFactoryType,
@@ -96,3 +129,242 @@ def test_transcribe(
         "wav", tmp_file_directory=speech_to_text.tmp_file_directory
     ) as tmp:
         assert TEST_TEXT, {} == speech_to_text.transcribe(tmp)
+
+
+@pytest.mark.parametrize("model", SPEECH_TO_TEXT_MODEL_TYPES)
+def test_transcribe_bills_audio_duration(
+    patched_openai_speech_to_text_factory: OpenAISpeechToTextFactoryType,
+    wav_file_factory: Callable[..., Path],
+    model: str,
+) -> None:
+    """
+    Test that transcribing audio bills its duration, rounded up.
+    """
+    speech_to_text = patched_openai_speech_to_text_factory(model)
+    assert speech_to_text
+    with wav_file_factory(seconds=1.5).open("r+b") as audio_file:
+        assert speech_to_text.transcribe(audio_file) == (TEST_TEXT, {})
+    assert speech_to_text.seconds_transcribed == 2
+
+
+@pytest.mark.parametrize("model", SPEECH_TO_TEXT_MODEL_TYPES)
+def test_transcription_cache(
+    patched_openai_speech_to_text_factory: OpenAISpeechToTextFactoryType,
+    wav_file_factory: Callable[..., Path],
+    model: str,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Test that repeated audio is served from the cache without calling
+    OpenAI, and that cached seconds are reported separately from billed
+    seconds. Also test that the disk tier outlives the component.
+    """
+    transcribe = Mock(return_value={"text": TEST_TEXT})
+    monkeypatch.setattr("openai.Audio.transcribe", transcribe)
+    cache_directory = tmp_path / "cache"
+    speech_to_text = patched_openai_speech_to_text_factory(
+        model,
+        transcription_cache=TranscriptionCache(directory=cache_directory),
+    )
+    assert speech_to_text
+    for _ in range(3):
+        with wav_file_factory(seconds=1.5).open("r+b") as audio_file:
+            speech_to_text.transcribe(audio_file)
+    with wav_file_factory(seconds=1.5, seed=1).open("r+b") as audio_file:
+        _, metadata = speech_to_text.transcribe(audio_file)
+
+    assert metadata == {"cache_hit": False}
+    assert transcribe.call_count == 2
+    _, metadata = speech_to_text.cost_estimate_data
+    assert metadata == {
+        "seconds_transcribed": 4,
+        "seconds_cached": 4,
+        "cache_hits": 2,
+        "pricing_rate": speech_to_text._pricing_rate,
+    }
+
+    fresh_speech_to_text = patched_openai_speech_to_text_factory(
+        model,
+        transcription_cache=TranscriptionCache(directory=cache_directory),
+    )
+    assert fresh_speech_to_text
+    with wav_file_factory(seconds=1.5).open("r+b") as audio_file:
+        assert fresh_speech_to_text.transcribe(audio_file) == (
+            TEST_TEXT,
+            {"cache_hit": True},
+        )
+    assert transcribe.call_count == 2
+
+
+@pytest.mark.parametrize("model", SPEECH_TO_TEXT_MODEL_TYPES)
+def test_audio_too_short(
+    patched_openai_speech_to_text_factory: OpenAISpeechToTextFactoryType,
+    wav_file_factory: Callable[..., Path],
+    model: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Test that audio too short to transcribe is transcribed as silence,
+    without being billed or cached.
+    """
+    transcribe = Mock(
+        side_effect=openai.error.InvalidRequestError(
+            "Audio file is too short. Minimum audio length is 0.1 seconds.",
+            None,
+        )
+    )
+    monkeypatch.setattr("openai.Audio.transcribe", transcribe)
+    speech_to_text = patched_openai_speech_to_text_factory(
+        model, transcription_cache=TranscriptionCache()
+    )
+    assert speech_to_text
+    for _ in range(2):
+        with wav_file_factory(seconds=0.05).open("r+b") as audio_file:
+            assert speech_to_text.transcribe(audio_file) == ("", {})
+
+    assert transcribe.call_count == 2
+    assert speech_to_text.seconds_transcribed == 0
+
+
+@pytest.mark.parametrize("model", SPEECH_TO_TEXT_MODEL_TYPES)
+def test_transcribe_speech_partial_transcripts(
+    patched_openai_speech_to_text_factory: OpenAISpeechToTextFactoryType,
+    model: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Test that partial transcripts are produced while recording, and that
+    they are billed, but not cached or timed as full transcriptions.
+    """
+    speech_to_text = patched_openai_speech_to_text_factory(
+        model, transcription_cache=TranscriptionCache()
+    )
+    assert speech_to_text
+    partial_transcripts: list[str] = []
+    partial_transcribed = threading.Event()
+
+    def _on_partial_transcript(text: str) -> None:
+        partial_transcripts.append(text)
+        partial_transcribed.set()
+
+    def _record(file_path: str, on_audio_block: Callable) -> None:
+        block = np.zeros((speech_to_text.sample_rate, 2))
+        sf.write(file_path, block, speech_to_text.sample_rate)
+        on_audio_block(block)
+        # Don't stop recording until the partial transcript is in
+        assert partial_transcribed.wait(timeout=5)
+
+    monkeypatch.setattr(
+        speech_to_text, "record_unspecified_length_audio", _record
+    )
+
+    # The partial transcript was of the same audio, but wasn't cached
+    assert speech_to_text.transcribe_speech(_on_partial_transcript) == (
+        TEST_TEXT,
+        {"cache_hit": False},
+    )
+    assert partial_transcripts == [TEST_TEXT]
+    assert speech_to_text.seconds_transcribed == 2
+    assert speech_to_text.timing_data["transcription"]["count"] == 1
+    assert speech_to_text.timing_data["partial_transcription"]["count"] == 1
+
+
+@pytest.mark.parametrize("overflowed", [[False, False], [True, False, True]])
+def test_input_overflows(
+    patched_openai_speech_to_text_factory: OpenAISpeechToTextFactoryType,
+    monkeypatch: pytest.MonkeyPatch,
+    loguru_caplog: pytest.LogCaptureFixture,
+    metrics: MetricsRegistry,
+    tmp_path: Path,
+    overflowed: list[bool],
+) -> None:
+    """
+    Test that blocks of audio input lost while recording are counted, and
+    reported once recording has finished.
+    """
+    speech_to_text = patched_openai_speech_to_text_factory(
+        SPEECH_TO_TEXT_MODEL_TYPES[0]
+    )
+    assert speech_to_text
+    key_tracker = Mock()
+    key_tracker.check_if_still_recording.side_effect = [True] * (
+        len(overflowed) - 1
+    ) + [False]
+    monkeypatch.setattr(
+        "chat_toolkit.components.speech_to_text."
+        "speech_to_text_component_base.KeyTracker",
+        Mock(return_value=key_tracker),
+    )
+
+    @contextmanager
+    def _input_stream(callback: Callable) -> Generator[None, None, None]:
+        for input_overflow in overflowed:
+            # Stands in for sounddevice.CallbackFlags
+            status = MagicMock(input_overflow=input_overflow)
+            status.__bool__.return_value = input_overflow
+            callback(np.zeros((512, 2)), 512, None, status)
+        yield
+
+    monkeypatch.setattr(speech_to_text, "_input_stream", _input_stream)
+
+    speech_to_text.record_unspecified_length_audio(str(tmp_path / "a.wav"))
+    assert speech_to_text.input_overflows == sum(overflowed)
+    warnings = [
+        record.message
+        for record in loguru_caplog.records
+        if "overflowed" in record.message
+    ]
+    if any(overflowed):
+        assert warnings == [
+            f"{sum(overflowed)} blocks of audio input overflowed while "
+            f"recording ({sum(overflowed)} so far)"
+        ]
+        assert "chat_toolkit_input_overflows_total" in metrics.render()
+    else:
+        assert not warnings
+
+
+def test_partial_transcripts_stop_after_max_seconds() -> None:
+    """
+    Test that partial transcriptions stop once the maximum duration of audio
+    has been recorded, since each one sends all the audio recorded so far.
+    """
+    transcribe = Mock(return_value=(TEST_TEXT, {}))
+    on_partial_transcript = Mock()
+    partial_transcriber = PartialTranscriber(
+        transcribe, on_partial_transcript, 1000, 1.0, max_seconds=3.0
+    )
+    for _ in range(5):
+        partial_transcriber.add_block(np.zeros((1000, 2)))
+        if partial_transcriber._in_flight is not None:
+            partial_transcriber._in_flight.result()
+    partial_transcriber.close()
+
+    assert transcribe.call_count == on_partial_transcript.call_count == 3
+    sent_frames = [
+        sf.info(io.BytesIO(call.args[0])).frames
+        for call in transcribe.call_args_list
+    ]
+    assert sent_frames == [1000, 2000, 3000]
+
+
+def test_partial_transcript_errors_logged(
+    loguru_caplog: pytest.LogCaptureFixture,
+) -> None:
+    """
+    Test that errors passing on partial transcripts are logged, rather than
+    lost in the partial transcription thread.
+    """
+    partial_transcriber = PartialTranscriber(
+        Mock(return_value=(TEST_TEXT, {})),
+        Mock(side_effect=RuntimeError),
+        1000,
+        1.0,
+    )
+    partial_transcriber.add_block(np.zeros((1000, 2)))
+    assert partial_transcriber._in_flight is not None
+    partial_transcriber._in_flight.result()
+    partial_transcriber.close()
+
+    assert "Partial transcription failed" in loguru_caplog.text
@@ -0,0 +1,153 @@
+import io
+import json
+from collections.abc import Generator
+from typing import Callable
+from unittest.mock import Mock
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import numpy as np
+import openai
+import pytest
+import soundfile as sf
+
+from chat_toolkit.common.openai_stub_server import (
+    OpenAIStubServer,
+    StubFailures,
+)
+from chat_toolkit.components.chatbots.openai_chatbot import OpenAIChatBot
+from chat_toolkit.components.speech_to_text.openai_speech_to_text import (
+    OpenAISpeechToText,
+)
+from chat_toolkit.components.speech_to_text.speech_to_text_component_base import (  # noqa: E501
+    default_sample_rate,
+)
+from test_suite.unit.conftest import CHATBOT_MODEL_TYPES
+
+StubServerFactoryType = Callable[..., OpenAIStubServer]
+
+
+@pytest.fixture
+def stub_server_factory(
+    monkeypatch: pytest.MonkeyPatch,
+) -> Generator[StubServerFactoryType, None, None]:
+    """
+    Factory that runs a stub server in the background for the rest of the
+    test, with OpenAI's client pointed at it.
+    """
+    contexts = []
+
+    def _inner(**kwargs) -> OpenAIStubServer:
+        server = OpenAIStubServer(**kwargs)
+        context = server.running()
+        monkeypatch.setattr("openai.api_base", context.__enter__())
+        monkeypatch.setattr("openai.api_key", "stub")
+        contexts.append(context)
+        return server
+
+    monkeypatch.setattr(
+        "chat_toolkit.components.chatbots.openai_chatbot.set_openai_api_key",
+        Mock(),
+    )
+    yield _inner
+    for context in contexts:
+        context.__exit__(None, None, None)
+
+
+def _wav(seconds: float) -> bytes:
+    """
+    Encode some silence as a WAV file.
+    """
+    audio = io.BytesIO()
+    sf.write(audio, np.zeros(int(seconds * 16000)), 16000, format="WAV")
+    return audio.getvalue()
+
+
+def test_chat_completions(stub_server_factory: StubServerFactoryType) -> None:
+    """
+    Test that the chatbot can send and stream messages over HTTP, and that
+    token usage is accounted for by the server.
+    """
+    server = stub_server_factory(completion_tokens=3, chunk_interval=0.001)
+    chatbot = OpenAIChatBot(CHATBOT_MODEL_TYPES[0])
+    chatbot.prompt_chatbot("Be nice")
+
+    response, _ = chatbot.send_message("Hi there")
+    assert response == "token0 token1 token2"
+    assert chatbot.tokens_used == {
+        "completion_tokens": 3,
+        "prompt_tokens": 4,
+        "total_tokens": 7,
+    }
+
+    fragments = list(chatbot.stream_message("How are you?"))
+    assert fragments == ["token0", " token1", " token2"]
+
+    usage = server.usage
+    assert usage["requests"] == 2
+    assert usage["completion_tokens"] == 6
+    assert usage["prompt_tokens"] == 4 + 10
+
+
+def test_transcriptions(
+    stub_server_factory: StubServerFactoryType,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Test that audio can be transcribed over HTTP, and that audio that is too
+    short is treated as silence.
+    """
+    monkeypatch.setattr(
+        "sounddevice.query_devices",
+        Mock(return_value={"default_samplerate": "16000"}),
+    )
+    default_sample_rate.cache_clear()
+    server = stub_server_factory(transcript="Hello")
+    speech_to_text = OpenAISpeechToText()
+
+    assert speech_to_text.transcribe(_wav(1.5))[0] == "Hello"
+    assert speech_to_text.transcribe(_wav(0.05))[0] == ""
+    assert server.usage["audio_seconds"] == pytest.approx(1.5)
+
+    with pytest.raises(HTTPError) as error:
+        urlopen(  # noqa: S310
+            f"{server.api_base}/audio/transcriptions",
+            data=b"model=whisper-1",
+            timeout=5,
+        )
+    assert error.value.code == 400
+    assert json.load(error.value)["error"]["message"] == "No file given"
+
+
+@pytest.mark.parametrize(
+    "failures, error",
+    [
+        (StubFailures(rate_limit_rate=1.0), openai.error.RateLimitError),
+        (StubFailures(error_rate=1.0), openai.error.APIError),
+    ],
+)
+def test_injected_errors(
+    stub_server_factory: StubServerFactoryType,
+    failures: StubFailures,
+    error: type,
+) -> None:
+    """
+    Test that injected errors are raised by OpenAI's client.
+    """
+    server = stub_server_factory(failures=failures)
+    with pytest.raises(error):
+        OpenAIChatBot(CHATBOT_MODEL_TYPES[0]).send_message("Hi")
+    assert server.usage["rate_limited"] + server.usage["errors"] == 1
+
+
+def test_error_rates_are_seeded() -> None:
+    """
+    Test that the same requests fail for the same seed.
+    """
+
+    def _failures(seed: int) -> list[bool]:
+        server = OpenAIStubServer(failures=StubFailures(0.5, seed=seed))
+        return [server._random.random() < 0.5 for _ in range(20)]
+
+    assert _failures(1) == _failures(1)
+    assert _failures(1) != _failures(2)
@@ -1,7 +1,14 @@
+import threading
+import time
 from unittest.mock import Mock
 
 import pytest
 
+from chat_toolkit.common.exceptions import (
+    ForkingUnsupportedError,
+    TranscriptionUnsupportedError,
+)
+from chat_toolkit.common.orchestrator import Orchestrator, OrchestratorOptions
 from chat_toolkit.components.chatbots.chatbot_component_base import (
     ChatbotComponentBase,
 )
@@ -11,7 +18,15 @@ from chat_toolkit.components.speech_to_text.speech_to_text_component_base import
 from chat_toolkit.components.text_to_speech.text_to_speech_component_base import (  # noqa: E501
     TextToSpeechComponentBase,
 )
-from test_suite.unit.conftest import PatchedOrchestratorType
+from test_suite.unit.conftest import (
+    CHATBOT_MODEL_TYPES,
+    SPEECH_TO_TEXT_MODEL_TYPES,
+    TEST_TEXT,
+    FakeTextToSpeech,
+    OpenAIChatbotFactoryType,
+    OpenAISpeechToTextFactoryType,
+    PatchedOrchestratorType,
+)
 
 
 def test_init(patched_orchestrator: PatchedOrchestratorType) -> None:
@@ -66,3 +81,298 @@ def test_keyboard_error_swallowed(
         orchestrator.terminal_conversation()
     except KeyboardInterrupt as e:
         raise AssertionError from e
+
+
+def test_speculative_conversation(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    patched_openai_speech_to_text_factory: OpenAISpeechToTextFactoryType,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    """
+    Test that a speech conversation uses speculative responses for stable
+    partial transcripts and reports on them.
+    """
+    speech_to_text = patched_openai_speech_to_text_factory(
+        SPEECH_TO_TEXT_MODEL_TYPES[0]
+    )
+    assert speech_to_text
+    orchestrator = Orchestrator(
+        patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0]),
+        speech_to_text,
+        options=OrchestratorOptions(speculative_stable_chunks=2),
+    )
+    transcripts = iter(["Hi there", ""])
+
+    def _transcribe_speech(on_partial_transcript=None) -> tuple[str, dict]:
+        transcript = next(transcripts)
+        for _ in range(2):
+            on_partial_transcript(transcript)
+        return transcript, {}
+
+    monkeypatch.setattr(
+        orchestrator, "get_start_prompt", Mock(return_value="")
+    )
+    monkeypatch.setattr(
+        speech_to_text, "transcribe_speech", Mock(wraps=_transcribe_speech)
+    )
+    orchestrator.terminal_conversation()
+
+    assert "Chatbot: Response: Hi there" in capsys.readouterr().out
+    assert orchestrator._speculative_responder
+    assert orchestrator._speculative_responder.summary["hits"] == 1
+
+
+def test_speculation_requires_forking(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    patched_openai_speech_to_text_factory: OpenAISpeechToTextFactoryType,
+) -> None:
+    """
+    Test that speculative responses can't be used with chatbots that can't
+    be forked.
+    """
+
+    class _ChatBot(ChatbotComponentBase):
+        def prompt_chatbot(self, start_prompts=None):
+            pass
+
+        def send_message(self, *args, **kwargs):
+            return "", {}
+
+        @property
+        def _cost_estimate_data(self) -> tuple[float, dict]:
+            return 0.0, {}
+
+    chatbot = _ChatBot(model=None, pricing_rate=0.0)
+    assert not chatbot.supports_forking
+    assert patched_openai_chatbot_factory(
+        CHATBOT_MODEL_TYPES[0]
+    ).supports_forking
+    with pytest.raises(ForkingUnsupportedError, match="support forking"):
+        Orchestrator(
+            chatbot,
+            patched_openai_speech_to_text_factory(
+                SPEECH_TO_TEXT_MODEL_TYPES[0]
+            ),
+            options=OrchestratorOptions(speculative_stable_chunks=2),
+        )
+
+
+def test_pipelined_speech_conversation(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    patched_openai_chat_completion_stream: None,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    """
+    Test that responses are streamed to the terminal and said sentence by
+    sentence.
+    """
+    text_to_speech = FakeTextToSpeech()
+    orchestrator = Orchestrator(
+        patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0]),
+        text_to_speech_component=text_to_speech,
+        options=OrchestratorOptions(pipelined_speech=True),
+    )
+    monkeypatch.setattr(
+        "builtins.input", Mock(side_effect=["", "Hi. How are you?", ""])
+    )
+    orchestrator.terminal_conversation()
+
+    output = capsys.readouterr().out
+    assert "Chatbot: Response: Hi. How are you?\n" in output
+    assert "Speech Pipeline Summary" in output
+    assert text_to_speech.said == ["Response: Hi.", "How are you?"]
+
+
+def test_barge_in_conversation(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Test that responses are said in the background, and are stopped as soon
+    as the user sends their next message.
+    """
+    saying = threading.Event()
+
+    def _on_say(_: str) -> None:
+        saying.set()
+        text_to_speech.stopped.wait(5)
+
+    inputs = iter(["", "Hi", "Bye", ""])
+
+    def _input(*_) -> str:
+        user_input = next(inputs)
+        if user_input == "Bye":
+            # The user barges in while the first response is being said
+            assert saying.wait(timeout=5)
+        return user_input
+
+    text_to_speech = FakeTextToSpeech(on_say=_on_say)
+    orchestrator = Orchestrator(
+        patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0]),
+        text_to_speech_component=text_to_speech,
+        options=OrchestratorOptions(barge_in=True),
+    )
+    monkeypatch.setattr("builtins.input", Mock(side_effect=_input))
+    orchestrator.terminal_conversation()
+
+    assert text_to_speech.stopped.is_set()
+    assert text_to_speech.said[0] == "Response: Hi"
+
+
+@pytest.mark.parametrize("speech_to_text_model", SPEECH_TO_TEXT_MODEL_TYPES)
+def test_barge_in_on_recording(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    patched_openai_speech_to_text_factory: OpenAISpeechToTextFactoryType,
+    speech_to_text_model: str,
+) -> None:
+    """
+    Test that speech is interrupted as soon as the user starts recording.
+    """
+    speech_to_text = patched_openai_speech_to_text_factory(
+        speech_to_text_model
+    )
+    assert speech_to_text
+
+    def _on_say(_: str) -> None:
+        text_to_speech.stopped.wait(5)
+
+    text_to_speech = FakeTextToSpeech(on_say=_on_say)
+    Orchestrator(
+        patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0]),
+        speech_to_text_component=speech_to_text,
+        text_to_speech_component=text_to_speech,
+        options=OrchestratorOptions(barge_in=True),
+    )
+    handles = [
+        text_to_speech.say_text_async(text) for text in ("Hello", "World")
+    ]
+    speech_to_text._notify_recording_started()
+    assert all(handle.wait(timeout=5) for handle in handles)
+    assert all(handle.cancelled for handle in handles)
+    assert "World" not in text_to_speech.said
+
+
+def test_run_turn(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+) -> None:
+    """
+    Test that a turn can be had without a terminal, and that its stages are
+    timed and its costs are accounted for.
+    """
+    text_to_speech = FakeTextToSpeech()
+    orchestrator = Orchestrator(
+        patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0]),
+        text_to_speech_component=text_to_speech,
+    )
+    result = orchestrator.run_turn("Hi there")
+
+    assert result.accepted
+    assert result.response == "Response: Hi there"
+    assert result.transcript is None
+    assert set(result.timings) == {"chat", "speak", "total"}
+    assert result.timings["total"] >= result.timings["chat"]
+    assert list(result.costs) == ["OpenAIChatBot"]
+    assert result.cost_estimate == pytest.approx(
+        orchestrator.cost_summary["total_cost_estimate"]
+    )
+    assert text_to_speech.said == ["Response: Hi there"]
+
+    timing_summary = orchestrator.timing_summary
+    assert timing_summary["Orchestrator"]["total"]["count"] == 1
+    assert timing_summary["OpenAIChatBot"]["completion"]["count"] == 1
+    assert timing_summary["FakeTextToSpeech"] == {}
+
+    result = orchestrator.run_turn("...", speak=False)
+    assert not result.accepted
+    assert result.costs == {}
+    assert result.to_dict()["timings"] == result.timings
+
+
+@pytest.mark.parametrize("speech_to_text_model", SPEECH_TO_TEXT_MODEL_TYPES)
+def test_run_turn_audio(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    patched_openai_speech_to_text_factory: OpenAISpeechToTextFactoryType,
+    wav_file_factory,
+    speech_to_text_model: str,
+) -> None:
+    """
+    Test that audio messages are transcribed before being sent to the
+    chatbot, and that they require a speech to text component.
+    """
+    audio = wav_file_factory().read_bytes()
+    chatbot = patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0])
+    with pytest.raises(TranscriptionUnsupportedError):
+        Orchestrator(chatbot).run_turn(audio)
+
+    orchestrator = Orchestrator(
+        chatbot,
+        patched_openai_speech_to_text_factory(speech_to_text_model),
+    )
+    result = orchestrator.run_turn(audio)
+
+    assert result.transcript == result.user_input == TEST_TEXT
+    assert result.response == f"Response: {TEST_TEXT}"
+    assert set(result.timings) == {"transcribe", "chat", "total"}
+    assert set(result.costs) == {"OpenAIChatBot", "OpenAISpeechToText"}
+
+
+def test_build(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    patched_openai_speech_to_text_factory: OpenAISpeechToTextFactoryType,
+) -> None:
+    """
+    Test that components are constructed and warmed up concurrently, so
+    that building takes about as long as the slowest component.
+    """
+    delay = 0.2
+    barrier = threading.Barrier(3, timeout=5)
+    warm_ups: list[Mock] = []
+
+    def _slow(factory):
+        def _inner():
+            component = factory()
+            component.warm_up = Mock(side_effect=lambda: time.sleep(delay))
+            warm_ups.append(component.warm_up)
+            # Every component must be under construction at the same time
+            barrier.wait()
+            return component
+
+        return _inner
+
+    started = time.monotonic()
+    orchestrator = Orchestrator.build(
+        _slow(lambda: patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0])),
+        _slow(
+            lambda: patched_openai_speech_to_text_factory(
+                SPEECH_TO_TEXT_MODEL_TYPES[0]
+            )
+        ),
+        _slow(FakeTextToSpeech),
+        options=OrchestratorOptions(barge_in=True),
+    )
+    assert time.monotonic() - started < delay * 2.5
+
+    assert len(orchestrator.components) == 3
+    assert isinstance(orchestrator._text_to_speech_component, FakeTextToSpeech)
+    assert orchestrator._barge_in
+    for warm_up in warm_ups:
+        warm_up.assert_called_once_with()
+    for component in orchestrator.components:
+        timing_data = component.timing_data
+        assert timing_data["construct"]["count"] == 1
+        assert timing_data["warm_up"]["p50"] >= delay
+
+
+def test_build_error(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+) -> None:
+    """
+    Test that errors constructing a component are raised by build.
+    """
+    with pytest.raises(RuntimeError, match="No audio device"):
+        Orchestrator.build(
+            lambda: patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0]),
+            Mock(side_effect=RuntimeError("No audio device")),
+        )
@@ -0,0 +1,120 @@
+from unittest.mock import Mock
+
+import pytest
+
+from chat_toolkit.common.orchestrator import Orchestrator
+from chat_toolkit.components.text_to_speech.pyttsx3_engine_pool import (
+    Pyttsx3EnginePool,
+)
+from chat_toolkit.components.text_to_speech.pyttsx3_text_to_speech import (
+    Pyttsx3TextToSpeech,
+)
+from test_suite.unit.conftest import (
+    CHATBOT_MODEL_TYPES,
+    OpenAIChatbotFactoryType,
+)
+
+
+@pytest.fixture
+def mock_engine(monkeypatch: pytest.MonkeyPatch) -> Mock:
+    """
+    Fixture that makes pyttsx3 create a mock engine.
+    """
+    properties = {"voice": "default", "rate": 200, "volume": 1.0}
+    engine = Mock()
+    engine.getProperty.side_effect = properties.get
+    engine.setProperty.side_effect = properties.__setitem__
+    init = Mock(return_value=engine)
+    monkeypatch.setattr("pyttsx3.init", init)
+    return engine
+
+
+def test_property_overlays(mock_engine: Mock) -> None:
+    """
+    Test that components share an engine, each with their own properties,
+    and that properties are only set when they change.
+    """
+    pool = Pyttsx3EnginePool()
+    fast = Pyttsx3TextToSpeech(speaking_rate=300, engine_pool=pool)
+    slow = Pyttsx3TextToSpeech(speaking_rate=100, engine_pool=pool)
+    slow.set_pyttsx3_property("volume", 0.5)
+    assert mock_engine.setProperty.call_count == 0
+
+    with fast.use_engine() as engine:
+        assert engine.getProperty("rate") == 300
+        assert engine.getProperty("volume") == 1.0
+    with slow.use_engine() as engine:
+        assert engine.getProperty("rate") == 100
+        assert engine.getProperty("volume") == 0.5
+    with fast.use_engine() as fast_engine:
+        assert fast_engine.getProperty("volume") == 1.0
+    with slow.use_engine() as slow_engine:
+        assert slow_engine is fast_engine
+
+    # Using the engine again without changes does not set anything
+    calls = mock_engine.setProperty.call_count
+    with slow.use_engine() as engine:
+        assert engine.getProperty("rate") == 100
+    assert mock_engine.setProperty.call_count == calls
+
+    mock_engine.runAndWait.assert_not_called()
+    assert pool.summary == {
+        "live_engines": 1,
+        "sessions": 2,
+        "engines_created": 1,
+        "construction_seconds": pytest.approx(0, abs=1),
+    }
+
+
+def test_stop_only_stops_owner(mock_engine: Mock) -> None:
+    """
+    Test that a component can only stop the engine while it is using it.
+    """
+    pool = Pyttsx3EnginePool()
+    first = Pyttsx3TextToSpeech(engine_pool=pool)
+    second = Pyttsx3TextToSpeech(engine_pool=pool)
+
+    with pool.use({}, owner=first):
+        second.stop_text()
+        mock_engine.stop.assert_not_called()
+        first.stop_text()
+        mock_engine.stop.assert_called_once()
+
+    first.stop_text()
+    mock_engine.stop.assert_called_once()
+
+
+def test_warm_up() -> None:
+    """
+    Test that warming up a component creates the shared engine ahead of its
+    first use, and only once.
+    """
+    pool = Pyttsx3EnginePool()
+    first = Pyttsx3TextToSpeech(engine_pool=pool)
+    second = Pyttsx3TextToSpeech(engine_pool=pool)
+    assert pool.summary["engines_created"] == 0
+
+    first.warm_up()
+    second.warm_up()
+    assert pool.summary["engines_created"] == 1
+
+
+def test_engine_pool_summary_printed(
+    mock_engine: Mock,
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    """
+    Test that orchestrators print the process wide pool's summary once a
+    component has used it.
+    """
+    text_to_speech = Pyttsx3TextToSpeech()
+    orchestrator = Orchestrator(
+        patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0]),
+        text_to_speech_component=text_to_speech,
+    )
+    orchestrator.print_engine_pool_summary()
+
+    out = capsys.readouterr().out
+    assert "Text to Speech Engine Summary" in out
+    assert "sessions" in out
@@ -1,8 +1,19 @@
+import io
+import multiprocessing
+from collections.abc import Iterator
+from pathlib import Path
 from typing import Optional
 
+import numpy as np
 import pytest
+import sounddevice as sd
+import soundfile as sf
 
-from chat_toolkit.common.exceptions import SpeakingRateError
+from chat_toolkit.common.exceptions import (
+    MissingSpeechCacheError,
+    SpeakingRateError,
+)
+from chat_toolkit.components.text_to_speech.speech_cache import SpeechCache
 from test_suite.unit.conftest import (
     TEXT_TO_SPEECH_MODEL_TYPES,
     Pyttsx3TextToSpeechFactoryType,
@@ -26,10 +37,11 @@ def test_init(
     assert text_to_speech
     assert text_to_speech._model == model
     assert text_to_speech._pricing_rate == 0
-    if isinstance(speaking_rate, int):
-        assert text_to_speech.engine.getProperty("rate") == speaking_rate
-    else:
-        assert text_to_speech.engine.getProperty("rate") == 175
+    with text_to_speech.use_engine() as engine:
+        if isinstance(speaking_rate, int):
+            assert engine.getProperty("rate") == speaking_rate
+        else:
+            assert engine.getProperty("rate") == 175
 
 
 @pytest.mark.parametrize("model", TEXT_TO_SPEECH_MODEL_TYPES)
@@ -65,3 +77,162 @@ def test_cost_estimate_data(
     assert metadata == {
         "pricing_rate": text_to_speech._pricing_rate,
     }
+
+
+@pytest.mark.parametrize("model", TEXT_TO_SPEECH_MODEL_TYPES)
+def test_speech_cache(
+    patched_pyttsx3_text_to_speech_factory: Pyttsx3TextToSpeechFactoryType,
+    patched_pyttsx3_rendering: list[str],
+    model: str,
+) -> None:
+    """
+    Test that text is only rendered once per set of engine properties, and
+    that cached speech is played from decoded samples.
+    """
+    text_to_speech = patched_pyttsx3_text_to_speech_factory(
+        model, speech_cache=SpeechCache()
+    )
+    assert text_to_speech
+
+    assert text_to_speech.say_text("hello") == {"cache_hit": False}
+    assert text_to_speech.say_text("hello") == {"cache_hit": True}
+    text_to_speech.set_pyttsx3_property("rate", 100)
+    assert text_to_speech.say_text("hello") == {"cache_hit": False}
+
+    assert patched_pyttsx3_rendering == ["hello", "hello"]
+    assert text_to_speech.cache_hits == 1
+    assert text_to_speech.timing_data["synthesis"]["count"] == 2
+    assert text_to_speech.timing_data["playback"]["count"] == 3
+    data, sample_rate = sd.play.call_args.args
+    assert sample_rate == 10000
+    assert len(data) == 500
+    assert text_to_speech.cost_estimate_data == (
+        0.0,
+        {"cache_hits": 1, "pricing_rate": 0.0},
+    )
+
+
+@pytest.mark.parametrize("model", TEXT_TO_SPEECH_MODEL_TYPES)
+def test_warm_speech_cache(
+    patched_pyttsx3_text_to_speech_factory: Pyttsx3TextToSpeechFactoryType,
+    patched_pyttsx3_rendering: list[str],
+    model: str,
+    tmp_path: Path,
+) -> None:
+    """
+    Test that phrases can be rendered ahead of time, and that rendered
+    phrases persist on disk between components.
+    """
+    text_to_speech = patched_pyttsx3_text_to_speech_factory(
+        model, speech_cache=SpeechCache(directory=tmp_path)
+    )
+    assert text_to_speech
+    assert text_to_speech.warm_speech_cache(["hi", "bye", "hi"]) == 2
+
+    text_to_speech = patched_pyttsx3_text_to_speech_factory(
+        model, speech_cache=SpeechCache(directory=tmp_path)
+    )
+    assert text_to_speech
+    assert text_to_speech.warm_speech_cache(["hi", "bye"]) == 0
+    assert text_to_speech.say_text("bye") == {"cache_hit": True}
+    assert patched_pyttsx3_rendering == ["hi", "bye"]
+
+
+@pytest.mark.parametrize("model", TEXT_TO_SPEECH_MODEL_TYPES)
+def test_warm_speech_cache_without_cache(
+    patched_pyttsx3_text_to_speech_factory: Pyttsx3TextToSpeechFactoryType,
+    model: str,
+) -> None:
+    """
+    Test that warming up requires a speech cache.
+    """
+    text_to_speech = patched_pyttsx3_text_to_speech_factory(model)
+    assert text_to_speech
+    with pytest.raises(MissingSpeechCacheError):
+        text_to_speech.warm_speech_cache(["hi"])
+
+
+def test_speech_cache_bounds(tmp_path: Path) -> None:
+    """
+    Test that both tiers of the speech cache are bounded by bytes.
+    """
+    audio = io.BytesIO()
+    sf.write(audio, np.zeros(100), 8000, format="WAV")
+    wav = audio.getvalue()
+    cache = SpeechCache(
+        max_memory_bytes=1000,
+        directory=tmp_path,
+        max_disk_bytes=len(wav) * 2,
+    )
+    keys = [SpeechCache.make_key(str(i), {"rate": 175}) for i in range(3)]
+    for key in keys:
+        data, sample_rate = cache.put(key, wav)
+        assert sample_rate == 8000
+
+    # 400 bytes of float32 samples each, so only two fit in either tier
+    assert keys[0] not in cache
+    assert all(key in cache for key in keys[1:])
+    assert len(list(tmp_path.glob("*.wav"))) == 2
+    assert SpeechCache.make_key("0", {"rate": 175}) != SpeechCache.make_key(
+        "0", {"rate": 100}
+    )
+
+
+@pytest.mark.parametrize("model", TEXT_TO_SPEECH_MODEL_TYPES)
+@pytest.mark.parametrize("workers", [1, 2])
+def test_synthesize_to_files(
+    patched_pyttsx3_text_to_speech_factory: Pyttsx3TextToSpeechFactoryType,
+    patched_pyttsx3_rendering: list[str],
+    model: str,
+    workers: int,
+    tmp_path: Path,
+) -> None:
+    """
+    Test that text is rendered to files by worker processes, using the
+    engine's properties.
+    """
+    text_to_speech = patched_pyttsx3_text_to_speech_factory(model, 120)
+    assert text_to_speech
+    items = [(f"phrase {i}", tmp_path / f"{i}.wav") for i in range(6)]
+
+    # Forked, so that workers use the patched engine
+    results = dict(
+        text_to_speech.synthesize_to_files(
+            items, workers, multiprocessing.get_context("fork")
+        )
+    )
+
+    assert results == dict(items)
+    for text, path in items:
+        data, sample_rate = sf.read(path)
+        assert len(data) == 100 * len(text)
+        assert sample_rate == 12000
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_synthesize_to_files_bounds_items_in_flight(
+    patched_pyttsx3_text_to_speech_factory: Pyttsx3TextToSpeechFactoryType,
+    patched_pyttsx3_rendering: list[str],
+    workers: int,
+    tmp_path: Path,
+) -> None:
+    """
+    Test that items are only read as workers become free.
+    """
+    text_to_speech = patched_pyttsx3_text_to_speech_factory(
+        TEXT_TO_SPEECH_MODEL_TYPES[0], None
+    )
+    assert text_to_speech
+    read: list[str] = []
+
+    def _items() -> Iterator[tuple[str, Path]]:
+        for i in range(20):
+            read.append(f"phrase {i}")
+            yield f"phrase {i}", tmp_path / f"{i}.wav"
+
+    results = text_to_speech.synthesize_to_files(
+        _items(), workers, multiprocessing.get_context("fork")
+    )
+    next(results)
+    assert len(read) <= 2 * workers
+    assert len(list(results)) == 19
@@ -0,0 +1,198 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+
+import pytest
+
+from chat_toolkit.common.exceptions import (
+    SchedulerLaneError,
+    SchedulerWeightError,
+)
+from chat_toolkit.common.metrics import MetricsRegistry
+from chat_toolkit.common.scheduler import BATCH, INTERACTIVE, FairScheduler
+from test_suite.unit.conftest import (
+    CHATBOT_MODEL_TYPES,
+    OpenAIChatbotFactoryType,
+)
+
+
+class _Requests:
+    """
+    Queues requests behind one that holds the scheduler's only slot, and
+    records the order they are dispatched in once it is released.
+    """
+
+    def __init__(self, scheduler: FairScheduler):
+        self.scheduler = scheduler
+        self.order: list[str] = []
+        self._threads: list[threading.Thread] = []
+        self._hold = scheduler.slot("hold")
+        self._hold.__enter__()
+
+    def queue(
+        self,
+        name: str,
+        tenant: str,
+        lane: str = INTERACTIVE,
+        deadline: Optional[float] = None,
+    ) -> None:
+        queued = sum(self.scheduler.summary["queued"].values())
+
+        def _request() -> None:
+            with self.scheduler.slot(tenant, lane, deadline):
+                self.order.append(name)
+
+        thread = threading.Thread(target=_request)
+        thread.start()
+        self._threads.append(thread)
+        # Wait for the request to be queued, so the queueing order is known
+        while sum(self.scheduler.summary["queued"].values()) == queued:
+            time.sleep(0.001)
+
+    def release(self) -> list[str]:
+        self._hold.__exit__(None, None, None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+        return self.order
+
+
+@pytest.fixture
+def requests() -> _Requests:
+    """
+    Requests for a scheduler with one slot.
+    """
+    scheduler = FairScheduler(max_concurrent=1)
+    scheduler.enable()
+    return _Requests(scheduler)
+
+
+def test_disabled() -> None:
+    """
+    Test that requests don't wait for a disabled scheduler.
+    """
+    scheduler = FairScheduler(max_concurrent=1)
+    with scheduler.slot("a"), scheduler.slot("a"):
+        pass
+
+    assert scheduler.summary == {
+        "active": 0,
+        "queued": {INTERACTIVE: 0, BATCH: 0},
+        "tenants": {},
+    }
+
+
+def test_fair_share(requests: _Requests) -> None:
+    """
+    Test that tenants take turns, however many requests each has waiting,
+    and that waits and shares are reported per tenant.
+    """
+    for index in range(4):
+        requests.queue(f"a{index}", "a")
+    for index in range(2):
+        requests.queue(f"b{index}", "b")
+
+    assert requests.release() == ["a0", "b0", "a1", "b1", "a2", "a3"]
+    summary = requests.scheduler.summary
+    assert summary["active"] == 0
+    assert summary["tenants"]["a"]["dispatched"] == 4
+    assert summary["tenants"]["b"]["share"] == pytest.approx(2 / 7)
+    assert summary["tenants"]["b"]["wait"]["count"] == 2
+    assert summary["tenants"]["b"]["wait"]["p50"] > 0
+
+
+def test_weights(requests: _Requests) -> None:
+    """
+    Test that tenants share capacity in proportion to their weights.
+    """
+    requests.scheduler.set_weight("b", 2)
+    for index in range(3):
+        requests.queue(f"a{index}", "a")
+    for index in range(3):
+        requests.queue(f"b{index}", "b")
+
+    assert requests.release() == ["a0", "b0", "b1", "a1", "b2", "a2"]
+
+    with pytest.raises(SchedulerWeightError, match="weight must be > 0"):
+        requests.scheduler.set_weight("b", 0)
+
+
+def test_lanes(requests: _Requests) -> None:
+    """
+    Test that interactive requests go before batch requests that have been
+    waiting longer.
+    """
+    requests.queue("batch0", "a", BATCH)
+    requests.queue("batch1", "b", BATCH)
+    requests.queue("interactive", "c")
+
+    assert requests.release() == ["interactive", "batch0", "batch1"]
+
+    with pytest.raises(SchedulerLaneError, match="lane must be"):
+        with requests.scheduler.slot("a", "urgent"):
+            pass
+
+
+def test_deadlines(requests: _Requests) -> None:
+    """
+    Test that requests close to their deadline go first, earliest deadline
+    first, and other deadlines don't affect fair ordering.
+    """
+    requests.queue("a0", "a")
+    requests.queue("b0", "b", deadline=60)
+    requests.queue("c0", "c", deadline=0.2)
+    requests.queue("d0", "d", deadline=0.1)
+
+    assert requests.release() == ["d0", "c0", "a0", "b0"]
+
+
+def test_aslot() -> None:
+    """
+    Test that async requests wait for a slot without blocking the event
+    loop, and that cancelled requests give up their place.
+    """
+    scheduler = FairScheduler(max_concurrent=1)
+    scheduler.enable()
+    order = []
+
+    async def _request(name: str) -> None:
+        async with scheduler.aslot(name):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def _test() -> None:
+        first = asyncio.create_task(_request("a"))
+        cancelled = asyncio.create_task(_request("b"))
+        last = asyncio.create_task(_request("c"))
+        await asyncio.sleep(0)
+        assert scheduler.summary["queued"][INTERACTIVE] == 2
+        cancelled.cancel()
+        await asyncio.gather(first, last)
+
+    asyncio.run(_test())
+    assert order == ["a", "c"]
+    assert scheduler.summary["active"] == 0
+    assert scheduler.summary["queued"][INTERACTIVE] == 0
+
+
+def test_component_requests(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    patched_openai_chat_completion_stream: None,
+    scheduler: FairScheduler,
+    metrics: MetricsRegistry,
+) -> None:
+    """
+    Test that components dispatch their requests through the scheduler, as
+    their session.
+    """
+    chatbot = patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0])
+    chatbot.session_id = "session"
+    chatbot.send_message("Hi there")
+    "".join(chatbot.stream_message("Hi again"))
+
+    assert scheduler.summary["tenants"]["session"]["dispatched"] == 2
+    assert scheduler.summary["active"] == 0
+    assert (
+        'chat_toolkit_queue_wait_seconds_count{lane="interactive",'
+        'tenant="session"} 2' in metrics.render()
+    )
@@ -0,0 +1,92 @@
+import threading
+from collections.abc import Iterator
+
+import pytest
+
+from chat_toolkit.common.sentence_pipeline import (
+    SentencePipeline,
+    split_sentences,
+)
+from test_suite.unit.conftest import FakeTextToSpeech
+
+
+@pytest.mark.parametrize(
+    "fragments,sentences",
+    [
+        (["Hello there. ", "How are you?"], ["Hello there.", "How are you?"]),
+        (
+            ["Hel", "lo! Pi is 3", ".14. ", "Bye"],
+            ["Hello!", "Pi is 3.14.", "Bye"],
+        ),
+        (['He said "hi." ', "Then left"], ['He said "hi."', "Then left"]),
+        (["One\n\nTwo"], ["One", "Two"]),
+        (["", " ", "No punctuation"], ["No punctuation"]),
+        ([], []),
+    ],
+)
+def test_split_sentences(fragments: list[str], sentences: list[str]) -> None:
+    """
+    Test that streamed fragments are grouped into sentences correctly.
+    """
+    assert list(split_sentences(fragments)) == sentences
+
+
+def test_speak_starts_before_text_is_complete() -> None:
+    """
+    Test that the first sentence is said while the rest of the text is still
+    being generated, and that time to first audio is measured.
+    """
+    first_sentence_said = threading.Event()
+    text_to_speech = FakeTextToSpeech(
+        on_say=lambda _: first_sentence_said.set()
+    )
+
+    def _fragments() -> Iterator[str]:
+        yield "Hello there. "
+        # Generation stalls until the first sentence is being said
+        assert first_sentence_said.wait(timeout=5)
+        yield "How are you?"
+
+    pipeline = SentencePipeline(text_to_speech)
+    assert pipeline.speak(_fragments()) == "Hello there. How are you?"
+    assert text_to_speech.said == ["Hello there.", "How are you?"]
+    assert pipeline.summary["responses"] == 1
+    assert pipeline.summary["max_time_to_first_audio_seconds"] > 0
+
+
+def test_speak_raises_text_to_speech_errors() -> None:
+    """
+    Test that errors raised while saying text are raised to the caller,
+    without blocking generation.
+    """
+
+    def _on_say(_: str) -> None:
+        raise RuntimeError
+
+    text_to_speech = FakeTextToSpeech(on_say=_on_say, max_queued_utterances=1)
+    pipeline = SentencePipeline(text_to_speech)
+    with pytest.raises(RuntimeError):
+        pipeline.speak(["One. "] * 10)
+
+
+def test_speak_without_waiting() -> None:
+    """
+    Test that speech can be left in the background and interrupted, and
+    that interrupted text does not count towards time to first audio.
+    """
+    saying = threading.Event()
+
+    def _on_say(_: str) -> None:
+        saying.set()
+        text_to_speech.stopped.wait(5)
+
+    text_to_speech = FakeTextToSpeech(on_say=_on_say)
+    pipeline = SentencePipeline(text_to_speech)
+
+    assert pipeline.speak(["One. Two. "], wait=False) == "One. Two. "
+    assert saying.wait(timeout=5)
+    text_to_speech.interrupt()
+    assert pipeline.speak(["Three."]) == "Three."
+    assert "Two." not in text_to_speech.said
+    assert text_to_speech.said[-1] == "Three."
+    assert pipeline.summary["responses"] == 2
@@ -0,0 +1,349 @@
+import asyncio
+import io
+from collections.abc import Awaitable
+from typing import Callable
+
+import numpy as np
+import pytest
+import soundfile as sf
+from aiohttp.test_utils import TestClient, TestServer
+
+from chat_toolkit.common.metrics import MetricsRegistry
+from chat_toolkit.common.orchestrator import Orchestrator
+from chat_toolkit.common.scheduler import FairScheduler
+from chat_toolkit.common.server import ConversationServer
+from chat_toolkit.common.usage_ledger import UsageLedger
+from test_suite.unit.conftest import (
+    CHATBOT_MODEL_TYPES,
+    SPEECH_TO_TEXT_MODEL_TYPES,
+    TEST_TEXT,
+    OpenAIChatbotFactoryType,
+    OpenAISpeechToTextFactoryType,
+)
+
+ServeType = Callable[..., ConversationServer]
+
+
+@pytest.fixture
+def serve(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    patched_openai_chat_completion_stream: None,
+) -> ServeType:
+    """
+    Fixture that runs a conversation server on localhost for the duration of
+    a test coroutine, which is passed a client for the server.
+    """
+
+    def _inner(
+        test: Callable[[TestClient], Awaitable[None]],
+        orchestrator_factory: Callable[[], Orchestrator] = (
+            lambda: Orchestrator(
+                patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0])
+            )
+        ),
+        **kwargs,
+    ) -> ConversationServer:
+        server = ConversationServer(orchestrator_factory, **kwargs)
+
+        async def _run() -> None:
+            async with TestClient(TestServer(server.make_app())) as client:
+                await test(client)
+
+        asyncio.run(_run())
+        return server
+
+    return _inner
+
+
+def test_conversation(serve: ServeType) -> None:
+    """
+    Test that a session can be started, converse, report its costs, and be
+    ended.
+    """
+
+    async def _test(client: TestClient) -> None:
+        response = await client.post(
+            "/sessions", json={"start_prompt": "Be nice"}
+        )
+        assert response.status == 201
+        session_id = (await response.json())["session_id"]
+
+        response = await client.post(
+            f"/sessions/{session_id}/messages", json={"message": "Hi there"}
+        )
+        assert response.status == 200
+        assert await response.json() == {
+            "response": "Response: Hi there",
+            "transcript": None,
+        }
+
+        response = await client.get(f"/sessions/{session_id}")
+        summary = await response.json()
+        assert summary["turns"] == 1
+        chatbot_costs = summary["cost_summary"]["components"]["OpenAIChatBot"]
+        assert chatbot_costs["metadata"]["completion_tokens"] > 0
+        assert summary["cost_summary"]["total_cost_estimate"] > 0
+
+        response = await client.delete(f"/sessions/{session_id}")
+        assert (await response.json())["turns"] == 1
+        response = await client.get(f"/sessions/{session_id}")
+        assert response.status == 404
+
+    server = serve(_test)
+    assert not server.sessions
+
+
+def test_streaming(serve: ServeType) -> None:
+    """
+    Test that responses can be streamed over HTTP and WebSockets.
+    """
+
+    async def _test(client: TestClient) -> None:
+        response = await client.post("/sessions")
+        session_id = (await response.json())["session_id"]
+
+        response = await client.post(
+            f"/sessions/{session_id}/messages",
+            json={"message": "Hi there", "stream": True},
+        )
+        chunks = [chunk async for chunk in response.content.iter_any()]
+        assert b"".join(chunks) == b"Response: Hi there"
+
+        async with client.ws_connect(f"/sessions/{session_id}/ws") as ws:
+            await ws.send_json({"message": "How are you?"})
+            messages = [await ws.receive_json() for _ in range(5)]
+        assert messages == [
+            {"type": "fragment", "text": "Response: "},
+            {"type": "fragment", "text": "How "},
+            {"type": "fragment", "text": "are "},
+            {"type": "fragment", "text": "you?"},
+            {"type": "response", "text": "Response: How are you?"},
+        ]
+
+        response = await client.get(f"/sessions/{session_id}")
+        assert (await response.json())["turns"] == 2
+
+    serve(_test)
+
+
+def test_concurrent_sessions(serve: ServeType) -> None:
+    """
+    Test that many sessions can converse at once, with a bounded number of
+    workers, and that their costs are accounted for separately.
+    """
+    sessions = 10
+
+    async def _converse(client: TestClient, turns: int) -> dict:
+        response = await client.post("/sessions")
+        session_id = (await response.json())["session_id"]
+        for turn in range(turns):
+            response = await client.post(
+                f"/sessions/{session_id}/messages",
+                json={"message": f"Message {turn}"},
+            )
+            assert (await response.json())["response"] == (
+                f"Response: Message {turn}"
+            )
+        response = await client.get(f"/sessions/{session_id}")
+        return await response.json()
+
+    async def _test(client: TestClient) -> None:
+        summaries = await asyncio.gather(
+            *(_converse(client, turns) for turns in range(1, sessions + 1))
+        )
+        assert [summary["turns"] for summary in summaries] == list(
+            range(1, sessions + 1)
+        )
+        tokens = [
+            summary["cost_summary"]["components"]["OpenAIChatBot"]["metadata"][
+                "total_tokens"
+            ]
+            for summary in summaries
+        ]
+        assert tokens == sorted(tokens)
+
+    server = serve(_test, max_workers=2)
+    assert len(server.sessions) == sessions
+
+
+@pytest.mark.parametrize("model", SPEECH_TO_TEXT_MODEL_TYPES)
+def test_audio_message(
+    serve: ServeType,
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    patched_openai_speech_to_text_factory: OpenAISpeechToTextFactoryType,
+    model: str,
+) -> None:
+    """
+    Test that audio messages are transcribed before being sent to the
+    chatbot.
+    """
+    audio = io.BytesIO()
+    sf.write(audio, np.full(44100, 0.25), 44100, format="WAV")
+
+    async def _test(client: TestClient) -> None:
+        response = await client.post("/sessions")
+        session_id = (await response.json())["session_id"]
+        response = await client.post(
+            f"/sessions/{session_id}/messages",
+            data=audio.getvalue(),
+            headers={"Content-Type": "audio/wav"},
+        )
+        assert await response.json() == {
+            "response": f"Response: {TEST_TEXT}",
+            "transcript": TEST_TEXT,
+        }
+
+    serve(
+        _test,
+        lambda: Orchestrator(
+            patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0]),
+            patched_openai_speech_to_text_factory(model),
+        ),
+    )
+
+
+def test_errors(serve: ServeType) -> None:
+    """
+    Test that bad requests are rejected.
+    """
+
+    async def _test(client: TestClient) -> None:
+        response = await client.post("/sessions/unknown/messages", json={})
+        assert response.status == 404
+
+        response = await client.post("/sessions")
+        session_id = (await response.json())["session_id"]
+        response = await client.post(
+            f"/sessions/{session_id}/messages", json={"message": ""}
+        )
+        assert response.status == 400
+        response = await client.post(
+            f"/sessions/{session_id}/messages", data=b"not json"
+        )
+        assert response.status == 400
+        response = await client.post(
+            f"/sessions/{session_id}/messages",
+            data=b"RIFF",
+            headers={"Content-Type": "audio/wav"},
+        )
+        assert (await response.json()) == {
+            "error": "Session cannot transcribe audio"
+        }
+
+        async with client.ws_connect(f"/sessions/{session_id}/ws") as ws:
+            for data in ("not json", "[]", '{"message": ""}'):
+                await ws.send_str(data)
+                assert (await ws.receive_json())["type"] == "error"
+
+        response = await client.post("/sessions")
+        assert response.status == 503
+
+    serve(_test, max_sessions=1)
+
+
+def test_max_sessions(serve: ServeType) -> None:
+    """
+    Test that sessions being started count towards the maximum number of
+    sessions.
+    """
+
+    async def _test(client: TestClient) -> None:
+        responses = await asyncio.gather(
+            *(client.post("/sessions") for _ in range(4))
+        )
+        assert sorted(response.status for response in responses) == [
+            201,
+            201,
+            503,
+            503,
+        ]
+
+    server = serve(_test, max_sessions=2)
+    assert len(server.sessions) == 2
+
+
+def test_session_ttl(serve: ServeType) -> None:
+    """
+    Test that idle sessions are ended.
+    """
+
+    async def _test(client: TestClient) -> None:
+        response = await client.post("/sessions")
+        session_id = (await response.json())["session_id"]
+        response = await client.get(f"/sessions/{session_id}")
+        assert response.status == 200
+
+        await asyncio.sleep(0.3)
+        response = await client.get(f"/sessions/{session_id}")
+        assert response.status == 404
+
+    serve(_test, session_ttl=0.1)
+
+
+def test_metrics(serve: ServeType, metrics: MetricsRegistry) -> None:
+    """
+    Test that the metrics of every session are served in Prometheus' format.
+    """
+
+    async def _test(client: TestClient) -> None:
+        response = await client.post("/sessions")
+        session_id = (await response.json())["session_id"]
+        await client.post(
+            f"/sessions/{session_id}/messages", json={"message": "Hi there"}
+        )
+
+        response = await client.get("/metrics")
+        assert response.status == 200
+        assert response.content_type == "text/plain"
+        assert "chat_toolkit_requests_total{" in await response.text()
+
+    serve(_test)
+
+
+def test_scheduler(serve: ServeType, scheduler: FairScheduler) -> None:
+    """
+    Test that each session's requests are dispatched by the scheduler as
+    its own tenant, and that the scheduler's summary is served.
+    """
+
+    async def _test(client: TestClient) -> None:
+        response = await client.post("/sessions")
+        session_id = (await response.json())["session_id"]
+        await client.post(
+            f"/sessions/{session_id}/messages", json={"message": "Hi there"}
+        )
+
+        response = await client.get("/scheduler")
+        assert response.status == 200
+        summary = await response.json()
+        assert summary["tenants"][session_id]["dispatched"] == 1
+        assert summary["tenants"][session_id]["share"] == 1.0
+
+    serve(_test)
+
+
+def test_usage_ledger(serve: ServeType, usage_ledger: UsageLedger) -> None:
+    """
+    Test that each session's usage, including its start prompt, is billed
+    to it in the usage ledger.
+    """
+
+    async def _test(client: TestClient) -> None:
+        response = await client.post(
+            "/sessions", json={"start_prompt": "Be brief"}
+        )
+        session = await response.json()
+        await client.post(
+            f"/sessions/{session['session_id']}/messages",
+            json={"message": "Hi there"},
+        )
+        response = await client.get(f"/sessions/{session['session_id']}")
+        session = await response.json()
+
+        usage = usage_ledger.aggregate("session")
+        assert list(usage) == [session["session_id"]]
+        assert usage[session["session_id"]]["cost"] == pytest.approx(
+            session["cost_summary"]["total_cost_estimate"]
+        )
+
+    serve(_test)
@@ -0,0 +1,122 @@
+from unittest.mock import Mock
+
+import openai
+import pytest
+
+from chat_toolkit.common.exceptions import StableChunksError
+from chat_toolkit.common.speculation import SpeculativeResponder
+from test_suite.unit.conftest import (
+    CHATBOT_MODEL_TYPES,
+    OpenAIChatbotFactoryType,
+)
+
+
+@pytest.fixture
+def counted_chat_completion(
+    patched_openai_chat_completion: None, monkeypatch: pytest.MonkeyPatch
+) -> Mock:
+    """
+    Wraps the patched chat completion so that requests can be counted.
+    """
+    create = Mock(wraps=openai.ChatCompletion.create)
+    monkeypatch.setattr("openai.ChatCompletion.create", create)
+    return create
+
+
+@pytest.mark.parametrize("model", CHATBOT_MODEL_TYPES)
+@pytest.mark.parametrize("stable_chunks", [1, 2, 3])
+def test_speculation_hit(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    counted_chat_completion: Mock,
+    model: str,
+    stable_chunks: int,
+) -> None:
+    """
+    Test that a stable partial transcript is sent once, and that its response
+    is used when the final transcript matches.
+    """
+    chatbot = patched_openai_chatbot_factory(model)
+    responder = SpeculativeResponder(chatbot, stable_chunks)
+    responder.start_turn()
+    for partial in ["Hello there", "Hello there "] * stable_chunks:
+        responder.feed(partial)
+
+    response, _ = responder.resolve("Hello there")
+    responder.close()
+
+    assert response == "Response: Hello there"
+    assert counted_chat_completion.call_count == 1
+    assert chatbot.history == [
+        {"role": "user", "content": "Hello there"},
+        {"role": "assistant", "content": response},
+    ]
+    assert chatbot.total_tokens_used == 5
+    assert responder.summary["hits"] == 1
+    assert responder.summary["hit_rate"] == 1.0
+    assert responder.summary["latency_saved_seconds"] >= 0
+
+
+@pytest.mark.parametrize("model", CHATBOT_MODEL_TYPES)
+def test_speculation_miss(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    counted_chat_completion: Mock,
+    model: str,
+) -> None:
+    """
+    Test that a speculative response for a different message is discarded,
+    but that its tokens are still accounted for.
+    """
+    chatbot = patched_openai_chatbot_factory(model)
+    responder = SpeculativeResponder(chatbot, 2)
+    responder.start_turn()
+    for partial in ("Hello", "Hello"):
+        responder.feed(partial)
+
+    response, _ = responder.resolve("Hello there")
+    responder.close()
+
+    assert response == "Response: Hello there"
+    assert counted_chat_completion.call_count == 2
+    assert chatbot.history == [
+        {"role": "user", "content": "Hello there"},
+        {"role": "assistant", "content": response},
+    ]
+    # 3 tokens for the discarded request, 5 tokens for the real one
+    assert chatbot.total_tokens_used == 8
+    assert responder.summary == {
+        "turns": 1,
+        "speculated_turns": 1,
+        "hits": 0,
+        "hit_rate": 0.0,
+        "latency_saved_seconds": 0.0,
+        "latency_saved_seconds_per_turn": 0.0,
+    }
+
+
+@pytest.mark.parametrize("model", CHATBOT_MODEL_TYPES)
+def test_speculation_ignores_late_partials(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    counted_chat_completion: Mock,
+    model: str,
+) -> None:
+    """
+    Test that partial transcripts arriving after a turn has been resolved do
+    not start speculative requests.
+    """
+    chatbot = patched_openai_chatbot_factory(model)
+    responder = SpeculativeResponder(chatbot, 1)
+    responder.start_turn()
+    responder.resolve("Hello")
+    responder.feed("Hello again")
+    responder.close()
+
+    assert counted_chat_completion.call_count == 1
+
+
+@pytest.mark.parametrize("stable_chunks", [0, -1])
+def test_stable_chunks_sad(stable_chunks: int) -> None:
+    """
+    Test that an error is raised with an inappropriate number of chunks.
+    """
+    with pytest.raises(StableChunksError, match="Stable chunks must be > 0"):
+        SpeculativeResponder(Mock(), stable_chunks)
@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+
+from test_suite.unit.conftest import FakeTextToSpeech
+
+
+def test_say_text_async() -> None:
+    """
+    Test that text is said in order by the speech worker, and that metadata
+    is available from the handles.
+    """
+    text_to_speech = FakeTextToSpeech()
+    handles = [text_to_speech.say_text_async(str(i)) for i in range(5)]
+
+    assert all(speech.wait(timeout=5) for speech in handles)
+    assert text_to_speech.said == [str(i) for i in range(5)]
+    assert [speech.metadata for speech in handles] == [
+        {"text": str(i)} for i in range(5)
+    ]
+    assert all(speech.started_at is not None for speech in handles)
+    assert not any(speech.cancelled for speech in handles)
+
+
+def test_say_text_async_errors() -> None:
+    """
+    Test that errors are stored on the handle, without stopping the worker.
+    """
+
+    def _on_say(text: str) -> None:
+        if text == "bad":
+            raise RuntimeError
+
+    text_to_speech = FakeTextToSpeech(on_say=_on_say)
+    bad = text_to_speech.say_text_async("bad")
+    good = text_to_speech.say_text_async("good")
+
+    assert good.wait(timeout=5)
+    assert isinstance(bad.exception, RuntimeError)
+    assert good.exception is None
+    assert text_to_speech.said == ["good"]
+
+
+@pytest.mark.parametrize("started", [True, False])
+def test_cancel(started: bool) -> None:
+    """
+    Test that cancelling text stops it if it is being said, and skips it if
+    it is still queued, without affecting other text.
+    """
+    saying = threading.Event()
+
+    def _on_say(_: str) -> None:
+        saying.set()
+        text_to_speech.stopped.wait(5)
+
+    text_to_speech = FakeTextToSpeech(on_say=_on_say)
+    first = text_to_speech.say_text_async("first")
+    second = text_to_speech.say_text_async("second")
+    assert saying.wait(timeout=5)
+
+    speech = first if started else second
+    speech.cancel()
+    assert speech.wait(timeout=5)
+    assert speech.cancelled
+    assert text_to_speech.stopped.is_set() == started
+
+    text_to_speech.stopped.set()
+    assert first.wait(timeout=5) and second.wait(timeout=5)
+    assert ("second" in text_to_speech.said) == started
+
+
+def test_interrupt() -> None:
+    """
+    Test that interrupting stops text being said and skips queued text.
+    """
+    saying = threading.Event()
+
+    def _on_say(_: str) -> None:
+        saying.set()
+        text_to_speech.stopped.wait(5)
+
+    text_to_speech = FakeTextToSpeech(on_say=_on_say)
+    handles = [text_to_speech.say_text_async(str(i)) for i in range(3)]
+    assert saying.wait(timeout=5)
+
+    text_to_speech.interrupt()
+    assert all(speech.wait(timeout=5) for speech in handles)
+    assert all(speech.cancelled for speech in handles)
+    assert text_to_speech.said == ["0"]
+
+
+def test_cancel_done_handle() -> None:
+    """
+    Test that cancelling text that has already been said does nothing.
+    """
+    text_to_speech = FakeTextToSpeech()
+    speech = text_to_speech.say_text_async("done")
+    assert speech.wait(timeout=5)
+
+    speech.cancel()
+    assert not speech.cancelled
+    assert not text_to_speech.stopped.is_set()
@@ -0,0 +1,44 @@
+import pytest
+
+from chat_toolkit.common.timing import Timings
+
+
+def test_timings() -> None:
+    """
+    Test that stages are timed, and summarized with percentiles.
+    """
+    timings = Timings()
+    timings.record("chat", 0.5)
+    with timings.time("chat"):
+        pass
+
+    samples = timings.samples("chat")
+    assert len(samples) == 2
+    assert samples[0] == 0.5
+    assert timings.samples("speak") == []
+    assert list(timings.summary) == ["chat"]
+    assert timings.summary["chat"]["count"] == 2
+    assert timings.summary["chat"]["p99"] <= 0.5
+
+
+def test_timings_skip_failures() -> None:
+    """
+    Test that stages that raise are not recorded.
+    """
+    timings = Timings()
+    with pytest.raises(RuntimeError):
+        with timings.time("chat"):
+            raise RuntimeError
+
+    assert timings.summary == {}
+
+
+def test_timings_bounded() -> None:
+    """
+    Test that only the most recent latencies of each stage are kept.
+    """
+    timings = Timings(max_samples=3)
+    for seconds in range(5):
+        timings.record("chat", seconds)
+
+    assert timings.samples("chat") == [2, 3, 4]
@@ -0,0 +1,95 @@
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from chat_toolkit.common.orchestrator import Orchestrator
+from chat_toolkit.common.tracing import Tracer, profile
+from chat_toolkit.common.utils import temporary_file
+from test_suite.unit.conftest import (
+    CHATBOT_MODEL_TYPES,
+    OpenAIChatbotFactoryType,
+)
+
+
+def test_disabled() -> None:
+    """
+    Test that spans of a disabled tracer are not recorded.
+    """
+    tracer = Tracer()
+    with tracer.span("work"):
+        pass
+    tracer.add_span("stage", 0.1)
+
+    assert tracer.events == []
+
+
+def test_spans() -> None:
+    """
+    Test that spans are recorded as complete events, with the thread that
+    recorded them.
+    """
+    tracer = Tracer(max_events=3)
+    tracer.start()
+    with tracer.span("outer", "Test", turn=1):
+        tracer.add_span("inner", 0.0)
+    with pytest.raises(RuntimeError):
+        with tracer.span("failed"):
+            raise RuntimeError
+    thread = threading.Thread(
+        target=lambda: tracer.add_span("other", 0.0), name="other-thread"
+    )
+    thread.start()
+    thread.join()
+    tracer.stop()
+
+    spans = [event for event in tracer.events if event["ph"] == "X"]
+    assert [span["name"] for span in spans] == ["inner", "outer", "failed"]
+    assert spans[1]["cat"] == "Test"
+    assert spans[1]["args"] == {"turn": 1}
+    assert spans[2]["args"] == {"error": "RuntimeError"}
+    assert spans[1]["ts"] <= spans[0]["ts"]
+    assert spans[0]["tid"] == threading.get_ident()
+
+    thread_names = {
+        event["args"]["name"] for event in tracer.events if event["ph"] == "M"
+    }
+    # The span from the other thread was dropped, over max_events
+    assert thread_names == {threading.current_thread().name}
+
+
+def test_profile(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    tmp_path: Path,
+) -> None:
+    """
+    Test that a conversation can be profiled, and saved as a Chrome trace
+    event file.
+    """
+    trace_path = tmp_path / "trace.json"
+    orchestrator = Orchestrator(
+        patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0])
+    )
+    with profile(trace_path) as tracer:
+        orchestrator.run_turn("Hello there")
+        with temporary_file("wav", tmp_file_directory=tmp_path):
+            pass
+    assert not tracer.enabled
+
+    trace = json.loads(trace_path.read_text())
+    assert trace["displayTimeUnit"] == "ms"
+    assert trace["otherData"] == {"dropped_events": 0}
+    spans = {
+        (event["cat"], event["name"])
+        for event in trace["traceEvents"]
+        if event["ph"] == "X"
+    }
+    assert spans == {
+        ("OpenAIChatBot", "send_message"),
+        ("OpenAIChatBot", "completion"),
+        ("Orchestrator", "chat"),
+        ("Orchestrator", "total"),
+        ("chat_toolkit", "temporary_file.create"),
+        ("chat_toolkit", "temporary_file.delete"),
+    }
@@ -0,0 +1,146 @@
+from itertools import count
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from chat_toolkit.common.exceptions import UsageGroupError
+from chat_toolkit.common.orchestrator import Orchestrator
+from chat_toolkit.common.usage_ledger import UsageLedger
+from test_suite.unit.conftest import (
+    CHATBOT_MODEL_TYPES,
+    SPEECH_TO_TEXT_MODEL_TYPES,
+    OpenAIChatbotFactoryType,
+    OpenAISpeechToTextFactoryType,
+)
+
+
+@pytest.fixture
+def ledger() -> UsageLedger:
+    """
+    Enabled ledger with events from two components and sessions, one
+    minute apart.
+    """
+    ledger = UsageLedger(initial_capacity=2, clock=count(0, 60).__next__)
+    ledger.enable()
+    ledger.record("Chat", "prompt_tokens", 10, 0.1, "a")
+    ledger.record("Chat", "completion_tokens", 5, 0.05, "a")
+    ledger.record("Speech", "audio_seconds", 30, 0.5, "b")
+    ledger.record("Chat", "prompt_tokens", 20, 0.2, "b")
+    return ledger
+
+
+def test_disabled() -> None:
+    """
+    Test that a disabled ledger records nothing.
+    """
+    ledger = UsageLedger()
+    ledger.record("Chat", "prompt_tokens", 10)
+
+    assert len(ledger) == 0
+    assert ledger.aggregate() == {}
+
+
+def test_aggregate(ledger: UsageLedger) -> None:
+    """
+    Test that events can be totalled by component, session and kind, within
+    time windows.
+    """
+    assert len(ledger) == 4
+    assert ledger.aggregate() == {
+        "Chat": {"events": 3, "quantity": 35.0, "cost": pytest.approx(0.35)},
+        "Speech": {"events": 1, "quantity": 30.0, "cost": 0.5},
+    }
+    assert ledger.aggregate("session", kind="prompt_tokens") == {
+        "a": {"events": 1, "quantity": 10.0, "cost": 0.1},
+        "b": {"events": 1, "quantity": 20.0, "cost": 0.2},
+    }
+    assert ledger.aggregate("kind", start=60, end=180) == {
+        "completion_tokens": {"events": 1, "quantity": 5.0, "cost": 0.05},
+        "audio_seconds": {"events": 1, "quantity": 30.0, "cost": 0.5},
+    }
+    assert ledger.aggregate(kind="unknown") == {}
+
+    with pytest.raises(UsageGroupError, match="Usage can only be grouped"):
+        ledger.aggregate("model")
+
+
+def test_rate(ledger: UsageLedger) -> None:
+    """
+    Test that usage can be totalled per interval of a time window.
+    """
+    starts, quantities, costs = ledger.rate(
+        120, start=0, end=240, kind="prompt_tokens"
+    )
+
+    np.testing.assert_array_equal(starts, [0, 120])
+    np.testing.assert_array_equal(quantities, [10, 20])
+    np.testing.assert_allclose(costs, [0.1, 0.2])
+
+
+def test_save_and_load(ledger: UsageLedger, tmp_path: Path) -> None:
+    """
+    Test that a ledger can be saved to a binary file and loaded again.
+    """
+    path = tmp_path / "usage.npz"
+    ledger.save(path)
+    loaded = UsageLedger.load(path)
+
+    assert len(loaded) == len(ledger)
+    assert loaded.aggregate("session") == ledger.aggregate("session")
+    for column, values in ledger.columns().items():
+        np.testing.assert_array_equal(loaded.columns()[column], values)
+
+    loaded.record("Chat", "prompt_tokens", 1, session="c")
+    assert loaded.names("session") == ["a", "b", "c"]
+
+
+def test_growth() -> None:
+    """
+    Test that the ledger grows to hold many events.
+    """
+    ledger = UsageLedger(initial_capacity=1, clock=count().__next__)
+    ledger.enable()
+    for index in range(10_000):
+        ledger.record(f"Component{index % 3}", "tokens", 1)
+
+    assert len(ledger) == 10_000
+    assert ledger.aggregate()["Component0"]["events"] == 3334
+    assert len(ledger.columns(start=9_000)["timestamp"]) == 1_000
+
+    ledger.reset()
+    assert len(ledger) == 0
+    assert ledger.names("component") == []
+
+
+def test_component_usage(
+    patched_openai_chatbot_factory: OpenAIChatbotFactoryType,
+    patched_openai_speech_to_text_factory: OpenAISpeechToTextFactoryType,
+    wav_file_factory,
+    usage_ledger: UsageLedger,
+) -> None:
+    """
+    Test that components bill their usage to the ledger, with the same
+    costs as their cost estimates.
+    """
+    orchestrator = Orchestrator(
+        patched_openai_chatbot_factory(CHATBOT_MODEL_TYPES[0]),
+        patched_openai_speech_to_text_factory(SPEECH_TO_TEXT_MODEL_TYPES[0]),
+    )
+    for component in orchestrator.components:
+        component.session_id = "session"
+    with open(wav_file_factory(), "rb") as f:
+        orchestrator.run_turn(f.read())
+
+    usage = usage_ledger.aggregate()
+    for component in orchestrator.components:
+        name = type(component).__qualname__
+        assert usage[name]["cost"] == pytest.approx(
+            component.cost_estimate_data[0]
+        )
+    assert set(usage_ledger.aggregate("kind")) == {
+        "prompt_tokens",
+        "completion_tokens",
+        "audio_seconds",
+    }
+    assert list(usage_ledger.aggregate("session")) == ["session"]
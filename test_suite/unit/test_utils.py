@@ -1,6 +1,6 @@
 import pytest
 
-from chat_toolkit.common.utils import set_openai_api_key
+from chat_toolkit.common.utils import latency_percentiles, set_openai_api_key
 
 
 @pytest.fixture
@@ -27,3 +27,21 @@ def test_missing_api_key_warning(
         )
         == 1
     )
+
+
+def test_latency_percentiles() -> None:
+    """
+    Test that latencies are summarized with percentiles.
+    """
+    assert latency_percentiles([]) == {
+        "count": 0,
+        "mean": 0.0,
+        "p50": 0.0,
+        "p95": 0.0,
+        "p99": 0.0,
+    }
+    latencies = latency_percentiles([float(i) for i in range(1, 101)])
+    assert latencies["count"] == 100
+    assert latencies["mean"] == latencies["p50"] == 50.5
+    assert latencies["p95"] == pytest.approx(95.05)
+    assert latencies["p99"] == pytest.approx(99.01)